@@ -25,11 +25,13 @@ def initialize(archive_dir_path, archive_settings):
         archive_dir_path=archive_dir_path,
         clip_dir_path=archive_dir_path / 'Clips',
         deferred_action_dir_path=archive_dir_path / 'Deferred Actions',
+        ephemeris_dir_path=archive_dir_path / 'Ephemeris',
         job_log_dir_path=archive_dir_path / 'Logs' / 'Jobs',
         preference_file_path=archive_dir_path / 'Preferences.yaml',
         preset_dir_path=archive_dir_path / 'Presets',
         recording_dir_paths=_create_recording_dir_paths(
             archive_settings, archive_dir_path),
+        spectrogram_cache_dir_path=archive_dir_path / 'Spectrograms',
         sqlite_database_file_path=archive_dir_path / 'Archive Database.sqlite')
     
     
@@ -13,7 +13,7 @@ from django.db import transaction
 from vesper.archive_paths import archive_paths
 from vesper.command.command import Command, CommandExecutionError
 from vesper.django.app.models import Recording, RecordingFile
-from vesper.singletons import recording_manager
+from vesper.singletons import recording_file_index, recording_manager
 import vesper.command.command_utils as command_utils
 import vesper.command.recording_utils as recording_utils
 
@@ -678,6 +678,9 @@ class AddRecordingAudioFilesCommand(Command):
             
             start_index += f.length
             
+        if not self._dry_run:
+            recording_file_index.instance.invalidate(recording.id)
+            
             
     def _get_relative_path(self, abs_path):
         
@@ -5,11 +5,13 @@ import logging
 
 import h5py
 import math
+import numpy as np
 
-from vesper.command.command import CommandExecutionError
-from vesper.django.app.models import StringAnnotation
+from vesper.command.command import CommandExecutionError, CommandSyntaxError
+from vesper.django.app.models import DeviceOutput, Processor, Station
 from vesper.singletons import clip_manager
 import vesper.command.command_utils as command_utils
+import vesper.django.app.model_utils as model_utils
 
 
 # TODO: Make reading clip ids and classifications from output files faster?
@@ -66,6 +68,26 @@ _START_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
 # _START_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
 
 
+_CLIP_DATASETS_LAYOUT = 'Clip Datasets'
+_CLIP_TABLE_LAYOUT = 'Clip Table'
+_LAYOUTS = (_CLIP_DATASETS_LAYOUT, _CLIP_TABLE_LAYOUT)
+
+# Approximate size in bytes of the chunks of clip table datasets.
+# HDF5 reads and decompresses whole chunks, so this should be large
+# enough for efficient compression and reading but small enough that
+# reading a single clip does not read too much extra data.
+_CLIP_TABLE_CHUNK_SIZE = 2 ** 20
+
+_CLIP_TABLE_COMPRESSION = 'gzip'
+_CLIP_TABLE_COMPRESSION_LEVEL = 4
+
+_STRING_DTYPE = h5py.string_dtype()
+
+# Clip table values for missing annotations.
+_MISSING_STRING_ANNOTATION_VALUE = ''
+_MISSING_INT_ANNOTATION_VALUE = -1
+
+
 _logger = logging.getLogger()
 
 
@@ -76,6 +98,24 @@ class ClipsHdf5FileExporter:
     
     The clips are written to the server-side HDF5 file specified in
     the `output_file_path` argument.
+    
+    The optional `layout` argument specifies the layout of the file,
+    either "Clip Datasets" (the default) or "Clip Table".
+    
+    In the "Clip Datasets" layout, each clip is a separate dataset of
+    the "/clips" group, with clip metadata as dataset attributes.
+    
+    In the "Clip Table" layout, the samples of all clips are in the
+    rows of a single two-dimensional "/clips/samples" dataset, and
+    clip metadata are in one-dimensional "/clips/<name>" datasets,
+    one per metadata item, with one element per clip. All of the
+    datasets are chunked and compressed. This layout is much more
+    compact and faster to write and read than the "Clip Datasets"
+    layout for large numbers of clips. It requires that all clips
+    have the same length, however: the first clip exported determines
+    the length, and subsequent clips with other lengths are not
+    exported. Missing string annotation values are empty strings and
+    missing integer annotation values are -1.
     """
         
     
@@ -83,8 +123,16 @@ class ClipsHdf5FileExporter:
     
     
     def __init__(self, args):
+        
         self._output_file_path = \
             command_utils.get_required_arg('output_file_path', args)
+        
+        self._layout = command_utils.get_optional_arg(
+            'layout', args, _CLIP_DATASETS_LAYOUT)
+        
+        if self._layout not in _LAYOUTS:
+            raise CommandSyntaxError(
+                f'Unrecognized HDF5 file layout "{self._layout}".')
     
     
     def begin_exports(self):
@@ -95,57 +143,76 @@ class ClipsHdf5FileExporter:
             raise CommandExecutionError(str(e))
         
         # Always create the "clips" group, even if it will be empty.
-        self._file.create_group('/clips')
+        self._group = self._file.create_group('/clips')
+        
+        if self._layout == _CLIP_TABLE_LAYOUT:
+            self._group.attrs['layout'] = self._layout
+            self._table_writer = None
         
         self._clip_manager = clip_manager.instance
         
+        # Map from model class to map from model ID to model name.
+        self._names = {
+            Station: {},
+            DeviceOutput: {},
+            Processor: {}
+        }
+        
     
     def export(self, clip):
+        return self.export_batch([clip]) == 1
+    
+    
+    def export_batch(self, clips):
         
-        annotations = _get_annotations(clip)
+        # Get annotations of all clips with one query.
+        annotations = _get_annotations(clips)
         
-        result = self._extract_samples(clip, annotations)
+        # Extract clip samples in order of recording and start index,
+        # to make recording file reads as sequential as possible. We
+        # write clips to the output file in the same order.
+        clips = sorted(clips, key=_get_read_key)
         
-        if result is not None:
+        rows = []
+        
+        for clip in clips:
             
-            samples, start_index = result
+            clip_annotations = annotations[clip.id]
             
-            # Create dataset from clip samples.
-            name = '/clips/{:08d}'.format(clip.id)
-            self._file[name] = samples
+            detector_name = self._get_name(
+                Processor, clip.creating_processor_id)
             
-            # Set dataset attributes from clip metadata.
-            attrs = self._file[name].attrs
-            attrs['clip_id'] = clip.id
-            attrs['station'] = clip.station.name
-            attrs['mic_output'] = clip.mic_output.name
-            attrs['detector'] = clip.creating_processor.name
-            attrs['date'] = str(clip.date)
-            attrs['sample_rate'] = clip.sample_rate
-            attrs['clip_start_time'] = _format_datetime(clip.start_time)
-            attrs['clip_start_index'] = clip.start_index
-            attrs['clip_length'] = clip.length
-            attrs['extraction_start_index'] = start_index
+            result = self._extract_samples(
+                clip, detector_name, clip_annotations)
             
-            for name, value in annotations.items():
-                name = name.lower().replace(' ', '_')
-                try:
-                    attrs[name] = value
-                except Exception:
-                    _logger.error(
-                        f'Could not assign value "{value}" for attribute '
-                        f'"{name}" for clip starting at {clip.start_time}.')
-                    raise
-                
-            return True
+            if result is not None:
+                samples, start_index = result
+                metadata = self._get_metadata(
+                    clip, detector_name, start_index, clip_annotations)
+                rows.append((metadata, samples))
         
+        if self._layout == _CLIP_TABLE_LAYOUT:
+            return self._write_table_rows(rows)
         else:
-            return False
+            return self._write_datasets(rows)
+    
+    
+    def _get_name(self, cls, id_):
+        
+        names = self._names[cls]
+        
+        try:
+            return names[id_]
+        
+        except KeyError:
+            name = cls.objects.get(id=id_).name
+            names[id_] = name
+            return name
         
  
-    def _extract_samples(self, clip, annotations):
+    def _extract_samples(self, clip, detector_name, annotations):
         
-        extent = _get_extraction_extent(clip, annotations)
+        extent = _get_extraction_extent(clip, detector_name, annotations)
         
         if extent is None:
             return None
@@ -168,14 +235,190 @@ class ClipsHdf5FileExporter:
             
             return samples, start_index
     
+    
+    def _get_metadata(self, clip, detector_name, start_index, annotations):
+        
+        metadata = {
+            'clip_id': clip.id,
+            'station': self._get_name(Station, clip.station_id),
+            'mic_output': self._get_name(DeviceOutput, clip.mic_output_id),
+            'detector': detector_name,
+            'date': str(clip.date),
+            'sample_rate': clip.sample_rate,
+            'clip_start_time': _format_datetime(clip.start_time),
+            'clip_start_index': clip.start_index,
+            'clip_length': clip.length,
+            'extraction_start_index': start_index
+        }
+        
+        for name, value in annotations.items():
+            metadata[_get_metadata_name(name)] = value
+            
+        return metadata
+    
+    
+    def _write_datasets(self, rows):
+        
+        for metadata, samples in rows:
+            
+            # Create dataset from clip samples.
+            name = '{:08d}'.format(metadata['clip_id'])
+            self._group[name] = samples
+            
+            # Set dataset attributes from clip metadata.
+            attrs = self._group[name].attrs
+            for key, value in metadata.items():
+                try:
+                    attrs[key] = value
+                except Exception:
+                    _logger.error(
+                        f'Could not assign value "{value}" for attribute '
+                        f'"{key}" for clip starting at '
+                        f'{metadata["clip_start_time"]}.')
+                    raise
+                
+        return len(rows)
+    
+    
+    def _write_table_rows(self, rows):
+        
+        if len(rows) == 0:
+            return 0
+        
+        if self._table_writer is None:
+            samples = rows[0][1]
+            self._table_writer = _ClipTableWriter(
+                self._group, len(samples), samples.dtype)
+        
+        return self._table_writer.append(rows)
+    
 
     def end_exports(self):
-        pass
+        self._file.close()
+
+
+def _get_read_key(clip):
+    return (clip.recording_channel_id, clip.start_index or 0, clip.id)
 
 
-def _get_extraction_extent(clip, annotations):
+def _get_metadata_name(annotation_name):
+    return annotation_name.lower().replace(' ', '_')
+
+
+class _ClipTableWriter:
+    
+    """Writes clips to the datasets of the "Clip Table" file layout."""
     
-    detector_name = _get_detector_name(clip)
+    
+    def __init__(self, group, clip_length, sample_dtype):
+        
+        self._clip_length = clip_length
+        
+        # Get number of clips per chunk.
+        clip_size = clip_length * sample_dtype.itemsize
+        chunk_length = max(_CLIP_TABLE_CHUNK_SIZE // clip_size, 1)
+        
+        self._samples = group.create_dataset(
+            'samples', shape=(0, clip_length), dtype=sample_dtype,
+            maxshape=(None, clip_length), chunks=(chunk_length, clip_length),
+            **_get_compression_kwargs())
+        
+        self._columns = dict(
+            (name, _create_column_dataset(group, name, dtype))
+            for name, dtype in _get_column_dtypes())
+        
+        self._size = 0
+        
+    
+    def append(self, rows):
+        
+        rows = [r for r in rows if self._check_length(*r)]
+        
+        start = self._size
+        end = start + len(rows)
+        
+        self._samples.resize(end, axis=0)
+        self._samples[start:end] = np.array([samples for _, samples in rows])
+        
+        for name, dataset in self._columns.items():
+            dataset.resize(end, axis=0)
+            dataset[start:end] = [
+                _get_column_value(metadata.get(name), dataset.dtype)
+                for metadata, _ in rows]
+        
+        self._size = end
+        
+        return len(rows)
+    
+    
+    def _check_length(self, metadata, samples):
+        
+        if len(samples) != self._clip_length:
+            _logger.warning(
+                f'Extracted samples of clip {metadata["clip_id"]} have '
+                f'length {len(samples)} rather than the length '
+                f'{self._clip_length} of previously exported clips, so the '
+                f'clip will not appear in output.')
+            return False
+        
+        else:
+            return True
+
+
+def _get_compression_kwargs():
+    return {
+        'compression': _CLIP_TABLE_COMPRESSION,
+        'compression_opts': _CLIP_TABLE_COMPRESSION_LEVEL,
+        'shuffle': True
+    }
+
+
+def _get_column_dtypes():
+    
+    dtypes = [
+        ('clip_id', np.int64),
+        ('station', _STRING_DTYPE),
+        ('mic_output', _STRING_DTYPE),
+        ('detector', _STRING_DTYPE),
+        ('date', _STRING_DTYPE),
+        ('sample_rate', np.float64),
+        ('clip_start_time', _STRING_DTYPE),
+        ('clip_start_index', np.int64),
+        ('clip_length', np.int64),
+        ('extraction_start_index', np.int64)
+    ]
+    
+    for name, value_converter in _ANNOTATION_INFOS:
+        dtype = np.int64 if value_converter is int else _STRING_DTYPE
+        dtypes.append((_get_metadata_name(name), dtype))
+        
+    return dtypes
+
+
+def _create_column_dataset(group, name, dtype):
+    
+    chunk_length = _CLIP_TABLE_CHUNK_SIZE // np.dtype(dtype).itemsize
+    
+    return group.create_dataset(
+        name, shape=(0,), dtype=dtype, maxshape=(None,),
+        chunks=(chunk_length,), **_get_compression_kwargs())
+
+
+def _get_column_value(value, dtype):
+    
+    if value is not None:
+        return value
+    
+    elif h5py.check_string_dtype(dtype) is not None:
+        return _MISSING_STRING_ANNOTATION_VALUE
+    
+    else:
+        return _MISSING_INT_ANNOTATION_VALUE
+
+
+def _get_extraction_extent(clip, detector_name, annotations):
+    
+    detector_name = _get_detector_type(detector_name)
     
     if detector_name is None:
         return None
@@ -203,9 +446,9 @@ def _get_extraction_extent(clip, annotations):
         return start_offset, length
         
 
-# def _get_extraction_extent(clip, annotations):
+# def _get_extraction_extent(clip, detector_name, annotations):
 #     
-#     detector_name = _get_detector_name(clip)
+#     detector_name = _get_detector_type(detector_name)
 #     
 #     if detector_name is None:
 #         return None
@@ -224,9 +467,7 @@ def _get_extraction_extent(clip, annotations):
 #         return start_offset, length
         
 
-def _get_detector_name(clip):
-    
-    detector_name = clip.creating_processor.name
+def _get_detector_type(detector_name):
     
     if detector_name.find('Thrush') != -1:
         return 'Thrush'
@@ -247,25 +488,35 @@ def _format_datetime(dt):
     return dt.strftime(_START_TIME_FORMAT)
     
 
-def _get_annotations(clip):
+def _get_annotations(clips):
+    
+    names = [name for name, _ in _ANNOTATION_INFOS]
     
-    return dict([
-        (name, _get_annotation_value(clip, name, value_converter))
-        for name, value_converter in _ANNOTATION_INFOS])
+    annotations = model_utils.get_clips_annotations(
+        [clip.id for clip in clips], names)
+    
+    return dict(
+        (clip_id, _convert_annotations(values))
+        for clip_id, values in annotations.items())
+
+
+def _convert_annotations(values):
+    return dict(
+        (name, _convert_annotation_value(name, values, value_converter))
+        for name, value_converter in _ANNOTATION_INFOS)
         
         
-def _get_annotation_value(clip, annotation_name, value_converter):
+def _convert_annotation_value(annotation_name, values, value_converter):
     
     try:
-        annotation = clip.string_annotations.get(
-            info__name=annotation_name)
+        value = values[annotation_name]
         
-    except StringAnnotation.DoesNotExist:
+    except KeyError:
         return _DEFAULT_ANNOTATION_VALUES.get(annotation_name)
     
     else:
         
         if value_converter is None:
-            return annotation.value
+            return value
         else:
-            return value_converter(annotation.value)
+            return value_converter(value)
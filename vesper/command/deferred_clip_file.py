@@ -0,0 +1,297 @@
+"""
+Module containing classes `DeferredClipFileWriter` and
+`DeferredClipFileReader`.
+
+A deferred clip file describes clips whose creation in an archive
+database has been deferred by a detect command, so that the clips can
+be created later by an execute deferred actions command. The file is
+append-only, and comprises a file header followed by any number of
+chunks, each describing one or more clips. A detector listener appends
+a chunk to its file each time it has a batch of clips to create, so it
+needn't keep its clips in memory.
+
+The file header comprises the eight bytes `b'VesperDC'` followed by a
+little-endian 32-bit unsigned file format version number, currently 1.
+
+Each chunk comprises a chunk header, a clip array, an annotation array,
+and annotation text. The chunk header comprises the four bytes
+`b'CHNK'` followed by three little-endian 32-bit unsigned integers: the
+number of clips, the number of annotations, and the size in bytes of
+the annotation text. The clip and annotation arrays are arrays of
+fixed-width records of the NumPy structured data types `CLIP_DTYPE`
+and `ANNOTATION_DTYPE`. A clip creation time is stored as an integer
+number of microseconds since the UTC epoch. Each annotation record
+indicates the clip of the chunk to which the annotation pertains, and
+the UTF-8 encoded lengths of its name and value. The annotation text is
+the concatenation of the encoded annotation names and values, in order.
+
+If the process writing a deferred clip file ends abnormally, the last
+chunk of the file may be incomplete. A reader ignores such a chunk.
+"""
+
+
+import datetime
+import os
+import struct
+
+import numpy as np
+import pytz
+
+
+FILE_NAME_EXTENSION = '.vdc'
+
+CLIP_DTYPE = np.dtype([
+    ('recording_channel_id', '<i8'),
+    ('start_index', '<i8'),
+    ('length', '<i8'),
+    ('creation_time', '<i8'),
+    ('creating_job_id', '<i8'),
+    ('creating_processor_id', '<i8')])
+
+ANNOTATION_DTYPE = np.dtype([
+    ('clip_num', '<u4'),
+    ('name_length', '<u2'),
+    ('value_length', '<u2')])
+
+_FILE_HEADER = struct.Struct('<8sI')
+_FILE_MAGIC = b'VesperDC'
+_FILE_FORMAT_VERSION = 1
+
+_CHUNK_HEADER = struct.Struct('<4sIII')
+_CHUNK_MAGIC = b'CHNK'
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=pytz.utc)
+
+
+class DeferredClipFileError(Exception):
+    pass
+
+
+class DeferredClipFileWriter:
+    
+    """
+    Appends chunks of clips to a new deferred clip file.
+    
+    Each clip is described by a tuple of the form:
+        
+        (recording_channel_id, start_index, length, creation_time,
+         creating_job_id, creating_processor_id, annotations)
+    
+    where `creation_time` is a UTC `datetime` and `annotations` is
+    either `None` or a `dict` mapping annotation names to values.
+    """
+    
+    
+    def __init__(self, file_path):
+        self._file = open(file_path, 'wb')
+        self._file.write(_FILE_HEADER.pack(_FILE_MAGIC, _FILE_FORMAT_VERSION))
+    
+    
+    def write(self, clips):
+        
+        """Appends a chunk containing the specified clips."""
+        
+        if len(clips) == 0:
+            return
+        
+        clip_records = np.zeros(len(clips), dtype=CLIP_DTYPE)
+        annotation_records = []
+        text = []
+        
+        for i, (recording_channel_id, start_index, length, creation_time,
+                creating_job_id, creating_processor_id, annotations) in \
+                enumerate(clips):
+            
+            clip_records[i] = (
+                recording_channel_id, start_index, length,
+                _get_epoch_microseconds(creation_time), creating_job_id,
+                creating_processor_id)
+            
+            if annotations is not None:
+                
+                for name, value in annotations.items():
+                    
+                    name = name.encode('utf-8')
+                    value = str(value).encode('utf-8')
+                    
+                    annotation_records.append((i, len(name), len(value)))
+                    text += [name, value]
+        
+        annotation_records = np.array(
+            annotation_records, dtype=ANNOTATION_DTYPE)
+        text = b''.join(text)
+        
+        self._file.write(_CHUNK_HEADER.pack(
+            _CHUNK_MAGIC, len(clip_records), len(annotation_records),
+            len(text)))
+        self._file.write(clip_records.tobytes())
+        self._file.write(annotation_records.tobytes())
+        self._file.write(text)
+    
+    
+    def close(self):
+        self._file.close()
+
+
+def _get_epoch_microseconds(dt):
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + \
+        delta.microseconds
+
+
+def get_datetime(epoch_microseconds):
+    
+    """
+    Gets the UTC `datetime` of a clip creation time read from a deferred
+    clip file.
+    """
+    
+    return _EPOCH + datetime.timedelta(microseconds=int(epoch_microseconds))
+
+
+class DeferredClipFileChunk:
+    
+    """
+    Chunk of a deferred clip file.
+    
+    The `clips` and `annotations` attributes of a chunk are NumPy record
+    arrays of types `CLIP_DTYPE` and `ANNOTATION_DTYPE`, respectively.
+    For a chunk read from a file, the arrays are views of the memory-
+    mapped file. The `end_offset` attribute is the byte offset in the
+    file of the next chunk.
+    """
+    
+    
+    def __init__(self, offset, end_offset, clips, annotations, text):
+        self.offset = offset
+        self.end_offset = end_offset
+        self.clips = clips
+        self.annotations = annotations
+        self._text = text
+    
+    
+    def get_annotations(self):
+        
+        """
+        Gets the annotations of the clips of this chunk.
+        
+        Returns a list with one element per clip of this chunk. The
+        element is `None` for a clip with no annotations, or a `dict`
+        mapping annotation names to values.
+        """
+        
+        annotations = [None] * len(self.clips)
+        
+        text = self._text
+        offset = 0
+        
+        for clip_num, name_length, value_length in self.annotations:
+            
+            value_offset = offset + name_length
+            end_offset = value_offset + value_length
+            
+            name = text[offset:value_offset].decode('utf-8')
+            value = text[value_offset:end_offset].decode('utf-8')
+            
+            if annotations[clip_num] is None:
+                annotations[clip_num] = {}
+            
+            annotations[clip_num][name] = value
+            
+            offset = end_offset
+        
+        return annotations
+
+
+class DeferredClipFileReader:
+    
+    """
+    Reads chunks of a deferred clip file.
+    
+    The reader memory-maps the file, so that reading a chunk does not
+    copy its clip and annotation arrays.
+    """
+    
+    
+    def __init__(self, file_path):
+        
+        if os.path.getsize(file_path) < _FILE_HEADER.size:
+            
+            # The process that wrote the file ended abnormally before
+            # the file header reached the file. We treat the file as
+            # having no chunks. (We can't memory-map an empty file.)
+            self._data = np.zeros(0, dtype=np.uint8)
+            
+            return
+        
+        self._data = np.memmap(file_path, dtype=np.uint8, mode='r')
+        
+        magic, version = _FILE_HEADER.unpack_from(self._data, 0)
+        
+        if magic != _FILE_MAGIC:
+            raise DeferredClipFileError(
+                f'File "{file_path}" is not a deferred clip file.')
+        
+        if version != _FILE_FORMAT_VERSION:
+            raise DeferredClipFileError(
+                f'Deferred clip file "{file_path}" has unsupported format '
+                f'version {version}.')
+    
+    
+    @property
+    def start_offset(self):
+        
+        """The byte offset of the first chunk of the file."""
+        
+        return _FILE_HEADER.size
+    
+    
+    def get_chunks(self, offset=None):
+        
+        """
+        Generates the chunks of the file, starting at the specified
+        byte offset.
+        
+        If `offset` is `None`, the chunks are generated starting with
+        the first one. Generation stops at the end of the file, or at
+        an incomplete final chunk.
+        """
+        
+        data = self._data
+        size = len(data)
+        
+        if offset is None:
+            offset = self.start_offset
+        
+        while offset + _CHUNK_HEADER.size <= size:
+            
+            magic, num_clips, num_annotations, text_size = \
+                _CHUNK_HEADER.unpack_from(data, offset)
+            
+            if magic != _CHUNK_MAGIC:
+                raise DeferredClipFileError(
+                    f'Bad deferred clip file chunk header at byte offset '
+                    f'{offset}.')
+            
+            clips_size = num_clips * CLIP_DTYPE.itemsize
+            annotations_size = num_annotations * ANNOTATION_DTYPE.itemsize
+            
+            clips_offset = offset + _CHUNK_HEADER.size
+            annotations_offset = clips_offset + clips_size
+            text_offset = annotations_offset + annotations_size
+            end_offset = text_offset + text_size
+            
+            if end_offset > size:
+                # incomplete chunk
+                
+                break
+            
+            clips = data[clips_offset:annotations_offset].view(CLIP_DTYPE)
+            annotations = \
+                data[annotations_offset:text_offset].view(ANNOTATION_DTYPE)
+            text = data[text_offset:end_offset].tobytes()
+            
+            yield DeferredClipFileChunk(
+                offset, end_offset, clips, annotations, text)
+            
+            offset = end_offset
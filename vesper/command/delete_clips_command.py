@@ -188,6 +188,10 @@ class DeleteClipsCommand(ClipSetCommand):
                 # 900 seems to work.
                 max_chunk_size = 900
                 
+                # Remove clips from clip count table while their
+                # annotations and tags still exist.
+                model_utils.remove_clip_counts(clips)
+                
                 for i in range(0, len(clips), max_chunk_size):
                     
                     chunk = clips[i:i + max_chunk_size]
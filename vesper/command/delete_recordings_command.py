@@ -10,6 +10,7 @@ from vesper.command.command import Command, CommandExecutionError
 from vesper.django.app.models import Clip, Recording, Station
 from vesper.singletons import clip_manager
 import vesper.command.command_utils as command_utils
+import vesper.django.app.model_utils as model_utils
 import vesper.util.archive_lock as archive_lock
 
 
@@ -111,8 +112,12 @@ class DeleteRecordingsCommand(Command):
                 # TODO: Consider moving file deletions outside of database
                 # transaction.
                 
-                clips = Clip.objects.filter(
-                    recording_channel__recording=recording)
+                clips = list(Clip.objects.filter(
+                    recording_channel__recording=recording))
+                
+                # Remove clips from clip count table while their
+                # annotations and tags still exist.
+                model_utils.remove_clip_counts(clips)
                 
                 # Delete clip files.
                 for clip in clips:
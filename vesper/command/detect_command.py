@@ -2,25 +2,32 @@
 
 
 from collections import defaultdict
+from multiprocessing import Process, Queue
+from threading import Event, Thread
 import datetime
 import itertools
 import logging
-import pickle
+import queue
 import random
 import time
 
-from django.db import transaction
+from django.db import connections, transaction
 
 from vesper.archive_paths import archive_paths
-from vesper.command.command import Command, CommandExecutionError
+from vesper.command.command import (
+    Command, CommandExecutionError, CommandSyntaxError)
+from vesper.command.deferred_clip_file import DeferredClipFileWriter
 from vesper.django.app.models import (
-    AnnotationInfo, Clip, Job, Recording, RecordingChannel, Station)
+    AnnotationInfo, Clip, Job, Processor, Recording, RecordingChannel,
+    Station)
+from vesper.django.app.recording_signal import RecordingSignal
 from vesper.old_bird.old_bird_detector_runner import OldBirdDetectorRunner
-from vesper.signal.wave_audio_file import WaveAudioFileReader
 from vesper.singletons import (
     archive, clip_manager, extension_manager, preset_manager)
+from vesper.util.analysis_graph import AnalysisGraph
 from vesper.util.schedule import Interval, Schedule
 import vesper.command.command_utils as command_utils
+import vesper.command.detect_worker as detect_worker
 import vesper.django.app.model_utils as model_utils
 import vesper.util.archive_lock as archive_lock
 import vesper.util.os_utils as os_utils
@@ -48,7 +55,7 @@ _DETECTION_CHUNK_SIZE = 100000
 """Detection chunk size in sample frames."""
 
 
-_CLIP_BATCH_SIZE = 10
+_CLIP_BATCH_SIZE = 100
 """
 Number of clips to write to archive in a single database transaction.
 
@@ -69,8 +76,59 @@ of the detector run in number of times faster than real time.
         1000             462              1088
         10000            2483             1063
         
-A batch size of 10 provides both a reasonably short transaction duration,
-which is important for concurrency support, and fast detection.
+A batch size of 10 provided both a reasonably short transaction duration,
+which is important for concurrency support, and fast detection when
+clips were created one database insert at a time.
+
+Clips are now created with set-based inserts (see the `_ClipWriter`
+class, below), which makes larger batches much cheaper. The following
+table shows the mean time to write a clip to a SQLite archive for
+various batch sizes, both with one insert per clip as before and with
+set-based inserts, and both with and without a single annotation per
+clip (as the MPG Ranch detectors create). The times were measured by
+writing 10000 clips with a `_ClipWriter` on a single-core Linux
+virtual machine.
+
+                           Time Per Clip (ms)
+                 Unannotated Clips           Annotated Clips
+    Batch Size   Per Clip   Set-Based    Per Clip   Set-Based
+    ----------   --------   ---------    --------   ---------
+        1          2.55       2.02         6.40       3.60
+        10         0.72       0.67         3.50       1.12
+        100        0.55       0.27         3.00       0.65
+        1000       0.48       0.25         2.83       0.54
+
+A batch size of 100 yields most of the benefit of set-based inserts
+while keeping transaction durations under a tenth of a second.
+"""
+
+
+_LISTENER_CLIP_BATCH_SIZE = 10
+"""
+Number of clips a detector listener accumulates before handing them to
+the clip writer.
+
+The clip writer writes clips to the archive in a separate thread, and
+combines the clips it receives into batches of up to `_CLIP_BATCH_SIZE`
+clips, so this number can be smaller than that one. Smaller listener
+batches keep clips flowing to the writer thread steadily, and when the
+database is fast the writer writes them promptly in small batches.
+"""
+
+
+_CLIP_QUEUE_SIZE = 1000
+"""
+Maximum number of listener clip batches in the clip writer's queue.
+
+When the queue is full, detector listeners wait for the writer thread
+to make room in it.
+"""
+
+
+_MAX_CLIP_BATCH_DELAY = 1
+"""
+Maximum time in seconds for which the clip writer thread waits for more
+clips to add to a batch before writing it.
 """
 
 
@@ -96,7 +154,30 @@ End index of shuffled station-nights for which to run detectors, when
 """
 
 
-_DEFERRED_DATABASE_WRITE_FILE_NAME_FORMAT = 'Job {} Part {:03d}.pkl'
+_DEFAULT_NUM_WORKERS = 1
+"""
+Default number of worker processes in which to run detectors.
+
+When the number of workers is one, detectors are run in the main job
+process. When it is greater than one, each station-night is processed
+in one of a pool of worker processes, and the main job process writes
+the clips detected by the workers to the archive.
+"""
+
+
+_WORKER_MESSAGE_TIMEOUT = 1
+"""
+Time in seconds that the main job process waits for a message from
+its worker processes before checking whether any of them are still
+alive.
+"""
+
+
+_DEFERRED_DATABASE_WRITE_FILE_NAME_FORMAT = 'Job {} Part {:03d}.vdc'
+
+
+_WORKER_DEFERRED_DATABASE_WRITE_FILE_NAME_FORMAT = \
+    'Job {} Worker {:03d} Part {:03d}.vdc'
 
 
 # TODO: Remove command argument and code for creating clip files if we
@@ -123,6 +204,7 @@ class DetectCommand(Command):
         self._schedule_name = get('schedule', args)
         self._defer_clip_creation = get('defer_clip_creation', args)
         self._create_clip_files = False  # get('create_clip_files', args)
+        self._num_workers = _get_num_workers(args)
         
         self._schedule = _get_schedule(self._schedule_name)
         self._station_schedules = {}
@@ -131,6 +213,12 @@ class DetectCommand(Command):
         self._start_station_night_index = _START_STATION_NIGHT_INDEX
         self._end_station_night_index = _END_STATION_NIGHT_INDEX
         
+        # Number of the worker process in which this command is running,
+        # or `None` if it is running in the main job process.
+        self._worker_num = None
+        
+        self._clip_writer = None
+        
         
     def execute(self, job_info):
         
@@ -143,15 +231,263 @@ class DetectCommand(Command):
         recording_lists = self._get_recording_lists()
         station_nights = sorted(recording_lists.keys())
         
+        num_workers = min(self._num_workers, len(station_nights))
+        
+        if num_workers <= 1 or len(other_detectors) == 0:
+            return self._run_detectors(
+                detectors, station_nights, recording_lists)
+            
+        else:
+            return self._run_detectors_in_workers(
+                old_bird_detectors, station_nights, recording_lists,
+                num_workers)
+    
+    
+    def _run_detectors(self, detectors, station_nights, recording_lists):
+        
+        job = Job.objects.get(id=self._job_info.job_id)
+        clip_writer = _ClipWriter(job, self._create_clip_files, self._logger)
+        self._clip_writer = _AsyncClipWriter(clip_writer)
+        
+        old_bird_detectors, other_detectors = _partition_detectors(detectors)
+        
+        num_station_nights = len(station_nights)
+        
+        try:
+            
+            for i, station_night in enumerate(station_nights):
+                
+                if self._job_info.stop_requested:
+                    return False
+                
+                self._log_station_night(station_night, i, num_station_nights)
+                
+                recordings = recording_lists[station_night]
+                self._run_old_bird_detectors(old_bird_detectors, recordings)
+                self._run_other_detectors(other_detectors, recordings)
+                
+        finally:
+            
+            # Wait for writer thread to write remaining clips.
+            self._clip_writer.close()
+            
+        return True
+    
+    
+    def _run_detectors_in_workers(
+            self, old_bird_detectors, station_nights, recording_lists,
+            num_workers):
+        
+        """
+        Runs detectors on station-nights in worker processes.
+        
+        Worker processes run only detectors other than the original
+        Old Bird detectors. This process writes the clips the workers
+        detect to the archive, and is thus the only process that does
+        so while the workers are running. When the workers have finished,
+        this process runs the original Old Bird detectors, if any, on
+        all of the station-nights itself. Those detectors write their
+        clips to the archive themselves, and they must run one at a time
+        in any case, since the Old Bird detector programs read and write
+        files at fixed locations.
+        """
+        
+        self._logger.info(
+            'Running detectors in {} worker processes...'.format(
+                num_workers))
+        
+        # Queue one task for each station-night, followed by one `None`
+        # for each worker to indicate that there are no more tasks.
+        # Tasks include recording IDs rather than recordings so that
+        # they can be unpickled in a worker before it sets up Django.
+        task_queue = Queue()
+        num_station_nights = len(station_nights)
         for i, station_night in enumerate(station_nights):
+            recording_ids = [r.id for r in recording_lists[station_night]]
+            task_queue.put((i, num_station_nights, station_night,
+                            recording_ids))
+        for _ in range(num_workers):
+            task_queue.put(None)
+            
+        message_queue = Queue()
+        
+        # Close this process's database connections so that worker
+        # processes do not inherit them. Django will reopen them as
+        # needed.
+        connections.close_all()
+        
+        workers = [
+            Process(
+                target=detect_worker.run_worker,
+                args=(self.arguments, self._job_info,
+                      archive_lock.get_lock(), worker_num, task_queue,
+                      message_queue))
+            for worker_num in range(num_workers)]
+        
+        for worker in workers:
+            worker.start()
+            
+        # Write clips detected by workers to archive. This process is
+        # the only one that writes clips to the archive database, so
+        # the workers never contend with each other for the archive
+        # lock.
+        job = Job.objects.get(id=self._job_info.job_id)
+        clip_writer = _ClipWriter(job, self._create_clip_files, self._logger)
+        async_clip_writer = _AsyncClipWriter(clip_writer)
+        
+        try:
+            num_failed_workers = self._write_worker_clips(
+                workers, message_queue, async_clip_writer)
             
-            self._log_station_night(station_night, i, len(station_nights))
+        finally:
+            
+            # Wait for writer thread to write remaining clips.
+            async_clip_writer.close()
+        
+        for worker in workers:
+            worker.join()
+            
+        if len(old_bird_detectors) != 0 and \
+                not self._job_info.stop_requested:
+            self._run_old_bird_detectors_on_station_nights(
+                old_bird_detectors, station_nights, recording_lists)
+            
+        # Any tasks remaining in the task queue (for example after a
+        # stop request) will never be read, so don't wait for them to
+        # be flushed to the queue's pipe when this process exits.
+        task_queue.cancel_join_thread()
+        
+        if not self._defer_clip_creation:
+            clip_writer.log_summary()
+            
+        if num_failed_workers != 0:
+            raise CommandExecutionError(
+                '{} of {} worker processes failed. See above for '
+                'details.'.format(num_failed_workers, num_workers))
+            
+        return not self._job_info.stop_requested
+    
+    
+    def _write_worker_clips(self, workers, message_queue, clip_writer):
+        
+        """
+        Writes clips sent by detection workers to the archive until all
+        of the workers have finished.
+        
+        Returns the number of workers that failed.
+        """
+        
+        num_running_workers = len(workers)
+        num_failed_workers = 0
+        all_workers_exited = False
+        
+        while num_running_workers != 0:
+            
+            try:
+                
+                if all_workers_exited:
+                    message = message_queue.get_nowait()
+                else:
+                    message = message_queue.get(
+                        timeout=_WORKER_MESSAGE_TIMEOUT)
+                
+            except queue.Empty:
+                
+                if all_workers_exited:
+                    # all workers have exited and we have handled all
+                    # of their messages, but at least one worker never
+                    # said it was done
+                    
+                    num_failed_workers += num_running_workers
+                    break
+                
+                elif not any(worker.is_alive() for worker in workers):
+                    # all workers have exited, at least one without
+                    # saying so before our timeout
+                    
+                    # Workers may have sent their final messages and
+                    # exited between our timeout and our check of
+                    # whether they were alive, so we handle any
+                    # messages remaining in the queue before counting
+                    # workers that never said they were done as failed.
+                    all_workers_exited = True
+                
+            else:
+                
+                name, value = message
+                
+                if name == 'clips':
+                    clip_writer.write_clips(value)
+                    
+                elif name == 'done':
+                    num_running_workers -= 1
+                    if not value:
+                        num_failed_workers += 1
+                        
+        return num_failed_workers
+    
+    
+    def _run_old_bird_detectors_on_station_nights(
+            self, detectors, station_nights, recording_lists):
+        
+        self._logger.info(
+            'Running original Old Bird detectors in main job process...')
+        
+        num_station_nights = len(station_nights)
+        
+        for i, station_night in enumerate(station_nights):
+            
+            if self._job_info.stop_requested:
+                break
+            
+            self._log_station_night(station_night, i, num_station_nights)
             
             recordings = recording_lists[station_night]
-            self._run_old_bird_detectors(old_bird_detectors, recordings)
-            self._run_other_detectors(other_detectors, recordings)
+            self._run_old_bird_detectors(detectors, recordings)
+    
+    
+    def run_worker(self, job_info, worker_num, task_queue, message_queue):
+        
+        """
+        Runs detectors on station-nights from a task queue.
+        
+        This method is invoked in each detection worker process, with
+        Django already set up and the root logger already configured.
+        Rather than writing clips to the archive database itself, each
+        worker sends them to the main job process via the specified
+        message queue.
+        
+        Workers do not run the original Old Bird detectors, which write
+        clips to the archive database themselves. The main job process
+        runs them after the workers finish.
+        """
+        
+        self._job_info = job_info
+        self._logger = logging.getLogger()
+        self._worker_num = worker_num
+        self._clip_writer = _QueueClipWriter(message_queue)
+        
+        detectors = self._get_detectors()
+        _, other_detectors = _partition_detectors(detectors)
+        
+        while not job_info.stop_requested:
             
-        return True
+            task = task_queue.get()
+            
+            if task is None:
+                # no more tasks
+                
+                break
+            
+            i, num_station_nights, station_night, recording_ids = task
+            
+            recordings = list(
+                Recording.objects.filter(
+                    id__in=recording_ids).order_by('start_time'))
+            
+            self._log_station_night(station_night, i, num_station_nights)
+            
+            self._run_other_detectors(other_detectors, recordings)
     
     
     def _get_detectors(self):
@@ -294,9 +630,16 @@ class DetectCommand(Command):
     def _log_station_night(self, station_night, i, n):
         
         station_name, night = station_night
+        
+        if self._worker_num is None:
+            worker_text = ''
+        else:
+            worker_text = ' in worker {}'.format(self._worker_num + 1)
+            
         self._logger.info((
-            'Processing recordings for station-night {} of {} - '
-            '"{} {}"...').format(i + 1, n, station_name, str(night)))
+            'Processing recordings for station-night {} of {}{} - '
+            '"{} {}"...').format(
+                i + 1, n, worker_text, station_name, str(night)))
 
 
     def _run_old_bird_detectors(self, detectors, recordings):
@@ -336,7 +679,7 @@ class DetectCommand(Command):
                 '    Processing recording {} of {} - "{}"...'.format(
                     i + 1, num_recordings, str(recording)))
             
-            recording_files = recording.files.all()
+            recording_files = recording.files.order_by('file_num')
             
             if len(recording_files) == 0:
                 self._logger.error(
@@ -346,10 +689,13 @@ class DetectCommand(Command):
             else:
                 
                 recording_intervals = self._get_detection_intervals(recording)
-            
-                for file_ in recording_files:
-                    self._run_other_detectors_on_file(
-                        detector_models, file_, recording_intervals)
+                
+                # Run detectors on runs of consecutive recording files
+                # as single signals, so that detectors are not restarted
+                # at file boundaries and can detect clips that span them.
+                for files in self._get_file_runs(recording_files):
+                    self._run_other_detectors_on_files(
+                        detector_models, files, recording_intervals)
                     
                     
     def _get_detection_intervals(self, recording):
@@ -402,67 +748,117 @@ class DetectCommand(Command):
                 return schedule
         
             
-    def _run_other_detectors_on_file(
-            self, detector_models, file_, recording_intervals):
-                
-        if file_.path is None:
-            
-            self._logger.error((
-                '        Archive has no path for file {} of recording, '
-                'so no detectors will be run on it.').format(file_.num))
+    def _get_file_runs(self, recording_files):
         
-        else:
+        """
+        Gets the runs of consecutive files of a recording that have
+        absolute paths.
+        
+        Returns a list of runs, each of which is a list of
+        `(file, absolute path)` pairs.
+        """
+        
+        runs = []
+        run = []
+        
+        for file_ in recording_files:
             
-            try:
-                abs_path = model_utils.get_absolute_recording_file_path(file_)
-                
-            except ValueError as e:
-                self._logger.error('        ' + str(e))
+            abs_path = None
+            
+            if file_.path is None:
                 
+                self._logger.error((
+                    '        Archive has no path for file {} of recording, '
+                    'so no detectors will be run on it.').format(
+                        file_.file_num))
+            
             else:
-                # have absolute path of recording file
                 
-                reader = WaveAudioFileReader(str(abs_path))
-                
-                intervals = _get_file_detection_intervals(
-                    file_, recording_intervals)
+                try:
+                    abs_path = \
+                        model_utils.get_absolute_recording_file_path(file_)
+                    
+                except ValueError as e:
+                    self._logger.error('        ' + str(e))
+                    
+            if abs_path is None:
+                # file has no absolute path
                 
-                if len(intervals) == 0:
-                    self._logger.info(
-                        f'        The detection schedule '
-                        f'"{self._schedule_name}" does not include any '
-                        f'portion of the time interval of the file '
-                        f'"{abs_path}", so no detectors will be run on it.')
+                if len(run) != 0:
+                    runs.append(run)
+                    run = []
                     
-                for interval in intervals:
-                    self._run_other_detectors_on_file_interval(
-                        detector_models, file_, abs_path, reader, interval)
+            else:
+                run.append((file_, abs_path))
+                
+        if len(run) != 0:
+            runs.append(run)
+            
+        return runs
+    
+    
+    def _run_other_detectors_on_files(
+            self, detector_models, files, recording_intervals):
+        
+        signal = RecordingSignal(f for f, _ in files)
+        files_text = _get_files_text(files)
+        
+        intervals = _get_signal_detection_intervals(
+            signal, recording_intervals)
+        
+        if len(intervals) == 0:
+            self._logger.info(
+                f'        The detection schedule '
+                f'"{self._schedule_name}" does not include any '
+                f'portion of the time interval of the {files_text}, '
+                f'so no detectors will be run on it.')
+            
+        for interval in intervals:
+            self._run_other_detectors_on_signal_interval(
+                detector_models, signal, files_text, interval)
                     
                     
-    def _run_other_detectors_on_file_interval(
-            self, detector_models, file_, file_path, file_reader,
-            time_interval):
+    def _run_other_detectors_on_signal_interval(
+            self, detector_models, signal, files_text, time_interval):
+        
+        files = signal.files
+        recording = files[0].recording
+        num_channels = recording.num_channels
+        signal_start_time = files[0].start_time
         
         # Log detection start message.
         self._log_detection_start(
-            detector_models, file_path, file_, time_interval)
+            detector_models, files_text, files, time_interval)
                 
         start_time = time.time()
         
         if _RUN_DETECTORS:
             
-            # Convert time interval to index interval.
+            # Convert time interval to signal index interval.
             index_interval = _get_index_interval(
-                time_interval, file_.start_time, file_.sample_rate)
+                time_interval, signal_start_time, recording.sample_rate)
                  
-            # Create detectors.
+            # Create detectors, and one analysis graph per channel for
+            # the detectors of that channel to share.
+            analysis_graphs = [AnalysisGraph() for _ in range(num_channels)]
             detectors = self._create_detectors(
-                detector_models, file_.recording, file_reader,
-                file_.start_index, index_interval.start)
+                detector_models, recording, signal.start_index,
+                index_interval.start, analysis_graphs)
                   
             # Detect.
-            for samples in _generate_sample_buffers(
-                    file_reader, index_interval):
+            for samples in _generate_sample_buffers(signal, index_interval):
+                
+                # Compute analysis products shared by detectors. Each
+                # file sample is read and decoded only once, and each
+                # shared product is computed only once per channel, no
+                # matter how many detectors use it. We process every
+                # graph, even one with no nodes, since processing also
+                # clears the graph's product cache, which would otherwise
+                # retain products (for example resampled input) for all
+                # of the chunks of the signal interval.
+                for channel_num, graph in enumerate(analysis_graphs):
+                    graph.process(samples[channel_num])
+                
                 for detector in detectors:
                     channel_samples = samples[detector.channel_num]
                     detector.detect(channel_samples)
@@ -471,6 +867,10 @@ class DetectCommand(Command):
             for detector in detectors:
                 detector.complete_detection()
                 
+            # Wait for clip writer to write clips, so that log messages
+            # about them precede those for subsequent files.
+            self._clip_writer.flush()
+                
         else:
             # don't run detectors
             
@@ -482,37 +882,47 @@ class DetectCommand(Command):
         interval_duration = \
             (time_interval.end - time_interval.start).total_seconds()
         self._log_detection_performance(
-            len(detector_models), file_.num_channels, interval_duration,
+            len(detector_models), num_channels, interval_duration,
             processing_time)
                     
                 
     def _log_detection_start(
-            self, detector_models, file_path, file_, time_interval):
-         
-        if time_interval.start == file_.start_time and \
-                time_interval.end == file_.end_time:
-            # running detectors on entire file
+            self, detector_models, files_text, files, time_interval):
+        
+        start_time = files[0].start_time
+        end_time = files[-1].end_time
+        
+        if len(files) == 1:
+            start_text = 'file start'
+            end_text = 'file end'
+        else:
+            start_text = 'first file start'
+            end_text = 'last file end'
+            
+        if time_interval.start == start_time and \
+                time_interval.end == end_time:
+            # running detectors on entire files
              
             interval_text = ''
              
         else:
-            # not running detectors on entire file
+            # not running detectors on entire files
             
             start = _format_datetime(time_interval.start)
             end = _format_datetime(time_interval.end)
             
-            if time_interval.start == file_.start_time:
-                # interval includes file start
+            if time_interval.start == start_time:
+                # interval includes start
                 
-                interval_text = ' interval [file start, {}]'.format(end)
+                interval_text = ' interval [{}, {}]'.format(start_text, end)
                 
-            elif time_interval.end == file_.end_time:
-                # interval includes file end
+            elif time_interval.end == end_time:
+                # interval includes end
                 
-                interval_text = ' interval [{}, file end]'.format(start)
+                interval_text = ' interval [{}, {}]'.format(start, end_text)
                 
             else:
-                # interval includes neither file start nor file end
+                # interval includes neither start nor end
                 
                 interval_text = ' interval [{}, {}]'.format(start, end)                 
              
@@ -520,35 +930,41 @@ class DetectCommand(Command):
             len(detector_models), 'detector')
         
         self._logger.info(
-            '        Running {} on file "{}"{}...'.format(
-                detectors_text, file_path, interval_text))
+            '        Running {} on {}{}...'.format(
+                detectors_text, files_text, interval_text))
         
 
     def _create_detectors(
-            self, detector_models, recording, file_reader,
-            file_start_index, interval_start_index):
+            self, detector_models, recording, signal_start_index,
+            interval_start_index, analysis_graphs):
         
         num_channels = recording.num_channels
         
         detectors = []
         
         job = Job.objects.get(id=self._job_info.job_id)
-
-        for detector_model in detector_models:
+        
+        # Run the detectors of each detector group as a single detector,
+        # so that they score their input only once.
+        for group in _group_detector_models(detector_models):
             
             for channel_num in range(num_channels):
                 
                 recording_channel = RecordingChannel.objects.get(
                     recording=recording, channel_num=channel_num)
                 
-                listener = _DetectorListener(
-                    detector_model, recording, recording_channel,
-                    file_start_index, interval_start_index,
-                    self._defer_clip_creation, self._create_clip_files,
-                    file_reader, job, self._logger)
+                listeners = [
+                    _DetectorListener(
+                        detector_model, recording, recording_channel,
+                        signal_start_index, interval_start_index,
+                        self._defer_clip_creation, self._create_clip_files,
+                        self._clip_writer, self._worker_num, job,
+                        self._logger)
+                    for detector_model in group]
                 
                 detector = _create_detector(
-                    detector_model, recording, listener)
+                    group, recording, listeners,
+                    analysis_graphs[channel_num])
                 
                 # We add a `channel_num` attribute to each detector to keep
                 # track of which recording channel it is for.
@@ -586,6 +1002,22 @@ class DetectCommand(Command):
         self._logger.info(message)
         
 
+def _get_num_workers(args):
+    
+    num_workers = command_utils.get_optional_arg(
+        'num_workers', args, _DEFAULT_NUM_WORKERS)
+    
+    if num_workers is None:
+        return _DEFAULT_NUM_WORKERS
+    
+    if not isinstance(num_workers, int) or num_workers < 1:
+        raise CommandSyntaxError(
+            'Bad "num_workers" command argument {}: number of workers '
+            'must be a positive integer.'.format(repr(num_workers)))
+        
+    return num_workers
+
+
 def _get_schedule(schedule_name):
     
     if schedule_name == '':
@@ -641,14 +1073,15 @@ def _get_time_intervals_intersection(a, b):
         return Interval(start=start, end=end)
 
 
-def _get_file_detection_intervals(file_, recording_intervals):
+def _get_signal_detection_intervals(signal, recording_intervals):
     
-    """Gets the audio file time intervals on which to run detectors."""
+    """Gets the recording signal time intervals on which to run detectors."""
     
-    file_interval = Interval(file_.start_time, file_.end_time)
+    files = signal.files
+    signal_interval = Interval(files[0].start_time, files[-1].end_time)
     
     detection_intervals = [
-        _get_time_intervals_intersection(i, file_interval)
+        _get_time_intervals_intersection(i, signal_interval)
         for i in recording_intervals]
     
     # Remove any `None` elements from detection intervals list.
@@ -657,11 +1090,23 @@ def _get_file_detection_intervals(file_, recording_intervals):
     return detection_intervals
     
 
+def _get_files_text(files):
+    
+    if len(files) == 1:
+        _, path = files[0]
+        return f'file "{path}"'
+    
+    else:
+        _, first_path = files[0]
+        _, last_path = files[-1]
+        return f'files "{first_path}" through "{last_path}"'
+
+
 def _get_index_interval(time_interval, start_time, sample_rate):
     
     """
-    Gets the audio file index interval corresponding to the specified
-    time interval.
+    Gets the recording signal index interval corresponding to the
+    specified time interval.
     """
     
     start_offset = (time_interval.start - start_time).total_seconds()
@@ -673,14 +1118,14 @@ def _get_index_interval(time_interval, start_time, sample_rate):
     return Interval(start=start_index, end=start_index + length)
 
 
-def _generate_sample_buffers(file_reader, interval):
+def _generate_sample_buffers(signal, interval):
     
     index = interval.start
     end_index = interval.end
     
     while index != end_index:
         length = min(_DETECTION_CHUNK_SIZE, end_index - index)
-        yield file_reader.read(index, length)
+        yield signal.as_channels[:, index:index + length]
         index += length
         
         
@@ -697,18 +1142,94 @@ def _format_datetime(dt):
 # themselves. How might we eliminate the redundancy? Be sure to consider
 # versioning and the possibility of processing parameters when thinking
 # about this.
-def _create_detector(detector_model, recording, listener):
+def _get_detector_class(detector_model):
     
     detector_name = detector_model.name
     
     classes = extension_manager.instance.get_extensions('Detector')
     
     try:
-        cls = classes[detector_name]
+        return classes[detector_name]
     except KeyError:
         raise ValueError('Unrecognized detector "{}".'.format(detector_name))
+
+
+def _group_detector_models(detector_models):
+    
+    """
+    Groups detector models whose detectors can run as one detector.
+    
+    A detector class can declare that it belongs to a group of
+    detectors that differ only in their thresholds with `detector_group`
+    and `threshold` class attributes. One detector of such a group can
+    do the work of several, scoring its input only once, when it is
+    given their thresholds via the `extra_thresholds` argument of its
+    initializer.
+    
+    Returns a list of lists of detector models, in order of their
+    first appearance in `detector_models`. Each list includes the
+    models of one detector group, or a single model.
+    """
+    
+    groups = []
+    group_thresholds = {}
+    
+    for detector_model in detector_models:
+        
+        cls = _get_detector_class(detector_model)
+        group_name = getattr(cls, 'detector_group', None)
+        threshold = getattr(cls, 'threshold', None)
+        
+        if group_name is None or threshold is None:
+            groups.append([detector_model])
+            continue
+        
+        group, thresholds = group_thresholds.get(group_name, (None, None))
+        
+        if group is None or threshold in thresholds:
+            # first detector of group, or detector with same threshold
+            # as an earlier detector of group
+            
+            group = [detector_model]
+            groups.append(group)
+            
+            if group_name not in group_thresholds:
+                group_thresholds[group_name] = (group, {threshold})
+            
+        else:
+            group.append(detector_model)
+            thresholds.add(threshold)
     
-    return cls(recording.sample_rate, listener)
+    return groups
+
+
+def _create_detector(detector_models, recording, listeners, analysis_graph):
+    
+    """
+    Creates a detector for a group of one or more detector models.
+    
+    See `_group_detector_models` for more about detector groups.
+    """
+    
+    cls = _get_detector_class(detector_models[0])
+    
+    kwargs = {}
+    
+    if len(detector_models) == 1:
+        listener = listeners[0]
+        
+    else:
+        # more than one detector model
+        
+        classes = [_get_detector_class(m) for m in detector_models]
+        thresholds = [c.threshold for c in classes]
+        listener = _DetectorGroupListener(dict(zip(thresholds, listeners)))
+        kwargs['extra_thresholds'] = thresholds[1:]
+    
+    if getattr(cls, 'uses_analysis_graph', False):
+        kwargs['analysis_graph'] = analysis_graph
+        
+    return cls(recording.sample_rate, listener, **kwargs)
 
 
 class _ClipCreationError(Exception):
@@ -717,6 +1238,523 @@ class _ClipCreationError(Exception):
         self.wrapped_exception = wrapped_exception
         
         
+class _ClipWriter:
+    
+    """
+    Writes batches of detected clips to the archive.
+    
+    Each clip is described by a tuple of the form:
+    
+        (recording_channel_id, start_index, length, creation_time,
+         creating_job_id, creating_processor_id, annotations)
+         
+    which is also the form in which clips are written to deferred
+    action files. All of the clips of a batch are written in a single
+    database transaction.
+    """
+    
+    
+    def __init__(self, job, create_clip_files, logger):
+        
+        self._job = job
+        self._create_clip_files = create_clip_files
+        self._logger = logger
+        
+        self._clip_manager = clip_manager.instance
+        
+        self._recording_channel_cache = {}
+        self._processor_cache = {}
+        self._annotation_info_cache = {}
+        
+        self.num_clips = 0
+        self.num_database_failures = 0
+        self.num_file_failures = 0
+        
+        
+    def write_clips(self, clips):
+        
+        """
+        Writes the specified clips to the archive.
+        
+        Returns a `(num_database_failures, num_file_failures)` pair.
+        """
+        
+        if len(clips) == 0:
+            return (0, 0)
+        
+        self.num_clips += len(clips)
+        
+        create_clip_files = self._create_clip_files
+        
+        # Get recording channel and processor information before
+        # starting transaction, so that any database queries this
+        # requires are not part of it.
+        recording_channel_id = clips[0][0]
+        processor_id = clips[0][5]
+        channel, station, mic_output, sample_rate, recording_start_time = \
+            self._get_recording_channel_info(recording_channel_id)
+        processor = self._get_processor(processor_id)
+            
+        # Create clip model instances.
+        clip_objects = []
+        for (_, start_index, length, creation_time, _, _, _) in clips:
+            
+            # Get clip start time as a `datetime`.
+            start_delta = datetime.timedelta(
+                seconds=start_index / sample_rate)
+            start_time = recording_start_time + start_delta
+             
+            end_time = signal_utils.get_end_time(
+                start_time, length, sample_rate)
+            
+            clip_objects.append(Clip(
+                station=station,
+                mic_output=mic_output,
+                recording_channel=channel,
+                start_index=start_index,
+                length=length,
+                sample_rate=sample_rate,
+                start_time=start_time,
+                end_time=end_time,
+                date=station.get_night(start_time),
+                creation_time=creation_time,
+                creating_user=None,
+                creating_job=self._job,
+                creating_processor=processor))
+            
+        # Create database records for batch of clips in one database
+        # transaction.
+        
+#         trans_start_time = time.time()
+        
+        try:
+            
+            with archive_lock.atomic(), transaction.atomic():
+                
+                try:
+                    model_utils.create_clips(
+                        clip_objects, self._get_clip_annotations(clips))
+                    
+                except Exception as e:
+                    
+                    # Note that it's important not to perform any
+                    # database queries here. If the database raised
+                    # the exception, we have to wait until we're
+                    # outside of the transaction to query the
+                    # database again.
+                    raise _ClipCreationError(e)
+
+#                 trans_end_time = time.time()
+#                 self._num_transactions += 1
+#                 self._total_transactions_duration += \
+#                     trans_end_time - trans_start_time
+        
+        except _ClipCreationError as e:
+            
+            clip = clip_objects[0]
+            duration = signal_utils.get_duration(clip.length, sample_rate)
+                
+            clip_string = Clip.get_string(
+                station.name, mic_output.name, processor.name,
+                clip.start_time, duration)
+            
+            batch_size = len(clips)
+            self.num_database_failures += batch_size
+            
+            if batch_size == 1:
+                subject = 'clip'
+                prefix = 'Clip'
+            else:
+                subject = f'batch of {batch_size} clips starting with'
+                prefix = f'All {batch_size} clips in this batch'
+                
+            self._logger.error(
+                f'            Attempt to create {subject} {clip_string} '
+                f'failed with message: {str(e.wrapped_exception)}. '
+                f'{prefix} will be ignored.')
+            
+            return (batch_size, 0)
+
+        else:
+            # clip creation succeeded
+            
+            num_file_failures = 0
+            
+            if create_clip_files:
+            
+                for clip in clip_objects:
+                    
+                    try:
+                        self._clip_manager.create_audio_file(clip)
+                        
+                    except Exception as e:
+                        num_file_failures += 1
+                        self._logger.error((
+                            '            Attempt to create audio file '
+                            'for clip {} failed with message: {} Clip '
+                            'database record was still created.').format(
+                                str(clip), str(e)))
+                        
+            self.num_file_failures += num_file_failures
+                        
+            return (0, num_file_failures)
+                        
+                        
+    def _get_clip_annotations(self, clips):
+        
+        """
+        Gets `(annotation_info, value)` pairs for the annotations of
+        the specified clips, as required by `model_utils.create_clips`.
+        """
+        
+        return [
+            None if annotations is None else [
+                (self._get_annotation_info(name), str(value))
+                for name, value in annotations.items()]
+            for (_, _, _, _, _, _, annotations) in clips]
+    
+    
+    def _get_recording_channel_info(self, recording_channel_id):
+
+        try:
+            return self._recording_channel_cache[recording_channel_id]
+        
+        except KeyError:
+            
+            channel = RecordingChannel.objects.get(id=recording_channel_id)
+            recording = channel.recording
+            station = recording.station
+            mic_output = channel.mic_output
+             
+            sample_rate = recording.sample_rate
+            start_time = recording.start_time
+            
+            info = (channel, station, mic_output, sample_rate, start_time)
+            
+            self._recording_channel_cache[recording_channel_id] = info
+            
+            return info
+        
+        
+    def _get_processor(self, processor_id):
+        
+        try:
+            return self._processor_cache[processor_id]
+        
+        except KeyError:
+            processor = Processor.objects.get(id=processor_id)
+            self._processor_cache[processor_id] = processor
+            return processor
+        
+        
+    def _get_annotation_info(self, name):
+        
+        try:
+            return self._annotation_info_cache[name]
+        
+        except KeyError:
+            # cache miss
+            
+            try:
+                info = AnnotationInfo.objects.get(name=name)
+            
+            except AnnotationInfo.DoesNotExist:
+                
+                # For now, at least, we require that there already be an
+                # `AnnotationInfo` in the archive database for any
+                # annotation that a detector wants to create.
+                raise ValueError((
+                    'Annotation "{}" not found in archive database: '
+                    'please add it and try again.').format(name))
+                
+            else:
+                self._annotation_info_cache[name] = info
+                return info
+            
+            
+    def log_summary(self):
+        
+        clips_text = text_utils.create_count_text(self.num_clips, 'clip')
+        
+        if self.num_database_failures == 0 and self.num_file_failures == 0:
+            self._logger.info(f'Created {clips_text}.')
+            
+        else:
+            
+            db_failures_text = text_utils.create_count_text(
+                self.num_database_failures, 'clip creation failure')
+            
+            if self._create_clip_files:
+                num_file_failures = \
+                    self.num_database_failures + self.num_file_failures
+                file_failures_text = ' and ' + text_utils.create_count_text(
+                    num_file_failures, 'audio file creation failure')
+            else:
+                file_failures_text = ''
+                
+            self._logger.info(
+                f'Processed {clips_text} with {db_failures_text}'
+                f'{file_failures_text}.')
+        
+        
+class _AsyncClipWriter:
+    
+    """
+    Clip writer that writes clips to the archive in a separate thread.
+    
+    The `write_clips` method of this class puts clips on a bounded queue
+    and returns immediately, so that detection can continue while the
+    clips are written. A writer thread takes clips from the queue and
+    writes them to the archive with a `_ClipWriter`, combining the clips
+    of consecutive queue items for the same recording channel and
+    processor into batches of up to `_CLIP_BATCH_SIZE` clips. The writer
+    thread waits up to `_MAX_CLIP_BATCH_DELAY` seconds for more clips to
+    add to a batch, so batches are larger when clips are detected faster
+    than they can be written. When the queue is full, `write_clips`
+    waits for the writer thread to make room in it.
+    
+    If writing clips raises an unexpected exception, the writer thread
+    discards any remaining clips and the exception is reraised by the
+    next call to `write_clips`, `run_when_written`, or `close`.
+    """
+    
+    
+    def __init__(self, clip_writer):
+        
+        self._clip_writer = clip_writer
+        
+        self._queue = queue.Queue(maxsize=_CLIP_QUEUE_SIZE)
+        self._exception = None
+        
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+        
+        
+    def write_clips(self, clips, callback=None):
+        
+        """
+        Queues clips for writing.
+        
+        The clips must all have the same recording channel and creating
+        processor. If `callback` is not `None`, it is invoked in the
+        writer thread with the numbers of database and audio file
+        failures after the clips are written.
+        """
+        
+        self._raise_exception_if_failed()
+        
+        if len(clips) != 0:
+            self._queue.put(('clips', clips, callback))
+            
+            
+    def run_when_written(self, function):
+        
+        """
+        Invokes a function in the writer thread after all previously
+        queued clips have been written.
+        """
+        
+        self._raise_exception_if_failed()
+        self._queue.put(('call', function))
+        
+        
+    def flush(self):
+        
+        """Waits for all queued clips to be written."""
+        
+        event = Event()
+        self.run_when_written(event.set)
+        event.wait()
+        self._raise_exception_if_failed()
+        
+        
+    def close(self):
+        
+        """
+        Waits for all queued clips to be written and stops the writer
+        thread.
+        """
+        
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_exception_if_failed()
+        
+        
+    def _raise_exception_if_failed(self):
+        if self._exception is not None:
+            exception = self._exception
+            self._exception = None
+            raise exception
+        
+        
+    def _run(self):
+        
+        try:
+            
+            item = self._queue.get()
+            
+            while item is not None:
+                
+                if item[0] == 'clips':
+                    item = self._write_clips(item)
+                    
+                else:
+                    # function call
+                    
+                    _, function = item
+                    
+                    try:
+                        function()
+                    except Exception as e:
+                        if self._exception is None:
+                            self._exception = e
+                            
+                    item = self._queue.get()
+                    
+        finally:
+            
+            # Close this thread's database connections.
+            connections.close_all()
+        
+        
+    def _write_clips(self, item):
+        
+        """
+        Writes the clips of the specified queue item, along with clips of
+        subsequent queue items that are available within the maximum
+        batch delay, in batches.
+        
+        Returns the next queue item that has not been processed.
+        """
+        
+        items = [item]
+        num_clips = len(item[1])
+        deadline = time.time() + _MAX_CLIP_BATCH_DELAY
+        next_item = _NO_ITEM
+        
+        # Gather queue items until there are enough clips for a full
+        # batch, we have waited long enough, or a non-clips item arrives.
+        while num_clips < _CLIP_BATCH_SIZE:
+            
+            timeout = max(deadline - time.time(), 0)
+            
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            
+            if item is not None and item[0] == 'clips':
+                items.append(item)
+                num_clips += len(item[1])
+                
+            else:
+                next_item = item
+                break
+            
+        for clips, callback in _group_clips(items):
+            
+            if self._exception is not None:
+                # writer failed
+                
+                # Discard clips.
+                continue
+            
+            try:
+                failures = self._clip_writer.write_clips(clips)
+                if callback is not None:
+                    callback(*failures)
+                    
+            except Exception as e:
+                self._exception = e
+                
+        if next_item is _NO_ITEM:
+            next_item = self._queue.get()
+            
+        return next_item
+    
+    
+_NO_ITEM = object()
+"""Marker for the absence of a clip writer queue item."""
+
+
+def _group_clips(items):
+    
+    """
+    Groups the clips of clip writer queue items by recording channel,
+    processor, and callback, preserving the order of the clips within
+    each group.
+    """
+    
+    groups = {}
+    
+    for _, clips, callback in items:
+        key = (clips[0][0], clips[0][5], callback)
+        groups.setdefault(key, []).extend(clips)
+        
+    return [(clips, key[2]) for key, clips in groups.items()]
+
+
+class _QueueClipWriter:
+    
+    """
+    Clip writer that sends batches of clips to the main job process
+    via a message queue.
+    
+    A detection worker process uses a writer of this class in place of
+    a `_ClipWriter`. The main job process receives the clips and writes
+    them to the archive with a `_ClipWriter`, which reports any failures.
+    """
+    
+    
+    def __init__(self, message_queue):
+        self._message_queue = message_queue
+        
+        
+    def write_clips(self, clips, callback=None):
+        
+        # We ignore `callback`, since we don't know here whether or
+        # not clip creation will succeed.
+        
+        if len(clips) != 0:
+            self._message_queue.put(('clips', clips))
+            
+            
+    def run_when_written(self, function):
+        function()
+        
+        
+    def flush(self):
+        pass
+        
+        
+class _DetectorGroupListener:
+    
+    """
+    Detector listener for a detector that runs a detector group.
+    
+    The listener forwards each clip to the listener for the detector of
+    the group whose threshold the clip was detected with.
+    """
+    
+    
+    def __init__(self, listeners):
+        
+        # Map from detector threshold to detector listener.
+        self._listeners = listeners
+        
+        
+    def process_clip(
+            self, start_index, length, threshold=None, annotations=None):
+        
+        listener = self._listeners[threshold]
+        listener.process_clip(start_index, length, threshold, annotations)
+        
+        
+    def complete_processing(self, threshold=None):
+        for listener in self._listeners.values():
+            listener.complete_processing(threshold)
+
+
 class _DetectorListener:
     
     
@@ -725,8 +1763,8 @@ class _DetectorListener:
     
     def __init__(
             self, detector_model, recording, recording_channel,
-            file_start_index, interval_start_index, defer_clip_creation,
-            create_clip_files, file_reader, job, logger):
+            signal_start_index, interval_start_index, defer_clip_creation,
+            create_clip_files, clip_writer, worker_num, job, logger):
         
         # Give this detector listener a unique serial number.
         self._serial_number = _DetectorListener.next_serial_number
@@ -735,23 +1773,24 @@ class _DetectorListener:
         self._detector_model = detector_model
         self._recording = recording
         self._recording_channel = recording_channel
-        self._file_start_index = file_start_index          # index in recording
-        self._interval_start_index = interval_start_index  # index in file
+        self._signal_start_index = signal_start_index      # index in recording
+        self._interval_start_index = interval_start_index  # index in signal
         self._defer_clip_creation = defer_clip_creation
         self._create_clip_files = create_clip_files
-        self._file_reader = file_reader
+        self._clip_writer = clip_writer
+        self._worker_num = worker_num
         self._job = job
         self._logger = logger
         
-        self._clip_manager = clip_manager.instance
         self._clips = []
-        self._deferred_clips = []
         self._num_clips = 0
         self._num_database_failures = 0
         self._num_file_failures = 0
         
-        self._annotation_info_cache = {}
- 
+        if defer_clip_creation:
+            self._deferred_clip_file_writer = \
+                self._create_deferred_clip_file_writer()
+        
 #         self._num_transactions = 0
 #         self._total_transactions_duration = 0
         
@@ -765,7 +1804,7 @@ class _DetectorListener:
         self._clips.append((start_index, length, annotations))
         self._num_clips += 1
         
-        if len(self._clips) == _CLIP_BATCH_SIZE:
+        if len(self._clips) == _LISTENER_CLIP_BATCH_SIZE:
             self._create_clips(threshold)
         
         
@@ -781,148 +1820,27 @@ class _DetectorListener:
         # of queries) to see if database interaction could be
         # made more efficient, for example with a cache.
         
-        recording_channel = self._recording_channel
-        detector_model = self._detector_model
-        start_offset = self._file_start_index + self._interval_start_index
+        recording_channel_id = self._recording_channel.id
+        detector_model_id = self._detector_model.id
+        job_id = self._job.id
+        start_offset = self._signal_start_index + self._interval_start_index
         creation_time = time_utils.get_utc_now()
         
-        create_clip_files = self._create_clip_files
+        clips = [
+            (recording_channel_id, start_index + start_offset, length,
+             creation_time, job_id, detector_model_id, annotations)
+            for start_index, length, annotations in self._clips]
         
         if self._defer_clip_creation:
             
-            for start_index, length, annotations in self._clips:
-                start_index += start_offset
-                clip = [
-                    recording_channel.id, start_index, length, creation_time,
-                    self._job.id, detector_model.id, annotations]
-                self._deferred_clips.append(clip)
+            # Append clips to deferred clip file rather than keeping
+            # them in memory until detection completes.
+            self._deferred_clip_file_writer.write(clips)
                 
         else:
             # database writes not deferred
-                
-            station = self._recording.station
-            sample_rate = self._recording.sample_rate
-            mic_output = recording_channel.mic_output
-        
-            if create_clip_files:
-                clips = []
-             
-            # Create database records for current batch of clips in one
-            # database transaction.
-            
-#             trans_start_time = time.time()
             
-            try:
-                
-                with archive_lock.atomic(), transaction.atomic():
-                    
-                    for start_index, length, annotations in self._clips:
-                        
-                        # Get clip start time as a `datetime`.
-                        start_index += start_offset
-                        start_delta = datetime.timedelta(
-                            seconds=start_index / sample_rate)
-                        start_time = \
-                            self._recording.start_time + start_delta
-                         
-                        end_time = signal_utils.get_end_time(
-                            start_time, length, sample_rate)
-                         
-                        try:
-                        
-                            # It would be nice to use Django's
-                            # `bulk_create` here, but unfortunately that
-                            # won't automatically set clip IDs for us
-                            # except (as of this writing) if we're using
-                            # PostgreSQL.
-                            clip = Clip.objects.create(
-                                station=station,
-                                mic_output=mic_output,
-                                recording_channel=recording_channel,
-                                start_index=start_index,
-                                length=length,
-                                sample_rate=sample_rate,
-                                start_time=start_time,
-                                end_time=end_time,
-                                date=station.get_night(start_time),
-                                creation_time=creation_time,
-                                creating_user=None,
-                                creating_job=self._job,
-                                creating_processor=detector_model
-                            )
-                            
-                            if create_clip_files:
-                                
-                                # Save clip so we can create clip file
-                                # outside of transaction.
-                                clips.append(clip)
-                                
-                            if annotations is not None:
-                                
-                                for name, value in annotations.items():
-                                    
-                                    annotation_info = \
-                                        self._get_annotation_info(name)
-                                    
-                                    model_utils.annotate_clip(
-                                        clip, annotation_info, str(value),
-                                        creation_time=creation_time,
-                                        creating_user=None,
-                                        creating_job=self._job,
-                                        creating_processor=detector_model)
-                        
-                        except Exception as e:
-                            
-                            # Note that it's important not to perform any
-                            # database queries here. If the database raised
-                            # the exception, we have to wait until we're
-                            # outside of the transaction to query the
-                            # database again.
-                            raise _ClipCreationError(e)
-
-#                     trans_end_time = time.time()
-#                     self._num_transactions += 1
-#                     self._total_transactions_duration += \
-#                         trans_end_time - trans_start_time
-            
-            except _ClipCreationError as e:
-                
-                duration = signal_utils.get_duration(length, sample_rate)
-                    
-                clip_string = Clip.get_string(
-                    station.name, mic_output.name, detector_model.name,
-                    start_time, duration)
-                
-                batch_size = len(self._clips)
-                self._num_database_failures += batch_size
-                
-                if batch_size == 1:
-                    prefix = 'Clip'
-                else:
-                    prefix = f'All {batch_size} clips in this batch'
-                    
-                self._logger.error(
-                    f'            Attempt to create clip {clip_string} '
-                    f'failed with message: {str(e.wrapped_exception)}. '
-                    f'{prefix} will be ignored.')
-
-            else:
-                # clip creation succeeded
-                
-                if create_clip_files:
-                
-                    for clip in clips:
-                        
-                        try:
-                            self._clip_manager.create_audio_file(clip)
-                            
-                        except Exception as e:
-                            self._num_file_failures += 1
-                            self._logger.error((
-                                '            Attempt to create audio file '
-                                'for clip {} failed with message: {} Clip '
-                                'database record was still created.').format(
-                                    str(clip), str(e)))
+            self._clip_writer.write_clips(clips, self._count_failures)
                             
         self._clips = []
         
@@ -931,41 +1849,40 @@ class _DetectorListener:
 #                 self._num_clips, self._detector_model.name))
 
 
-    def _get_annotation_info(self, name):
+    def _count_failures(self, num_database_failures, num_file_failures):
         
-        try:
-            return self._annotation_info_cache[name]
+        # This method is invoked by the clip writer, possibly in its
+        # writer thread, after it writes a batch of our clips.
+        
+        self._num_database_failures += num_database_failures
+        self._num_file_failures += num_file_failures
         
-        except KeyError:
-            # cache miss
-            
-            try:
-                info = AnnotationInfo.objects.get(name=name)
-            
-            except AnnotationInfo.DoesNotExist:
-                
-                # For now, at least, we require that there already be an
-                # `AnnotationInfo` in the archive database for any
-                # annotation that a detector wants to create.
-                raise ValueError((
-                    'Annotation "{}" not found in archive database: '
-                    'please add it and try again.').format(name))
-                
-            else:
-                self._annotation_info_cache[name] = info
-                return info
-
         
     def complete_processing(self, threshold=None):
         
         # Create remaining clips.
         self._create_clips(threshold)
         
+        if self._defer_clip_creation:
+            self._deferred_clip_file_writer.close()
+            self._log_completion()
+            
+        else:
+            
+            # Log completion after our clips have been written, so that
+            # we can report any failures.
+            self._clip_writer.run_when_written(self._log_completion)
+            
+            
+    def _log_completion(self):
+        
         clips_text = text_utils.create_count_text(self._num_clips, 'clip')
         
-        if self._defer_clip_creation:
+        if self._defer_clip_creation or self._worker_num is not None:
             
-            self._write_deferred_clips_file()
+            # Clip creation is either deferred or performed by the main
+            # job process, so we don't know here whether or not it will
+            # succeed.
             
             self._logger.info((
                 '        Processed {} from detector "{}".').format(
@@ -1005,25 +1922,19 @@ class _DetectorListener:
 #             'seconds.').format(avg))
 
 
-    def _write_deferred_clips_file(self):
-        
-        actions = {
-            'actions': [
-                {
-                    'name': 'create_clips',
-                    'arguments': {
-                        'clips': self._deferred_clips
-                    }
-                }
-            ]
-        }
+    def _create_deferred_clip_file_writer(self):
         
         dir_path = archive_paths.deferred_action_dir_path
         os_utils.create_directory(dir_path)
         
-        file_name = _DEFERRED_DATABASE_WRITE_FILE_NAME_FORMAT.format(
-            self._job.id, self._serial_number)
+        if self._worker_num is None:
+            file_name = _DEFERRED_DATABASE_WRITE_FILE_NAME_FORMAT.format(
+                self._job.id, self._serial_number)
+        else:
+            file_name = \
+                _WORKER_DEFERRED_DATABASE_WRITE_FILE_NAME_FORMAT.format(
+                    self._job.id, self._worker_num, self._serial_number)
+            
         file_path = dir_path / file_name
         
-        with open(file_path, 'wb') as file_:
-            pickle.dump(actions, file_)
+        return DeferredClipFileWriter(file_path)
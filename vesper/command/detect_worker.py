@@ -0,0 +1,91 @@
+"""
+Module containing function that runs a detection worker process.
+
+The `run_worker` function runs in each worker process started by a
+`DetectCommand` that runs detectors in more than one process. The
+function is in its own module rather than in the `detect_command`
+module for the same reason that the `run_job` function is in its own
+module: to minimize the imports that a new worker process must perform
+before it sets up Django.
+"""
+
+
+import logging
+import traceback
+
+import vesper.util.django_utils as django_utils
+
+
+def run_worker(
+        command_args, job_info, lock, worker_num, task_queue,
+        message_queue):
+
+    """
+    Runs a detection worker process.
+
+    The function sets up Django and configures the root logger for
+    the worker process, and then runs detectors on station-nights read
+    from the task queue until it reads a `None` task or a stop is
+    requested for the job. Clips detected by the worker are sent to the
+    main job process via the message queue, in messages of the form
+    `('clips', clips)`. The last message sent by the worker is always
+    `('done', succeeded)`, where `succeeded` is `True` if and only if
+    the worker did not fail with an exception.
+
+    Parameters:
+
+        command_args : `dict`
+            the arguments of the detect command of the job.
+
+        job_info : `vesper.command.job_info.JobInfo`
+            information pertaining to the job.
+
+        lock : archive lock
+            the archive lock of the job.
+
+        worker_num : `int`
+            the number of this worker, starting from zero.
+
+        task_queue : `multiprocessing.Queue`
+            queue of station-night tasks.
+
+        message_queue : `multiprocessing.Queue`
+            queue of messages to the main job process.
+    """
+
+    # Set up Django for the worker process. See the `run_job` function
+    # of the `job_runner` module for more about this.
+    django_utils.set_up_django()
+
+    # These imports are here rather than at the top of this module so
+    # they will be executed after Django is set up in the worker process.
+    from vesper.command.detect_command import DetectCommand
+    import vesper.util.archive_lock as archive_lock
+
+    archive_lock.set_lock(lock)
+
+    # Configure root logger for the worker process. If the process was
+    # forked from the main job process, the root logger inherited the
+    # handlers of that process, which we remove to avoid logging each
+    # message twice.
+    logger = logging.getLogger()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    job_info.configure_logger(logger)
+
+    succeeded = False
+
+    try:
+        command = DetectCommand(command_args)
+        command.run_worker(job_info, worker_num, task_queue, message_queue)
+
+    except Exception:
+        logger.error(
+            f'Detection worker {worker_num + 1} failed with an exception. '
+            f'See traceback below.\n' + traceback.format_exc())
+
+    else:
+        succeeded = True
+
+    finally:
+        message_queue.put(('done', succeeded))
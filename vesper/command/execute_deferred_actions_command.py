@@ -1,8 +1,10 @@
 """Module containing class `ExecuteDeferredActionsCommand`."""
 
 
+from collections import defaultdict
 import datetime
 import logging
+import os
 import pickle
 import time
 
@@ -11,8 +13,10 @@ import pytz
 
 from vesper.archive_paths import archive_paths
 from vesper.command.command import Command, CommandExecutionError
+from vesper.command.deferred_clip_file import DeferredClipFileReader
 from vesper.django.app.models import (
     AnnotationInfo, Clip, Job, Processor, RecordingChannel)
+import vesper.command.deferred_clip_file as deferred_clip_file
 import vesper.command.command_utils as command_utils
 import vesper.django.app.model_utils as model_utils
 import vesper.util.signal_utils as signal_utils
@@ -21,6 +25,26 @@ import vesper.util.signal_utils as signal_utils
 _LOGGING_PERIOD = 10000
 
 
+_CLIP_BATCH_SIZE = 10000
+"""
+Approximate number of clips to create from a deferred clip file in a
+single database transaction.
+"""
+
+
+_PROGRESS_FILE_NAME_SUFFIX = '.progress'
+"""
+Suffix appended to the name of a deferred clip file to get the name of
+its progress file.
+
+The progress file of a deferred clip file contains the byte offset in
+the deferred clip file of the first chunk whose clips have not yet been
+created. It is updated after each database transaction, so that if
+execution of the file's actions is interrupted, a subsequent execution
+can resume where the first left off.
+"""
+
+
 class ExecuteDeferredActionsCommand(Command):
     
     
@@ -56,7 +80,12 @@ class ExecuteDeferredActionsCommand(Command):
             
         else:
 
-            file_paths = sorted(dir_path.glob('*.pkl'))
+            # We execute the actions of deferred clip files and of
+            # legacy pickle files in the order of their file names,
+            # which is the order in which they were written.
+            extensions = ('.pkl', deferred_clip_file.FILE_NAME_EXTENSION)
+            file_paths = sorted(
+                p for p in dir_path.iterdir() if p.suffix in extensions)
             num_files = len(file_paths)
             
             self._logger.info((
@@ -64,30 +93,161 @@ class ExecuteDeferredActionsCommand(Command):
                 '"{}"...').format(num_files, dir_path))
                 
             try:
-                with transaction.atomic():
-                    for i, file_path in enumerate(file_paths):
-                        self._logger.info((
-                            'Executing actions from file {} of {} - '
-                            '"{}"...').format(
-                                i + 1, num_files, file_path.name))
-                        self._execute_deferred_actions(file_path)
+                
+                for i, file_path in enumerate(file_paths):
+                    
+                    self._logger.info((
+                        'Executing actions from file {} of {} - '
+                        '"{}"...').format(i + 1, num_files, file_path.name))
+                    
+                    if file_path.suffix == '.pkl':
+                        with transaction.atomic():
+                            self._execute_deferred_actions(file_path)
+                            
+                    else:
+                        self._execute_deferred_clip_file(file_path)
+                        
+                    # If we get here, the execution of the file's
+                    # actions succeeded and we can move the file to
+                    # the `Executed` directory.
+                    self._move_deferred_action_file(file_path)
               
             except Exception:
                 self._logger.error(
                     'Execution of deferred actions failed with an '
-                    'exception. Archive database has been restored '
-                    'to its state before the job began. See below '
-                    'for exception traceback.')
+                    'exception. Clips created before the failure remain '
+                    'in the archive database, and executing deferred '
+                    'actions again will resume where this job left off. '
+                    'See below for exception traceback.')
                 raise
             
-            # If we get here, the execution of all of the deferred
-            # actions succeeded and we can move the action files
-            # to the `Executed` directory.
-            self._move_deferred_action_files(file_paths)
-              
         return True
     
     
+    def _execute_deferred_clip_file(self, file_path):
+        
+        progress_file_path = _get_progress_file_path(file_path)
+        offset = _read_progress_file(progress_file_path)
+        
+        if offset is not None:
+            self._logger.info(
+                f'Resuming at byte offset {offset} of file, where a '
+                f'previous execution left off.')
+        
+        start_time = time.time()
+        
+        num_clips = self._create_deferred_file_clips(
+            file_path, offset, progress_file_path)
+        
+        if progress_file_path.exists():
+            progress_file_path.unlink()
+                
+        elapsed_time = time.time() - start_time
+        timing_text = command_utils.get_timing_text(
+            elapsed_time, num_clips, 'clips')
+        self._logger.info(
+            'Created {} clips{}.'.format(num_clips, timing_text))
+        
+        
+    def _create_deferred_file_clips(
+            self, file_path, offset, progress_file_path):
+        
+        """
+        Creates the clips of a deferred clip file, starting at the
+        specified byte offset, in batches of about `_CLIP_BATCH_SIZE`
+        clips.
+        
+        The file is memory-mapped only during the execution of this
+        method, so that it can be moved afterwards.
+        
+        Returns the number of clips created.
+        """
+        
+        reader = DeferredClipFileReader(file_path)
+        
+        # If we're resuming, some of the clips following the offset
+        # may have been created after the progress file was last
+        # written, so we check for them.
+        check_for_existing_clips = offset is not None
+        
+        chunks = []
+        num_batch_clips = 0
+        num_clips = 0
+        
+        for chunk in reader.get_chunks(offset):
+            
+            chunks.append(chunk)
+            num_batch_clips += len(chunk.clips)
+            
+            if num_batch_clips >= _CLIP_BATCH_SIZE:
+                
+                num_clips += self._create_deferred_clips(
+                    chunks, check_for_existing_clips)
+                
+                _write_progress_file(progress_file_path, chunk.end_offset)
+                
+                self._logger.info('Created {} clips...'.format(num_clips))
+                
+                chunks = []
+                num_batch_clips = 0
+                check_for_existing_clips = False
+                
+        if len(chunks) != 0:
+            num_clips += self._create_deferred_clips(
+                chunks, check_for_existing_clips)
+            
+        return num_clips
+        
+        
+    def _create_deferred_clips(self, chunks, check_for_existing_clips):
+        
+        """
+        Creates the clips of the specified deferred clip file chunks
+        in one database transaction.
+        
+        Returns the number of clips created.
+        """
+        
+        clips = []
+        clip_annotations = []
+        
+        for chunk in chunks:
+            
+            for record, annotations in zip(
+                    chunk.clips.tolist(), chunk.get_annotations()):
+                
+                (recording_channel_id, start_index, length, creation_time,
+                 creating_job_id, creating_processor_id) = record
+                
+                creation_time = deferred_clip_file.get_datetime(creation_time)
+                
+                clips.append(self._create_clip_object(
+                    recording_channel_id, start_index, length,
+                    creation_time, creating_job_id, creating_processor_id))
+                
+                clip_annotations.append(
+                    self._get_annotation_pairs(annotations))
+                
+        if check_for_existing_clips:
+            clips, clip_annotations = \
+                _remove_existing_clips(clips, clip_annotations)
+            
+        model_utils.create_clips(clips, clip_annotations, self._job)
+        
+        return len(clips)
+    
+    
+    def _get_annotation_pairs(self, annotations):
+        
+        if annotations is None:
+            return None
+        
+        else:
+            return [
+                (self._get_annotation_info(name), str(value))
+                for name, value in annotations.items()]
+    
+    
     def _execute_deferred_actions(self, file_path):
         
         with open(file_path, 'rb') as file_:
@@ -139,6 +299,18 @@ class ExecuteDeferredActionsCommand(Command):
         
         (recording_channel_id, start_index, length, creation_time,
          creating_job_id, creating_processor_id, annotations) = clip_info
+        
+        clip = self._create_clip_object(
+            recording_channel_id, start_index, length, creation_time,
+            creating_job_id, creating_processor_id)
+        
+        model_utils.create_clips(
+            [clip], [self._get_annotation_pairs(annotations)], self._job)
+        
+        
+    def _create_clip_object(
+            self, recording_channel_id, start_index, length, creation_time,
+            creating_job_id, creating_processor_id):
          
         channel, station, mic_output, sample_rate, start_time = \
             self._get_recording_channel_info(recording_channel_id)
@@ -150,7 +322,7 @@ class ExecuteDeferredActionsCommand(Command):
         job = self._get_job(creating_job_id)
         processor = self._get_processor(creating_processor_id)
          
-        clip = Clip.objects.create(
+        return Clip(
             station=station,
             mic_output=mic_output,
             recording_channel=channel,
@@ -165,17 +337,6 @@ class ExecuteDeferredActionsCommand(Command):
             creating_job=job,
             creating_processor=processor
         )
-        
-        if annotations is not None:
-            
-            for name, value in annotations.items():
-                
-                annotation_info = self._get_annotation_info(name)
-                
-                model_utils.annotate_clip(
-                    clip, annotation_info, str(value),
-                    creation_time=creation_time, creating_user=None,
-                    creating_job=self._job, creating_processor=processor)
 
 
     # TODO: The `_get_annotation_info` method and the code above that
@@ -251,21 +412,67 @@ class ExecuteDeferredActionsCommand(Command):
             return processor
         
         
-    def _move_deferred_action_files(self, file_paths):
+    def _move_deferred_action_file(self, file_path):
+        executed_dir_path = file_path.parent / 'Executed'
+        executed_dir_path.mkdir(parents=True, exist_ok=True)
+        file_path.rename(executed_dir_path / file_path.name)
         
-        if len(file_paths) > 0:
-            
-            self._logger.info(
-                'Moving deferred action files to "Executed" directory...')
-            
-            executed_dir_path = file_paths[0].parent / 'Executed'
-            executed_dir_path.mkdir(parents=True, exist_ok=True)
-            
-            for old_path in file_paths:
-                new_path = executed_dir_path / old_path.name
-                old_path.rename(new_path)
         
-         
+def _get_progress_file_path(file_path):
+    return file_path.parent / (file_path.name + _PROGRESS_FILE_NAME_SUFFIX)
+
+
+def _read_progress_file(file_path):
+    if file_path.exists():
+        return int(file_path.read_text())
+    else:
+        return None
+    
+    
+def _write_progress_file(file_path, offset):
+    
+    # Write to a temporary file and then replace the progress file
+    # with it, so that a progress file is never partially written.
+    temp_file_path = file_path.parent / (file_path.name + '.temp')
+    temp_file_path.write_text(str(offset))
+    os.replace(temp_file_path, file_path)
+    
+    
+def _remove_existing_clips(clips, clip_annotations):
+    
+    """
+    Removes clips that already exist in the archive database, along
+    with their annotations.
+    """
+    
+    groups = defaultdict(list)
+    for clip in clips:
+        key = (clip.recording_channel_id, clip.creating_processor_id)
+        groups[key].append(clip.start_time)
+        
+    existing_clip_keys = set()
+    
+    for (channel_id, processor_id), start_times in groups.items():
+        
+        existing_start_times = Clip.objects.filter(
+            recording_channel_id=channel_id,
+            creating_processor_id=processor_id,
+            start_time__range=(min(start_times), max(start_times))
+        ).values_list('start_time', flat=True)
+        
+        existing_clip_keys.update(
+            (channel_id, processor_id, start_time)
+            for start_time in existing_start_times)
+        
+    pairs = [
+        (clip, annotations)
+        for clip, annotations in zip(clips, clip_annotations)
+        if (clip.recording_channel_id, clip.creating_processor_id,
+            clip.start_time) not in existing_clip_keys]
+    
+    return [p[0] for p in pairs], [p[1] for p in pairs]
+    
+    
 def _parse_datetime(dt):
     dt = datetime.datetime.strptime(dt, '%Y-%m-%d %H:%M:%S')
     return pytz.utc.localize(dt)
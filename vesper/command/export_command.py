@@ -123,21 +123,51 @@ def _create_clip_count_text(count):
 
 _LOGGING_PERIOD = 500    # clips
 
+_EXPORT_BATCH_SIZE = 1000    # clips
+
 
 def _export_clips(clips, exporter):
     
+    # An exporter can export clips in batches rather than one at a
+    # time, for example to get clip data with fewer database queries,
+    # by providing an `export_batch` method. The method exports a list
+    # of clips and returns the number of them that it exported.
+    if hasattr(exporter, 'export_batch'):
+        batch_size = _EXPORT_BATCH_SIZE
+        export_batch = exporter.export_batch
+    else:
+        batch_size = 1
+        export_batch = lambda batch: sum(exporter.export(c) for c in batch)
+        
     visited_count = 0
     exported_count = 0
     
-    for clip in clips:
+    for batch in _get_batches(clips, batch_size):
         
-        if exporter.export(clip):
-            exported_count += 1
+        exported_count += export_batch(batch)
         
-        visited_count += 1
+        prev_visited_count = visited_count
+        visited_count += len(batch)
         
-        if visited_count % _LOGGING_PERIOD == 0:
+        if visited_count // _LOGGING_PERIOD != \
+                prev_visited_count // _LOGGING_PERIOD:
             _logger.info(f'Visited {visited_count} clips...')
             
     _logger.info(
         f'Exported {exported_count} of {visited_count} visited clips.')
+
+
+def _get_batches(items, batch_size):
+    
+    batch = []
+    
+    for item in items:
+        
+        batch.append(item)
+        
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+            
+    if len(batch) != 0:
+        yield batch
@@ -8,7 +8,7 @@ import time
 
 from vesper.command.command import Command
 from vesper.django.app.models import RecordingFile
-from vesper.singletons import recording_manager
+from vesper.singletons import recording_file_index, recording_manager
 import vesper.command.command_utils as command_utils
 import vesper.util.text_utils as text_utils
 
@@ -137,6 +137,9 @@ class RefreshRecordingAudioFilePathsCommand(Command):
                 file_.save()
                 updated_count += 1
                 
+        if updated_count != 0:
+            recording_file_index.instance.invalidate()
+            
         elapsed_time = time.time() - start_time
         timing_text = command_utils.get_timing_text(
             elapsed_time, visited_count, 'files')
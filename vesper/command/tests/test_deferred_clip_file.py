@@ -0,0 +1,81 @@
+from pathlib import Path
+import datetime
+import tempfile
+
+import pytz
+
+from vesper.command.deferred_clip_file import (
+    DeferredClipFileReader, DeferredClipFileWriter)
+from vesper.tests.test_case import TestCase
+import vesper.command.deferred_clip_file as deferred_clip_file
+
+
+_CREATION_TIME = datetime.datetime(
+    2020, 5, 1, 12, 34, 56, 789012, tzinfo=pytz.utc)
+
+
+class DeferredClipFileTests(TestCase):
+    
+    
+    def test_write_and_read(self):
+        
+        chunks = [
+            [(1, 100, 10, _CREATION_TIME, 2, 3, None),
+             (1, 200, 20, _CREATION_TIME, 2, 3,
+              {'Classification': 'Call.AMRE', 'Score': 95.5})],
+            [(4, 300, 30, _CREATION_TIME, 5, 6, {'Détecteur': 'é'})]
+        ]
+        
+        with tempfile.TemporaryDirectory() as dir_path:
+            
+            file_path = Path(dir_path) / 'Test.vdc'
+            
+            writer = DeferredClipFileWriter(file_path)
+            for clips in chunks:
+                writer.write(clips)
+            writer.close()
+            
+            self._assert_chunks(file_path, chunks)
+            
+            # Truncate file in the middle of its last chunk, as might
+            # happen if the writing process ended abnormally.
+            size = file_path.stat().st_size
+            with open(file_path, 'r+b') as file_:
+                file_.truncate(size - 5)
+            
+            self._assert_chunks(file_path, chunks[:1])
+    
+    
+    def _assert_chunks(self, file_path, expected_chunks):
+        
+        reader = DeferredClipFileReader(file_path)
+        chunks = list(reader.get_chunks())
+        
+        self.assertEqual(len(chunks), len(expected_chunks))
+        
+        for chunk, expected_clips in zip(chunks, expected_chunks):
+            
+            clips = [
+                record[:3] +
+                (deferred_clip_file.get_datetime(record[3]),) +
+                record[4:] + (annotations,)
+                for record, annotations in zip(
+                    chunk.clips.tolist(), chunk.get_annotations())]
+            
+            expected_clips = [
+                clip[:6] + (_stringify_values(clip[6]),)
+                for clip in expected_clips]
+            
+            self.assertEqual(clips, expected_clips)
+        
+        # Chunks can be read starting from the offset of any chunk.
+        if len(chunks) > 1:
+            resumed_chunks = list(reader.get_chunks(chunks[0].end_offset))
+            self.assertEqual(len(resumed_chunks), len(chunks) - 1)
+
+
+def _stringify_values(annotations):
+    if annotations is None:
+        return None
+    else:
+        return dict((k, str(v)) for k, v in annotations.items())
@@ -38,10 +38,16 @@ class Archive:
         # a circular import.
         from vesper.singletons import preference_manager
         
-        preferences = preference_manager.instance.preferences
-        self._ui_names = preferences.get('ui_names', {})
+        self._preference_manager = preference_manager.instance
         
-        self._hidden_objects = _get_hidden_objects(preferences)
+        self._preferences_version = None
+        """
+        Version of the preferences from which the UI names and hidden
+        objects of this archive were obtained.
+        """
+        
+        self._ui_names = None
+        self._hidden_objects = None
         
         self._processors_by_type = None
         """
@@ -113,6 +119,33 @@ class Archive:
         self._processor_cache_dirty = True
         self._string_anno_values_cache_dirty = True
         
+        self._update_preferences_if_needed()
+        
+        
+    def _update_preferences_if_needed(self):
+        
+        """
+        Updates the UI names and hidden objects of this archive if the
+        preferences have been reloaded since they were last updated.
+        
+        Since the cached processors and string annotation values depend
+        on the UI names and hidden objects, this marks both caches as
+        dirty when it updates them.
+        """
+        
+        manager = self._preference_manager
+        
+        if manager.version != self._preferences_version:
+            
+            preferences = manager.preferences
+            self._ui_names = preferences.get('ui_names', {})
+            self._hidden_objects = _get_hidden_objects(preferences)
+            
+            self._preferences_version = manager.version
+            
+            self._processor_cache_dirty = True
+            self._string_anno_values_cache_dirty = True
+            
     
     @property
     def NOT_APPLICABLE(self):
@@ -145,6 +178,7 @@ class Archive:
     
     
     def _refresh_processor_cache_if_needed(self):
+        self._update_preferences_if_needed()
         if self._processor_cache_dirty:
             self.refresh_processor_cache()
             
@@ -223,6 +257,7 @@ class Archive:
      
     
     def _refresh_string_annotation_values_cache_if_needed(self):
+        self._update_preferences_if_needed()
         if self._string_anno_values_cache_dirty:
             self.refresh_string_annotation_values_cache()
              
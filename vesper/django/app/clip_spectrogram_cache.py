@@ -0,0 +1,418 @@
+"""Module containing class `ClipSpectrogramCache`."""
+
+
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+import json
+import math
+import os
+import tempfile
+
+import numpy as np
+
+from vesper.util.bunch import Bunch
+from vesper.util.lru_cache import LruCache
+import vesper.util.time_frequency_analysis_utils as tfa_utils
+
+
+# Data window weights. We compute the same symmetric, sum-of-cosines
+# windows as the clip album, so that server and browser spectrograms
+# are the same.
+_WINDOW_WEIGHTS = {
+    'Blackman': (.42, -.5, .08),
+    'Hamming': (.54, -.46),
+    'Hann': (.5, -.5),
+    'Nuttall': (.3635819, -.4891775, .1365995, -.0106411),
+    'Rectangular': (1,)
+}
+
+_DEFAULT_SPECTRAL_INTERPOLATION_FACTOR = 1
+_DEFAULT_REFERENCE_POWER = 1e-10
+
+# Clip sample scale factor. The clip album decodes 16-bit clip samples
+# to the interval [-1, 1). `ClipManager.get_samples` returns samples at
+# 16-bit scale for recordings of all supported sample formats, including
+# 24-bit and floating point ones (see `MappedWaveFile`).
+_SAMPLE_SCALE_FACTOR = 1 / 32768
+
+_CACHE_VERSION = 1
+"""
+Version of cached spectrograms.
+
+Increment this whenever the spectrograms computed for given clips and
+settings change, so that the cache will not return spectrograms that
+it computed before the change.
+"""
+
+_HEADER_DTYPE = np.dtype('<u4')
+
+
+class ClipSpectrogramCache:
+    
+    """
+    Disk-backed cache of clip spectrograms.
+    
+    A clip spectrogram cache computes clip spectrograms as the clip
+    album does, but quantizes them to eight-bit images for display and
+    stores the images in files in a cache directory, so that they need
+    be computed only once for a given clip and set of spectrogram
+    settings.
+    
+    Cache files are content-addressed: the name of the file for a
+    spectrogram is a hash of the clip ID, the properties of the clip
+    that determine its samples, and the spectrogram settings. A cache
+    entry thus never goes stale: if a clip's samples or the album
+    settings change, the old entry is simply no longer used. The cache
+    keeps the total size of its files below a specified maximum,
+    deleting the least recently used files as needed to make room for
+    new ones.
+    
+    A cached spectrogram comprises two little-endian 32-bit unsigned
+    integers, the number of spectra and the number of bins per
+    spectrum, followed by the spectra, one after the other, with one
+    byte per bin. A bin value of zero corresponds to the start of the
+    spectrogram settings' power range and a value of 255 to its end.
+    """
+    
+    
+    def __init__(self, clip_manager, dir_path, max_size):
+        
+        self._clip_manager = clip_manager
+        self._dir_path = Path(dir_path)
+        self._max_size = max_size
+        
+        # Map from cache file path to file size, in order of last use.
+        # We load this from the cache directory lazily, the first time
+        # we need it.
+        self._files = None
+        self._size = 0
+        
+        self._lock = Lock()
+    
+    
+    @property
+    def dir_path(self):
+        return self._dir_path
+    
+    
+    @property
+    def max_size(self):
+        return self._max_size
+    
+    
+    @property
+    def size(self):
+        
+        """The total size of the files of this cache, in bytes."""
+        
+        with self._lock:
+            self._load_files_if_needed()
+            return self._size
+    
+    
+    def get_spectrogram(self, clip, settings):
+        
+        """
+        Gets the quantized spectrogram of the specified clip.
+        
+        Parameters
+        ----------
+        clip : Clip
+            the clip whose spectrogram to get.
+        
+        settings : Bunch
+            spectrogram settings, as returned by
+            `parse_spectrogram_settings`.
+        
+        Returns
+        -------
+        bytes
+            the clip's quantized spectrogram, in the format described
+            in the class docstring.
+        """
+        
+        path = self._get_file_path(clip, settings)
+        
+        try:
+            
+            with open(path, 'rb') as file_:
+                contents = file_.read()
+        
+        except FileNotFoundError:
+            # spectrogram not in cache
+            
+            contents = self._compute_spectrogram(clip, settings)
+            self._add_file(path, contents)
+        
+        else:
+            # spectrogram in cache
+            
+            self._touch_file(path, len(contents))
+        
+        return contents
+    
+    
+    def _get_file_path(self, clip, settings):
+        key = json.dumps((
+            _CACHE_VERSION, clip.id, clip.recording_channel_id,
+            clip.start_index, clip.length, clip.sample_rate, settings.hash))
+        digest = sha256(key.encode('utf-8')).hexdigest()
+        return self._dir_path / digest[:2] / digest[2:]
+    
+    
+    def _compute_spectrogram(self, clip, settings):
+        
+        samples = self._clip_manager.get_samples(clip)
+        samples = samples * _SAMPLE_SCALE_FACTOR
+        
+        gram = _compute_spectrogram(samples, clip.sample_rate, settings)
+        
+        header = np.array(gram.shape, dtype=_HEADER_DTYPE)
+        return header.tobytes() + gram.tobytes()
+    
+    
+    def _add_file(self, path, contents):
+        
+        # Write the file to a temporary file in the cache directory and
+        # then rename it, so that other threads and processes never see
+        # a partially written file.
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        fd, temp_path = tempfile.mkstemp(dir=self._dir_path, suffix='.tmp')
+        
+        try:
+            with os.fdopen(fd, 'wb') as file_:
+                file_.write(contents)
+            os.replace(temp_path, path)
+        
+        except Exception:
+            _delete_file(temp_path)
+            raise
+        
+        with self._lock:
+            
+            self._load_files_if_needed()
+            
+            old_size = self._files.pop(path, 0)
+            self._files[path] = len(contents)
+            self._size += len(contents) - old_size
+            
+            self._evict_files_if_needed()
+    
+    
+    def _touch_file(self, path, size):
+        
+        with self._lock:
+            
+            self._load_files_if_needed()
+            
+            if path in self._files:
+                self._files.move_to_end(path)
+            else:
+                # file added by another process
+                
+                self._files[path] = size
+                self._size += size
+        
+        # Update file modification time so the file's recency survives
+        # a restart.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+    
+    
+    def _load_files_if_needed(self):
+        
+        if self._files is None:
+            
+            files = []
+            
+            if self._dir_path.exists():
+                
+                for path in self._dir_path.glob('*/*'):
+                    
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    
+                    files.append((stat.st_mtime, path, stat.st_size))
+            
+            files.sort()
+            
+            self._files = LruCache()
+            for _, path, size in files:
+                self._files[path] = size
+            
+            self._size = sum(self._files.values())
+    
+    
+    def _evict_files_if_needed(self):
+        while self._size > self._max_size and len(self._files) > 1:
+            path, size = self._files.popitem(last=False)
+            self._size -= size
+            _delete_file(path)
+    
+    
+    def clear(self):
+        
+        """Deletes all of the files of this cache."""
+        
+        with self._lock:
+            
+            self._load_files_if_needed()
+            
+            for path in self._files:
+                _delete_file(path)
+            
+            self._files.clear()
+            self._size = 0
+
+
+def parse_spectrogram_settings(settings):
+    
+    """
+    Parses clip album spectrogram settings.
+    
+    Parameters
+    ----------
+    settings : dict
+        the spectrogram settings of a clip album settings preset, as
+        sent by the clip album. The dictionary has a "computation" item
+        whose value is the computation settings of the preset and a
+        "powerRange" item whose value is the power range of the display
+        settings of the preset.
+    
+    Returns
+    -------
+    Bunch
+        the parsed settings.
+    
+    Raises
+    ------
+    ValueError
+        if the settings are invalid.
+    """
+    
+    try:
+        
+        computation = settings['computation']
+        window = computation['window']
+        
+        window_type = window['type']
+        window_size = float(window['size'])
+        hop_size = float(computation['hopSize'])
+        interpolation_factor = computation.get(
+            'spectralInterpolationFactor',
+            _DEFAULT_SPECTRAL_INTERPOLATION_FACTOR)
+        reference_power = computation.get('referencePower')
+        start_power, end_power = (float(p) for p in settings['powerRange'])
+    
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Bad spectrogram settings.')
+    
+    if window_type not in _WINDOW_WEIGHTS:
+        raise ValueError(f'Unrecognized window type "{window_type}".')
+    
+    if window_size <= 0 or hop_size <= 0 or hop_size > 100:
+        raise ValueError('Bad spectrogram window or hop size.')
+    
+    if start_power == end_power:
+        raise ValueError('Spectrogram power range is empty.')
+    
+    if not reference_power:
+        reference_power = _DEFAULT_REFERENCE_POWER
+    
+    result = Bunch(
+        window_type=window_type,
+        window_size=window_size,
+        hop_size=hop_size,
+        spectral_interpolation_factor=interpolation_factor,
+        reference_power=float(reference_power),
+        power_range=(start_power, end_power))
+    
+    # Hash settings for cache keys.
+    data = json.dumps(result.__dict__, sort_keys=True)
+    result.hash = sha256(data.encode('utf-8')).hexdigest()
+    
+    return result
+
+
+def _compute_spectrogram(samples, sample_rate, settings):
+    
+    float_window_size = settings.window_size * sample_rate
+    window_size = _round(float_window_size)
+    window = _create_window(settings.window_type, window_size)
+    hop_size = _round(settings.hop_size / 100 * float_window_size)
+    dft_size = _get_dft_size(
+        window_size, settings.spectral_interpolation_factor)
+    
+    if window_size == 0 or hop_size == 0 or len(samples) < window_size:
+        return np.zeros((0, dft_size // 2 + 1), dtype=np.uint8)
+    
+    gram = tfa_utils.compute_spectrogram(samples, window, hop_size, dft_size)
+    
+    # Scale spectrogram as the clip album does.
+    tfa_utils.scale_spectrogram(gram, out=gram)
+    
+    tfa_utils.linear_to_log(gram, settings.reference_power, out=gram)
+    
+    # Quantize to eight bits.
+    start_power, end_power = settings.power_range
+    gram -= start_power
+    gram *= 255 / (end_power - start_power)
+    np.rint(gram, out=gram)
+    np.clip(gram, 0, 255, out=gram)
+    
+    return gram.astype(np.uint8)
+
+
+def _round(x):
+    
+    # We round halves up like JavaScript's `Math.round` rather than to
+    # even like Python's `round`, to get the same window and hop sizes
+    # as the clip album.
+    return math.floor(x + .5)
+
+
+def _create_window(window_type, size):
+    
+    window = np.zeros(size)
+    weights = _WINDOW_WEIGHTS[window_type]
+    
+    if size == 1:
+        window[0] = sum(weights)
+    
+    elif size > 1:
+        phases = 2 * np.pi * np.arange(size) / (size - 1)
+        for i, weight in enumerate(weights):
+            window += weight * np.cos(i * phases)
+    
+    return window
+
+
+def _get_dft_size(window_size, interpolation_factor):
+    
+    dft_size = tfa_utils.get_dft_size(window_size)
+    
+    # Like the clip album, we ignore interpolation factors that are
+    # not integer powers of two greater than one.
+    if isinstance(interpolation_factor, (int, float)) and \
+            interpolation_factor > 1 and \
+            interpolation_factor == int(interpolation_factor):
+        
+        factor = int(interpolation_factor)
+        if factor & (factor - 1) == 0:
+            dft_size *= factor
+    
+    return dft_size
+
+
+def _delete_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -8,6 +8,7 @@ import vesper.django.app.form_utils as form_utils
 _FORM_TITLE = 'Detect'
 _SCHEDULE_FIELD_LABEL = 'Schedule'
 _DEFER_CLIP_CREATION_LABEL = 'Defer clip creation'
+_NUM_WORKERS_FIELD_LABEL = 'Worker processes'
     
     
 def _get_field_default(name, default):
@@ -33,6 +34,11 @@ class DetectForm(forms.Form):
         initial=_get_field_default(_DEFER_CLIP_CREATION_LABEL, False),
         required=False)
     
+    num_workers = forms.IntegerField(
+        label=_NUM_WORKERS_FIELD_LABEL,
+        min_value=1,
+        initial=_get_field_default(_NUM_WORKERS_FIELD_LABEL, 1))
+    
     
     def __init__(self, *args, **kwargs):
         
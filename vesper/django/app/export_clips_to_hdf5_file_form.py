@@ -3,8 +3,18 @@ from django import forms
 from vesper.django.app.clip_set_form import ClipSetForm
 
 
+_LAYOUT_CHOICES = (
+    ('Clip Datasets', 'One dataset per clip'),
+    ('Clip Table', 'One table of fixed-length clips'),
+)
+
+
 class ExportClipsToHdf5FileForm(ClipSetForm):
     
     output_file_path = forms.CharField(
         label='Output file', max_length=255,
         widget=forms.TextInput(attrs={'class': 'command-form-wide-input'}))
+    
+    layout = forms.ChoiceField(
+        label='File layout', choices=_LAYOUT_CHOICES,
+        initial=_LAYOUT_CHOICES[0][0])
@@ -0,0 +1,25 @@
+"""
+Django management command that rebuilds the clip count table of a
+Vesper archive.
+"""
+
+
+from django.core.management.base import BaseCommand, CommandError
+
+import vesper.django.app.model_utils as model_utils
+
+
+class Command(BaseCommand):
+
+
+    help = 'Rebuilds the clip count table of a Vesper archive'
+
+
+    def handle(self, *args, **options):
+
+        try:
+            model_utils.rebuild_clip_counts()
+        except Exception as e:
+            raise CommandError(
+                f'Could not rebuild clip count table. Error message was: '
+                f'{str(e)}')
@@ -0,0 +1,76 @@
+# Generated by Django 3.2.25 on 2026-10-18 04:02
+
+from django.db import migrations, models
+from django.db.models import Count, FilteredRelation, Q
+import django.db.models.deletion
+
+
+def populate_clip_counts(apps, schema_editor):
+
+    """Populates the clip count table from the clip table."""
+
+    AnnotationInfo = apps.get_model('vesper', 'AnnotationInfo')
+    Clip = apps.get_model('vesper', 'Clip')
+    ClipCount = apps.get_model('vesper', 'ClipCount')
+
+    info = AnnotationInfo.objects.filter(name='Classification').first()
+
+    clips = Clip.objects.annotate(
+        annotation=FilteredRelation(
+            'string_annotation',
+            condition=Q(string_annotation__info=info))
+    ).order_by()
+
+    fields = (
+        'station_id', 'mic_output_id', 'creating_processor_id', 'date',
+        'annotation__value')
+
+    def create_clip_count(d, tag_info_id):
+        return ClipCount(
+            station_id=d['station_id'],
+            mic_output_id=d['mic_output_id'],
+            detector_id=d['creating_processor_id'],
+            date=d['date'],
+            annotation_value=d['annotation__value'],
+            tag_info_id=tag_info_id,
+            count=d['count'])
+
+    counts = [
+        create_clip_count(d, None)
+        for d in clips.values(*fields).annotate(count=Count('id'))]
+
+    tag_counts = clips.values(*fields, 'tag__info_id').annotate(
+        count=Count('id'))
+    counts += [
+        create_clip_count(d, d['tag__info_id'])
+        for d in tag_counts if d['tag__info_id'] is not None]
+
+    ClipCount.objects.bulk_create(counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vesper', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClipCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('annotation_value', models.CharField(blank=True, max_length=255, null=True)),
+                ('count', models.BigIntegerField()),
+                ('detector', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='clip_counts', related_query_name='clip_count', to='vesper.processor')),
+                ('mic_output', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clip_counts', related_query_name='clip_count', to='vesper.deviceoutput')),
+                ('station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clip_counts', related_query_name='clip_count', to='vesper.station')),
+                ('tag_info', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='clip_counts', related_query_name='clip_count', to='vesper.taginfo')),
+            ],
+            options={
+                'db_table': 'vesper_clip_count',
+                'index_together': {('station', 'mic_output', 'detector', 'date')},
+            },
+        ),
+        migrations.RunPython(populate_clip_counts, migrations.RunPython.noop),
+    ]
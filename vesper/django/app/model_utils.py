@@ -7,12 +7,14 @@ import datetime
 import itertools
 
 from django.db import transaction
-from django.db.models import Count, F
+from django.db.models import Count, F, FilteredRelation, Q, Sum
 
 from vesper.django.app.models import (
-    AnnotationInfo, Clip, DeviceConnection, Recording, RecordingChannel,
-    StationDevice, StringAnnotation, StringAnnotationEdit, TagInfo)
-from vesper.singletons import archive, recording_manager
+    AnnotationInfo, Clip, ClipCount, DeviceConnection, Recording,
+    RecordingChannel, StationDevice, StringAnnotation, StringAnnotationEdit,
+    TagInfo)
+from vesper.singletons import (
+    archive, recording_file_index, recording_manager)
 from vesper.util.bunch import Bunch
 import vesper.util.time_utils as time_utils
 import vesper.util.archive_lock as archive_lock
@@ -297,7 +299,7 @@ def get_recording_dates(station, mic_output):
     # TODO: Annotate channels with recording start times?
     channels = RecordingChannel.objects.filter(
         recording__station=station,
-        mic_output=mic_output)
+        mic_output=mic_output).select_related('recording')
     
     nights = set(station.get_night(c.recording.start_time) for c in channels)
     
@@ -350,40 +352,39 @@ def get_clip_recording_file(clip):
         example if it straddles the boundary between two files.
     """
     
-    recording = clip.recording_channel.recording
-    files = recording.files
-    num_files = files.count()
+    index = recording_file_index.instance
+    recording_id, _ = index.get_channel_info(clip.recording_channel_id)
     
-    if num_files == 0:
+    if len(index.get_files(recording_id)) == 0:
         return None
     
-    else:
+    file_ = index.find_file(recording_id, clip.start_index)
+    
+    if file_ is not None:
+        # clip starts in this file
         
-        for f in files.all().order_by('file_num'):
+        if clip.end_index <= file_.end_index:
+            # clip is contained entirely in this file
             
-            file_end_index = f.end_index
+            return file_
+        
+        else:
+            # clip is not contained entirely in this file
             
-            if clip.start_index < file_end_index:
-                # clip starts in this file
-                
-                if clip.end_index <= file_end_index:
-                    # clip is contained entirely in this file
-                    
-                    return f
-                
-                else:
-                    # clip is not contained entirely in this file
-                    
-                    raise ValueError(
-                        'Clip extends past end of recording file in which '
-                        'it starts.')
+            raise ValueError(
+                'Clip extends past end of recording file in which '
+                'it starts.')
             
-        # We should never get here, since by definition a clip is part of
-        # its parent recording.
-        raise ValueError(
-            'DATA INTEGRITY ERROR: Clip starts after end of last file of '
-            'parent recording. This is not supposed to happen, and should '
-            'be investigated ASAP.')
+    # We should never get here, since by definition a clip is part of
+    # its parent recording.
+    raise ValueError(
+        'DATA INTEGRITY ERROR: Clip starts after end of last file of '
+        'parent recording. This is not supposed to happen, and should '
+        'be investigated ASAP.')
+
+
+CLIP_COUNT_ANNOTATION_NAME = 'Classification'
+"""Name of the annotation whose values the clip count table counts."""
 
 
 def get_clip_counts(
@@ -394,16 +395,27 @@ def get_clip_counts(
     
     counts = dict((date, 0) for date in dates)
     
-    clips = get_clips(
-        station=station,
-        mic_output=mic_output,
-        detector=detector,
-        annotation_name=annotation_name,
-        annotation_value=annotation_value,
-        tag_name=tag_name,
-        order=False)
-    
-    count_dicts = clips.values('date').annotate(count=Count('date'))
+    if annotation_name is None or \
+            annotation_name == CLIP_COUNT_ANNOTATION_NAME:
+        # counts are in clip count table
+        
+        count_dicts = _get_clip_count_table_counts(
+            station, mic_output, detector, annotation_value, tag_name,
+            annotation_name is not None)
+        
+    else:
+        # counts are not in clip count table
+        
+        clips = get_clips(
+            station=station,
+            mic_output=mic_output,
+            detector=detector,
+            annotation_name=annotation_name,
+            annotation_value=annotation_value,
+            tag_name=tag_name,
+            order=False)
+        
+        count_dicts = clips.values('date').annotate(count=Count('date'))
     
     for d in count_dicts:
         counts[d['date']] = d['count']
@@ -414,6 +426,222 @@ def get_clip_counts(
 #         print('_get_clip_counts {}: {}'.format(str(date), count))
     
     return counts
+
+
+def _get_clip_count_table_counts(
+        station, mic_output, detector, annotation_value, tag_name,
+        filter_by_annotation):
+    
+    clip_counts = ClipCount.objects.filter(
+        station=station, mic_output=mic_output, detector=detector)
+    
+    if tag_name is None:
+        clip_counts = clip_counts.filter(tag_info__isnull=True)
+    else:
+        info = TagInfo.objects.get(name=tag_name)
+        clip_counts = clip_counts.filter(tag_info=info)
+    
+    if filter_by_annotation:
+        
+        if annotation_value is None:
+            # want only unannotated clips
+            
+            clip_counts = clip_counts.filter(annotation_value__isnull=True)
+            
+        else:
+            # want only annotated clips
+            
+            clip_counts = _filter_by_annotation_value(
+                clip_counts.filter(annotation_value__isnull=False),
+                'annotation_value', annotation_value)
+    
+    return clip_counts.values('date').annotate(
+        count=Sum('count')).order_by()
+    
+    
+@archive_lock.atomic
+@transaction.atomic
+def add_clip_counts(clips):
+    
+    """
+    Adds the specified clips to the clip count table.
+    
+    Code that creates clips should call this function after creating
+    them and their annotations, in the same transaction.
+    """
+    
+    _adjust_clip_counts([c.id for c in clips], 1)
+    
+    
+@archive_lock.atomic
+@transaction.atomic
+def remove_clip_counts(clips):
+    
+    """
+    Removes the specified clips from the clip count table.
+    
+    Code that deletes clips should call this function before deleting
+    them, in the same transaction.
+    """
+    
+    _adjust_clip_counts([c.id for c in clips], -1)
+    
+    
+def _adjust_clip_counts(clip_ids, increment):
+    
+    """
+    Adds `increment` times the counts of the specified clips to the
+    clip count table.
+    
+    The counts of the clips are computed from the clip table for just
+    the specified clips, so the cost of an adjustment is proportional
+    to the number of clips adjusted rather than to the numbers of clips
+    of their nights. Code that modifies the "Classification" annotations
+    of clips calls this function with an increment of -1 before the
+    modification and with an increment of 1 after it.
+    """
+    
+    deltas = defaultdict(int)
+    
+    for ids in _get_chunks(clip_ids, _MAX_QUERY_CLIP_ID_COUNT):
+        for count in _count_clips(Clip.objects.filter(id__in=ids)):
+            deltas[_get_clip_count_key(count)] += increment * count.count
+            
+    _apply_clip_count_deltas(deltas)
+    
+    
+def _get_clip_count_key(count):
+    return (
+        count.station_id, count.mic_output_id, count.detector_id,
+        count.date, count.annotation_value, count.tag_info_id)
+    
+    
+def _apply_clip_count_deltas(deltas):
+    
+    """
+    Adds deltas to the counts of the clip count table.
+    
+    `deltas` maps clip count keys (as returned by `_get_clip_count_key`)
+    to count deltas. Counts that become zero are deleted.
+    """
+    
+    deltas = dict((k, d) for k, d in deltas.items() if d != 0)
+    
+    if len(deltas) == 0:
+        return
+    
+    groups = defaultdict(list)
+    for key in deltas:
+        groups[key[:3]].append(key[3])
+        
+    # Get existing counts to adjust. As in `_set_clip_ids`, we query
+    # for a range of dates rather than for individual dates, and
+    # ignore counts that are not in `deltas`.
+    counts = {}
+    for (station_id, mic_output_id, detector_id), dates in groups.items():
+        for count in ClipCount.objects.filter(
+                station_id=station_id,
+                mic_output_id=mic_output_id,
+                detector_id=detector_id,
+                date__range=(min(dates), max(dates))):
+            key = _get_clip_count_key(count)
+            if key in deltas:
+                counts[key] = count
+                
+    new_counts = []
+    updated_counts = []
+    zero_count_ids = []
+    
+    for key, delta in deltas.items():
+        
+        count = counts.get(key)
+        
+        if count is None:
+            
+            station_id, mic_output_id, detector_id, date, value, \
+                tag_info_id = key
+                
+            new_counts.append(ClipCount(
+                station_id=station_id,
+                mic_output_id=mic_output_id,
+                detector_id=detector_id,
+                date=date,
+                annotation_value=value,
+                tag_info_id=tag_info_id,
+                count=delta))
+            
+        else:
+            
+            count.count += delta
+            
+            if count.count == 0:
+                zero_count_ids.append(count.id)
+            else:
+                updated_counts.append(count)
+                
+    ClipCount.objects.bulk_create(new_counts)
+    ClipCount.objects.bulk_update(updated_counts, ['count'])
+    
+    for ids in _get_chunks(zero_count_ids, _MAX_QUERY_CLIP_ID_COUNT):
+        ClipCount.objects.filter(id__in=ids).delete()
+        
+        
+def _count_clips(clips):
+    
+    """Counts the specified clips, returning unsaved `ClipCount`s."""
+    
+    info = AnnotationInfo.objects.filter(
+        name=CLIP_COUNT_ANNOTATION_NAME).first()
+    
+    # If the archive has no annotation info for the counted annotation,
+    # this condition matches no annotations, so all clips are counted
+    # as unannotated.
+    annotation = FilteredRelation(
+        'string_annotation',
+        condition=Q(string_annotation__info=info))
+    
+    clips = clips.annotate(annotation=annotation).order_by()
+    
+    fields = (
+        'station_id', 'mic_output_id', 'creating_processor_id', 'date',
+        'annotation__value')
+    
+    # Count clips regardless of tags.
+    counts = [
+        _create_clip_count(d, None)
+        for d in clips.values(*fields).annotate(count=Count('id'))]
+    
+    # Count tagged clips. Untagged clips have a null tag info ID
+    # because of the left outer join with the tag table, and have
+    # already been counted.
+    tag_counts = clips.values(*fields, 'tag__info_id').annotate(
+        count=Count('id'))
+    counts += [
+        _create_clip_count(d, d['tag__info_id'])
+        for d in tag_counts if d['tag__info_id'] is not None]
+    
+    return counts
+
+
+def _create_clip_count(d, tag_info_id):
+    return ClipCount(
+        station_id=d['station_id'],
+        mic_output_id=d['mic_output_id'],
+        detector_id=d['creating_processor_id'],
+        date=d['date'],
+        annotation_value=d['annotation__value'],
+        tag_info_id=tag_info_id,
+        count=d['count'])
+
+
+@archive_lock.atomic
+@transaction.atomic
+def rebuild_clip_counts():
+    
+    """Recomputes the entire clip count table from the clip table."""
+    
+    ClipCount.objects.all().delete()
+    ClipCount.objects.bulk_create(_count_clips(Clip.objects.all()))
     
     
 def get_clips(**kwargs):
@@ -480,27 +708,35 @@ def _filter_clips_by_annotation_if_needed(
         else:
             # want only annotated clips
             
-            wildcard = archive.instance.STRING_ANNOTATION_VALUE_WILDCARD
-            
             # Get all annotated clips.
             clips = clips.filter(string_annotation__info=info)
             
-            if not annotation_value.endswith(wildcard):
-                # want clips with a particular annotation value
-                
-                clips = clips.filter(string_annotation__value=annotation_value)
-                
-            elif annotation_value != wildcard:
-                # want clips whose annotation values start with a prefix
-                
-                prefix = annotation_value[:-len(wildcard)]
-                
-                clips = clips.filter(
-                    string_annotation__value__startswith=prefix)
-                
-            return clips
+            return _filter_by_annotation_value(
+                clips, 'string_annotation__value', annotation_value)
                 
 
+def _filter_by_annotation_value(objects, field_name, annotation_value):
+    
+    wildcard = archive.instance.STRING_ANNOTATION_VALUE_WILDCARD
+    
+    if not annotation_value.endswith(wildcard):
+        # want objects with a particular annotation value
+        
+        return objects.filter(**{field_name: annotation_value})
+        
+    elif annotation_value != wildcard:
+        # want objects whose annotation values start with a prefix
+        
+        prefix = annotation_value[:-len(wildcard)]
+        
+        return objects.filter(**{field_name + '__startswith': prefix})
+        
+    else:
+        # want objects with any annotation value
+        
+        return objects
+
+
 def _filter_clips_by_tag_if_needed(clips, tag_name):
     
     # TODO: Support tag exclusion as well as inclusion.
@@ -560,6 +796,53 @@ def get_clip_annotations(clip):
     return dict((a.name, a.value) for a in annotations)
 
 
+def get_clips_annotations(clip_ids, annotation_names=None):
+    
+    """
+    Gets the annotations of the specified clips.
+    
+    This function gets the annotations of many clips with one query
+    per `_MAX_QUERY_CLIP_ID_COUNT` clips, rather than one query per
+    clip as repeated calls to `get_clip_annotations` would.
+    
+    Parameters
+    ----------
+    clip_ids : list of int
+        the IDs of the clips whose annotations to get.
+    
+    annotation_names : iterable of str or None
+        the names of the annotations to get, or `None` to get all
+        annotations.
+    
+    Returns
+    -------
+    dict
+        mapping from clip ID to a dictionary that maps annotation names
+        to annotation values, with an item for each specified clip ID.
+        The annotation dictionary of a clip with no annotations, or of
+        a nonexistent clip, is empty.
+    """
+    
+    clip_ids = list(dict.fromkeys(clip_ids))
+    
+    annotations = dict((i, {}) for i in clip_ids)
+    
+    for ids in _get_chunks(clip_ids, _MAX_QUERY_CLIP_ID_COUNT):
+        
+        query = StringAnnotation.objects.filter(clip_id__in=ids)
+        
+        if annotation_names is not None:
+            query = query.filter(
+                info__name__in=annotation_names)
+        
+        rows = query.values_list('clip_id', 'info__name', 'value')
+        
+        for clip_id, name, value in rows:
+            annotations[clip_id][name] = value
+    
+    return annotations
+
+
 def get_clip_annotation_value(clip, annotation_info):
 
     try:
@@ -590,6 +873,11 @@ def annotate_clip(
     if annotation is None or annotation.value != value:
         # annotation does not exist or value differs from specified value
         
+        counted = annotation_info.name == CLIP_COUNT_ANNOTATION_NAME
+        
+        if counted:
+            _adjust_clip_counts([clip.id], -1)
+            
         if creation_time is None:
             creation_time = time_utils.get_utc_now()
         
@@ -622,8 +910,135 @@ def annotate_clip(
             info=annotation_info,
             action=StringAnnotationEdit.ACTION_SET,
             **kwargs)
+        
+        if counted:
+            _adjust_clip_counts([clip.id], 1)
     
     
+@archive_lock.atomic
+@transaction.atomic
+def create_clips(clips, clip_annotations=None, annotation_creating_job=None):
+    
+    """
+    Creates database records for new clips and their annotations, and
+    updates the clip count table accordingly.
+    
+    The records are created with a few set-based inserts rather than
+    several inserts per clip.
+    
+    Parameters
+    ----------
+    clips : list of Clip
+        unsaved clips. This function sets the IDs of the clips.
+    clip_annotations : list or None
+        `None` if the clips have no annotations, or a list with one
+        element per clip. Each element is either `None` or a list of
+        `(annotation_info, value)` pairs. An annotation is created with
+        the creation time and creating processor of its clip, and a
+        `StringAnnotationEdit` is created for each annotation.
+    annotation_creating_job : Job or None
+        the creating job of the annotations, or `None` to use the
+        creating job of each annotation's clip.
+    """
+    
+    if len(clips) == 0:
+        return
+    
+    elif len(clips) == 1:
+        # only one clip
+        
+        # Saving a single clip sets its ID on all database backends,
+        # and is faster than a bulk insert followed by an ID query.
+        clips[0].save()
+        
+    else:
+        
+        Clip.objects.bulk_create(clips)
+        
+        # Some database backends (e.g. PostgreSQL) set the IDs of clips
+        # created with `bulk_create`, but others (e.g. SQLite) do not.
+        # In the latter case we get the IDs from the database.
+        if clips[0].id is None:
+            _set_clip_ids(clips)
+            
+    if clip_annotations is not None:
+        _create_clip_annotations(
+            clips, clip_annotations, annotation_creating_job)
+        
+    add_clip_counts(clips)
+    
+    
+def _create_clip_annotations(clips, clip_annotations, annotation_creating_job):
+    
+    annotations = []
+    annotation_edits = []
+    
+    for clip, annotation_pairs in zip(clips, clip_annotations):
+        
+        if annotation_pairs is None:
+            continue
+        
+        creating_job = annotation_creating_job
+        if creating_job is None:
+            creating_job = clip.creating_job
+            
+        for annotation_info, value in annotation_pairs:
+            
+            # Since the clip is new it has no annotations yet, so we
+            # needn't check for existing ones as `annotate_clip` does.
+            kwargs = {
+                'clip': clip,
+                'info': annotation_info,
+                'value': value,
+                'creation_time': clip.creation_time,
+                'creating_user': None,
+                'creating_job': creating_job,
+                'creating_processor': clip.creating_processor
+            }
+            
+            annotations.append(StringAnnotation(**kwargs))
+            
+            annotation_edits.append(StringAnnotationEdit(
+                action=StringAnnotationEdit.ACTION_SET, **kwargs))
+            
+    if len(annotations) != 0:
+        StringAnnotation.objects.bulk_create(annotations)
+        StringAnnotationEdit.objects.bulk_create(annotation_edits)
+        
+        
+def _set_clip_ids(clips):
+    
+    """
+    Sets the IDs of clips that were created with `bulk_create`.
+    
+    The IDs are retrieved via the clips' recording channels, start
+    times, and creating processors, which together uniquely identify
+    a clip. For each recording channel and creating processor, we query
+    for the range of start times of the clips rather than for the
+    individual start times, to avoid exceeding query parameter limits
+    for large numbers of clips. Clips in the range that are not in
+    `clips` are ignored.
+    """
+    
+    groups = defaultdict(list)
+    for clip in clips:
+        key = (clip.recording_channel_id, clip.creating_processor_id)
+        groups[key].append(clip)
+        
+    for (channel_id, processor_id), group in groups.items():
+        
+        start_times = [clip.start_time for clip in group]
+        
+        ids = dict(Clip.objects.filter(
+            recording_channel_id=channel_id,
+            creating_processor_id=processor_id,
+            start_time__range=(min(start_times), max(start_times))
+        ).values_list('start_time', 'id'))
+        
+        for clip in group:
+            clip.id = ids[clip.start_time]
+            
+            
 @archive_lock.atomic
 @transaction.atomic
 def delete_clip_annotation(
@@ -640,6 +1055,11 @@ def delete_clip_annotation(
     
     else:
     
+        counted = annotation_info.name == CLIP_COUNT_ANNOTATION_NAME
+        
+        if counted:
+            _adjust_clip_counts([clip.id], -1)
+            
         annotation.delete()
     
         if creation_time is None:
@@ -653,6 +1073,196 @@ def delete_clip_annotation(
             creating_user=creating_user,
             creating_job=creating_job,
             creating_processor=creating_processor)
+        
+        if counted:
+            _adjust_clip_counts([clip.id], 1)
+
+
+_MAX_QUERY_CLIP_ID_COUNT = 900
+"""
+Maximum number of clip IDs in a single query.
+
+Some SQLite builds limit the number of parameters of a query to 999,
+so we query for large numbers of clips in chunks.
+"""
+
+
+@archive_lock.atomic
+@transaction.atomic
+def annotate_clips(
+        clip_ids, annotation_info, value, creation_time=None,
+        creating_user=None, creating_job=None, creating_processor=None):
+    
+    """
+    Sets the value of an annotation of several clips.
+    
+    This function has the same effect as calling `annotate_clip` for
+    each clip, but uses a few set-based queries rather than several
+    queries per clip. It queries for the existing annotation values of
+    all of the clips at once, and then creates, updates, and records
+    edits of the annotations that must change with bulk statements.
+    
+    Parameters
+    ----------
+    clip_ids : sequence of int
+        the IDs of the clips to annotate.
+    annotation_info : AnnotationInfo
+        the annotation to set.
+    value : str
+        the annotation value.
+    
+    Raises
+    ------
+    Clip.DoesNotExist
+        If one or more of the specified clips does not exist. In this
+        case no clips are annotated.
+    """
+    
+    values = _get_clip_annotation_values(clip_ids, annotation_info)
+    
+    new_ids = [i for i, v in values.items() if v is None]
+    changed_ids = [
+        i for i, v in values.items() if v is not None and v != value]
+    
+    if len(new_ids) == 0 and len(changed_ids) == 0:
+        return
+    
+    annotated_ids = new_ids + changed_ids
+    counted = annotation_info.name == CLIP_COUNT_ANNOTATION_NAME
+    
+    if counted:
+        _adjust_clip_counts(annotated_ids, -1)
+        
+    if creation_time is None:
+        creation_time = time_utils.get_utc_now()
+    
+    kwargs = {
+        'info': annotation_info,
+        'value': value,
+        'creation_time': creation_time,
+        'creating_user': creating_user,
+        'creating_job': creating_job,
+        'creating_processor': creating_processor
+    }
+    
+    StringAnnotation.objects.bulk_create(
+        [StringAnnotation(clip_id=i, **kwargs) for i in new_ids])
+    
+    for ids in _get_chunks(changed_ids, _MAX_QUERY_CLIP_ID_COUNT):
+        StringAnnotation.objects.filter(
+            clip_id__in=ids, info=annotation_info).update(**kwargs)
+    
+    StringAnnotationEdit.objects.bulk_create([
+        StringAnnotationEdit(
+            clip_id=i, action=StringAnnotationEdit.ACTION_SET, **kwargs)
+        for i in annotated_ids])
+    
+    if counted:
+        _adjust_clip_counts(annotated_ids, 1)
+
+
+@archive_lock.atomic
+@transaction.atomic
+def delete_clip_annotations(
+        clip_ids, annotation_info, creation_time=None, creating_user=None,
+        creating_job=None, creating_processor=None):
+    
+    """
+    Deletes an annotation of several clips.
+    
+    This function has the same effect as calling `delete_clip_annotation`
+    for each clip, but uses a few set-based queries rather than several
+    queries per clip.
+    
+    Raises
+    ------
+    Clip.DoesNotExist
+        If one or more of the specified clips does not exist. In this
+        case no annotations are deleted.
+    """
+    
+    values = _get_clip_annotation_values(clip_ids, annotation_info)
+    
+    ids = [i for i, v in values.items() if v is not None]
+    
+    if len(ids) == 0:
+        return
+    
+    counted = annotation_info.name == CLIP_COUNT_ANNOTATION_NAME
+    
+    if counted:
+        _adjust_clip_counts(ids, -1)
+        
+    for chunk in _get_chunks(ids, _MAX_QUERY_CLIP_ID_COUNT):
+        StringAnnotation.objects.filter(
+            clip_id__in=chunk, info=annotation_info).delete()
+    
+    if creation_time is None:
+        creation_time = time_utils.get_utc_now()
+    
+    StringAnnotationEdit.objects.bulk_create([
+        StringAnnotationEdit(
+            clip_id=i,
+            info=annotation_info,
+            action=StringAnnotationEdit.ACTION_DELETE,
+            creation_time=creation_time,
+            creating_user=creating_user,
+            creating_job=creating_job,
+            creating_processor=creating_processor)
+        for i in ids])
+    
+    if counted:
+        _adjust_clip_counts(ids, 1)
+
+
+def _get_clip_annotation_values(clip_ids, annotation_info):
+    
+    """
+    Gets the values of an annotation of several clips.
+    
+    Returns
+    -------
+    dict
+        mapping from clip ID to annotation value, or to `None` for
+        clips that do not have the annotation. The dictionary has one
+        item for each distinct clip ID, in order of first appearance
+        in `clip_ids`.
+    
+    Raises
+    ------
+    Clip.DoesNotExist
+        If one or more of the specified clips does not exist.
+    """
+    
+    clip_ids = list(dict.fromkeys(clip_ids))
+    
+    values = {}
+    
+    # We join the clip table with the annotation table rather than
+    # querying the annotation table alone so that the same query
+    # tells us which clips exist.
+    annotation = FilteredRelation(
+        'string_annotation',
+        condition=Q(string_annotation__info=annotation_info))
+    
+    for ids in _get_chunks(clip_ids, _MAX_QUERY_CLIP_ID_COUNT):
+        
+        values.update(
+            Clip.objects.filter(id__in=ids).annotate(
+                annotation=annotation
+            ).values_list('id', 'annotation__value'))
+    
+    if len(values) != len(clip_ids):
+        missing_ids = [i for i in clip_ids if i not in values]
+        raise Clip.DoesNotExist(
+            f'Could not find clips with IDs {missing_ids}.')
+    
+    return dict((i, values[i]) for i in clip_ids)
+
+
+def _get_chunks(items, chunk_size):
+    for i in range(0, len(items), chunk_size):
+        yield items[i:i + chunk_size]
 
 
 def get_clip_detector_name(clip):
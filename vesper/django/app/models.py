@@ -1001,6 +1001,58 @@ class TagEdit(Model):
         db_table = 'vesper_tag_edit'
 
 
+# A `ClipCount` is a precomputed count of the clips of one station,
+# mic output, detector, and date that have a particular "Classification"
+# annotation value (or no such annotation, when `annotation_value` is
+# null) and a particular tag. A count whose `tag_info` is null includes
+# clips regardless of their tags. A clip with several tags thus
+# contributes to the count with a null `tag_info` and to the count for
+# each of its tags.
+#
+# The clip calendar gets its counts from this table rather than by
+# counting clips, which can take several seconds for large archives.
+# Code that creates clips should call the `model_utils.add_clip_counts`
+# function after creating them, and code that deletes clips should
+# call the `model_utils.remove_clip_counts` function before deleting
+# them, in the same transaction. Both functions adjust the counts by
+# the contributions of just the specified clips. The `model_utils`
+# functions that modify clip classifications adjust the counts
+# themselves in the same way. The `rebuildclipcounts`
+# management command recomputes all of the counts, for example after
+# clips have been modified some other way (e.g. in the Django admin).
+class ClipCount(Model):
+    
+    station = ForeignKey(
+        Station, CASCADE,
+        related_name='clip_counts',
+        related_query_name='clip_count')
+    mic_output = ForeignKey(
+        DeviceOutput, CASCADE,
+        related_name='clip_counts',
+        related_query_name='clip_count')
+    detector = ForeignKey(
+        Processor, CASCADE, null=True, blank=True,
+        related_name='clip_counts',
+        related_query_name='clip_count')
+    date = DateField()
+    annotation_value = CharField(max_length=255, null=True, blank=True)
+    tag_info = ForeignKey(
+        TagInfo, CASCADE, null=True, blank=True,
+        related_name='clip_counts',
+        related_query_name='clip_count')
+    count = BigIntegerField()
+    
+    def __str__(self):
+        detector_name = 'None' if self.detector is None else self.detector.name
+        return '{} / {} / {} / {} / {} / {} / {}'.format(
+            self.station.name, self.mic_output.name, detector_name,
+            self.date, self.annotation_value, self.tag_info, self.count)
+    
+    class Meta:
+        db_table = 'vesper_clip_count'
+        index_together = ('station', 'mic_output', 'detector', 'date')
+
+
 # class RecordingJob(Model):
 #     
 #     recording = ForeignKey(
@@ -0,0 +1,187 @@
+"""Module containing class `RecordingFileIndex`."""
+
+
+from bisect import bisect_right
+from threading import RLock
+
+from vesper.django.app.models import RecordingChannel, RecordingFile
+from vesper.util.lru_cache import LruCache
+
+
+class RecordingFileIndex:
+    
+    """
+    In-process index of the files of archive recordings.
+    
+    A recording file index finds the file of a recording that contains
+    a specified recording sample index by binary search over the start
+    indices of the recording's files. The index loads the files and
+    channels of a recording from the archive database the first time
+    they are needed, with one query for each, and then caches them, so
+    that locating the recording files of many clips requires database
+    queries in proportion to the number of recordings rather than the
+    number of clips.
+    
+    Code that modifies the files of a recording (for example, by adding
+    files or changing their paths) should invalidate the recording's
+    cached files by calling the `invalidate` method. Another process
+    cannot do that, however, so the index also reloads the files of a
+    recording when asked for a sample index past the end of its cached
+    files, and users of the index should invalidate a recording and
+    retry once if they cannot open one of its files.
+    """
+    
+    
+    def __init__(self, max_size=None):
+        
+        # Map from recording ID to `_RecordingFiles` object.
+        self._recordings = LruCache(max_size)
+        
+        # Map from recording channel ID to `(recording ID, channel
+        # number)` pair.
+        self._channels = {}
+        
+        self._lock = RLock()
+    
+    
+    def get_channel_info(self, recording_channel_id):
+        
+        """
+        Gets the recording ID and channel number of a recording channel.
+        
+        Returns
+        -------
+        tuple
+            `(recording_id, channel_num)` pair.
+        """
+        
+        with self._lock:
+            
+            info = self._channels.get(recording_channel_id)
+            
+            if info is None:
+                
+                # Cache the info of all of the recording's channels, so
+                # that looking up the other channels doesn't require
+                # further queries.
+                recording_id = RecordingChannel.objects.values_list(
+                    'recording_id', flat=True).get(id=recording_channel_id)
+                channels = RecordingChannel.objects.filter(
+                    recording_id=recording_id).values_list(
+                        'id', 'channel_num')
+                for channel_id, channel_num in channels:
+                    self._channels[channel_id] = (recording_id, channel_num)
+                
+                info = self._channels[recording_channel_id]
+            
+            return info
+    
+    
+    def get_files(self, recording_id):
+        
+        """
+        Gets the files of the specified recording, in order of file
+        number.
+        """
+        
+        with self._lock:
+            return self._get_recording_files(recording_id).files
+    
+    
+    def _get_recording_files(self, recording_id):
+        
+        try:
+            return self._recordings[recording_id]
+        
+        except KeyError:
+            files = _RecordingFiles(recording_id)
+            self._recordings[recording_id] = files
+            return files
+    
+    
+    def find_file(self, recording_id, index):
+        
+        """
+        Finds the file of a recording that contains a sample index.
+        
+        Parameters
+        ----------
+        recording_id : int
+            the ID of the recording.
+        
+        index : int
+            the index in the recording of the sample to find.
+        
+        Returns
+        -------
+        RecordingFile or None
+            the file that contains the specified sample, or `None` if
+            there is no such file.
+        """
+        
+        with self._lock:
+            
+            files = self._get_recording_files(recording_id)
+            
+            if index >= files.end_index:
+                # index is past end of cached files
+                
+                # Files may have been added to the recording in another
+                # process since we cached them, so reload them.
+                self.invalidate(recording_id)
+                files = self._get_recording_files(recording_id)
+            
+            return files.find_file(index)
+    
+    
+    def invalidate(self, recording_id=None):
+        
+        """
+        Invalidates the cached files of the specified recording, or of
+        all recordings if `recording_id` is `None`.
+        """
+        
+        with self._lock:
+            
+            if recording_id is None:
+                self._recordings.clear()
+                self._channels.clear()
+            
+            else:
+                self._recordings.pop(recording_id, None)
+
+
+class _RecordingFiles:
+    
+    
+    def __init__(self, recording_id):
+        
+        # We get the files' recording along with them, since users of
+        # the files usually need it.
+        files = RecordingFile.objects.filter(
+            recording_id=recording_id).select_related(
+                'recording').order_by('file_num')
+        
+        self.files = tuple(files)
+        
+        self.start_indices = [f.start_index for f in self.files]
+        
+        if len(self.files) == 0:
+            self.end_index = 0
+        else:
+            self.end_index = self.files[-1].end_index
+    
+    
+    def find_file(self, index):
+        
+        i = bisect_right(self.start_indices, index) - 1
+        
+        if i < 0:
+            return None
+        
+        file_ = self.files[i]
+        
+        if index >= file_.end_index:
+            return None
+        
+        return file_
@@ -0,0 +1,136 @@
+"""Module containing class `RecordingSignal`."""
+
+
+from vesper.signal.mapped_wave_file import MappedWaveFile
+from vesper.signal.multi_file_signal import MultiFileSignal
+import vesper.django.app.model_utils as model_utils
+
+
+class RecordingSignal(MultiFileSignal):
+    
+    """
+    Signal comprising the samples of consecutive files of an archive
+    recording.
+    
+    A recording signal lets its users read samples from a recording
+    without regard to the boundaries between the recording's files,
+    for example to get the samples of a clip that starts in one file
+    and ends in the next, or to run a detector on a recording without
+    restarting it at the start of each file.
+    
+    By default, a recording signal reads its files with memory maps,
+    keeping just the most recently read file open. A different way of
+    reading the files can be specified with a *file reader*, a function
+    `read(file_, start_index, end_index)` that returns a frame-first,
+    two-dimensional NumPy array of frames `start_index` through
+    `end_index - 1` of the specified `RecordingFile`.
+    """
+    
+    
+    def __init__(self, files, file_reader=None, name=None):
+        
+        """
+        Initializes this signal.
+        
+        Parameters
+        ----------
+        files : sequence of RecordingFile
+            the files of this signal, in order. The files must be
+            consecutive files of one recording.
+        
+        file_reader : function or None
+            the file reader of this signal, or `None` to use the
+            default file reader.
+        
+        name : str or None
+            the name of this signal.
+        
+        Raises
+        ------
+        ValueError
+            If `files` is empty or its files are not consecutive.
+        """
+        
+        files = tuple(files)
+        
+        _check_files(files)
+        
+        if file_reader is None:
+            file_reader = _RecordingFileReader()
+        
+        def read(file_num, start_index, end_index):
+            return file_reader(files[file_num], start_index, end_index)
+        
+        recording = files[0].recording
+        file_lengths = [f.length for f in files]
+        
+        # Get sample type by reading zero frames from first file.
+        dtype = read(0, 0, 0).dtype
+        
+        super().__init__(
+            file_lengths, recording.sample_rate, recording.num_channels,
+            dtype, read, name)
+        
+        self._files = files
+    
+    
+    @property
+    def files(self):
+        return self._files
+    
+    
+    @property
+    def start_index(self):
+        
+        """The index in the recording of the first sample of this signal."""
+        
+        return self._files[0].start_index
+
+
+def _check_files(files):
+    
+    if len(files) == 0:
+        raise ValueError('Recording signal must have at least one file.')
+    
+    for prev, file_ in zip(files[:-1], files[1:]):
+        
+        if file_.recording_id != prev.recording_id or \
+                file_.start_index != prev.end_index:
+            
+            raise ValueError(
+                f'Recording signal files {prev.file_num} and '
+                f'{file_.file_num} are not consecutive files of one '
+                f'recording.')
+
+
+class _RecordingFileReader:
+    
+    
+    def __init__(self):
+        self._file_id = None
+        self._wave_file = None
+    
+    
+    def __call__(self, file_, start_index, end_index):
+        
+        if file_.id != self._file_id:
+            
+            path = model_utils.get_absolute_recording_file_path(file_)
+            
+            if path is None:
+                raise ValueError(
+                    f'Archive has no path for file {file_.file_num} of '
+                    f'recording.')
+            
+            # We keep only one file open at a time, since recording
+            # signal reads are usually sequential.
+            if self._wave_file is not None:
+                self._wave_file.close()
+                self._wave_file = None
+                self._file_id = None
+            
+            self._wave_file = MappedWaveFile(
+                str(path), f'recording file "{path}"')
+            self._file_id = file_.id
+        
+        return self._wave_file.read(start_index, end_index)
@@ -228,6 +228,59 @@ export class ClipAlbum {
     }
 
 
+    /*
+     * Adds clips to the end of this album.
+     *
+     * An album's clips can arrive from the server in several pages,
+     * the first of which is specified to the album constructor. This
+     * method adds the clips of a subsequent page.
+     */
+    addClips(clipInfos) {
+
+        if (clipInfos.length === 0)
+            return;
+
+        const startNum = this._clips.length;
+        const viewSettings = this.settings.clipView;
+
+        for (const [i, clipInfo] of clipInfos.entries()) {
+            const clip = this._createClip([startNum + i, clipInfo]);
+            clip.view = new this.clipViewClass(this, clip, viewSettings);
+            this._clips.push(clip);
+            this._clipViews.push(clip.view);
+        }
+
+        // Repaginate. Since a layout paginates clips in order, adding
+        // clips to the end of the album can change only its last page,
+        // and add pages after that.
+        const oldNumPages = this.numPages;
+        this._layout.settings = this.settings.layout;
+
+        this._clipManager = this._createClipManager();
+
+        if (this._rugPlot !== null)
+            this._rugPlot.onClipsAdded();
+
+        if (oldNumPages === 0 || this.pageNum === oldNumPages - 1) {
+            // current page may have changed
+
+            // Set `this._pageNum` to `null` so assignment below triggers
+            // full page update.
+            const pageNum = oldNumPages === 0 ? 0 : this.pageNum;
+            this._pageNum = null;
+            this.pageNum = pageNum;
+
+        } else {
+
+            this._clipManager.pageNum = this.pageNum;
+            this._updateTitle();
+            this._updateButtonStates();
+
+        }
+
+    }
+
+
 	_initUiElements() {
 	    
         this._clipsDiv = document.getElementById('clips');
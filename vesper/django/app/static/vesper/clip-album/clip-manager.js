@@ -600,7 +600,17 @@ class _ClipLoader {
 
             try {
 
-                const result = await this._fetchClipBatchAudios(clips);
+                // Get clip spectrograms from the server along with clip
+                // audios, so clip views needn't compute them.
+                const [result, spectrograms] = await Promise.all([
+                    this._fetchClipBatchAudios(clips),
+                    this._getClipBatchSpectrograms(clips)
+                ]);
+
+                if (spectrograms !== null &&
+                        spectrograms.length === clips.length)
+                    this._setClipBatchSpectrograms(clips, spectrograms);
+
                 const arrayBuffer = await result.arrayBuffer();
                 return this._decodeClipBatchAudios(clips, arrayBuffer);
 
@@ -634,9 +644,11 @@ class _ClipLoader {
 
             } else if (status === CLIP_LOAD_STATUS.UNLOADED) {
 
-                // Forget samples so we won't prevent garbage collection.
+                // Forget samples and spectrogram so we won't prevent
+                // garbage collection.
                 clip.audioBuffer = null;
                 clip.samples = null;
+                clip.spectrogram = null;
 
                 clip.view.onClipSamplesChanged();
 
@@ -649,18 +661,115 @@ class _ClipLoader {
 
     async _fetchClipBatchAudios(clips) {
 
-        const clipIds = clips.map(clip => clip.id);
+        // We use a GET request rather than a POST one so the browser
+        // can cache the response. The server marks clip audio as
+        // immutable, so when the user returns to a page the browser
+        // can get its clips' audio from its cache.
+        const clipIds = clips.map(clip => clip.id).join(',');
 
-        return fetch('/batch/read/clip-audios/', {
-            headers: {
-                'Accept': 'application/json',
-                'Content-Type': 'application/json'
-            },
-            method: 'POST',
-            body: JSON.stringify({
-                'clip_ids': clipIds
-            })
-        });
+        return fetch('/batch/read/clip-audios/?clip_ids=' + clipIds);
+
+    }
+
+
+    /**
+     * Gets the spectrograms of a batch of clips from the server.
+     *
+     * Returns `null` if the server should not compute the spectrograms,
+     * or if getting them fails, in which case clip views compute them
+     * themselves.
+     */
+    async _getClipBatchSpectrograms(clips) {
+
+        const settings = clips[0].view.serverSpectrogramSettings;
+
+        if (settings === null)
+            return null;
+
+        try {
+
+            const response = await fetch('/batch/read/clip-spectrograms/', {
+                headers: {
+                    'Accept': 'application/octet-stream',
+                    'Content-Type': 'application/json'
+                },
+                method: 'POST',
+                body: JSON.stringify({
+                    'clip_ids': clips.map(clip => clip.id),
+                    'settings': settings
+                })
+            });
+
+            if (!response.ok)
+                throw new Error(
+                    `Server response was ${response.status} ` +
+                    `(${response.statusText}).`);
+
+            const arrayBuffer = await response.arrayBuffer();
+            return this._decodeClipBatchSpectrograms(arrayBuffer);
+
+        } catch (error) {
+
+            this._handleError('Load of clip batch spectrograms failed.', error);
+            return null;
+
+        }
+
+    }
+
+
+    _decodeClipBatchSpectrograms(arrayBuffer) {
+
+        // Spectrograms are stored one after the other, with each
+        // prefixed with its size in bytes in a 32-bit little-endian
+        // integer. Each spectrogram comprises its number of spectra
+        // and its number of bins per spectrum, both 32-bit little-endian
+        // integers, followed by its spectra, with one byte per bin.
+
+        const spectrograms = [];
+        const dataView = new DataView(arrayBuffer);
+        let offset = 0;
+
+        while (offset < arrayBuffer.byteLength) {
+
+            const size = dataView.getUint32(offset, true);
+            const numSpectra = dataView.getUint32(offset + 4, true);
+            const numBins = dataView.getUint32(offset + 8, true);
+
+            // We copy the spectrogram's spectra rather than viewing
+            // them in place so the array buffer of the whole batch can
+            // be garbage collected.
+            const start = offset + 12;
+            const data = new Uint8Array(
+                arrayBuffer.slice(start, start + numSpectra * numBins));
+
+            spectrograms.push({
+                numSpectra: numSpectra,
+                numBins: numBins,
+                data: data
+            });
+
+            offset += 4 + size;
+
+        }
+
+        return spectrograms;
+
+    }
+
+
+    _setClipBatchSpectrograms(clips, spectrograms) {
+
+        // A samples load operation can be canceled while in progress
+        // by changing `clip.samplesStatus` from `CLIP_LOAD_STATUS.LOADING`
+        // to `CLIP_LOAD_STATUS_UNLOADED`. In this case we ignore the
+        // results of the operation.
+
+        for (let i = 0; i < clips.length; i++) {
+            const clip = clips[i];
+            if (clip.samplesStatus === CLIP_LOAD_STATUS.LOADING)
+                clip.spectrogram = spectrograms[i];
+        }
 
     }
 
@@ -474,6 +474,19 @@ export class ClipView {
     }
 
 
+    /**
+     * Gets the settings with which the server should compute the
+     * spectrogram of the clip of this view.
+     *
+     * The clip loader requests a spectrogram for a clip from the server
+     * along with the clip's samples if and only if this property is
+     * not `null`.
+     */
+    get serverSpectrogramSettings() {
+        return null;
+    }
+
+
     /**
      * Responds to a change in the samples of the clip of this view.
      *
@@ -21,6 +21,9 @@ export class Clip {
 		this._samples = null;
 		this._samplesStatus = CLIP_LOAD_STATUS.UNLOADED;
 
+		// Spectrogram computed by the server, or `null` if none.
+		this._spectrogram = null;
+
 		this._annotations = null;
 		this._annotationsStatus = CLIP_LOAD_STATUS.UNLOADED;
 
@@ -90,6 +93,16 @@ export class Clip {
 	}
 
 
+	get spectrogram() {
+		return this._spectrogram;
+	}
+
+
+	set spectrogram(spectrogram) {
+		this._spectrogram = spectrogram;
+	}
+
+
 	get annotations() {
 		return this._annotations;
 	}
@@ -405,6 +405,16 @@ export class NightRugPlot {
 	}
 
 
+	/*
+	 * Updates this plot after clips have been added to the end of the
+	 * clips array with which it was constructed.
+	 */
+	onClipsAdded() {
+		this._clipTimes = this._clips.map(_getClipTime);
+		this._draw();
+	}
+
+
 	setPageClipNumRange(range) {
 
 		if (!_rangesEqual(range, this._pageClipNumRange)) {
@@ -91,6 +91,15 @@ export class SpectrogramClipView extends ClipView {
 	}
 
 
+    get serverSpectrogramSettings() {
+        const settings = this.settings.spectrogram;
+        return {
+            'computation': settings.computation,
+            'powerRange': settings.display.powerRange
+        };
+    }
+
+
     onClipSamplesChanged() {
 
         const clip = this.clip;
@@ -108,29 +117,52 @@ export class SpectrogramClipView extends ClipView {
 			settings.display = this.settings.spectrogram.display;
 
 
-			// Compute spectrogram, offscreen spectrogram canvas, and
-			// spectrogram image data. The spectrogram canvas and the
-            // spectrogram image data have the same size as the
-            // spectrogram.
-            
-			this._spectrogram = _computeSpectrogram(clip.samples, settings);
-            
-            // _showSpectrogramStats(this._spectrogram, settings);
-            
-            // Uncomment the following assignment to normalize the
-            // spectrogram background.
-            // this._spectrogram =
-            //     _normalizeSpectrogramBackground(this._spectrogram, settings);
-            
-			this._spectrogramCanvas =
-				_createSpectrogramCanvas(this._spectrogram, settings);
+            if (clip.spectrogram !== null) {
+                // have spectrogram from server
+                
+                // Create spectrogram canvas and image data from server
+                // spectrogram, which is already quantized for display.
+                
+                this._spectrogram = null;
+                
+                this._spectrogramCanvas =
+                    _createServerSpectrogramCanvas(clip.spectrogram);
+                
+                this._spectrogramImageData =
+                    _createSpectrogramImageData(this._spectrogramCanvas);
+                
+                _computeServerSpectrogramImage(
+                    clip.spectrogram, this._spectrogramCanvas,
+                    this._spectrogramImageData, settings);
                 
-			this._spectrogramImageData =
-				_createSpectrogramImageData(this._spectrogramCanvas);
+            } else {
+                // do not have spectrogram from server
+
+                // Compute spectrogram, offscreen spectrogram canvas, and
+                // spectrogram image data. The spectrogram canvas and the
+                // spectrogram image data have the same size as the
+                // spectrogram.
+                
+                this._spectrogram = _computeSpectrogram(clip.samples, settings);
+                
+                // _showSpectrogramStats(this._spectrogram, settings);
                 
-			_computeSpectrogramImage(
-				this._spectrogram, this._spectrogramCanvas,
-				this._spectrogramImageData, settings);
+                // Uncomment the following assignment to normalize the
+                // spectrogram background.
+                // this._spectrogram = _normalizeSpectrogramBackground(
+                //     this._spectrogram, settings);
+                
+                this._spectrogramCanvas =
+                    _createSpectrogramCanvas(this._spectrogram, settings);
+                    
+                this._spectrogramImageData =
+                    _createSpectrogramImageData(this._spectrogramCanvas);
+                    
+                _computeSpectrogramImage(
+                    this._spectrogram, this._spectrogramCanvas,
+                    this._spectrogramImageData, settings);
+                    
+            }
                 
 
 			// Draw spectrogram image.
@@ -354,7 +386,7 @@ function _getHopSize(size, sampleRate, windowSize) {
 function _getDftSize(windowSize, settings) {
 
     const interpFactor =
-        settings.spectralInterpolationFactor |
+        settings.spectralInterpolationFactor ||
         _DEFAULT_SPECTRAL_INTERPOLATION_FACTOR;
 
     const powerOfTwoCeil = _getPowerOfTwoCeil(windowSize);
@@ -647,6 +679,47 @@ function _computeSpectrogramImage(spectrogram, canvas, imageData, settings) {
 }
 
 
+function _createServerSpectrogramCanvas(spectrogram) {
+	const canvas = document.createElement('canvas');
+	canvas.width = spectrogram.numSpectra;
+	canvas.height = spectrogram.numBins;
+	return canvas;
+}
+
+
+function _computeServerSpectrogramImage(
+        spectrogram, canvas, imageData, settings) {
+
+	const numSpectra = canvas.width;
+	const numBins = canvas.height;
+	const gram = spectrogram.data;
+	const data = imageData.data;
+
+	// The server maps the display power range to [0, 255], so we need
+	// only reverse the color map if needed.
+	const [a, b] = settings.display.reverseColormap ? [-1, 255] : [1, 0];
+
+	// Map spectrogram values to pixel values.
+	let m = 0;
+	for (let i = 0; i < numBins; i++) {
+		let k = numBins - 1 - i;
+	    for (let j = 0; j < numSpectra; j++) {
+			const v = a * gram[k] + b;
+			data[m++] = v;
+			data[m++] = v;
+			data[m++] = v;
+			data[m++] = 255;
+			k += numBins;
+		}
+	}
+
+	// Write pixel values to spectrogram canvas.
+	const context = canvas.getContext('2d');
+	context.putImageData(imageData, 0, 0);
+
+}
+
+
 function _getColorCoefficients(settings) {
 
 	const [startPower, endPower] = settings.powerRange;
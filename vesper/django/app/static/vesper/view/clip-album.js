@@ -1,6 +1,13 @@
 import { ClipAlbum } from '/static/vesper/clip-album/clip-album.js';
 
 
+// We get the clips of an album from the server in pages. We get a small
+// first page so that the album can display it quickly, and then get the
+// remaining clips in larger pages, adding them to the album as they
+// arrive.
+const _FIRST_CLIP_LIST_PAGE_SIZE = 1000;
+
+
 // Module-level state, set via `init` function.
 let state = null;
 
@@ -20,11 +27,47 @@ export function init(state_) {
 let clipAlbum = null;
 
 
-function onLoad() {
+async function onLoad() {
+
+    const url = state.clipListUrl;
+
+    let [clips, nextPageKey] =
+        await getClipListPage(url, null, _FIRST_CLIP_LIST_PAGE_SIZE);
+
+    state.clips = clips;
     clipAlbum = new ClipAlbum(state);
+
+    while (nextPageKey !== null) {
+        [clips, nextPageKey] = await getClipListPage(url, nextPageKey);
+        clipAlbum.addClips(clips);
+    }
+
+}
+
+
+async function getClipListPage(url, pageKey, pageSize = null) {
+
+    if (pageKey !== null)
+        url += '&after=' + encodeURIComponent(pageKey);
+
+    if (pageSize !== null)
+        url += '&limit=' + pageSize;
+
+    const response = await fetch(url);
+
+    if (!response.ok)
+        throw new Error(
+            `Could not get clip list from server. Server response was ` +
+            `${response.status} (${response.statusText}).`);
+
+    const page = await response.json();
+
+    return [page.clips, page.nextPageKey];
+
 }
 
 
 function onResize() {
-    clipAlbum.onResize();
+    if (clipAlbum !== null)
+        clipAlbum.onResize();
 }
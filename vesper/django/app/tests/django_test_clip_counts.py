@@ -0,0 +1,162 @@
+import datetime
+
+from django.test import TestCase
+import pytz
+
+from vesper.django.app.models import (
+    AnnotationInfo, Clip, ClipCount, Device, DeviceModel, DeviceModelOutput,
+    DeviceOutput, Processor, Recording, RecordingChannel, Station, Tag,
+    TagInfo)
+import vesper.django.app.model_utils as model_utils
+
+
+def _dt(*args):
+    return datetime.datetime(*args, tzinfo=pytz.utc)
+
+
+_START_TIME = _dt(2020, 5, 1, 2)
+_SAMPLE_RATE = 24000
+_CLIP_LENGTH = 24000
+
+
+class ClipCountTests(TestCase):
+    
+    
+    def setUp(self):
+        
+        self.station = Station.objects.create(
+            name='Station', time_zone='US/Eastern')
+        
+        model = DeviceModel.objects.create(
+            name='Recorder Model', type='Recorder', manufacturer='Nagra',
+            model='X')
+        model_output = DeviceModelOutput.objects.create(
+            model=model, local_name='Output 0', channel_num=0)
+        recorder = Device.objects.create(
+            name='Recorder', model=model, serial_number='0')
+        self.mic_output = DeviceOutput.objects.create(
+            device=recorder, model_output=model_output)
+        
+        recording = Recording.objects.create(
+            station=self.station, recorder=recorder, num_channels=1,
+            length=10 * 86400 * _SAMPLE_RATE, sample_rate=_SAMPLE_RATE,
+            start_time=_START_TIME,
+            end_time=_START_TIME + datetime.timedelta(days=10),
+            creation_time=_START_TIME)
+        self.channel = RecordingChannel.objects.create(
+            recording=recording, channel_num=0, recorder_channel_num=0,
+            mic_output=self.mic_output)
+        
+        self.detectors = [
+            Processor.objects.create(name=name, type='Detector')
+            for name in ('Tseep', 'Thrush')]
+        
+        self.classification = AnnotationInfo.objects.create(
+            name='Classification', type='String', creation_time=_START_TIME)
+        
+        self.tag_infos = [
+            TagInfo.objects.create(name=name, creation_time=_START_TIME)
+            for name in ('Review', 'Interesting')]
+        
+        self.clip_num = 0
+    
+    
+    def _create_clips(self, count, detector, day, classifications=()):
+        
+        clips = []
+        clip_annotations = []
+        
+        for i in range(count):
+            
+            start_time = _START_TIME + datetime.timedelta(
+                days=day, seconds=10 * self.clip_num)
+            self.clip_num += 1
+            
+            clips.append(Clip(
+                station=self.station,
+                mic_output=self.mic_output,
+                recording_channel=self.channel,
+                start_index=None,
+                length=_CLIP_LENGTH,
+                sample_rate=_SAMPLE_RATE,
+                start_time=start_time,
+                end_time=start_time + datetime.timedelta(seconds=1),
+                date=self.station.get_night(start_time),
+                creation_time=_START_TIME,
+                creating_processor=detector))
+            
+            if i < len(classifications):
+                clip_annotations.append(
+                    [(self.classification, classifications[i])])
+            else:
+                clip_annotations.append(None)
+        
+        model_utils.create_clips(clips, clip_annotations)
+        
+        return clips
+    
+    
+    def _assert_counts_match_rebuild(self):
+        incremental_counts = _get_counts()
+        model_utils.rebuild_clip_counts()
+        self.assertEqual(incremental_counts, _get_counts())
+    
+    
+    def test_incremental_counts(self):
+        
+        tseep, thrush = self.detectors
+        
+        clips = self._create_clips(10, tseep, 0, ['Call', 'Noise', 'Call'])
+        clips += self._create_clips(5, thrush, 0, ['Noise'])
+        clips += self._create_clips(5, tseep, 1)
+        
+        # Tag some clips, giving one clip two tags, and start from
+        # counts that include the tags.
+        review, interesting = self.tag_infos
+        for clip, info in [
+                (clips[0], review), (clips[0], interesting),
+                (clips[1], review), (clips[12], review),
+                (clips[16], interesting)]:
+            Tag.objects.create(clip=clip, info=info, creation_time=_START_TIME)
+        model_utils.rebuild_clip_counts()
+        
+        # Create clips.
+        clips += self._create_clips(4, tseep, 1, ['Call.AMRE'])
+        self._assert_counts_match_rebuild()
+        
+        # Create one clip, which is saved rather than bulk created.
+        clips += self._create_clips(1, thrush, 2, ['Call'])
+        self._assert_counts_match_rebuild()
+        
+        # Classify unclassified, differently classified, and identically
+        # classified clips.
+        ids = [clips[i].id for i in (0, 1, 2, 5, 12, 16, 20)]
+        model_utils.annotate_clips(ids, self.classification, 'Call')
+        self._assert_counts_match_rebuild()
+        
+        model_utils.annotate_clip(clips[0], self.classification, 'Noise')
+        self._assert_counts_match_rebuild()
+        
+        model_utils.delete_clip_annotation(clips[1], self.classification)
+        self._assert_counts_match_rebuild()
+        
+        ids = [clips[i].id for i in (0, 2, 3, 16)]
+        model_utils.delete_clip_annotations(ids, self.classification)
+        self._assert_counts_match_rebuild()
+        
+        # Delete clips.
+        deleted_clips = [clips[i] for i in (0, 12, 13, 20)]
+        model_utils.remove_clip_counts(deleted_clips)
+        Clip.objects.filter(id__in=[c.id for c in deleted_clips]).delete()
+        self._assert_counts_match_rebuild()
+        
+        # Counts that become zero are deleted.
+        self.assertFalse(ClipCount.objects.filter(count=0).exists())
+
+
+def _get_counts():
+    return sorted(
+        ClipCount.objects.values_list(
+            'station_id', 'mic_output_id', 'detector_id', 'date',
+            'annotation_value', 'tag_info_id', 'count'),
+        key=str)
@@ -0,0 +1,196 @@
+from io import BytesIO
+from pathlib import Path
+import datetime
+import os
+import tempfile
+
+from django.test import TestCase
+import numpy as np
+import pytz
+
+from vesper.archive_paths import archive_paths
+from vesper.django.app.models import (
+    Clip, Device, DeviceModel, DeviceModelOutput, DeviceOutput, Processor,
+    Recording, RecordingChannel, RecordingFile, Station)
+from vesper.django.app.recording_file_index import RecordingFileIndex
+from vesper.util.clip_manager import ClipManager
+from vesper.util.recording_manager import RecordingManager
+import vesper.tests.test_utils as test_utils
+import vesper.util.audio_file_utils as audio_file_utils
+
+
+_START_TIME = datetime.datetime(2020, 5, 1, 2, tzinfo=pytz.utc)
+_SAMPLE_RATE = 24000
+_RECORDING_LENGTH = 1000
+
+
+def _create_samples():
+    
+    # 16-bit sinusoid.
+    times = np.arange(_RECORDING_LENGTH) / _SAMPLE_RATE
+    return np.round(20000 * np.sin(2 * np.pi * 1000 * times)).astype('<i2')
+
+
+class ClipManagerTests(TestCase):
+    
+    
+    def setUp(self):
+        
+        self.dir_path = Path(tempfile.mkdtemp())
+        
+        # Put clip audio files in our temporary directory.
+        self.clip_dir_path = archive_paths.clip_dir_path
+        archive_paths.clip_dir_path = self.dir_path / 'Clips'
+        
+        self.clip_manager = ClipManager()
+        self.clip_manager._rm = \
+            RecordingManager(self.dir_path, [self.dir_path])
+        self.clip_manager._file_index = RecordingFileIndex()
+        
+        self.station = Station.objects.create(
+            name='Station', time_zone='US/Eastern')
+        
+        model = DeviceModel.objects.create(
+            name='Recorder Model', type='Recorder', manufacturer='Nagra',
+            model='X')
+        model_output = DeviceModelOutput.objects.create(
+            model=model, local_name='Output 0', channel_num=0)
+        self.recorder = Device.objects.create(
+            name='Recorder', model=model, serial_number='0')
+        self.mic_output = DeviceOutput.objects.create(
+            device=self.recorder, model_output=model_output)
+        
+        self.detector = Processor.objects.create(
+            name='Detector', type='Detector')
+        
+        self.samples = _create_samples()
+        self.recording_num = 0
+    
+    
+    def tearDown(self):
+        archive_paths.clip_dir_path = self.clip_dir_path
+    
+    
+    def _create_recording_file(self, file_samples, sample_size, sample_format):
+        
+        """
+        Creates a one-channel recording with one file, and returns
+        the recording's channel.
+        """
+        
+        start_time = _START_TIME + \
+            datetime.timedelta(days=self.recording_num)
+        end_time = start_time + \
+            datetime.timedelta(seconds=_RECORDING_LENGTH / _SAMPLE_RATE)
+        
+        recording = Recording.objects.create(
+            station=self.station, recorder=self.recorder, num_channels=1,
+            length=_RECORDING_LENGTH, sample_rate=_SAMPLE_RATE,
+            start_time=start_time, end_time=end_time,
+            creation_time=_START_TIME)
+        
+        channel = RecordingChannel.objects.create(
+            recording=recording, channel_num=0, recorder_channel_num=0,
+            mic_output=self.mic_output)
+        
+        file_name = f'Recording {self.recording_num}.wav'
+        self.recording_num += 1
+        
+        contents = test_utils.create_wave_file_contents(
+            file_samples, _SAMPLE_RATE, sample_size, sample_format)
+        with open(self.dir_path / file_name, 'wb') as file_:
+            file_.write(contents)
+        
+        RecordingFile.objects.create(
+            recording=recording, file_num=0, start_index=0,
+            length=_RECORDING_LENGTH, path=file_name)
+        
+        return channel
+    
+    
+    def _create_clip(self, channel, start_index, length):
+        
+        recording = channel.recording
+        start_time = recording.start_time + \
+            datetime.timedelta(seconds=start_index / _SAMPLE_RATE)
+        
+        return Clip.objects.create(
+            station=self.station,
+            mic_output=self.mic_output,
+            recording_channel=channel,
+            start_index=start_index,
+            length=length,
+            sample_rate=_SAMPLE_RATE,
+            start_time=start_time,
+            end_time=start_time + datetime.timedelta(
+                seconds=(length - 1) / _SAMPLE_RATE),
+            date=self.station.get_night(start_time),
+            creation_time=_START_TIME,
+            creating_processor=self.detector)
+    
+    
+    def test_get_audio_file_contents_sample_formats(self):
+        
+        samples = self.samples
+        
+        # 24-bit samples with nonzero low bytes, 32-bit samples, and
+        # floating point samples, all of which should yield the 16-bit
+        # samples when read.
+        low_bytes = np.arange(len(samples)) % 256
+        cases = [
+            (samples, 16, 'integer'),
+            ((samples.astype('<i4') << 8) + low_bytes, 24, 'integer'),
+            (samples.astype('<i4') << 16, 32, 'integer'),
+            (samples / 32767, 32, 'floating point'),
+            (samples / 32767, 64, 'floating point')
+        ]
+        
+        for file_samples, sample_size, sample_format in cases:
+            
+            channel = self._create_recording_file(
+                file_samples, sample_size, sample_format)
+            clip = self._create_clip(channel, 100, 500)
+            
+            contents = self.clip_manager.get_audio_file_contents(
+                clip, 'audio/wav')
+            clip_samples, sample_rate = \
+                audio_file_utils.read_wave_file(BytesIO(contents))
+            
+            self.assertEqual(sample_rate, _SAMPLE_RATE)
+            self.assertTrue(np.array_equal(clip_samples[0], samples[100:600]))
+    
+    
+    def test_get_audio_etag(self):
+        
+        samples = self.samples
+        channel = self._create_recording_file(samples, 16, 'integer')
+        clip = self._create_clip(channel, 100, 500)
+        
+        get_etag = self.clip_manager.get_audio_etag
+        get_contents = self.clip_manager.get_audio_file_contents
+        path = self.clip_manager.get_audio_file_path(clip)
+        
+        # Contents and tag come from recording file.
+        recording_etag = get_etag(clip)
+        recording_contents = get_contents(clip, 'audio/wav')
+        self.assertEqual(get_etag(clip), recording_etag)
+        
+        # Creating a clip audio file changes contents and tag.
+        self.clip_manager.create_audio_file(clip, -samples[100:600])
+        os.utime(path, ns=(0, 1000))
+        clip_etag = get_etag(clip)
+        clip_contents = get_contents(clip, 'audio/wav')
+        self.assertNotEqual(clip_contents, recording_contents)
+        self.assertNotEqual(clip_etag, recording_etag)
+        
+        # So does regenerating the clip audio file.
+        self.clip_manager.create_audio_file(clip, samples[100:600] // 2)
+        os.utime(path, ns=(0, 2000))
+        self.assertNotEqual(get_contents(clip, 'audio/wav'), clip_contents)
+        self.assertNotEqual(get_etag(clip), clip_etag)
+        
+        # Deleting the clip audio file restores the recording contents
+        # and tag.
+        self.clip_manager.delete_audio_file(clip)
+        self.assertEqual(get_contents(clip, 'audio/wav'), recording_contents)
+        self.assertEqual(get_etag(clip), recording_etag)
@@ -0,0 +1,196 @@
+from unittest.mock import patch
+import queue
+
+from django.test import SimpleTestCase
+
+from vesper.command.detect_command import DetectCommand
+from vesper.util.bunch import Bunch
+import vesper.command.detect_command as detect_command
+
+
+class _Detector:
+    
+    detector_group = None
+    threshold = None
+    
+    def __init__(self, sample_rate, listener, extra_thresholds=None):
+        self.sample_rate = sample_rate
+        self.listener = listener
+        self.extra_thresholds = extra_thresholds
+
+
+def _create_detector_class(detector_group, threshold):
+    return type(
+        '_Detector', (_Detector,),
+        {'detector_group': detector_group, 'threshold': threshold})
+
+
+# Map from detector model name to detector class.
+_DETECTOR_CLASSES = {
+    'Tseep 90': _create_detector_class('Tseep', .9),
+    'Tseep 80': _create_detector_class('Tseep', .8),
+    'Tseep 70': _create_detector_class('Tseep', .7),
+    'Other Tseep 90': _create_detector_class('Tseep', .9),
+    'Thrush 90': _create_detector_class('Thrush', .9),
+    'Thrush 80': _create_detector_class('Thrush', .8),
+    'Ungrouped 90': _create_detector_class(None, .9),
+    'Other Ungrouped 90': _create_detector_class(None, .9),
+    'No Threshold': _create_detector_class('Tseep', None),
+}
+
+
+def _get_detector_class(detector_model):
+    return _DETECTOR_CLASSES[detector_model.name]
+
+
+class _Listener:
+    
+    def __init__(self):
+        self.clips = []
+        self.completed = False
+    
+    def process_clip(
+            self, start_index, length, threshold=None, annotations=None):
+        self.clips.append((start_index, length, threshold, annotations))
+    
+    def complete_processing(self, threshold=None):
+        self.completed = True
+
+
+class _Worker:
+    
+    def is_alive(self):
+        return False
+
+
+class _MessageQueue:
+    
+    """
+    Message queue whose messages arrive only after a timed `get`
+    times out, as when workers send their final messages and exit
+    between the timeout and the check of whether they are alive.
+    """
+    
+    
+    def __init__(self, messages):
+        self._messages = list(messages)
+    
+    
+    def get(self, timeout):
+        raise queue.Empty()
+    
+    
+    def get_nowait(self):
+        if len(self._messages) == 0:
+            raise queue.Empty()
+        else:
+            return self._messages.pop(0)
+
+
+class _ClipWriter:
+    
+    def __init__(self):
+        self.clips = []
+    
+    def write_clips(self, clips):
+        self.clips += clips
+
+
+class DetectCommandTests(SimpleTestCase):
+    
+    
+    def _write_worker_clips(self, num_workers, messages):
+        command = DetectCommand.__new__(DetectCommand)
+        workers = [_Worker() for _ in range(num_workers)]
+        clip_writer = _ClipWriter()
+        num_failed_workers = command._write_worker_clips(
+            workers, _MessageQueue(messages), clip_writer)
+        return num_failed_workers, clip_writer.clips
+    
+    
+    def test_write_worker_clips_after_workers_exit(self):
+        
+        # Both workers finish successfully.
+        messages = [
+            ('clips', [1, 2]),
+            ('done', True),
+            ('clips', [3]),
+            ('done', True)
+        ]
+        self.assertEqual(
+            self._write_worker_clips(2, messages), (0, [1, 2, 3]))
+        
+        # One worker fails and another exits without saying so.
+        messages = [
+            ('clips', [1, 2]),
+            ('done', False)
+        ]
+        self.assertEqual(
+            self._write_worker_clips(2, messages), (2, [1, 2]))
+    
+    
+    @patch.object(detect_command, '_get_detector_class', _get_detector_class)
+    def test_group_detector_models(self):
+        
+        cases = [
+            
+            # Detectors of a group with different thresholds are grouped.
+            (['Tseep 90', 'Tseep 80', 'Tseep 70'],
+             [['Tseep 90', 'Tseep 80', 'Tseep 70']]),
+            
+            # Detectors of different groups are not grouped.
+            (['Tseep 90', 'Thrush 80', 'Tseep 80', 'Thrush 90'],
+             [['Tseep 90', 'Tseep 80'], ['Thrush 80', 'Thrush 90']]),
+            
+            # Detectors without groups or thresholds are not grouped.
+            (['Ungrouped 90', 'Other Ungrouped 90', 'No Threshold',
+              'Tseep 80'],
+             [['Ungrouped 90'], ['Other Ungrouped 90'], ['No Threshold'],
+              ['Tseep 80']]),
+            
+            # A detector with the same threshold as an earlier detector
+            # of its group is not grouped with it.
+            (['Tseep 90', 'Other Tseep 90', 'Tseep 80'],
+             [['Tseep 90', 'Tseep 80'], ['Other Tseep 90']]),
+        
+        ]
+        
+        for names, expected in cases:
+            models = [Bunch(name=name) for name in names]
+            groups = detect_command._group_detector_models(models)
+            groups = [[m.name for m in group] for group in groups]
+            self.assertEqual(groups, expected)
+    
+    
+    @patch.object(detect_command, '_get_detector_class', _get_detector_class)
+    def test_detector_group_clip_routing(self):
+        
+        names = ['Tseep 90', 'Tseep 80', 'Tseep 70']
+        models = [Bunch(name=name) for name in names]
+        thresholds = [_DETECTOR_CLASSES[name].threshold for name in names]
+        listeners = [_Listener() for _ in names]
+        recording = Bunch(sample_rate=24000)
+        
+        detector = detect_command._create_detector(
+            models, recording, listeners, None)
+        
+        self.assertEqual(detector.sample_rate, 24000)
+        self.assertEqual(detector.extra_thresholds, thresholds[1:])
+        
+        # Report one clip per threshold, as the detector would.
+        for i, threshold in enumerate(thresholds):
+            detector.listener.process_clip(i, 100, threshold, {'Score': i})
+        
+        for i, (listener, threshold) in enumerate(zip(listeners, thresholds)):
+            self.assertEqual(
+                listener.clips, [(i, 100, threshold, {'Score': i})])
+        
+        detector.listener.complete_processing()
+        self.assertTrue(all(listener.completed for listener in listeners))
+        
+        # A group of one detector uses the detector's listener directly.
+        listener = _Listener()
+        detector = detect_command._create_detector(
+            models[:1], recording, [listener], None)
+        self.assertIs(detector.listener, listener)
+        self.assertEqual(detector.extra_thresholds, None)
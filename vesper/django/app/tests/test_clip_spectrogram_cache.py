@@ -0,0 +1,182 @@
+from io import BytesIO
+import tempfile
+
+import numpy as np
+
+from vesper.django.app.clip_spectrogram_cache import (
+    ClipSpectrogramCache, parse_spectrogram_settings)
+from vesper.signal.mapped_wave_file import MappedWaveFile
+from vesper.tests.test_case import TestCase
+from vesper.util.bunch import Bunch
+import vesper.tests.test_utils as test_utils
+
+
+_SETTINGS = {
+    'computation': {
+        'window': {'type': 'Hann', 'size': .005},
+        'hopSize': 50,
+        'spectralInterpolationFactor': 2,
+        'referencePower': 1e-9
+    },
+    'powerRange': [0, 90]
+}
+
+
+class _ClipManager:
+    
+    
+    def __init__(self):
+        self.num_reads = 0
+    
+    
+    def get_samples(self, clip):
+        self.num_reads += 1
+        return np.random.randint(-1000, 1000, clip.length).astype('int16')
+
+
+class _WaveFileClipManager:
+    
+    """Clip manager that reads clip samples from WAVE file contents."""
+    
+    
+    def __init__(self, contents):
+        self._contents = contents
+    
+    
+    def get_samples(self, clip):
+        wave_file = MappedWaveFile(BytesIO(self._contents))
+        return wave_file.read(0, clip.length)[:, 0]
+
+
+def _create_clip(id_, length=1000):
+    return Bunch(
+        id=id_, recording_channel_id=1, start_index=id_ * 10000,
+        length=length, sample_rate=22050.)
+
+
+class ClipSpectrogramCacheTests(TestCase):
+    
+    
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.clip_manager = _ClipManager()
+    
+    
+    def _create_cache(self, max_size=1000000):
+        return ClipSpectrogramCache(
+            self.clip_manager, self.dir_path, max_size)
+    
+    
+    def test_get_spectrogram(self):
+        
+        cache = self._create_cache()
+        settings = parse_spectrogram_settings(_SETTINGS)
+        clip = _create_clip(1)
+        
+        contents = cache.get_spectrogram(clip, settings)
+        
+        # Window size is 110, hop size is 55, and DFT size is 256.
+        num_spectra, num_bins = np.frombuffer(contents[:8], dtype='<u4')
+        self.assertEqual(num_spectra, 17)
+        self.assertEqual(num_bins, 129)
+        self.assertEqual(len(contents), 8 + 17 * 129)
+        self.assertEqual(cache.size, len(contents))
+        
+        # Second get should come from cache.
+        self.assertEqual(cache.get_spectrogram(clip, settings), contents)
+        self.assertEqual(self.clip_manager.num_reads, 1)
+        
+        # So should a get by a new cache for the same directory.
+        cache = self._create_cache()
+        self.assertEqual(cache.get_spectrogram(clip, settings), contents)
+        self.assertEqual(self.clip_manager.num_reads, 1)
+        
+        # Different settings should yield a different spectrogram.
+        settings = dict(_SETTINGS, powerRange=[10, 100])
+        settings = parse_spectrogram_settings(settings)
+        cache.get_spectrogram(clip, settings)
+        self.assertEqual(self.clip_manager.num_reads, 2)
+    
+    
+    def test_eviction(self):
+        
+        # Each spectrogram is 8 + 17 * 129 = 2201 bytes, so this cache
+        # can hold three.
+        cache = self._create_cache(7000)
+        settings = parse_spectrogram_settings(_SETTINGS)
+        clips = [_create_clip(i) for i in range(5)]
+        
+        for clip in clips[:3]:
+            cache.get_spectrogram(clip, settings)
+        
+        # Use first clip so second is least recently used.
+        cache.get_spectrogram(clips[0], settings)
+        
+        cache.get_spectrogram(clips[3], settings)
+        self.assertEqual(cache.size, 3 * 2201)
+        self.assertEqual(self.clip_manager.num_reads, 4)
+        
+        # First clip should still be cached, but not second.
+        cache.get_spectrogram(clips[0], settings)
+        self.assertEqual(self.clip_manager.num_reads, 4)
+        cache.get_spectrogram(clips[1], settings)
+        self.assertEqual(self.clip_manager.num_reads, 5)
+        
+        cache.clear()
+        self.assertEqual(cache.size, 0)
+        self.assertEqual(self._create_cache().size, 0)
+    
+    
+    def test_sample_formats(self):
+        
+        # Spectrograms of clips from 24-bit and floating point
+        # recordings should be the same as those of clips from 16-bit
+        # recordings with the same samples.
+        
+        samples = np.random.default_rng(0).integers(
+            -20000, 20000, 1000).astype('<i2')
+        
+        cases = [
+            (samples, 16, 'integer'),
+            (samples.astype('<i4') << 8, 24, 'integer'),
+            (samples / 32767, 32, 'floating point')
+        ]
+        
+        settings = parse_spectrogram_settings(_SETTINGS)
+        clip = _create_clip(1)
+        spectrograms = []
+        
+        for file_samples, sample_size, sample_format in cases:
+            
+            contents = test_utils.create_wave_file_contents(
+                file_samples, 22050, sample_size, sample_format)
+            clip_manager = _WaveFileClipManager(contents)
+            
+            cache = ClipSpectrogramCache(
+                clip_manager, tempfile.mkdtemp(), 1000000)
+            spectrograms.append(cache.get_spectrogram(clip, settings))
+        
+        # Make sure spectrogram is neither all zeros nor saturated.
+        gram = np.frombuffer(spectrograms[0][8:], dtype=np.uint8)
+        self.assertTrue(0 < gram.mean() < 255)
+        
+        for gram in spectrograms[1:]:
+            self.assertEqual(gram, spectrograms[0])
+    
+    
+    def test_parse_spectrogram_settings_errors(self):
+        
+        cases = [
+            {},
+            dict(_SETTINGS, powerRange=[0]),
+            dict(_SETTINGS, powerRange=[10, 10]),
+            dict(_SETTINGS, computation=dict(
+                _SETTINGS['computation'],
+                window={'type': 'Bobo', 'size': .005})),
+            dict(_SETTINGS, computation=dict(
+                _SETTINGS['computation'], hopSize=0)),
+        ]
+        
+        for settings in cases:
+            self._assert_raises(
+                ValueError, parse_spectrogram_settings, settings)
@@ -14,6 +14,7 @@ urlpatterns = [
     path('clip-calendar/', views.clip_calendar, name='clip-calendar'),
     path('clip-album/', views.clip_album, name='clip-album'),
     path('night/', views.night, name='night'),
+    path('clip-list/json/', views.clip_list_json, name='clip-list-json'),
     
     path('batch/read/clip-audios/',
          views.batch_read_clip_audios,
@@ -23,6 +24,10 @@ urlpatterns = [
          views.batch_read_clip_annotations,
          name='batch-read-clip-annotations'),
         
+    path('batch/read/clip-spectrograms/',
+         views.batch_read_clip_spectrograms,
+         name='batch-read-clip-spectrograms'),
+        
     path('clips/<int:clip_id>/wav/', views.clip_wav, name='clip-wav'),
     path('clips/<int:clip_id>/annotations/json/', views.annotations_json,
          name='annotations'),
@@ -1,20 +1,23 @@
 from pathlib import Path
-from urllib.parse import quote
+from urllib.parse import quote, urlencode
 import datetime
-import itertools
+import hashlib
 import json
 import logging
 
 from django import forms, urls
 from django.db import transaction
-from django.db.models import F, Max, Min
+from django.db.models import F, Max, Min, Q
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
 from django.http import (
     Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden,
-    HttpResponseNotAllowed, HttpResponseRedirect, HttpResponseServerError)
+    HttpResponseNotAllowed, HttpResponseRedirect, HttpResponseServerError,
+    StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, quote_etag)
 from django.views.decorators.csrf import csrf_exempt
 import numpy as np
 
@@ -22,6 +25,8 @@ from vesper.django.app.add_recording_audio_files_form import \
     AddRecordingAudioFilesForm
 from vesper.django.app.classify_form import ClassifyForm
 from vesper.django.app.clip_set_form import ClipSetForm
+from vesper.django.app.clip_spectrogram_cache import \
+    parse_spectrogram_settings
 from vesper.django.app.delete_clips_form import DeleteClipsForm
 from vesper.django.app.delete_recordings_form import DeleteRecordingsForm
 from vesper.django.app.detect_form import DetectForm
@@ -41,12 +46,12 @@ from vesper.django.app.transfer_call_classifications_form import \
     TransferCallClassificationsForm
 from vesper.django.app.refresh_recording_audio_file_paths_form import \
     RefreshRecordingAudioFilePathsForm
-from vesper.ephem.astronomical_calculator import AstronomicalCalculator
 from vesper.old_bird.export_clip_counts_csv_file_form import \
     ExportClipCountsCsvFileForm as OldBirdExportClipCountsCsvFileForm
 from vesper.old_bird.import_clips_form import ImportClipsForm
 from vesper.singletons import (
-    archive, clip_manager, job_manager, preference_manager, preset_manager)
+    archive, clip_manager, clip_spectrogram_cache, ephemeris_table_cache,
+    job_manager, preference_manager, preset_manager)
 from vesper.util.bunch import Bunch
 from vesper.util.byte_buffer import ByteBuffer
 import vesper.django.app.model_utils as model_utils
@@ -350,7 +355,8 @@ def _create_detect_command_spec(form):
             'start_date': data['start_date'],
             'end_date': data['end_date'],
             'schedule': data['schedule'],
-            'defer_clip_creation': data['defer_clip_creation']
+            'defer_clip_creation': data['defer_clip_creation'],
+            'num_workers': data['num_workers']
         }
     }
 
@@ -640,6 +646,7 @@ def _create_export_clips_to_hdf5_file_command_spec(form):
                 'name': 'Clips HDF5 File Exporter',
                 'arguments': {
                     'output_file_path': data['output_file_path'],
+                    'layout': data['layout'],
                 }
             },
         }
@@ -934,6 +941,13 @@ def clip_wav(request, clip_id):
     
     clip = get_object_or_404(Clip, pk=clip_id)
     
+    # Respond with 304 (Not Modified) if the client already has the
+    # current audio. We can tell this without reading any audio data.
+    etag = quote_etag(clip_manager.instance.get_audio_etag(clip))
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return _set_clip_audio_cache_headers(response, etag)
+    
     content_type = 'audio/wav'
     
     try:
@@ -952,6 +966,24 @@ def clip_wav(request, clip_id):
     response.write(content)
     response['Content-Type'] = content_type
     response['Content-Length'] = len(content)
+    return _set_clip_audio_cache_headers(response, etag)
+
+
+_CLIP_AUDIO_MAX_AGE = 365 * 24 * 60 * 60
+"""
+Maximum age of cached clip audio, in seconds.
+
+Clip audio rarely changes, and a clip ID is never reused for another
+clip, so we allow clients to cache clip audio for a long time without
+revalidating it. If a clip's audio does change, its entity tag changes
+too, so a client that revalidates will get the new audio.
+"""
+
+
+def _set_clip_audio_cache_headers(response, etag):
+    response['ETag'] = etag
+    patch_cache_control(
+        response, private=True, max_age=_CLIP_AUDIO_MAX_AGE, immutable=True)
     return response
 
 
@@ -967,6 +999,13 @@ def presets_json(request, preset_type_name):
         return HttpResponseNotAllowed(_GET_AND_HEAD)
 
 
+_presets_json_cache = {}
+"""
+Mapping from preset type names to `(preset manager version, presets JSON)`
+pairs.
+"""
+
+
 def _get_presets_json(preset_type_name):
 
     """
@@ -975,11 +1014,25 @@ def _get_presets_json(preset_type_name):
     The returned JSON is a list of [<preset path>, <preset JSON>]
     pairs, where the preset path is the path relative to the directory
     for the preset type.
+    
+    Since the clip album and night views include the same presets in
+    every response, we cache the JSON, recomputing it only when the
+    preset manager's version changes.
     """
 
-    presets = preset_manager.instance.get_flattened_presets(preset_type_name)
-    presets = [(path, preset.camel_case_data) for path, preset in presets]
-    return json.dumps(presets)
+    manager = preset_manager.instance
+    version = manager.version
+    
+    cached_version, content = \
+        _presets_json_cache.get(preset_type_name, (None, None))
+    
+    if cached_version != version:
+        presets = manager.get_flattened_presets(preset_type_name)
+        presets = [(path, preset.camel_case_data) for path, preset in presets]
+        content = json.dumps(presets)
+        _presets_json_cache[preset_type_name] = (version, content)
+        
+    return content
 
 
 @csrf_exempt
@@ -1161,7 +1214,20 @@ def _parse_content_type(content_type):
 @csrf_exempt
 def batch_read_clip_audios(request):
     
-    if request.method == 'POST':
+    # This view accepts GET requests with a "clip_ids" query parameter
+    # whose value is a comma-separated list of clip IDs, as well as
+    # POST requests with a JSON body containing a "clip_ids" list.
+    # Browsers cache responses to GET requests but not to POST ones,
+    # so the clip album uses GET.
+    
+    if request.method in _GET_AND_HEAD:
+        
+        try:
+            clip_ids = _parse_clip_ids(request.GET.get('clip_ids', ''))
+        except ValueError:
+            return HttpResponseBadRequest(reason='Bad clip IDs')
+        
+    elif request.method == 'POST':
         
         
         # Parse request content JSON.
@@ -1176,53 +1242,195 @@ def batch_read_clip_audios(request):
         except json.JSONDecodeError as e:
             return HttpResponseBadRequest(
                 reason='Could not decode request JSON')
-
-
-        # Get requested clip audios.
         
         clip_ids = content['clip_ids']
         
-        clips = [get_object_or_404(Clip, pk=i) for i in clip_ids]
+    else:
+        return HttpResponseNotAllowed(('GET', 'HEAD', 'POST'))
+    
+    
+    # Get requested clips with one query.
+    
+    try:
+        clips = _get_batch_clips(clip_ids)
+    except Clip.DoesNotExist as e:
+        raise Http404(str(e))
+    
+    manager = clip_manager.instance
+    
+    
+    # Respond with 304 (Not Modified) if the client already has the
+    # current audios.
+    
+    etag = None
+    
+    if request.method in _GET_AND_HEAD:
+        
+        etags = ','.join(manager.get_audio_etag(clip) for clip in clips)
+        etag = quote_etag(hashlib.sha1(etags.encode('utf-8')).hexdigest())
+        
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return _set_clip_audio_cache_headers(response, etag)
+    
+    
+    # Stream clip audios, each preceded by its size in bytes. We
+    # stream audios as we read them rather than reading them all
+    # before responding, so the client can start receiving them
+    # sooner and the server needn't hold them all in memory.
+    
+    def get_audio(clip):
+        return manager.get_audio_file_contents(clip, 'audio/wav')
+    
+    content = _generate_clip_data(clips, get_audio, 'audio file contents')
+    
+    response = StreamingHttpResponse(
+        content, content_type='application/octet-stream')
+    
+    if etag is not None:
+        _set_clip_audio_cache_headers(response, etag)
+    
+    return response
+
+
+def _parse_clip_ids(text):
+    return [int(i) for i in text.split(',')]
+
+
+def _get_batch_clips(clip_ids):
+    
+    clips = Clip.objects.filter(id__in=clip_ids).select_related(
+        'recording_channel')
+    clips = dict((clip.id, clip) for clip in clips)
+    
+    try:
+        return [clips[i] for i in clip_ids]
+    except KeyError as e:
+        raise Clip.DoesNotExist(f'No clip matches ID {e.args[0]}.')
+
+
+_CLIP_DATA_READ_BATCH_SIZE = 50
+"""
+Number of clips whose data `_generate_clip_data` reads at a time.
 
-        content_type = 'audio/wav'
+The function reads the data of each batch of clips in recording order,
+to make file reads as sequential as possible, but must send them in
+the order in which the client requested them. A larger batch size
+makes reads more sequential, but delays the first data of the
+response and increases memory use.
+"""
+
+
+def _generate_clip_data(clips, get_data, data_name):
+    
+    for i in range(0, len(clips), _CLIP_DATA_READ_BATCH_SIZE):
+        
+        batch = clips[i:i + _CLIP_DATA_READ_BATCH_SIZE]
         
-        audios = []
+        # Read data in order of recording and start index.
+        clip_nums = sorted(
+            range(len(batch)), key=lambda j: _get_read_key(batch[j]))
         
-        for clip in clips:
+        data = [None] * len(batch)
+        
+        for j in clip_nums:
+            
+            clip = batch[j]
             
             try:
-                audio = clip_manager.instance.get_audio_file_contents(
-                    clip, content_type)
+                data[j] = get_data(clip)
                 
             except Exception as e:
+                
+                # We have probably already sent part of the response,
+                # so all we can do is log the error and end the
+                # response prematurely by raising an exception.
                 logger = logging.getLogger('django.server')
                 logger.error((
-                    'Attempt to get audio file contents for clip "{}" failed '
-                    'with {} exception. Exception message was: {}').format(
-                        str(clip), e.__class__.__name__, str(e)))
-                return HttpResponseServerError()
+                    'Attempt to get {} for clip "{}" failed with {} '
+                    'exception. Exception message was: {}').format(
+                        data_name, str(clip), e.__class__.__name__, str(e)))
+                raise
             
-            audios.append(audio)
-            
-            
-        # Concatenate alternating binary audio sizes and audios to make
-        # response content.
-        audio_sizes = [_get_uint32_bytes(len(a)) for a in audios]
-        pairs = zip(audio_sizes, audios)
-        parts = itertools.chain.from_iterable(pairs)
-        content = b''.join(parts)
-        
-        # Construct response
-        return HttpResponse(content, content_type='application/octet-stream')
-    
-    else:
-        return HttpResponseNotAllowed(['POST'])        
+        for d in data:
+            yield _get_uint32_bytes(len(d))
+            yield d
+
+
+def _get_read_key(clip):
+    start_index = -1 if clip.start_index is None else clip.start_index
+    return (clip.recording_channel.recording_id, start_index)
 
 
 def _get_uint32_bytes(i):
     return np.array([i], dtype=np.dtype('<u4')).tobytes()
 
 
+@csrf_exempt
+def batch_read_clip_spectrograms(request):
+    
+    """
+    Reads the spectrograms of a batch of clips.
+    
+    This view expects a request body that is UTF-8 encoded JSON like:
+    
+        {
+            "clip_ids": [1, 2, 3],
+            "settings": {
+                "computation": {
+                    "window": {"type": "Hann", "size": .005},
+                    "hopSize": 20,
+                    "spectralInterpolationFactor": 2,
+                    "referencePower": 1e-9
+                },
+                "powerRange": [0, 90]
+            }
+        }
+    
+    where the settings are those of the requesting clip album. The view
+    responds with the quantized spectrograms of the clips, in the format
+    described in the documentation of the `ClipSpectrogramCache` class,
+    each preceded by its size in bytes.
+    """
+    
+    if request.method == 'POST':
+        
+        try:
+            content = _get_request_body_as_json(request)
+        except HttpError as e:
+            return e.http_response
+
+        try:
+            content = json.loads(content)
+        except json.JSONDecodeError as e:
+            return HttpResponseBadRequest(
+                reason='Could not decode request JSON')
+        
+        try:
+            settings = parse_spectrogram_settings(
+                content['settings'])
+        except (KeyError, TypeError, ValueError) as e:
+            return HttpResponseBadRequest(reason=str(e))
+        
+        try:
+            clips = _get_batch_clips(content['clip_ids'])
+        except Clip.DoesNotExist as e:
+            raise Http404(str(e))
+        
+        cache = clip_spectrogram_cache.instance
+        
+        def get_spectrogram(clip):
+            return cache.get_spectrogram(clip, settings)
+        
+        content = _generate_clip_data(clips, get_spectrogram, 'spectrogram')
+        
+        return StreamingHttpResponse(
+            content, content_type='application/octet-stream')
+    
+    else:
+        return HttpResponseNotAllowed(['POST'])        
+
+
 @csrf_exempt
 def batch_read_clip_annotations(request):
     
@@ -1240,8 +1448,8 @@ def batch_read_clip_annotations(request):
                 reason='Could not decode request JSON')
 
         clip_ids = content['clip_ids']
-        annotations = dict((i, _get_annotations(i)) for i in clip_ids)
-        content = json.dumps(annotations)       
+        annotations = model_utils.get_clips_annotations(clip_ids)
+        content = json.dumps(annotations)
         return HttpResponse(content, content_type='application/json')
     
     else:
@@ -1276,39 +1484,30 @@ def annotations(request, annotation_name):
             value = content['value']
             clip_ids = content['clip_ids']
 
-            # We lock the archive just once for all of the clips that
-            # we process, rather than once for each clip. This means
-            # that we may hold the lock for several seconds, during
-            # which no other threads or processes can hold it. This
-            # method is several times faster this way, and since it
-            # is typically invoked interactively, the improved
-            # performance is especially important.
+            # The bulk annotation functions of `model_utils` lock the
+            # archive just once for all of the clips, and update their
+            # annotations with a few set-based queries rather than
+            # several queries per clip.
             with archive_lock.atomic():
                 with transaction.atomic():
 
                     info = get_object_or_404(
                         AnnotationInfo, name=annotation_name)
 
-                    # TODO: Try to speed up the following, which currently
-                    # takes several seconds per thousand clips. Perhaps we
-                    # don't need for Django to create Clip instances for us,
-                    # but instead can use raw SQL to query the
-                    # vesper_string_annotation table just once to get the
-                    # information we need to decide what updates are needed,
-                    # and then a second time to perform the updates.
-
-                    for clip_id in clip_ids:
+                    user = request.user
 
-                        clip = get_object_or_404(Clip, pk=clip_id)
-                        user = request.user
+                    try:
 
                         if value is None:
-                            model_utils.delete_clip_annotation(
-                                clip, info, creating_user=user)
+                            model_utils.delete_clip_annotations(
+                                clip_ids, info, creating_user=user)
 
                         else:
-                            model_utils.annotate_clip(
-                                clip, info, value, creating_user=user)
+                            model_utils.annotate_clips(
+                                clip_ids, info, value, creating_user=user)
+
+                    except Clip.DoesNotExist as e:
+                        raise Http404(str(e))
 
             return HttpResponse()
 
@@ -1579,8 +1778,8 @@ def night(request):
     archive_ = archive.instance
 
     # Reload presets and preferences to make sure we have the latest.
-    # TODO: For efficiency's sake, be more selective about what we reload.
-    # We might reload only presets of specified types, for example.
+    # The managers reparse only files that have changed since they
+    # were last loaded, so this is cheap when nothing has changed.
     preset_manager.instance.reload_presets()
     preference_manager.instance.reload_preferences()
     preferences = preference_manager.instance.preferences
@@ -1618,15 +1817,9 @@ def night(request):
     recordings = model_utils.get_recordings(station, mic_output, time_interval)
     recordings_json = _get_recordings_json(recordings, station)
 
-    clips = model_utils.get_clips(
-        station=station,
-        mic_output=mic_output,
-        date=date,
-        detector=detector,
-        annotation_name=annotation_name,
-        annotation_value=annotation_value,
-        tag_name=tag_name)
-    clips_json = _get_clips_json(clips, station)
+    clip_list_url = _get_clip_list_url(
+        sm_pair_ui_name, detector, annotation_value_spec, tag_spec,
+        date_string)
 
     settings_presets_json = _get_presets_json('Clip Album Settings')
     commands_presets_json = _get_presets_json('Clip Album Commands')
@@ -1649,7 +1842,7 @@ def night(request):
         date=date_string,
         twilight_event_times_json=twilight_event_times_json,
         recordings_json=recordings_json,
-        clips_json=clips_json,
+        clip_list_url=clip_list_url,
         settings_presets_json=settings_presets_json,
         settings_preset_path=settings_preset_path,
         commands_presets_json=commands_presets_json,
@@ -1664,14 +1857,18 @@ def _get_twilight_event_times_json(station, night):
     # See note near the top of this file about why we send local
     # instead of UTC times to clients.
 
-    calculator = AstronomicalCalculator(
-        station.latitude, station.longitude, station.tz,
-        result_times_local=True)
+    # We get twilight event times from the station's ephemeris table
+    # rather than computing them, since the table computes them only
+    # once per night and station.
+    table = ephemeris_table_cache.instance.get_table(
+        station.latitude, station.longitude, station.tz)
     
-    events = calculator.get_night_twilight_events(night)
+    events = table.get_night_twilight_events(night)
     
+    utc_to_local = station.utc_to_local
     times = dict(
-        (_get_twilight_event_variable_name(e.name), _format_time(e.time))
+        (_get_twilight_event_variable_name(e.name),
+         _format_time(utc_to_local(e.time)))
         for e in events)
     
     return json.dumps(times)
@@ -1709,23 +1906,215 @@ def _get_recording_dict(recording, utc_to_local):
     }
 
 
-def _get_clips_json(clips, station):
+_CLIP_LIST_PAGE_SIZE = 10000
+"""Default and maximum number of clips per clip list JSON response."""
+
+
+def clip_list_json(request):
+
+    '''
+    Gets a page of a clip list as JSON.
+
+    The clips are those of the station/mic, detector, classification,
+    tag, and (optionally) date specified by the query items of the
+    request URL, in order of increasing start time. A clip list is
+    divided into pages by *keyset pagination*: each response includes
+    a key that the client can send back in the `after` query item of
+    the next request to get the next page, or `null` if there are no
+    more clips. Unlike offset pagination, keyset pagination gets each
+    page with an indexed query regardless of how far into the list it
+    is. The maximum number of clips per page can be specified with the
+    `limit` query item.
+
+    The response JSON is like:
+
+        {
+            "clips": [[<id>, <start index>, <length>, <sample rate>,
+                       <local start time>], ...],
+            "nextPageKey": "2019-05-10T03:02:16.874014+00:00/1234"
+        }
+    '''
+
+    if request.method in _GET_AND_HEAD:
+
+        params = request.GET
+
+        try:
+            station, clips = _get_clip_list_clips(params)
+            after = _parse_clip_list_page_key(params.get('after'))
+            limit = min(
+                int(params.get('limit', _CLIP_LIST_PAGE_SIZE)),
+                _CLIP_LIST_PAGE_SIZE)
+        except Exception as e:
+            return HttpResponseBadRequest(
+                reason=f'Bad clip list query: {e}')
+
+        clips, next_page_key = _get_clip_list_page(
+            clips, station, after, limit)
+
+        content = json.dumps({
+            'clips': _get_clip_lists(clips, station),
+            'nextPageKey': next_page_key
+        })
+
+        return HttpResponse(content, content_type='application/json')
+
+    else:
+        return HttpResponseNotAllowed(_GET_AND_HEAD)
+
+
+def _get_clip_list_clips(params):
+
+    archive_ = archive.instance
+
+    sm_pairs = model_utils.get_station_mic_output_pairs_dict()
+    station, mic_output = sm_pairs[params['station_mic']]
+
+    detector = archive_.get_processor(params['detector'])
+
+    annotation_name, annotation_value = _get_string_annotation_info(
+        'Classification', params['classification'])
+
+    tag_name = _get_tag_name(params['tag'])
+
+    date_string = params.get('date')
+    if date_string is None:
+        date = None
+    else:
+        date = time_utils.parse_date(*date_string.split('-'))
+
+    clips = model_utils.get_clips(
+        station=station,
+        mic_output=mic_output,
+        date=date,
+        detector=detector,
+        annotation_name=annotation_name,
+        annotation_value=annotation_value,
+        tag_name=tag_name,
+        order=False)
+
+    return station, clips
+
+
+def _get_clip_list_url(
+        sm_pair_ui_name, detector, annotation_ui_value_spec, tag_spec,
+        date_string=None):
+
+    params = {
+        'station_mic': sm_pair_ui_name,
+        'detector': detector.name,
+        'classification': annotation_ui_value_spec,
+        'tag': tag_spec
+    }
+
+    if date_string is not None:
+        params['date'] = date_string
+
+    return reverse('clip-list-json') + '?' + urlencode(params)
+
+
+def _parse_clip_list_page_key(key):
+
+    if key is None:
+        return None
+
+    else:
+        start_time, clip_id = key.rsplit('/', 1)
+        return datetime.datetime.fromisoformat(start_time), int(clip_id)
+
+
+def _get_clip_list_page(clips, station, after, limit):
+
+    """
+    Gets one page of clips, ordered by start time and ID.
+
+    The page comprises up to `limit` clips that follow the clip with
+    the `(start time, ID)` key `after`, or the first clips if `after`
+    is `None`. We get only the columns of the clips that we need.
+    """
+
+    if after is not None:
+
+        start_time, clip_id = after
+
+        # The date condition is redundant, but lets the database use
+        # the clip table's station/mic/date/detector index to skip the
+        # clips of dates before that of the start time.
+        clips = clips.filter(
+            Q(start_time__gt=start_time) |
+            Q(start_time=start_time, id__gt=clip_id),
+            date__gte=station.get_night(start_time))
+
+    clips = list(
+        clips.order_by('start_time', 'id').values_list(
+            'id', 'start_index', 'length', 'sample_rate', 'start_time'
+        )[:limit + 1])
+
+    if len(clips) > limit:
+        # more clips follow this page
+
+        clips = clips[:limit]
+        clip_id, start_time = clips[-1][0], clips[-1][4]
+        next_page_key = f'{start_time.isoformat()}/{clip_id}'
+
+    else:
+        next_page_key = None
+
+    return clips, next_page_key
+
+
+def _get_clip_lists(clips, station):
 
     # See note near the top of this file about why we send local
     # instead of UTC times to clients.
 
-    utc_to_local = station.utc_to_local
-    clip_lists = [_get_clip_list(c, utc_to_local) for c in clips]
-    result = json.dumps(clip_lists)
-    return result
+    start_times = _format_local_times([c[4] for c in clips], station)
+
+    return [c[:4] + (t,) for c, t in zip(clips, start_times)]
+
+
+def _format_local_times(times, station):
+
+    """
+    Formats UTC times as station local times.
+
+    This function returns the same strings as applying
+    `station.utc_to_local` and then `_format_time` to each time, but
+    converts and formats the times with NumPy. Time zone offsets only
+    change on minute boundaries, so it converts just one time per
+    distinct minute of the times with `station.utc_to_local`, and uses
+    the resulting UTC offset and time zone name for all of the times
+    of that minute.
+    """
+
+    if len(times) == 0:
+        return []
+
+    utc_times = np.array(
+        [t.replace(tzinfo=None) for t in times], dtype='datetime64[us]')
 
+    minutes, minute_nums = np.unique(
+        utc_times.astype('datetime64[m]'), return_inverse=True)
 
-def _get_clip_list(c, utc_to_local):
+    offsets = []
+    time_zone_suffixes = []
+    for minute in minutes.tolist():
+        local_minute = station.utc_to_local(minute)
+        offsets.append(local_minute.utcoffset())
+        time_zone_suffixes.append(' ' + local_minute.strftime('%Z'))
 
-    # See note about UTC and local times near the top of this file.
-    start_time = _format_time(utc_to_local(c.start_time))
+    offsets = np.array(offsets, dtype='timedelta64[us]')
+    local_times = utc_times + offsets[minute_nums]
 
-    return [c.id, c.start_index, c.length, c.sample_rate, start_time]
+    prefixes = np.datetime_as_string(local_times, unit='s')
+
+    microseconds = \
+        (local_times - local_times.astype('datetime64[s]')).astype(np.int64)
+    millis = np.round(microseconds / 1000.).astype(np.int64)
+
+    return [
+        p.replace('T', ' ') + _MILLIS_SUFFIXES[m] + time_zone_suffixes[i]
+        for p, m, i in zip(prefixes.tolist(), millis.tolist(), minute_nums)]
 
 
 def _format_time(time):
@@ -1733,15 +2122,25 @@ def _format_time(time):
     prefix = time.strftime('%Y-%m-%d %H:%M:%S')
 
     millis = int(round(time.microsecond / 1000.))
+
+    time_zone = time.strftime('%Z')
+
+    return prefix + _get_millis_suffix(millis) + ' ' + time_zone
+
+
+def _get_millis_suffix(millis):
+
     millis = '{:03d}'.format(millis)
     while len(millis) != 0 and millis[-1] == '0':
         millis = millis[:-1]
     if len(millis) != 0:
         millis = '.' + millis
 
-    time_zone = time.strftime('%Z')
+    return millis
+
 
-    return prefix + millis + ' ' + time_zone
+# Rounding microseconds can yield 1000 milliseconds.
+_MILLIS_SUFFIXES = [_get_millis_suffix(m) for m in range(1001)]
 
 
 def _limit_index(index, min_index, max_index):
@@ -1761,8 +2160,8 @@ def clip_album(request):
     params = request.GET
     
     # Reload presets and preferences to make sure we have the latest.
-    # TODO: For efficiency's sake, be more selective about what we reload.
-    # We might reload only presets of specified types, for example.
+    # The managers reparse only files that have changed since they
+    # were last loaded, so this is cheap when nothing has changed.
     preset_manager.instance.reload_presets()
     preference_manager.instance.reload_preferences()
     preferences = preference_manager.instance.preferences
@@ -1779,15 +2178,9 @@ def clip_album(request):
 
     d = _get_clip_filter_data(params, preferences)
 
-    station, mic_output = d.sm_pair
-    clips = model_utils.get_clips(
-        station=station,
-        mic_output=mic_output,
-        detector=d.detector,
-        annotation_name=d.annotation_name,
-        annotation_value=d.annotation_value,
-        tag_name=d.tag_name)
-    clips_json = _get_clips_json(clips, station)
+    clip_list_url = _get_clip_list_url(
+        d.sm_pair_ui_name, d.detector, d.annotation_ui_value_spec,
+        d.tag_spec)
 
     settings_presets_json = _get_presets_json('Clip Album Settings')
     commands_presets_json = _get_presets_json('Clip Album Commands')
@@ -1809,7 +2202,7 @@ def clip_album(request):
         tag=d.tag_spec,
         twilight_event_times_json='null',
         recordings_json='[]',
-        clips_json=clips_json,
+        clip_list_url=clip_list_url,
         settings_presets_json=settings_presets_json,
         settings_preset_path=settings_preset_path,
         commands_presets_json=commands_presets_json,
@@ -32,7 +32,8 @@ def main():
     if args[0].endswith('vesper_admin'):
         args[0] = __file__
         
-    if 'createsuperuser' in args or 'runserver' in args:
+    if 'createsuperuser' in args or 'runserver' in args or \
+            'rebuildclipcounts' in args:
         _check_archive_dir()
     
     os.environ.setdefault(
@@ -8,6 +8,8 @@ from datetime import (
     tzinfo as TzInfo)
 from functools import lru_cache
 from pathlib import Path
+
+import numpy as np
 import pytz
 
 from skyfield import almanac
@@ -79,7 +81,9 @@ _SUNLIGHT_PERIOD_NAMES = {
     4: 'Day'
 }
 
-_ONE_DAY = TimeDelta(days=1)
+_SUNLIGHT_PERIOD_NAME_ARRAY = np.array(
+    [_SUNLIGHT_PERIOD_NAMES[i] for i in range(5)], dtype=object)
+
 _THIRTEEN_HOURS = TimeDelta(hours=13)
 
 
@@ -102,6 +106,8 @@ def result_times_local(self)
 
 def get_solar_position(self, time)
 
+def get_solar_positions(self, times)
+
 def get_solar_noon(self, date)
 
 def get_solar_midnight(self, date)
@@ -117,11 +123,17 @@ def get_night_twilight_events(self, date, event_names=None)
 def get_night_twilight_event_time(self, date, event_name)
 
 def get_sunlight_period_name(self, time)
+
+def get_sunlight_period_names(self, times)
     
 def get_lunar_position(self, time)
+
+def get_lunar_positions(self, times)
     
 def get_lunar_illumination(self, time)
 
+def get_lunar_illuminations(self, times)
+
 
 Omit the following methods initially. Skyfield does not yet offer
 moonrise and moonset calculations. It is more difficult to calculate
@@ -163,6 +175,19 @@ and the distance is in kilometers.
 """
 
 
+POSITION_DTYPE = np.dtype([
+    ('altitude', 'float64'),
+    ('azimuth', 'float64'),
+    ('distance', 'float64')
+])
+"""
+NumPy dtype of the structured arrays of sun and moon positions returned
+by the `get_solar_positions` and `get_lunar_positions` methods of the
+`AstronomicalCalculator` class. The fields of the dtype are the same
+as the attributes of a `Position`, with the same units.
+"""
+
+
 Event = namedtuple('Event', ('time', 'name'))
 """
 Astronomical event, for example sunrise or sunset.
@@ -231,6 +256,15 @@ class AstronomicalCalculator:
     Methods that have `datetime` arguments require that those arguments
     be time-zone-aware.
     
+    The `get_solar_positions`, `get_lunar_positions`,
+    `get_lunar_illuminations`, and `get_sunlight_period_names` methods
+    compute their quantities for arrays of times, and are much faster
+    for many times than repeated invocations of the corresponding
+    scalar methods. Their `times` arguments can be either NumPy
+    `datetime64` arrays of UTC times or iterables of time-zone-aware
+    `datetime` objects. They return NumPy arrays with the same shapes
+    as their arguments.
+    
     Several of the methods of this class cache results to improve the
     efficiency of repeated invocations with the same arguments. These
     methods are:
@@ -315,42 +349,84 @@ class AstronomicalCalculator:
     
     @lru_cache(_MAX_CACHE_SIZE)
     def get_solar_position(self, time):
-        return self._get_position(self._sun, time)
+        return _get_position(self.get_solar_positions(time))
+    
+    
+    def get_solar_positions(self, times):
+        
+        """
+        Gets the positions of the sun at the specified times.
+        
+        Returns a NumPy structured array with dtype `POSITION_DTYPE`.
+        """
+        
+        return self._get_positions(self._sun, times)
     
     
-    def _get_position(self, body, time):
+    def _get_positions(self, body, times):
         
-        # Get Skyfield position.
-        time = self._get_skyfield_time(time)
-        position = self._loc.at(time).observe(body).apparent().altaz()
+        # Get Skyfield positions.
+        times, shape = self._get_skyfield_times(times)
+        positions = self._loc.at(times).observe(body).apparent().altaz()
         
         # Get position attributes with desired units.
-        altitude = position[0].degrees
-        azimuth = position[1].degrees
-        distance = position[2].km
+        result = np.zeros(shape, dtype=POSITION_DTYPE)
+        result['altitude'] = positions[0].degrees.reshape(shape)
+        result['azimuth'] = positions[1].degrees.reshape(shape)
+        result['distance'] = positions[2].km.reshape(shape)
         
-        return Position(altitude, azimuth, distance)
+        return result
     
     
-    def _get_skyfield_time(self, arg):
+    def _get_skyfield_times(self, arg):
+        
+        """
+        Gets a one-dimensional Skyfield `Time` for the specified
+        `datetime` or times, along with the shape of the times.
+        """
         
         if isinstance(arg, DateTime):
-            return self._get_scalar_skyfield_time(arg)
+            _check_time_zone_awareness(arg)
+            times = np.array([_get_utc_datetime64(arg)])
+            shape = ()
+            
+        elif isinstance(arg, np.ndarray) and \
+                np.issubdtype(arg.dtype, np.datetime64):
+            times = arg.ravel()
+            shape = arg.shape
             
         else:
             # assume `arg` is iterable of `datetime` objects
             
-            # We create a list from the iterable since the documentation
-            # for the Skyfield `Timescale.from_datetimes` method specifies
-            # that its argument should be a list of `datetime` objects.
             times = list(arg)
             
             for time in times:
                 _check_time_zone_awareness(time)
                 
-            return self._timescale.from_datetimes(times)
-        
-        
+            times = np.array(
+                [_get_utc_datetime64(t) for t in times],
+                dtype='datetime64[us]')
+            shape = times.shape
+        
+        # Get Skyfield time from UTC calendar dates and seconds of day.
+        # We don't simply give Skyfield seconds since the epoch, since
+        # it would then apply the leap second offset of the epoch to all
+        # of the times.
+        times = times.astype('datetime64[us]')
+        days = times.astype('datetime64[D]')
+        months = days.astype('datetime64[M]')
+        years = months.astype('datetime64[Y]')
+        seconds = (times - days) / np.timedelta64(1, 's')
+        
+        times = self._timescale.utc(
+            years.astype(np.int64) + 1970,
+            months.astype(np.int64) % 12 + 1,
+            (days - months).astype(np.int64) + 1,
+            0, 0, seconds)
+        
+        return times, shape
+    
+    
     def _get_scalar_skyfield_time(self, time):
         _check_time_zone_awareness(time)
         return self._timescale.from_datetime(time)
@@ -660,60 +736,84 @@ class AstronomicalCalculator:
         solar midnight.
         """
         
-        self._check_for_polar_location('get sunlight period name')
-
-        arg = self._get_skyfield_time(time)
-        period_codes = self._sunlight_period_function(arg)
-        
-        if len(period_codes.shape) == 0:
-            # getting period name for single time
-            
-            return self._get_sunlight_period_name(period_codes, time)
+        names = self.get_sunlight_period_names(time)
         
+        if names.shape == ():
+            return names[()]
         else:
-            # getting period names for list of times
-            
-            return [
-                self._get_sunlight_period_name(c, time)
-                for c in period_codes]
+            return list(names)
     
     
-    def _get_sunlight_period_name(self, code, time):
+    def get_sunlight_period_names(self, times):
         
-        code = float(code)
+        """
+        Gets the names of the sunlight periods that include the
+        specified times.
         
-        name = _SUNLIGHT_PERIOD_NAMES[code]
+        Returns a NumPy array of strings. See the documentation of the
+        `get_sunlight_period_name` method for the possible strings.
+        """
         
-        if name == 'Day' or name == 'Night':
-            return name
+        self._check_for_polar_location('get sunlight period names')
         
-        else:
-            # some kind of twilight
-            
-            # Get solar midnight of solar night that includes `time`.
-            # If `time` is before the solar noon of its day, the relevant
-            # solar midnight is the one that precedes that solar noon.
-            # Otherwise it's the one after. This solar midnight always
-            # separates the evening and morning twilight periods.
-            date = time.date()
-            noon = self.get_solar_noon(date)
-            if time < noon:
-                date = date - _ONE_DAY
-            midnight = self.get_solar_midnight(date)
-            
-            prefix = 'Evening' if time < midnight else 'Morning'
-            
-            return f'{prefix} {name}'
+        times, shape = self._get_skyfield_times(times)
+        codes = self._sunlight_period_function(times)
+        
+        names = _SUNLIGHT_PERIOD_NAME_ARRAY[codes]
+        
+        # Prefix twilight period names with "Evening" or "Morning".
+        # Evening twilight is between a solar noon and the following
+        # solar midnight, i.e. when the sun is west of the meridian.
+        # Morning twilight is between a solar midnight and the following
+        # solar noon, when the sun is east of the meridian.
+        twilight = (codes > 0) & (codes < 4)
+        if twilight.any():
+            evening = self._solar_transit_function(times[twilight])
+            prefixes = np.where(evening, 'Evening ', 'Morning ')
+            names[twilight] = prefixes.astype(object) + names[twilight]
+        
+        return names.reshape(shape)
     
     
     @lru_cache(_MAX_CACHE_SIZE)
     def get_lunar_position(self, time):
-        return self._get_position(self._moon, time)
+        return _get_position(self.get_lunar_positions(time))
+    
+    
+    def get_lunar_positions(self, times):
+        
+        """
+        Gets the positions of the moon at the specified times.
+        
+        Returns a NumPy structured array with dtype `POSITION_DTYPE`.
+        """
+        
+        return self._get_positions(self._moon, times)
     
     
     def get_lunar_illumination(self, time):
-        t = self._get_skyfield_time(time)
-        return almanac.fraction_illuminated(self._ephemeris, 'moon', t)
+        
+        illuminations = self.get_lunar_illuminations(time)
+        
+        if illuminations.shape == ():
+            return float(illuminations)
+        else:
+            return illuminations
+    
+    
+    def get_lunar_illuminations(self, times):
+        
+        """
+        Gets the illuminated fractions of the moon at the specified
+        times.
+        
+        Returns a NumPy array of floats.
+        """
+        
+        times, shape = self._get_skyfield_times(times)
+        illuminations = \
+            almanac.fraction_illuminated(self._ephemeris, 'moon', times)
+        return illuminations.reshape(shape)
 
 
 def _get_time_zone(time_zone):
@@ -739,6 +839,15 @@ def _check_time_zone_awareness(time):
         raise ValueError('Time does not include a time zone.')
 
 
+def _get_utc_datetime64(time):
+    time = time.astimezone(pytz.utc).replace(tzinfo=None)
+    return np.datetime64(time, 'us')
+
+
+def _get_position(positions):
+    return Position(*(float(positions[name]) for name in POSITION_DTYPE.names))
+
+
 # TODO: Move this function to a utility module and use it more widely,
 # as part of an effort to eventually eliminate the use of `pytz` in
 # Vesper. `pytz` should not be needed for Python versions 3.9 and above,
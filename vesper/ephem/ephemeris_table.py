@@ -0,0 +1,514 @@
+"""Module containing classes `EphemerisTable` and `EphemerisTableCache`."""
+
+
+from datetime import (
+    datetime as DateTime,
+    timedelta as TimeDelta)
+from hashlib import sha1
+from pathlib import Path
+from threading import Lock
+import os
+import tempfile
+
+import numpy as np
+import pytz
+
+from vesper.ephem.astronomical_calculator import (
+    AstronomicalCalculator, Event, Position)
+from vesper.util.lru_cache import LruCache
+
+
+_FORMAT_VERSION = 1
+"""
+Ephemeris table file format version.
+
+Increment this whenever the format or contents of table files change.
+Tables for the new version will be stored in new directories, so that
+old table files are never used.
+"""
+
+_TWILIGHT_EVENT_NAMES = (
+    'Sunset',
+    'Civil Dusk',
+    'Nautical Dusk',
+    'Astronomical Dusk',
+    'Astronomical Dawn',
+    'Nautical Dawn',
+    'Civil Dawn',
+    'Sunrise'
+)
+
+_TWILIGHT_EVENT_INDICES = dict(
+    (name, i) for i, name in enumerate(_TWILIGHT_EVENT_NAMES))
+
+# Twilight event time table values that are not times. Times are in
+# microseconds since the epoch.
+_NOT_COMPUTED = np.iinfo(np.int64).min
+_NO_EVENT = _NOT_COMPUTED + 1
+
+# Rows of daily position tables.
+_SOLAR_ALTITUDE = 0
+_SOLAR_AZIMUTH = 1
+_SOLAR_DISTANCE = 2
+_LUNAR_ALTITUDE = 3
+_LUNAR_AZIMUTH = 4
+_LUNAR_DISTANCE = 5
+_LUNAR_ILLUMINATION = 6
+_POSITION_TABLE_ROW_COUNT = 7
+
+_ANGLE_ROWS = frozenset((_SOLAR_AZIMUTH, _LUNAR_AZIMUTH))
+
+# We sample positions once per minute, including at both ends of each
+# UTC day, so we can interpolate within a day using only that day's
+# table.
+_POSITION_TABLE_COLUMN_COUNT = 24 * 60 + 1
+
+_SECONDS_PER_DAY = 24 * 60 * 60
+_MAX_CACHED_POSITION_TABLE_COUNT = 100
+
+_EPOCH = DateTime(1970, 1, 1, tzinfo=pytz.utc)
+_EPOCH_DATE = _EPOCH.date()
+
+
+class EphemerisTable:
+    
+    """
+    Persistent table of solar and lunar data for a single location.
+    
+    An `EphemerisTable` provides some of the same quantities as an
+    `AstronomicalCalculator`, namely night twilight event times and
+    solar and lunar positions and lunar illumination, but computes
+    them with the calculator only once for a given night or day,
+    storing the results both in memory and in files in a directory.
+    Subsequent requests for the quantities, including by other
+    tables for the same directory (e.g. in other processes or after
+    a restart), are satisfied from the stored results.
+    
+    Twilight event times are stored exactly. Positions and lunar
+    illumination are stored once per minute, and interpolated
+    linearly for other times. The interpolation errors are tiny:
+    solar and lunar altitudes, for example, are accurate to about
+    a thousandth of a degree.
+    
+    The times returned by the methods of a table are local or UTC
+    according to the `result_times_local` property of the table's
+    calculator.
+    """
+    
+    
+    def __init__(self, calculator, dir_path):
+        
+        self._calculator = calculator
+        self._dir_path = Path(dir_path)
+        
+        # Map from year to twilight event time table for nights of
+        # that year. Each table is a NumPy array with one row per day
+        # of the year and one column per twilight event.
+        self._twilight_event_tables = {}
+        
+        # Map from UTC date to position table for that date.
+        self._position_tables = LruCache(_MAX_CACHED_POSITION_TABLE_COUNT)
+        
+        self._lock = Lock()
+    
+    
+    @property
+    def calculator(self):
+        return self._calculator
+    
+    
+    @property
+    def dir_path(self):
+        return self._dir_path
+    
+    
+    def get_night_twilight_events(self, date, name_filter=None):
+        
+        """
+        Gets the twilight events of the specified night.
+        
+        This method is equivalent to the `AstronomicalCalculator`
+        method of the same name.
+        """
+        
+        times = self._get_night_twilight_event_times(date)
+        
+        events = [
+            Event(self._get_datetime(time), name)
+            for name, time in zip(_TWILIGHT_EVENT_NAMES, times)
+            if time != _NO_EVENT]
+        
+        events.sort()
+        
+        if name_filter is not None:
+            
+            if isinstance(name_filter, str):
+                name_filter = (name_filter,)
+            
+            name_filter = frozenset(name_filter)
+            events = [e for e in events if e.name in name_filter]
+        
+        return events
+    
+    
+    def get_night_twilight_event_time(self, date, event_name):
+        
+        """
+        Gets the time of the specified twilight event of the specified
+        night, or `None` if the event does not occur.
+        
+        This method is equivalent to the `AstronomicalCalculator`
+        method of the same name.
+        """
+        
+        times = self._get_night_twilight_event_times(date)
+        time = times[_TWILIGHT_EVENT_INDICES[event_name]]
+        
+        if time == _NO_EVENT:
+            return None
+        else:
+            return self._get_datetime(time)
+    
+    
+    def _get_night_twilight_event_times(self, date):
+        
+        with self._lock:
+            
+            table = self._get_twilight_event_table(date.year)
+            
+            day_num = date.timetuple().tm_yday - 1
+            times = table[day_num]
+            
+            if times[0] == _NOT_COMPUTED:
+                times[:] = self._compute_night_twilight_event_times(date)
+                self._save_table(
+                    self._get_twilight_event_table_path(date.year), table)
+            
+            return times.copy()
+    
+    
+    def _get_twilight_event_table(self, year):
+        
+        table = self._twilight_event_tables.get(year)
+        
+        if table is None:
+            
+            path = self._get_twilight_event_table_path(year)
+            table = _load_table(path)
+            
+            if table is None:
+                table = np.full(
+                    (366, len(_TWILIGHT_EVENT_NAMES)), _NOT_COMPUTED,
+                    dtype=np.int64)
+            
+            self._twilight_event_tables[year] = table
+        
+        return table
+    
+    
+    def _get_twilight_event_table_path(self, year):
+        return self._dir_path / 'Twilight Events' / f'{year}.npy'
+    
+    
+    def _compute_night_twilight_event_times(self, date):
+        
+        times = np.full(len(_TWILIGHT_EVENT_NAMES), _NO_EVENT, np.int64)
+        
+        for time, name in self._calculator.get_night_twilight_events(date):
+            times[_TWILIGHT_EVENT_INDICES[name]] = \
+                (time - _EPOCH) // TimeDelta(microseconds=1)
+        
+        return times
+    
+    
+    def _get_datetime(self, time):
+        
+        time = _EPOCH + TimeDelta(microseconds=int(time))
+        
+        if self._calculator.result_times_local:
+            time = time.astimezone(self._calculator.time_zone)
+        
+        return time
+    
+    
+    def get_solar_position(self, time):
+        
+        """
+        Gets the position of the sun at the specified time or times.
+        
+        This method is equivalent to the `AstronomicalCalculator`
+        method of the same name, except that its argument can also be
+        an iterable of `datetime` objects, in which case the attributes
+        of the returned `Position` are NumPy arrays.
+        """
+        
+        return self._get_position(
+            time, _SOLAR_ALTITUDE, _SOLAR_AZIMUTH, _SOLAR_DISTANCE)
+    
+    
+    def get_lunar_position(self, time):
+        
+        """
+        Gets the position of the moon at the specified time or times.
+        
+        This method is equivalent to the `AstronomicalCalculator`
+        method of the same name, except that its argument can also be
+        an iterable of `datetime` objects, in which case the attributes
+        of the returned `Position` are NumPy arrays.
+        """
+        
+        return self._get_position(
+            time, _LUNAR_ALTITUDE, _LUNAR_AZIMUTH, _LUNAR_DISTANCE)
+    
+    
+    def _get_position(self, time, *rows):
+        return Position(*self._interpolate(time, rows))
+    
+    
+    def get_lunar_illumination(self, time):
+        
+        """
+        Gets the illuminated fraction of the moon at the specified
+        time or times.
+        
+        This method is equivalent to the `AstronomicalCalculator`
+        method of the same name.
+        """
+        
+        return self._interpolate(time, (_LUNAR_ILLUMINATION,))[0]
+    
+    
+    def _interpolate(self, time, rows):
+        
+        scalar = isinstance(time, DateTime)
+        times = [time] if scalar else list(time)
+        
+        seconds = np.array([_get_timestamp(t) for t in times])
+        days = np.floor(seconds / _SECONDS_PER_DAY).astype(np.int64)
+        
+        results = np.zeros((len(rows), len(seconds)))
+        
+        for day in np.unique(days):
+            
+            table = self._get_position_table(
+                _EPOCH_DATE + TimeDelta(days=int(day)))
+            
+            indices = np.nonzero(days == day)[0]
+            minutes = (seconds[indices] - day * _SECONDS_PER_DAY) / 60
+            
+            # Get indices and weights for interpolation.
+            i = np.minimum(
+                minutes.astype(np.int64), _POSITION_TABLE_COLUMN_COUNT - 2)
+            f = minutes - i
+            
+            for j, row in enumerate(rows):
+                
+                x0 = table[row, i]
+                dx = table[row, i + 1] - x0
+                
+                if row in _ANGLE_ROWS:
+                    # Interpolate the short way around the circle.
+                    dx = (dx + 180) % 360 - 180
+                    results[j, indices] = (x0 + f * dx) % 360
+                else:
+                    results[j, indices] = x0 + f * dx
+        
+        if scalar:
+            return [float(r[0]) for r in results]
+        else:
+            return list(results)
+    
+    
+    def _get_position_table(self, date):
+        
+        with self._lock:
+            
+            try:
+                return self._position_tables[date]
+            
+            except KeyError:
+                # table not in memory
+                
+                path = self._get_position_table_path(date)
+                table = _load_table(path)
+                
+                if table is None:
+                    table = self._compute_position_table(date)
+                    self._save_table(path, table)
+                
+                self._position_tables[date] = table
+                
+                return table
+    
+    
+    def _get_position_table_path(self, date):
+        return self._dir_path / 'Positions' / f'{date.isoformat()}.npy'
+    
+    
+    def _compute_position_table(self, date):
+        
+        start_time = DateTime(
+            date.year, date.month, date.day, tzinfo=pytz.utc)
+        times = [
+            start_time + TimeDelta(minutes=i)
+            for i in range(_POSITION_TABLE_COLUMN_COUNT)]
+        
+        calculator = self._calculator
+        
+        table = np.zeros(
+            (_POSITION_TABLE_ROW_COUNT, _POSITION_TABLE_COLUMN_COUNT))
+        
+        positions = calculator.get_solar_positions(times)
+        table[_SOLAR_ALTITUDE] = positions['altitude']
+        table[_SOLAR_AZIMUTH] = positions['azimuth']
+        table[_SOLAR_DISTANCE] = positions['distance']
+        
+        positions = calculator.get_lunar_positions(times)
+        table[_LUNAR_ALTITUDE] = positions['altitude']
+        table[_LUNAR_AZIMUTH] = positions['azimuth']
+        table[_LUNAR_DISTANCE] = positions['distance']
+        
+        table[_LUNAR_ILLUMINATION] = calculator.get_lunar_illuminations(times)
+        
+        return table
+    
+    
+    def _save_table(self, path, table):
+        
+        # Write the table to a temporary file and then rename it, so
+        # that other threads and processes never see a partially
+        # written file. We don't consider failure to save a table an
+        # error, since the table is still in memory: it just means
+        # we may have to compute the table again some other time.
+        
+        try:
+            
+            path.parent.mkdir(parents=True, exist_ok=True)
+            
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            
+            try:
+                with os.fdopen(fd, 'wb') as file_:
+                    np.save(file_, table)
+                os.replace(temp_path, path)
+            
+            except Exception:
+                _delete_file(temp_path)
+                raise
+        
+        except OSError:
+            pass
+
+
+def _get_timestamp(time):
+    tzinfo = time.tzinfo
+    if tzinfo is None or tzinfo.utcoffset(time) is None:
+        raise ValueError('Time does not include a time zone.')
+    return time.timestamp()
+
+
+def _load_table(path):
+    try:
+        return np.load(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _delete_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class EphemerisTableCache:
+    
+    """
+    Ephemeris table cache.
+    
+    An `EphemerisTableCache` maintains a cache of `EphemerisTable`
+    objects, one per location, in the manner of an
+    `AstronomicalCalculatorCache`. Each table stores its files in its
+    own subdirectory of the cache directory. The subdirectory name is
+    a hash of the table's location and time zone, so a table never
+    uses the files of a different location, for example after a
+    station has moved.
+    
+    The `dir_path` initializer argument is the path of the cache
+    directory.
+    
+    The `result_times_local` initializer argument determines whether
+    the tables of the cache return local times or UTC times.
+    
+    The `max_size` initializer argument determines the maximum
+    number of tables the cache will hold in memory.
+    """
+    
+    
+    DEFAULT_MAX_SIZE = 100
+    
+    
+    def __init__(
+            self, dir_path, result_times_local=False,
+            max_size=DEFAULT_MAX_SIZE):
+        
+        self._dir_path = Path(dir_path)
+        self._result_times_local = result_times_local
+        self._tables = LruCache(max_size)
+        self._lock = Lock()
+    
+    
+    @property
+    def dir_path(self):
+        return self._dir_path
+    
+    
+    @property
+    def result_times_local(self):
+        return self._result_times_local
+    
+    
+    @property
+    def max_size(self):
+        return self._tables.max_size
+    
+    
+    def get_table(self, latitude, longitude, time_zone):
+        
+        """
+        Gets a table for the specified latitude, longitude, and
+        time zone.
+        
+        The `latitude` and `longitude` arguments specify the location
+        of the desired table. They have units of degrees.
+        
+        The `time_zone` argument specifies the local time zone at the
+        table's location. It can be either a string IANA time zone
+        name or an instance of a `datetime.tzinfo` subclass.
+        """
+        
+        key = (latitude, longitude, str(time_zone))
+        
+        with self._lock:
+            
+            try:
+                return self._tables[key]
+            
+            except KeyError:
+                # cache miss
+                
+                calculator = AstronomicalCalculator(
+                    latitude, longitude, time_zone, self.result_times_local)
+                
+                dir_path = self._dir_path / _get_dir_name(key)
+                
+                table = EphemerisTable(calculator, dir_path)
+                
+                self._tables[key] = table
+                
+                return table
+
+
+def _get_dir_name(key):
+    data = repr((_FORMAT_VERSION,) + key).encode('utf-8')
+    return sha1(data).hexdigest()
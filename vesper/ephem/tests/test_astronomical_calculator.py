@@ -13,6 +13,7 @@ from datetime import (
     datetime as DateTime,
     timedelta as TimeDelta)
 
+import numpy as np
 import pytz
 
 from vesper.tests.test_case import TestCase
@@ -28,11 +29,6 @@ from vesper.ephem.astronomical_calculator import AstronomicalCalculator
 # for example for generating test data? There is a pip-installable
 # Python wrapper for NOVAS available from PyPI.
 
-# TODO: Test vector arguments to `get_solar_position`,
-# `get_sunlight_period_name`, `get_lunar_position`, and
-# `get_lunar_illumination`.
-
-
 # Ithaca, NY location and time zone.
 TEST_LAT = 42.431964
 TEST_LON = -76.501656
@@ -194,6 +190,22 @@ LUNAR_ILLUMINATION_ERROR_THRESHOLD = .070
 TIME_DIFFERENCE_ERROR_THRESHOLD = 60   # seconds
 
 
+def _get_time_arrays(times):
+    
+    """
+    Gets a list of aware `datetime` objects and a NumPy `datetime64`
+    array of UTC times for the specified times.
+    """
+    
+    times = list(times)
+    
+    utc_times = np.array([
+        np.datetime64(t.astimezone(pytz.utc).replace(tzinfo=None), 'us')
+        for t in times])
+    
+    return times, utc_times
+
+
 class AstronomicalCalculatorTests(TestCase):
     
     """
@@ -362,6 +374,13 @@ class AstronomicalCalculatorTests(TestCase):
             self.assertEqual(actual, expected)
     
     
+    def test_get_sunlight_period_names(self):
+        times, expected = zip(*SUNLIGHT_PERIODS)
+        for times in _get_time_arrays(times):
+            actual = self.calculator.get_sunlight_period_names(times)
+            self.assertEqual(list(actual), list(expected))
+    
+    
     def test_get_lunar_position(self):
         for time, expected_pos in LUNAR_POSITIONS:
             pos = self.calculator.get_lunar_position(time)
@@ -378,6 +397,40 @@ class AstronomicalCalculatorTests(TestCase):
                 LUNAR_ILLUMINATION_ERROR_THRESHOLD)
     
     
+    def test_position_and_illumination_arrays(self):
+        
+        c = self.calculator
+        
+        cases = [
+            (c.get_solar_positions, c.get_solar_position, SOLAR_POSITIONS),
+            (c.get_lunar_positions, c.get_lunar_position, LUNAR_POSITIONS),
+            (c.get_lunar_illuminations, c.get_lunar_illumination,
+             LUNAR_ILLUMINATIONS)
+        ]
+        
+        for get_array, get_scalar, data in cases:
+            
+            times = [time for time, _ in data]
+            expected = [get_scalar(time) for time in times]
+            
+            for times in _get_time_arrays(times):
+                
+                actual = get_array(times)
+                
+                if actual.dtype.names is not None:
+                    # positions
+                    
+                    actual = [tuple(p) for p in actual]
+                
+                self.assertTrue(np.allclose(actual, expected))
+        
+        # Array results should have same shape as array arguments.
+        times = _get_time_arrays([time for time, _ in SOLAR_POSITIONS])[1]
+        times = times[:6].reshape((2, 3))
+        positions = c.get_solar_positions(times)
+        self.assertEqual(positions.shape, (2, 3))
+    
+    
     def test_naive_datetime_errors(self):
          
         c = self.calculator
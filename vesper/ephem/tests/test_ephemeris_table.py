@@ -0,0 +1,149 @@
+from datetime import (
+    date as Date,
+    datetime as DateTime,
+    timedelta as TimeDelta)
+import tempfile
+
+import numpy as np
+import pytz
+
+from vesper.ephem.astronomical_calculator import Event, POSITION_DTYPE
+from vesper.ephem.ephemeris_table import EphemerisTable
+from vesper.tests.test_case import TestCase
+
+
+_TIME_ZONE = pytz.timezone('US/Eastern')
+
+
+def _utc(*args):
+    return DateTime(*args, tzinfo=pytz.utc)
+
+
+class _Calculator:
+    
+    """
+    Fake astronomical calculator whose positions are simple linear
+    functions of time, so that we know what an ephemeris table should
+    interpolate.
+    """
+    
+    
+    def __init__(self, result_times_local=False):
+        self.time_zone = _TIME_ZONE
+        self.result_times_local = result_times_local
+        self.num_night_computations = 0
+        self.num_position_computations = 0
+    
+    
+    def get_night_twilight_events(self, date):
+        
+        self.num_night_computations += 1
+        
+        start_time = _utc(date.year, date.month, date.day, 23, 30)
+        
+        return [
+            Event(start_time, 'Sunset'),
+            Event(start_time + TimeDelta(minutes=30), 'Civil Dusk'),
+            Event(start_time + TimeDelta(hours=10), 'Civil Dawn'),
+            Event(start_time + TimeDelta(hours=10.5), 'Sunrise'),
+        ]
+    
+    
+    def get_solar_positions(self, times):
+        minutes = _get_minutes(times)
+        return self._get_positions(minutes / 10, (minutes * 3) % 360, minutes)
+    
+    
+    def _get_positions(self, altitudes, azimuths, distances):
+        self.num_position_computations += 1
+        positions = np.zeros(len(altitudes), dtype=POSITION_DTYPE)
+        positions['altitude'] = altitudes
+        positions['azimuth'] = azimuths
+        positions['distance'] = distances
+        return positions
+    
+    
+    def get_lunar_positions(self, times):
+        minutes = _get_minutes(times)
+        return self._get_positions(-minutes / 10, 0 * minutes, 2 * minutes)
+    
+    
+    def get_lunar_illuminations(self, times):
+        return _get_minutes(times) / 10000
+
+
+def _get_minutes(times):
+    start_time = _utc(2020, 1, 1)
+    return np.array([(t - start_time).total_seconds() / 60 for t in times])
+
+
+class EphemerisTableTests(TestCase):
+    
+    
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+    
+    
+    def test_get_night_twilight_events(self):
+        
+        calculator = _Calculator(result_times_local=True)
+        table = EphemerisTable(calculator, self.dir_path)
+        date = Date(2020, 5, 1)
+        
+        expected = [
+            Event(e.time.astimezone(_TIME_ZONE), e.name)
+            for e in calculator.get_night_twilight_events(date)]
+        calculator.num_night_computations = 0
+        
+        self.assertEqual(table.get_night_twilight_events(date), expected)
+        self.assertEqual(
+            table.get_night_twilight_events(date, 'Sunrise'), expected[3:])
+        self.assertEqual(
+            table.get_night_twilight_event_time(date, 'Civil Dawn'),
+            expected[2].time)
+        self.assertIsNone(
+            table.get_night_twilight_event_time(date, 'Nautical Dusk'))
+        self.assertEqual(calculator.num_night_computations, 1)
+        
+        # A new table for the same directory should get events from
+        # the table file.
+        calculator = _Calculator(result_times_local=True)
+        table = EphemerisTable(calculator, self.dir_path)
+        self.assertEqual(table.get_night_twilight_events(date), expected)
+        self.assertEqual(calculator.num_night_computations, 0)
+        
+        table.get_night_twilight_events(date + TimeDelta(days=1))
+        self.assertEqual(calculator.num_night_computations, 1)
+    
+    
+    def test_get_positions(self):
+        
+        calculator = _Calculator()
+        table = EphemerisTable(calculator, self.dir_path)
+        
+        # 100.5 minutes after start of 2020-01-01.
+        time = _utc(2020, 1, 1, 1, 40, 30)
+        position = table.get_solar_position(time)
+        self.assertAlmostEqual(position.altitude, 10.05)
+        self.assertAlmostEqual(position.azimuth, 301.5)
+        self.assertAlmostEqual(position.distance, 100.5)
+        self.assertAlmostEqual(table.get_lunar_illumination(time), .01005)
+        
+        # These times are on either side of a day boundary, and solar
+        # azimuth wraps around from 359.95 to .5 degrees between them.
+        times = [_utc(2020, 1, 1, 23, 59, 59), _utc(2020, 1, 2, 0, 0, 10)]
+        position = table.get_lunar_position(times)
+        altitudes = [-143.99833, -144.01667]
+        self.assertTrue(np.allclose(position.altitude, altitudes))
+        azimuths = table.get_solar_position(times).azimuth
+        self.assertTrue(np.allclose(azimuths, [359.95, .5]))
+        
+        # Sun and moon for each of two days.
+        self.assertEqual(calculator.num_position_computations, 4)
+        
+        # A new table for the same directory should get positions from
+        # the table files.
+        calculator = _Calculator()
+        table = EphemerisTable(calculator, self.dir_path)
+        table.get_lunar_position(times)
+        self.assertEqual(calculator.num_position_computations, 0)
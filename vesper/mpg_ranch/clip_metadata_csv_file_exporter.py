@@ -11,8 +11,7 @@ import tempfile
 
 from vesper.command.command import CommandExecutionError
 from vesper.django.app.models import AnnotationInfo
-from vesper.ephem.astronomical_calculator import AstronomicalCalculatorCache
-from vesper.singletons import clip_manager
+from vesper.singletons import clip_manager, ephemeris_table_cache
 from vesper.util.bunch import Bunch
 import vesper.command.command_utils as command_utils
 import vesper.django.app.model_utils as model_utils
@@ -274,9 +273,6 @@ columns:
 ''')
 
 
-_ASTRONOMICAL_CALCULATORS = AstronomicalCalculatorCache()
-
-
 class ClipMetadataCsvFileExporter:
     
     
@@ -508,12 +504,10 @@ class AnnotationValueMeasurement:
 class _TwilightEventTimeMeasurement:
     
     def measure(self, clip):
-        station = clip.station
-        calculator = _ASTRONOMICAL_CALCULATORS.get_calculator(
-            station.latitude, station.longitude, station.tz)
-        night = station.get_night(clip.start_time)
+        table = _get_ephemeris_table(clip)
+        night = clip.station.get_night(clip.start_time)
         event_name = self.name[:-5]
-        return calculator.get_night_twilight_event_time(night, event_name)
+        return table.get_night_twilight_event_time(night, event_name)
 
 
 class AstronomicalDawnTimeMeasurement(_TwilightEventTimeMeasurement):
@@ -639,13 +633,19 @@ class LunarAltitudeMeasurement:
     
     
 def _get_lunar_position(clip):
-    calculator = _get_astronomical_calculator(clip)
-    return calculator.get_lunar_position(clip.start_time)
+    table = _get_ephemeris_table(clip)
+    return table.get_lunar_position(clip.start_time)
+    
+    
+def _get_ephemeris_table(clip):
     
+    # We get solar and lunar data from the station's ephemeris table
+    # rather than computing them clip by clip. The table computes the
+    # data once per night or day and station, stores them in the
+    # archive, and interpolates them for clip times.
     
-def _get_astronomical_calculator(clip):
     station = clip.station
-    return _ASTRONOMICAL_CALCULATORS.get_calculator(
+    return ephemeris_table_cache.instance.get_table(
         station.latitude, station.longitude, station.tz)
 
 
@@ -662,8 +662,8 @@ class LunarIlluminationMeasurement:
     name = 'Lunar Illumination'
     
     def measure(self, clip):
-        calculator = _get_astronomical_calculator(clip)
-        return calculator.get_lunar_illumination(clip.start_time)
+        table = _get_ephemeris_table(clip)
+        return table.get_lunar_illumination(clip.start_time)
     
     
 class NauticalDawnTimeMeasurement(_TwilightEventTimeMeasurement):
@@ -715,8 +715,8 @@ class SolarAltitudeMeasurement:
     
     
 def _get_solar_position(clip):
-    calculator = _get_astronomical_calculator(clip)
-    return calculator.get_solar_position(clip.start_time)
+    table = _get_ephemeris_table(clip)
+    return table.get_solar_position(clip.start_time)
     
     
 class SolarAzimuthMeasurement:
@@ -748,7 +748,7 @@ class SunlightPeriodNameMeasurement:
     name = 'Sunlight Period Name'
     
     def measure(self, clip):
-        calculator = _get_astronomical_calculator(clip)
+        calculator = _get_ephemeris_table(clip).calculator
         return calculator.get_sunlight_period_name(clip.start_time)
 
 
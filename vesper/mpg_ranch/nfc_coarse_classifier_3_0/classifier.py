@@ -26,8 +26,6 @@ from vesper.util.settings import Settings
 import vesper.django.app.model_utils as model_utils
 import vesper.mpg_ranch.nfc_coarse_classifier_3_0.classifier_utils as \
     classifier_utils
-import vesper.mpg_ranch.nfc_coarse_classifier_3_0.dataset_utils as \
-    dataset_utils
 import vesper.util.open_mp_utils as open_mp_utils
 import vesper.util.signal_utils as signal_utils
 import vesper.util.yaml_utils as yaml_utils
@@ -35,6 +33,21 @@ import vesper.util.yaml_utils as yaml_utils
 
 _EVALUATION_MODE_ENABLED = False
 
+_INFERENCE_BATCH_SIZE = classifier_utils.DEFAULT_INFERENCE_BATCH_SIZE
+"""Number of clips the classifier scores per TensorFlow inference batch."""
+
+_INFERENCE_INTRA_OP_THREAD_COUNT = 0
+"""
+Number of threads TensorFlow uses within an inference operation, or
+zero to let TensorFlow choose.
+"""
+
+_INFERENCE_INTER_OP_THREAD_COUNT = 0
+"""
+Number of threads TensorFlow uses to run inference operations in
+parallel, or zero to let TensorFlow choose.
+"""
+
 
 '''
 This classifier can run in one of two modes, *normal mode* and
@@ -267,8 +280,10 @@ class _Classifier:
         
         self.clip_type = clip_type
         
-        self._estimator = self._create_estimator()
         self._settings = self._load_settings()
+        self._inference_session = classifier_utils.get_inference_session(
+            self.clip_type, _INFERENCE_BATCH_SIZE,
+            _INFERENCE_INTRA_OP_THREAD_COUNT, _INFERENCE_INTER_OP_THREAD_COUNT)
         
         # Configure waveform slicing.
         s = self._settings
@@ -285,14 +300,6 @@ class _Classifier:
         self._clip_manager = clip_manager.instance
     
     
-    def _create_estimator(self):
-        path = classifier_utils.get_tensorflow_model_dir_path(self.clip_type)
-        logging.info((
-            'Creating TensorFlow estimator from saved model in directory '
-            '"{}"...').format(path))
-        return tf.contrib.estimator.SavedModelEstimator(str(path))
-
-    
     def _load_settings(self):
         path = classifier_utils.get_settings_file_path(self.clip_type)
         logging.info('Loading classifier settings from "{}"...'.format(path))
@@ -314,12 +321,12 @@ class _Classifier:
             # have at least one waveform slice to classify
         
             # Stack waveform slices to make 2-D NumPy array.
-            self._waveforms = np.stack(waveforms)
+            waveforms = np.stack(waveforms)
         
             # logging.info('Scoring clip waveforms...')
             
-            scores = classifier_utils.score_dataset_examples(
-                self._estimator, self._create_dataset)
+            scores = classifier_utils.score_waveforms(
+                self._inference_session, waveforms)
             
             # logging.info('Classifying clips...')
             
@@ -396,14 +403,6 @@ class _Classifier:
         return samples
 
         
-    def _create_dataset(self):
-        
-        return dataset_utils.create_spectrogram_dataset_from_waveforms_array(
-            self._waveforms, dataset_utils.DATASET_MODE_INFERENCE,
-            self._settings, batch_size=64,
-            feature_name=self._settings.model_input_name)
-    
-    
     def _classify_clip(self, index, score, clips):
         
         if score >= self._classification_threshold:
@@ -5,12 +5,17 @@ from pathlib import Path
 
 import numpy as np
 
+from vesper.util.settings import Settings
+
 
 _CLASSIFIER_DIR_NAME_FORMAT = '{} Classifier'
 _TENSORFLOW_MODEL_DIR_NAME = 'TensorFlow SavedModel'
 KERAS_MODEL_FILE_NAME = 'Keras Model.h5'
 SETTINGS_FILE_NAME = 'Settings.yaml'
 
+DEFAULT_INFERENCE_BATCH_SIZE = 64
+"""Default number of waveforms per inference batch."""
+
 
 def get_classifier_dir_path(clip_type):
     package_path = Path(__file__).parent
@@ -49,3 +54,57 @@ def score_dataset_examples(estimator, dataset_creator):
     scores = np.array([list(s.values())[0][0] for s in scores])
     
     return scores
+
+
+def get_inference_session(
+        clip_type, batch_size=DEFAULT_INFERENCE_BATCH_SIZE,
+        intra_op_thread_count=0, inter_op_thread_count=0):
+    
+    """
+    Gets the shared inference session for a classifier.
+    
+    The session computes spectrograms from waveforms as specified by
+    the classifier's settings file and scores them with the classifier's
+    TensorFlow model. Callers that specify the same clip type, batch
+    size, and thread counts share a session. See the
+    `vesper.util.inference_session.InferenceSession` class for
+    descriptions of the batch size and thread counts.
+    """
+    
+    # We import these here rather than at the top of this module
+    # so that the other functions of the module do not require
+    # TensorFlow.
+    from vesper.mpg_ranch.nfc_coarse_classifier_3_0 import dataset_utils
+    from vesper.util import inference_session
+    
+    model_dir_path = get_tensorflow_model_dir_path(clip_type)
+    
+    settings_file_path = get_settings_file_path(clip_type)
+    settings = Settings.create_from_yaml_file(settings_file_path)
+    
+    mode = dataset_utils.DATASET_MODE_INFERENCE
+    preprocessor = dataset_utils.create_spectrogram_preprocessor(
+        mode, settings)
+    
+    # Preprocessors created with the same mode from the same settings
+    # file are equivalent.
+    preprocessor_key = ('Spectrogram', mode, str(settings_file_path))
+    
+    return inference_session.get_inference_session(
+        model_dir_path, preprocessor, preprocessor_key, batch_size,
+        intra_op_thread_count, inter_op_thread_count)
+
+
+def score_waveforms(session, waveforms):
+    
+    """
+    Scores waveforms with an inference session, returning the
+    resulting scores in a NumPy array.
+    """
+    
+    if len(waveforms) == 0:
+        return np.zeros(0)
+    
+    # The model outputs an array containing one element, a score,
+    # for each waveform.
+    return session.predict(waveforms)[:, 0]
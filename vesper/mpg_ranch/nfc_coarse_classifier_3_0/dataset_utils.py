@@ -102,6 +102,29 @@ def _create_spectrogram_dataset(
     return dataset
 
 
+def create_spectrogram_preprocessor(
+        mode, settings, feature_name='spectrogram'):
+    
+    """
+    Creates a function that computes spectrograms for a batch of
+    waveforms in a TensorFlow graph.
+    
+    The function performs the same preprocessing as the datasets created
+    by this module, but takes a tensor of waveforms rather than a dataset.
+    It is suitable for use as the preprocessor of a
+    `vesper.util.inference_session.InferenceSession`.
+    """
+    
+    preprocessor = _Preprocessor(mode, settings, feature_name)
+    
+    def preprocess(waveforms):
+        waveforms = tf.map_fn(
+            preprocessor.preprocess_waveform, waveforms, dtype=tf.float32)
+        return preprocessor.compute_spectrograms(waveforms)
+    
+    return preprocess
+
+
 class _Preprocessor:
     
     """
@@ -29,8 +29,6 @@ from vesper.util.sample_buffer import SampleBuffer
 from vesper.util.settings import Settings
 import vesper.mpg_ranch.nfc_coarse_classifier_3_0.classifier_utils \
     as classifier_utils
-import vesper.mpg_ranch.nfc_coarse_classifier_3_0.dataset_utils \
-    as dataset_utils
 import vesper.util.open_mp_utils as open_mp_utils
 import vesper.util.signal_utils as signal_utils
 
@@ -46,7 +44,10 @@ _TSEEP_SETTINGS = Settings(
     hop_size=50,
     threshold=.9,
     initial_clip_padding=.1,
-    clip_duration=.4
+    clip_duration=.4,
+    inference_batch_size=classifier_utils.DEFAULT_INFERENCE_BATCH_SIZE,
+    inference_intra_op_thread_count=0,
+    inference_inter_op_thread_count=0
 )
 
 _THRUSH_SETTINGS = Settings(
@@ -55,10 +56,17 @@ _THRUSH_SETTINGS = Settings(
     hop_size=50,
     threshold=.9,
     initial_clip_padding=.2,
-    clip_duration=.6
+    clip_duration=.6,
+    inference_batch_size=classifier_utils.DEFAULT_INFERENCE_BATCH_SIZE,
+    inference_intra_op_thread_count=0,
+    inference_inter_op_thread_count=0
 )
 
 
+_TSEEP_DETECTOR_GROUP = 'MPG Ranch Tseep Detector 0.0'
+_THRUSH_DETECTOR_GROUP = 'MPG Ranch Thrush Detector 0.0'
+
+
 # Constants controlling detection score output. The output is written to
 # a stereo audio file with detector audio input samples in one channel
 # and detection scores in the other. It is useful for detector debugging,
@@ -93,6 +101,21 @@ class _Detector:
     """
     
     
+    detector_group = None
+    """
+    Name of the group of detectors to which the detector belongs.
+    
+    The detectors of a group differ only in their thresholds, so one
+    detector of the group that is given the thresholds of the others as
+    extra thresholds can do the work of all of them, scoring its input
+    only once.
+    """
+    
+    
+    threshold = None
+    """The detection threshold of the detector."""
+    
+    
     def __init__(
             self, settings, input_sample_rate, listener,
             extra_thresholds=None):
@@ -119,7 +142,7 @@ class _Detector:
         self._input_chunk_start_index = 0
         
         self._classifier_settings = self._load_classifier_settings()
-        self._estimator = self._create_estimator()
+        self._inference_session = self._get_inference_session()
         
         s = self._classifier_settings
         fs = s.waveform_sample_rate
@@ -163,6 +186,14 @@ class _Detector:
         return sorted(thresholds)
     
     
+    def _get_inference_session(self):
+        s = self._settings
+        return classifier_utils.get_inference_session(
+            s.clip_type, s.inference_batch_size,
+            s.inference_intra_op_thread_count,
+            s.inference_inter_op_thread_count)
+    
+    
     def _load_classifier_settings(self):
         s = self._settings
         path = classifier_utils.get_settings_file_path(s.clip_type)
@@ -170,22 +201,6 @@ class _Detector:
         return Settings.create_from_yaml_file(path)
         
         
-    def _create_estimator(self):
-        s = self._settings
-        path = classifier_utils.get_tensorflow_model_dir_path(s.clip_type)
-        logging.info((
-            'Creating TensorFlow estimator from saved model in directory '
-            '"{}"...').format(path))
-        return tf.contrib.estimator.SavedModelEstimator(str(path))
-
-    
-    def _create_dataset(self):
-        s = self._classifier_settings
-        return dataset_utils.create_spectrogram_dataset_from_waveforms_array(
-            self._waveforms, dataset_utils.DATASET_MODE_INFERENCE, s,
-            batch_size=64, feature_name=s.model_input_name)
-    
-    
     def detect(self, samples):
         
         if self._input_buffer is None:
@@ -231,17 +246,17 @@ class _Detector:
             #     'or {:.1f} times faster than real time.').format(
             #         input_duration, processing_time, rate))
 
-        self._waveforms = _get_analysis_records(
+        waveforms = _get_analysis_records(
             samples, self._classifier_waveform_length, self._hop_size)
         
 #         print('Scoring chunk waveforms...')
 #         start_time = time.time()
          
-        scores = classifier_utils.score_dataset_examples(
-            self._estimator, self._create_dataset)
+        scores = classifier_utils.score_waveforms(
+            self._inference_session, waveforms)
         
 #         elapsed_time = time.time() - start_time
-#         num_waveforms = self._waveforms.shape[0]
+#         num_waveforms = waveforms.shape[0]
 #         rate = num_waveforms / elapsed_time
 #         print((
 #             'Scored {} waveforms in {:.1f} seconds, a rate of {:.1f} '
@@ -382,6 +397,8 @@ class TseepDetector(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.0'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = _TSEEP_SETTINGS.threshold
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -401,6 +418,8 @@ class TseepDetector90(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.0 90'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .9
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -412,6 +431,8 @@ class TseepDetector80(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.0 80'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .8
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -423,6 +444,8 @@ class TseepDetector70(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.0 70'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .7
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -434,6 +457,8 @@ class TseepDetector60(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.0 60'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .6
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -445,6 +470,8 @@ class TseepDetector50(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.0 50'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .5
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -456,6 +483,8 @@ class TseepDetector40(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.0 40'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .4
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -467,6 +496,8 @@ class ThrushDetector(_Detector):
      
      
     extension_name = 'MPG Ranch Thrush Detector 0.0'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = _THRUSH_SETTINGS.threshold
      
      
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -478,6 +509,8 @@ class ThrushDetector90(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.0 90'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .9
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -489,6 +522,8 @@ class ThrushDetector80(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.0 80'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .8
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -500,6 +535,8 @@ class ThrushDetector70(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.0 70'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .7
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -511,6 +548,8 @@ class ThrushDetector60(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.0 60'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .6
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -522,6 +561,8 @@ class ThrushDetector50(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.0 50'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .5
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
@@ -533,6 +574,8 @@ class ThrushDetector40(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.0 40'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .4
     
     
     def __init__(self, sample_rate, listener, extra_thresholds=None):
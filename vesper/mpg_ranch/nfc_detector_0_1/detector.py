@@ -36,8 +36,6 @@ from vesper.util.sample_buffer import SampleBuffer
 from vesper.util.settings import Settings
 import vesper.mpg_ranch.nfc_coarse_classifier_3_0.classifier_utils \
     as classifier_utils
-import vesper.mpg_ranch.nfc_coarse_classifier_3_0.dataset_utils \
-    as dataset_utils
 import vesper.signal.resampling_utils as resampling_utils
 import vesper.util.open_mp_utils as open_mp_utils
 import vesper.util.signal_utils as signal_utils
@@ -54,7 +52,10 @@ _TSEEP_SETTINGS = Settings(
     hop_size=50,
     threshold=.9,
     initial_clip_padding=.1,
-    clip_duration=.4
+    clip_duration=.4,
+    inference_batch_size=classifier_utils.DEFAULT_INFERENCE_BATCH_SIZE,
+    inference_intra_op_thread_count=0,
+    inference_inter_op_thread_count=0
 )
 
 _THRUSH_SETTINGS = Settings(
@@ -63,10 +64,17 @@ _THRUSH_SETTINGS = Settings(
     hop_size=50,
     threshold=.9,
     initial_clip_padding=.2,
-    clip_duration=.6
+    clip_duration=.6,
+    inference_batch_size=classifier_utils.DEFAULT_INFERENCE_BATCH_SIZE,
+    inference_intra_op_thread_count=0,
+    inference_inter_op_thread_count=0
 )
 
 
+_TSEEP_DETECTOR_GROUP = 'MPG Ranch Tseep Detector 0.1'
+_THRUSH_DETECTOR_GROUP = 'MPG Ranch Thrush Detector 0.1'
+
+
 _DETECTOR_SAMPLE_RATE = 24000
 
 
@@ -101,12 +109,39 @@ class _Detector:
     thrush coarse classifiers. The `TseepDetector` and `ThrushDetector`
     classes of this module subclass the `_Detector` class with fixed
     settings, namely `_TSEEP_SETTINGS` and  `_THRUSH_SETTINGS`, respectively.
+    
+    A detector can be given an analysis graph (see the
+    `vesper.util.analysis_graph` module) that it shares with other
+    detectors running on the same channel. The detectors then share
+    the resampling of their input to 24000 Hz.
+    """
+    
+    
+    uses_analysis_graph = True
+    """
+    `True` if and only if the detector's initializer accepts an
+    `analysis_graph` keyword argument.
     """
     
     
+    detector_group = None
+    """
+    Name of the group of detectors to which the detector belongs.
+    
+    The detectors of a group differ only in their thresholds, so one
+    detector of the group that is given the thresholds of the others as
+    extra thresholds can do the work of all of them, scoring its input
+    only once.
+    """
+    
+    
+    threshold = None
+    """The detection threshold of the detector."""
+    
+    
     def __init__(
             self, settings, input_sample_rate, listener,
-            extra_thresholds=None):
+            extra_thresholds=None, analysis_graph=None):
         
         open_mp_utils.work_around_multiple_copies_issue()
         
@@ -116,6 +151,7 @@ class _Detector:
         self._settings = settings
         self._input_sample_rate = input_sample_rate
         self._listener = listener
+        self._analysis_graph = analysis_graph
         
         s2f = signal_utils.seconds_to_frames
         
@@ -130,7 +166,7 @@ class _Detector:
         self._input_chunk_start_index = 0
         
         self._classifier_settings = self._load_classifier_settings()
-        self._estimator = self._create_estimator()
+        self._inference_session = self._get_inference_session()
         
         s = self._classifier_settings
         
@@ -181,6 +217,14 @@ class _Detector:
         return sorted(thresholds)
     
     
+    def _get_inference_session(self):
+        s = self._settings
+        return classifier_utils.get_inference_session(
+            s.clip_type, s.inference_batch_size,
+            s.inference_intra_op_thread_count,
+            s.inference_inter_op_thread_count)
+    
+    
     def _load_classifier_settings(self):
         s = self._settings
         path = classifier_utils.get_settings_file_path(s.clip_type)
@@ -188,22 +232,6 @@ class _Detector:
         return Settings.create_from_yaml_file(path)
         
         
-    def _create_estimator(self):
-        s = self._settings
-        path = classifier_utils.get_tensorflow_model_dir_path(s.clip_type)
-        logging.info((
-            'Creating TensorFlow estimator from saved model in directory '
-            '"{}"...').format(path))
-        return tf.contrib.estimator.SavedModelEstimator(str(path))
-
-    
-    def _create_dataset(self):
-        s = self._classifier_settings
-        return dataset_utils.create_spectrogram_dataset_from_waveforms_array(
-            self._waveforms, dataset_utils.DATASET_MODE_INFERENCE, s,
-            batch_size=64, feature_name=s.model_input_name)
-    
-    
     def detect(self, samples):
         
         if self._input_buffer is None:
@@ -229,6 +257,28 @@ class _Detector:
             self._process_input_chunk(chunk)
             
             
+    def _resample(self, samples):
+        
+        fs = self._purported_input_sample_rate
+        
+        def resample():
+            return resampling_utils.resample_to_24000_hz(samples, fs)
+        
+        if self._analysis_graph is None:
+            return resample()
+        
+        else:
+            # Detectors that share an analysis graph all receive the
+            # same input samples and buffer them identically, so they
+            # process the same input chunks during the same graph
+            # processing cycle. We cache each resampled chunk in the
+            # graph so that it is computed only once.
+            key = (
+                'Resampled To 24000 Hz', self._input_chunk_start_index,
+                len(samples), fs)
+            return self._analysis_graph.get_product(key, resample)
+    
+    
     def _process_input_chunk(self, samples):
         
         input_length = len(samples)
@@ -264,8 +314,7 @@ class _Detector:
              
             # start_time = time.time()
             
-            samples = resampling_utils.resample_to_24000_hz(
-                samples, self._purported_input_sample_rate)
+            samples = self._resample(samples)
             
             # processing_time = time.time() - start_time
             # input_duration = input_length / self._input_sample_rate
@@ -280,17 +329,17 @@ class _Detector:
             
             self._purported_input_sample_rate = self._input_sample_rate
             
-        self._waveforms = _get_analysis_records(
+        waveforms = _get_analysis_records(
             samples, self._classifier_waveform_length, self._hop_size)
         
 #         print('Scoring chunk waveforms...')
 #         start_time = time.time()
          
-        scores = classifier_utils.score_dataset_examples(
-            self._estimator, self._create_dataset)
+        scores = classifier_utils.score_waveforms(
+            self._inference_session, waveforms)
         
 #         elapsed_time = time.time() - start_time
-#         num_waveforms = self._waveforms.shape[0]
+#         num_waveforms = waveforms.shape[0]
 #         rate = num_waveforms / elapsed_time
 #         print((
 #             'Scored {} waveforms in {:.1f} seconds, a rate of {:.1f} '
@@ -433,11 +482,16 @@ class TseepDetector(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.1'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = _TSEEP_SETTINGS.threshold
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         super().__init__(
-            _TSEEP_SETTINGS, sample_rate, listener, extra_thresholds)
+            _TSEEP_SETTINGS, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 def _tseep_settings(threshold):
@@ -452,140 +506,217 @@ class TseepDetector90(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.1 90'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .9
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(90)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector80(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.1 80'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .8
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(80)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector70(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.1 70'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .7
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(70)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector60(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.1 60'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .6
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(60)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector50(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.1 50'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .5
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(50)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector40(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 0.1 40'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .4
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(40)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector(_Detector):
      
      
     extension_name = 'MPG Ranch Thrush Detector 0.1'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = _THRUSH_SETTINGS.threshold
      
      
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         super().__init__(
-            _THRUSH_SETTINGS, sample_rate, listener, extra_thresholds)
+            _THRUSH_SETTINGS, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
 
 class ThrushDetector90(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.1 90'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .9
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(90)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector80(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.1 80'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .8
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(80)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector70(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.1 70'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .7
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(70)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector60(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.1 60'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .6
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(60)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector50(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.1 50'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .5
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(50)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector40(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 0.1 40'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .4
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(40)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
@@ -23,14 +23,12 @@ import logging
 import numpy as np
 import tensorflow as tf
 
+from vesper.util.analysis_graph import AnalysisGraph, ResamplingNode
 from vesper.util.detection_score_file_writer import DetectionScoreFileWriter
 from vesper.util.sample_buffer import SampleBuffer
 from vesper.util.settings import Settings
 import vesper.mpg_ranch.nfc_coarse_classifier_4_0.classifier_utils \
     as classifier_utils
-import vesper.mpg_ranch.nfc_coarse_classifier_4_0.dataset_utils \
-    as dataset_utils
-import vesper.signal.resampling_utils as resampling_utils
 import vesper.util.open_mp_utils as open_mp_utils
 import vesper.util.signal_utils as signal_utils
 
@@ -46,7 +44,10 @@ _TSEEP_SETTINGS = Settings(
     hop_size=50,
     threshold=.41,
     initial_clip_padding=.1,
-    clip_duration=.4
+    clip_duration=.4,
+    inference_batch_size=classifier_utils.DEFAULT_INFERENCE_BATCH_SIZE,
+    inference_intra_op_thread_count=0,
+    inference_inter_op_thread_count=0
 )
 
 _THRUSH_SETTINGS = Settings(
@@ -55,10 +56,17 @@ _THRUSH_SETTINGS = Settings(
     hop_size=50,
     threshold=.70,
     initial_clip_padding=.2,
-    clip_duration=.6
+    clip_duration=.6,
+    inference_batch_size=classifier_utils.DEFAULT_INFERENCE_BATCH_SIZE,
+    inference_intra_op_thread_count=0,
+    inference_inter_op_thread_count=0
 )
 
 
+_TSEEP_DETECTOR_GROUP = 'MPG Ranch Tseep Detector 1.0'
+_THRUSH_DETECTOR_GROUP = 'MPG Ranch Thrush Detector 1.0'
+
+
 _DETECTOR_SAMPLE_RATE = 24000
 
 
@@ -93,12 +101,46 @@ class _Detector:
     thrush coarse classifiers. The `TseepDetector` and `ThrushDetector`
     classes of this module subclass the `_Detector` class with fixed
     settings, namely `_TSEEP_SETTINGS` and  `_THRUSH_SETTINGS`, respectively.
+    
+    A detector can be given an analysis graph (see the
+    `vesper.util.analysis_graph` module) that it shares with other
+    detectors running on the same channel. The detectors then share
+    the resampling of their input to 24000 Hz.
+    
+    The detector resamples its input as one continuous signal rather
+    than chunk by chunk, so there are no resampling artifacts at chunk
+    boundaries. Input sample rates of 22050 and 44100 Hz are resampled
+    exactly, like the other common rates. Input at other, uncommon rates
+    is resampled with `resampy` in chunks of about an hour (see the
+    `ResamplingNode` class).
     """
     
     
+    uses_analysis_graph = True
+    """
+    `True` if and only if the detector's initializer accepts an
+    `analysis_graph` keyword argument.
+    """
+    
+    
+    detector_group = None
+    """
+    Name of the group of detectors to which the detector belongs.
+    
+    The detectors of a group differ only in their thresholds, so one
+    detector of the group that is given the thresholds of the others as
+    extra thresholds can do the work of all of them, scoring its input
+    only once.
+    """
+    
+    
+    threshold = None
+    """The detection threshold of the detector."""
+    
+    
     def __init__(
             self, settings, input_sample_rate, listener,
-            extra_thresholds=None):
+            extra_thresholds=None, analysis_graph=None):
         
         open_mp_utils.work_around_multiple_copies_issue()
         
@@ -109,20 +151,29 @@ class _Detector:
         self._input_sample_rate = input_sample_rate
         self._listener = listener
         
+        if analysis_graph is None:
+            self._analysis_graph = AnalysisGraph()
+            self._owns_analysis_graph = True
+        else:
+            self._analysis_graph = analysis_graph
+            self._owns_analysis_graph = False
+        
         s2f = signal_utils.seconds_to_frames
         
         s = self._settings
         fs = self._input_sample_rate
-        self._input_buffer = None
-        self._input_chunk_size = s2f(s.input_chunk_size, fs)
         self._thresholds = self._get_thresholds(extra_thresholds)
         self._clip_start_offset = -s2f(s.initial_clip_padding, fs)
         self._clip_length = s2f(s.clip_duration, fs)
         
-        self._input_chunk_start_index = 0
+        # Buffer of input samples resampled to the classifier sample
+        # rate if needed, which we process in chunks.
+        self._buffer = None
+        self._chunk_size = s2f(s.input_chunk_size, _DETECTOR_SAMPLE_RATE)
+        self._chunk_start_index = 0
         
         self._classifier_settings = self._load_classifier_settings()
-        self._estimator = self._create_estimator()
+        self._inference_session = self._get_inference_session()
         
         s = self._classifier_settings
         
@@ -138,6 +189,12 @@ class _Detector:
         fraction = self._settings.hop_size / 100
         self._hop_size = s2f(fraction * s.waveform_duration, fs)
         
+        if self._input_sample_rate != self._classifier_sample_rate:
+            self._resampling_node = self._analysis_graph.add_node(
+                ResamplingNode(self._input_sample_rate))
+        else:
+            self._resampling_node = None
+        
         if _SCORE_OUTPUT_ENABLED:
             file_path = _SCORE_FILE_PATH_FORMAT.format(settings.clip_type)
             self._score_file_writer = DetectionScoreFileWriter(
@@ -173,6 +230,14 @@ class _Detector:
         return sorted(thresholds)
     
     
+    def _get_inference_session(self):
+        s = self._settings
+        return classifier_utils.get_inference_session(
+            s.clip_type, s.inference_batch_size,
+            s.inference_intra_op_thread_count,
+            s.inference_inter_op_thread_count)
+    
+    
     def _load_classifier_settings(self):
         s = self._settings
         path = classifier_utils.get_settings_file_path(s.clip_type)
@@ -180,109 +245,55 @@ class _Detector:
         return Settings.create_from_yaml_file(path)
         
         
-    def _create_estimator(self):
-        s = self._settings
-        path = classifier_utils.get_tensorflow_model_dir_path(s.clip_type)
-        logging.info((
-            'Creating TensorFlow estimator from saved model in directory '
-            '"{}"...').format(path))
-        return tf.contrib.estimator.SavedModelEstimator(str(path))
-
-    
-    def _create_dataset(self):
-        s = self._classifier_settings
-        return dataset_utils.create_spectrogram_dataset_from_waveforms_array(
-            self._waveforms, dataset_utils.DATASET_MODE_INFERENCE, s,
-            batch_size=64, feature_name=s.model_input_name)
-    
-    
     def detect(self, samples):
         
-        if self._input_buffer is None:
-            self._input_buffer = SampleBuffer(samples.dtype)
-             
-        self._input_buffer.write(samples)
+        if self._owns_analysis_graph:
+            self._analysis_graph.process(samples)
         
-        self._process_input_chunks()
-            
-            
-    def _process_input_chunks(self, process_all_samples=False):
+        if self._resampling_node is not None:
+            samples = self._resampling_node.output
         
-        # Process as many chunks of input samples of size
-        # `self._input_chunk_size` as possible.
-        while len(self._input_buffer) >= self._input_chunk_size:
-            chunk = self._input_buffer.read(self._input_chunk_size)
-            self._process_input_chunk(chunk)
-            
-        # If indicated, process any remaining input samples as one chunk.
-        # The size of the chunk will differ from `self._input_chunk_size`.
-        if process_all_samples and len(self._input_buffer) != 0:
-            chunk = self._input_buffer.read()
-            self._process_input_chunk(chunk)
+        self._write_samples(samples)
+        
+        self._process_chunks()
             
             
-    def _process_input_chunk(self, samples):
+    def _write_samples(self, samples):
         
-        input_length = len(samples)
-        
-        if self._classifier_sample_rate != self._input_sample_rate:
-            # need to resample input
-            
-            # When the input sample rate is 22050 Hz or 44100 Hz,
-            # we resample as though it were 22000 Hz or 44000 Hz,
-            # respectively, resulting in an actual resampled rate of
-            # about 24055 Hz rather than 24000 Hz. This allows us to
-            # resample much faster, and has little or no effect on the
-            # clips [NEED TO SHOW THIS] output by the detector, since
-            # the change to the resampled rate is small (only about a
-            # quarter of a percent), and the detector is fairly
-            # insensitive to small changes in the frequency and duration
-            # of NFCs. We account for such sample rate substitutions
-            # when computing the start index in the input signal of a
-            # detected clip in the `_notify_listener_of_clips` method,
-            # below.
-            #
-            # The lack of rigor inherent in this trick will always make
-            # the processing of 22050 Hz and 44100 Hz input a little
-            # questionable. In the future, I hope to obviate the trick by
-            # implementing faster but proper resampling of 22050 Hz and
-            # 44100 Hz input. 
-            if self._input_sample_rate == 22050:
-                self._purported_input_sample_rate = 22000
-            elif self._input_sample_rate == 44100:
-                self._purported_input_sample_rate = 44000
-            else:
-                self._purported_input_sample_rate = self._input_sample_rate
+        if self._buffer is None:
+            self._buffer = SampleBuffer(samples.dtype)
              
-            # start_time = time.time()
-            
-            samples = resampling_utils.resample_to_24000_hz(
-                samples, self._purported_input_sample_rate)
-            
-            # processing_time = time.time() - start_time
-            # input_duration = input_length / self._input_sample_rate
-            # rate = input_duration / processing_time
-            # print((
-            #     'Resampled {:.1f} seconds of input in {:.1f} seconds, '
-            #     'or {:.1f} times faster than real time.').format(
-            #         input_duration, processing_time, rate))
+        self._buffer.write(samples)
+        
+        
+    def _process_chunks(self, process_all_samples=False):
+        
+        # Process as many chunks of samples of size `self._chunk_size`
+        # as possible.
+        while len(self._buffer) >= self._chunk_size:
+            chunk = self._buffer.read(self._chunk_size)
+            self._process_chunk(chunk)
             
-        else:
-            # don't need to resample input
+        # If indicated, process any remaining samples as one chunk.
+        # The size of the chunk will differ from `self._chunk_size`.
+        if process_all_samples and len(self._buffer) != 0:
+            chunk = self._buffer.read()
+            self._process_chunk(chunk)
             
-            self._purported_input_sample_rate = self._input_sample_rate
             
-        self._waveforms = _get_analysis_records(
+    def _process_chunk(self, samples):
+        
+        waveforms = _get_analysis_records(
             samples, self._classifier_waveform_length, self._hop_size)
         
 #         print('Scoring chunk waveforms...')
 #         start_time = time.time()
          
-        scores = classifier_utils.score_dataset_examples(
-            self._estimator, self._create_dataset)
+        scores = classifier_utils.score_waveforms(
+            self._inference_session, waveforms)
         
 #         elapsed_time = time.time() - start_time
-#         num_waveforms = self._waveforms.shape[0]
+#         num_waveforms = waveforms.shape[0]
 #         rate = num_waveforms / elapsed_time
 #         print((
 #             'Scored {} waveforms in {:.1f} seconds, a rate of {:.1f} '
@@ -296,32 +307,28 @@ class _Detector:
             peak_indices = signal_utils.find_peaks(scores, threshold)
             peak_scores = scores[peak_indices]
             self._notify_listener_of_clips(
-                peak_indices, peak_scores, input_length, threshold)
+                peak_indices, peak_scores, len(samples), threshold)
         
-        self._input_chunk_start_index += input_length
+        self._chunk_start_index += len(samples)
             
 
     def _notify_listener_of_clips(
-            self, peak_indices, peak_scores, input_length, threshold):
+            self, peak_indices, peak_scores, chunk_length, threshold):
         
         # print('Clips:')
         
-        start_offset = self._input_chunk_start_index + self._clip_start_offset
         peak_indices *= self._hop_size
+        peak_indices += self._chunk_start_index
+        
+        chunk_end_index = self._get_input_index(
+            self._chunk_start_index + chunk_length)
         
         for i, score in zip(peak_indices, peak_scores):
             
-            # Convert classification index to input index, accounting for
-            # any difference between classification sample rate and input
-            # rate.
-            f = self._input_sample_rate / self._purported_input_sample_rate
-            classification_sample_rate = f * self._classifier_sample_rate
-            t = signal_utils.get_duration(i, classification_sample_rate)
-            i = signal_utils.seconds_to_frames(t, self._input_sample_rate)
+            i = self._get_input_index(i)
             
-            clip_start_index = i + start_offset
+            clip_start_index = i + self._clip_start_offset
             clip_end_index = clip_start_index + self._clip_length
-            chunk_end_index = self._input_chunk_start_index + input_length
             
             if clip_start_index < 0:
                 logging.warning(
@@ -350,6 +357,17 @@ class _Detector:
                     clip_start_index, self._clip_length, threshold,
                     annotations)
         
+        
+    def _get_input_index(self, index):
+        
+        """
+        Converts a classifier sample rate index to an input sample
+        rate index.
+        """
+        
+        t = signal_utils.get_duration(index, self._classifier_sample_rate)
+        return signal_utils.seconds_to_frames(t, self._input_sample_rate)
+        
 
     def complete_detection(self):
         
@@ -358,7 +376,11 @@ class _Detector:
         for all input.
         """
         
-        self._process_input_chunks(process_all_samples=True)
+        if self._resampling_node is not None:
+            self._write_samples(self._resampling_node.complete())
+            
+        if self._buffer is not None:
+            self._process_chunks(process_all_samples=True)
             
         self._listener.complete_processing()
         
@@ -425,11 +447,16 @@ class TseepDetector(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 1.0'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = _TSEEP_SETTINGS.threshold
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         super().__init__(
-            _TSEEP_SETTINGS, sample_rate, listener, extra_thresholds)
+            _TSEEP_SETTINGS, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 def _tseep_settings(threshold):
@@ -444,184 +471,285 @@ class TseepDetector90(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 1.0 90'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .9
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(90)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector80(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 1.0 80'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .8
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(80)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector70(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 1.0 70'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .7
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(70)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector60(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 1.0 60'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .6
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(60)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector50(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 1.0 50'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .5
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(50)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector40(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 1.0 40'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .4
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(40)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector30(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 1.0 30'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .3
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(30)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class TseepDetector20(_Detector):
     
     
     extension_name = 'MPG Ranch Tseep Detector 1.0 20'
+    detector_group = _TSEEP_DETECTOR_GROUP
+    threshold = .2
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _tseep_settings(20)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector(_Detector):
      
      
     extension_name = 'MPG Ranch Thrush Detector 1.0'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = _THRUSH_SETTINGS.threshold
      
      
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         super().__init__(
-            _THRUSH_SETTINGS, sample_rate, listener, extra_thresholds)
+            _THRUSH_SETTINGS, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
 
 class ThrushDetector90(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 1.0 90'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .9
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(90)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector80(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 1.0 80'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .8
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(80)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector70(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 1.0 70'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .7
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(70)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector60(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 1.0 60'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .6
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(60)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector50(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 1.0 50'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .5
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(50)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
     
 class ThrushDetector40(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 1.0 40'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .4
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(40)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
 
 class ThrushDetector30(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 1.0 30'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .3
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(30)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
 
 
 class ThrushDetector20(_Detector):
     
     
     extension_name = 'MPG Ranch Thrush Detector 1.0 20'
+    detector_group = _THRUSH_DETECTOR_GROUP
+    threshold = .2
     
     
-    def __init__(self, sample_rate, listener, extra_thresholds=None):
+    def __init__(
+            self, sample_rate, listener, extra_thresholds=None,
+            analysis_graph=None):
         settings = _thrush_settings(20)
-        super().__init__(settings, sample_rate, listener, extra_thresholds)
+        super().__init__(
+            settings, sample_rate, listener, extra_thresholds,
+            analysis_graph)
@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+import tensorflow as tf
+
+from vesper.tests.test_case import TestCase
+from vesper.util.settings import Settings
+import vesper.mpg_ranch.nfc_coarse_classifier_4_0.classifier_utils \
+    as classifier_utils
+
+
+_TF_VERSION = int(tf.__version__.split('.')[0])
+
+
+# The coarse classifier spectrogram preprocessors use `tf.contrib`,
+# which is available only in TensorFlow 1.
+@unittest.skipIf(
+    _TF_VERSION != 1, 'coarse classifier preprocessors require TensorFlow 1')
+class CoarseClassifierInferenceSessionTests(TestCase):
+    
+    
+    def test_score_waveforms(self):
+        
+        for clip_type in ('Tseep', 'Thrush'):
+            
+            path = classifier_utils.get_settings_file_path(clip_type)
+            settings = Settings.create_from_yaml_file(path)
+            length = int(round(
+                settings.waveform_duration * settings.waveform_sample_rate))
+            
+            waveforms = np.random.default_rng(0).normal(
+                scale=1000, size=(5, length)).astype('float32')
+            
+            session = classifier_utils.get_inference_session(
+                clip_type, batch_size=2)
+            scores = classifier_utils.score_waveforms(session, waveforms)
+            
+            self.assertEqual(scores.shape, (5,))
+            self.assertTrue(np.all((scores >= 0) & (scores <= 1)))
+            self.assertEqual(session.num_batches, 3)
+            
+            # Scores do not depend on how waveforms are batched.
+            for i, waveform in enumerate(waveforms):
+                score = classifier_utils.score_waveforms(
+                    session, waveform.reshape((1, length)))
+                self._assert_arrays_close(score, scores[i:i + 1])
+            
+            # Callers with the same arguments share a session.
+            self.assertIs(
+                classifier_utils.get_inference_session(
+                    clip_type, batch_size=2),
+                session)
@@ -373,6 +373,8 @@ class ClipImporter:
             creating_job=self._job,
             creating_processor=info.detector)
 
+        model_utils.add_clip_counts([clip])
+        
         _copy_clip_audio_file(file_path, clip)
         
         if info.classification is not None:
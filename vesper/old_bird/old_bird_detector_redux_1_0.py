@@ -18,6 +18,10 @@ import scipy.linalg as linalg
 import scipy.signal as signal
 
 from vesper.util.bunch import Bunch
+from vesper.util.series_processors import (
+    ClipMerger, ClipSuppressor, SeriesProcessor, SeriesProcessorChain,
+    TransientFinder, get_crossings)
+import vesper.util.signal_utils as signal_utils
 
 
 _OLD_FS = 22050.
@@ -178,13 +182,13 @@ class _Detector:
         suppressor_period = int(round(s.suppressor_period * sample_rate))
         
         processors = [
-            _TransientFinder(min_length, max_length),
+            TransientFinder(min_length, max_length),
             _TransientPadder(initial_padding, final_padding),
-            _ClipMerger(),
-            _ClipSuppressor(s.suppressor_count_threshold, suppressor_period)
+            ClipMerger(),
+            ClipSuppressor(s.suppressor_count_threshold, suppressor_period)
         ]
         
-        return _SeriesProcessorChain(processors)
+        return SeriesProcessorChain(processors)
     
         
     @property
@@ -246,13 +250,11 @@ class _Detector:
         rise_indices = np.where(crossing_samples == 1)[0] + offset
         fall_indices = np.where(crossing_samples == -2)[0] + offset
         
-        return sorted(
-            [(i, True) for i in rise_indices] +
-            [(i, False) for i in fall_indices])
+        return get_crossings(rise_indices, fall_indices)
     
     
     def _notify_listener(self, clips):
-        for start_index, length in clips:
+        for start_index, length in clips.tolist():
             self._listener.process_clip(start_index, length)
             
             
@@ -314,22 +316,22 @@ class _Squarer(_SignalProcessor):
         return x * x
     
     
-class _Integrator(_FirFilter):
+class _Integrator(_SignalProcessor):
     
-    # An alternative to making this class an `_FirFilter` subclass would
-    # be to use the `np.cumsum` function to compute the cumulative sum
-    # of the input and then the difference between the result and a
-    # delayed version of the result. That approach is more efficient
-    # but it has numerical problems for sufficiently long inputs
-    # (the cumulative sum of the squared samples grows ever larger, but
-    # the samples do not, so you'll eventually start throwing away sample
-    # bits), so I have chosen not to use it. An alternative would be to use
-    # Cython or Numba or something like that to implement the integration
-    # in a way that is both faster and accurate for arbitrarily long inputs.
+    # We compute moving averages with `signal_utils.moving_average`,
+    # which uses cumulative sums but restarts them regularly so that
+    # they do not lose precision for long inputs. That is much faster
+    # than filtering with an FIR filter whose coefficients are all
+    # `1 / integration_length`, which we did formerly, and yields the
+    # same output up to rounding error.
     
     def __init__(self, integration_length):
-        coefficients = np.ones(integration_length) / integration_length
-        super().__init__(coefficients)
+        super().__init__(integration_length - 1)
+        self._integration_length = integration_length
+        
+        
+    def process(self, x):
+        return signal_utils.moving_average(x, self._integration_length)
 
 
 class _DelayAndDivideProcessor(_SignalProcessor):
@@ -385,152 +387,7 @@ class _SignalProcessorChain(_SignalProcessor):
         return x
     
     
-class _SeriesProcessor:
-    
-    
-    def process(self, items):
-        raise NotImplementedError()
-    
-    
-    def complete_processing(self, items):
-        return self.process(items)
-    
-    
-_STATE_DOWN = 0
-_STATE_UP = 1
-_STATE_HOLDING = 2
-
-
-class _TransientFinder(_SeriesProcessor):
-    
-    """Finds transients in a series of threshold crossings."""
-    
-    
-    def __init__(self, min_length, max_length):
-        
-        self._min_length = min_length
-        self._max_length = max_length
-        
-        self._state = _STATE_DOWN
-        
-        self._start_index = 0
-        """
-        index of start of current transient.
-        
-        The value of this attribute only has meaning for the up and holding
-        states. It does not mean anything for the down state.
-        """
-        
-        
-    def process(self, crossings):
-        
-        transients = []
-        emit = transients.append
-        
-        for index, rise in crossings:
-    
-            if self._state == _STATE_DOWN:
-    
-                if rise:
-                    # rise while down
-    
-                    # Start new transient.
-                    self._start_index = index
-                    self._state = _STATE_UP
-    
-                # Do nothing for fall while down.
-    
-            elif self._state == _STATE_UP:
-    
-                if rise:
-                    # rise while up
-    
-                    if index == self._start_index + self._max_length:
-                        # rise just past end of maximal transient
-                        
-                        # Emit maximal transient.
-                        emit((self._start_index, self._max_length))
-                        
-                        # Return to down state. It seems a little odd that
-                        # a rise would return us to the down state, but
-                        # that is what happens in the original Old Bird
-                        # detector (see line 252 of the original detector
-                        # source code file splimflipflop.c), and our goal
-                        # here is to reimplement that detector. This code
-                        # should seldom execute on real inputs, since it
-                        # should be rare for two consecutive rises to occur
-                        # precisely `self._max_length` samples apart.
-                        self._state = _STATE_DOWN
-                        
-                    elif index > self._start_index + self._max_length:
-                        # rise more than one sample past end of maximal
-                        # transient
-    
-                        # Emit maximal transient
-                        emit((self._start_index, self._max_length))
-    
-                        # Start new transient.
-                        self._start_index = index
-    
-                    # Do nothing for rise before end of maximal transient.
-    
-                else:
-                    # fall while up
-    
-                    if index < self._start_index + self._min_length:
-                        # fall before end of minimal transient
-    
-                        self._state = _STATE_HOLDING
-    
-                    else:
-                        # fall at or after end of minimal transient
-    
-                        length = index - self._start_index
-    
-                        # Truncate transient if after end of maximal transient.
-                        if length > self._max_length:
-                            length = self._max_length
-    
-                        # Emit transient.
-                        emit((self._start_index, length))
-                        
-                        self._state = _STATE_DOWN
-    
-            else:
-                # holding after short transient
-    
-                if rise:
-                    # rise while holding after short transient
-    
-                    if index > self._start_index + self._min_length:
-                        # rise follows end of minimal transient by at least
-                        # one non-transient sample
-                        
-                        # Emit minimal transient.
-                        emit((self._start_index, self._min_length))
-    
-                        # Start new transient.
-                        self._start_index = index
-                        
-                    self._state = _STATE_UP
-    
-                else:
-                    # fall while holding after short transient
-    
-                    if index >= self._start_index + self._min_length:
-                        # fall at or after end of minimal transient
-    
-                        # Emit minimal transient.
-                        emit((self._start_index, self._min_length))
-    
-                        self._state = _STATE_DOWN
-    
-                    # Do nothing for fall before end of minimal transient.
-
-        return transients
-    
-    
-class _TransientPadder(_SeriesProcessor):
+class _TransientPadder(SeriesProcessor):
     
     
     def __init__(self, initial_padding, final_padding):
@@ -540,140 +397,16 @@ class _TransientPadder(_SeriesProcessor):
         
     def process(self, transients):
         
-        clips = []
-        
-        for start_index, length in transients:
-            
-            start_index -= self._initial_padding
-            length += self._initial_padding + self._final_padding
-            
-            if start_index < 0:
-                length += start_index
-                start_index = 0
-                
-            clips.append((start_index, length))
-            
-        return clips
-            
-        
-class _ClipMerger(_SeriesProcessor):
-    
-    
-    def __init__(self):
-        self._prev_start_index = None
-        self._prev_end_index = None
-        
+        # Pad transients, truncating any padding that would precede
+        # the start of the input.
+        start_indices = np.maximum(
+            transients[:, 0] - self._initial_padding, 0)
+        end_indices = \
+            transients[:, 0] + transients[:, 1] + self._final_padding
         
-    def process(self, clips):
-        
-        merged_clips = []
-        
-        for start_index, length in clips:
+        return np.column_stack((start_indices, end_indices - start_indices))
             
-            if self._prev_start_index is None:
-                # first clip
-                 
-                self._remember_clip(start_index, length)
-                 
-            elif start_index <= self._prev_end_index:
-                # not first clip, and new clip overlaps or immediately
-                # follows previous clip
-                     
-                # Merge new clip into previous clip.
-                self._prev_end_index = start_index + length
-                     
-            else:
-                # not first clip, new clip does not overlap previous clip
-                 
-                self._append_previous_clip(merged_clips)
-                self._remember_clip(start_index, length)
-                
-        return merged_clips
-    
-    
-    def _remember_clip(self, start_index, length):
-        self._prev_start_index = start_index
-        self._prev_end_index = start_index + length
-        
-
-    def _append_previous_clip(self, clips):
-        prev_length = self._prev_end_index - self._prev_start_index
-        clips.append((self._prev_start_index, prev_length))
         
-
-    def complete_processing(self, clips):
-        
-        merged_clips = self.process(clips)
-        
-        if self._prev_start_index is not None:
-            # one more clip to emit
-            
-            self._append_previous_clip(merged_clips)
-            
-        return merged_clips
-
-        
-class _ClipSuppressor(_SeriesProcessor):
-    
-    
-    def __init__(self, count_threshold, period):
-        self._count_threshold = count_threshold
-        self._period = period
-        self._recent_start_indices = []
-        
-        
-    def process(self, clips):
-        
-        unsuppressed_clips = []
-        
-        indices = self._recent_start_indices
-             
-        for start_index, length in clips:
-            
-            # Remember clip.
-            indices.append(start_index)
-             
-            # Discard oldest clip if there are more than count threshold.
-            if len(indices) > self._count_threshold:
-                indices.pop(0)
-                 
-            if len(indices) == self._count_threshold:
-                # have enough clips to test for suppression
-                 
-                delta = (indices[-1] - indices[0])
-                 
-                if delta < self._period:
-                    # got more than `self._count_threshold` clips in the
-                    # last `self._period` samples
-                     
-                    # Suppress clip.
-                    continue
-                 
-            # If we get here, the clip was not suppressed.
-            unsuppressed_clips.append((start_index, length))
-            
-        return unsuppressed_clips
-        
-        
-class _SeriesProcessorChain(_SeriesProcessor):
-    
-    
-    def __init__(self, processors):
-        self._processors = processors
-        
-        
-    def process(self, items):
-        for processor in self._processors:
-            items = processor.process(items)
-        return items
-    
-    
-    def complete_processing(self, items):
-        for processor in self._processors:
-            items = processor.complete_processing(items)
-        return items
-    
-    
 class TseepDetector(_Detector):
     
     
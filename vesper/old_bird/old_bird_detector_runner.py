@@ -555,6 +555,8 @@ class _DetectorMonitor(Thread):
                         creating_processor=self._detector
                     )
                     
+                    model_utils.add_clip_counts([clip])
+                    
                     # We must create the clip audio file after creating
                     # the clip row in the database. The file's path
                     # depends on the clip ID, which is set as part of
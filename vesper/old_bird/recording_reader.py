@@ -1,7 +1,7 @@
-import wave
-
 import numpy as np
 
+from vesper.signal.mapped_wave_file import MappedWaveFile
+
 
 class RecordingReader:
     
@@ -78,6 +78,7 @@ class _RecordingFileReader:
         #    length: length of audio file in sample frames
         
         self._file = file_
+        self._wave_file = None
         
         
     @property
@@ -88,28 +89,22 @@ class _RecordingFileReader:
     def read_samples(
             self, channel_num, read_index, num_frames, samples, write_index):
         
-        try:
-            reader = wave.open(str(self._file.path), 'rb')
-        except Exception as e:
-            self._handle_file_error('Open failed', e)
-        
-        with reader:
+        if self._wave_file is None:
             
+            # Open and memory-map file on first read. We keep the file
+            # open for subsequent reads, which typically read a small
+            # number of samples each.
             try:
-                reader.setpos(read_index)
+                self._wave_file = MappedWaveFile(str(self._file.path))
             except Exception as e:
-                self._handle_file_error('Set of read position failed', e)
+                self._handle_file_error('Open failed', e)
                 
-            try:
-                buffer = reader.readframes(num_frames)
-            except Exception as e:
-                self._handle_file_error('Samples read failed', e)
- 
-            s = np.frombuffer(buffer, dtype='<i2')
-            s = s.reshape((num_frames, reader.getnchannels()))
-            s = s.transpose()
+        try:
+            s = self._wave_file.read(read_index, read_index + num_frames)
+        except Exception as e:
+            self._handle_file_error('Samples read failed', e)
             
-            samples[write_index:write_index + num_frames] = s[channel_num]
+        samples[write_index:write_index + num_frames] = s[:, channel_num]
         
         
     def _handle_file_error(self, prefix, exception):
@@ -12,9 +12,10 @@ import numpy as np
 
 # from vesper.pnf.ratio_file_writer import RatioFileWriter
 from vesper.pnf.pnf_energy_detector_1_0 import (
-    Detector, _FirFilter, _seconds_to_samples, _SeriesProcessor,
-    _SeriesProcessorChain)
+    Detector, _FirFilter, _seconds_to_samples)
 from vesper.util.bunch import Bunch
+from vesper.util.series_processors import (
+    SeriesProcessor, SeriesProcessorChain)
 
 
 class BaselineDetector(Detector):
@@ -53,7 +54,7 @@ class BaselineDetector(Detector):
             
         ]
             
-        return _SeriesProcessorChain(processors)
+        return SeriesProcessorChain(processors)
     
         
     def _get_threshold_crossings(self, ratios, threshold):
@@ -102,7 +103,7 @@ _STATE_UP = 1
 _STATE_HOLDING = 2
 
 
-class _TransientFinder(_SeriesProcessor):
+class _TransientFinder(SeriesProcessor):
       
     """Finds transients in a series of threshold crossings."""
       
@@ -231,7 +232,7 @@ class _TransientFinder(_SeriesProcessor):
         return transients
     
     
-class _Clipper(_SeriesProcessor):
+class _Clipper(SeriesProcessor):
     
     
     def __init__(self, initial_padding, duration, sample_rate):
@@ -242,7 +243,8 @@ class _Clipper(_SeriesProcessor):
         
         
     def process(self, clips):
-        return [self._get_bounds(clip) for clip in clips]
+        clips = [self._get_bounds(clip) for clip in clips]
+        return np.array(clips, dtype='int64').reshape(-1, 2)
     
     
     # TODO: Should we do something special if the clip end index is past
@@ -292,8 +294,10 @@ class TseepDetector(BaselineDetector):
     extension_name = 'PNF 2018 Baseline Tseep Detector 1.0'
     
     
-    def __init__(self, sample_rate, listener):
-        super().__init__(_TSEEP_SETTINGS, sample_rate, listener)
+    def __init__(self, sample_rate, listener, analysis_graph=None):
+        super().__init__(
+            _TSEEP_SETTINGS, sample_rate, listener,
+            analysis_graph=analysis_graph)
 
 
 class ThrushDetector(BaselineDetector):
@@ -302,5 +306,7 @@ class ThrushDetector(BaselineDetector):
     extension_name = 'PNF 2018 Baseline Thrush Detector 1.0'
     
     
-    def __init__(self, sample_rate, listener):
-        super().__init__(_THRUSH_SETTINGS, sample_rate, listener)
+    def __init__(self, sample_rate, listener, analysis_graph=None):
+        super().__init__(
+            _THRUSH_SETTINGS, sample_rate, listener,
+            analysis_graph=analysis_graph)
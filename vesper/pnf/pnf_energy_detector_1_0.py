@@ -20,7 +20,10 @@ import numpy as np
 import scipy.signal as signal
 
 # from vesper.pnf.ratio_file_writer import RatioFileWriter
+from vesper.util.analysis_graph import (
+    AnalysisGraph, BandPowerNode, SpectrogramNode)
 from vesper.util.bunch import Bunch
+from vesper.util.series_processors import SeriesProcessor
 import vesper.util.time_frequency_analysis_utils as tfa_utils
 
 
@@ -61,11 +64,10 @@ dominates the cost.
 
 I chose a window size of 5 ms for both detectors. I want them to share a
 window size and hop size if that doesn't hinder performance much, so that
-we will have the option of computing the spectrogram once for both
-detectors. We can't do that now due to a limitation of the Vesper
-detection infrastructure, but if that limitation is removed then sharing
-the spectrogram computation between the detectors will provide a big
-efficiency boost.
+the spectrogram can be computed once for both detectors. When the
+detectors run on the same channel with a shared analysis graph (see the
+`vesper.util.analysis_graph` module), they do share the spectrogram
+computation, which provides a big efficiency boost.
 
 I tried hop sizes of 50, 75, and 100 percent for both detectors with a
 window size of 5 ms. 50 percent was a little better than 75 percent for
@@ -234,23 +236,47 @@ class Detector:
     `ThrushDetector` classes of this module subclass the `Detector`
     class with fixed settings, namely `_TSEEP_SETTINGS` AND
     `_THRUSH_SETTINGS`, respectively.
+    
+    The detector computes its spectrogram and in-band power with the
+    nodes of an analysis graph. If the detector is given an analysis
+    graph that is shared with other detectors on the same channel, the
+    owner of the graph must process each chunk of input with the graph
+    before passing it to the detector's `detect` method. Detectors that
+    share a graph and have the same spectrogram settings (as the tseep
+    and thrush detectors of this module do for any given sample rate)
+    compute the spectrogram only once. If the detector is not given an
+    analysis graph, it creates and processes its own.
+    """
+    
+    
+    uses_analysis_graph = True
+    """
+    `True` if and only if the detector's initializer accepts an
+    `analysis_graph` keyword argument.
     """
     
     
     def __init__(
             self, settings, input_sample_rate, listener,
-            debugging_listener=None):
+            debugging_listener=None, analysis_graph=None):
         
         self._settings = settings
         self._input_sample_rate = input_sample_rate
         self._listener = listener
         self._debugging_listener = debugging_listener
         
+        if analysis_graph is None:
+            self._analysis_graph = AnalysisGraph()
+            self._owns_analysis_graph = True
+        else:
+            self._analysis_graph = analysis_graph
+            self._owns_analysis_graph = False
+        
         self._signal_processor = self._create_signal_processor()
         self._series_processors = self._create_series_processors()
         
         self._num_samples_processed = 0
-        self._unprocessed_samples = np.array([], dtype='float')
+        self._unprocessed_powers = np.array([], dtype='float')
         self._num_samples_generated = 0
         
 #         self._ratio_file_writer = RatioFileWriter(
@@ -267,16 +293,21 @@ class Detector:
         hop_size = _seconds_to_samples(s.window_size * s.hop_size / 100, fs)
         dft_size = tfa_utils.get_dft_size(window_size)
         spectrograph = _Spectrograph(
-            'Spectrograph', s.window_type, window_size, hop_size, dft_size, fs)
+            'Spectrograph', window_size, hop_size, dft_size, fs)
         
         bin_size = spectrograph.bin_size
         start_bin_num = _get_start_bin_num(s.start_frequency, bin_size)
         end_bin_num = _get_end_bin_num(s.end_frequency, bin_size)
-        frequency_integrator = _FrequencyIntegrator(
-            'Frequency Integrator', start_bin_num, end_bin_num,
-            spectrograph.output_sample_rate)
         
-        fs = frequency_integrator.output_sample_rate
+        # Get spectrogram and in-band power nodes from analysis graph,
+        # sharing them with any other detectors that use the graph.
+        graph = self._analysis_graph
+        self._spectrogram_node = graph.add_node(SpectrogramNode(
+            s.window_type, window_size, hop_size, dft_size))
+        self._band_power_node = graph.add_node(BandPowerNode(
+            self._spectrogram_node, start_bin_num, end_bin_num))
+        
+        fs = spectrograph.output_sample_rate
         power_filter = self._create_power_filter(fs)
         
         fs = power_filter.output_sample_rate
@@ -284,16 +315,26 @@ class Detector:
         divider = _Divider('Divider', delay, fs)
         
         processors = [
-            spectrograph,
-            frequency_integrator,
             power_filter,
             divider
         ]
         
-        return _SignalProcessorChain(
-            'Detector', processors, self._input_sample_rate,
+        self._power_processor = _SignalProcessorChain(
+            'Power Processor', processors, spectrograph.output_sample_rate,
             self._debugging_listener)
         
+        # The spectrograph is not part of the chain we return, since its
+        # computations are performed by the analysis graph. We include it
+        # here, however, so the chain has the appropriate record size,
+        # hop size, and output time offset for the detector as a whole.
+        processors = [
+            spectrograph,
+            self._power_processor
+        ]
+        
+        return _SignalProcessorChain(
+            'Detector', processors, self._input_sample_rate)
+        
 
     def _create_power_filter(self, input_sample_rate):
         
@@ -352,12 +393,19 @@ class Detector:
         # functionality from this class to the `_SignalProcessorChain`
         # class, but not to the other signal processor classes.
         
-        # Concatenate unprocessed samples received in previous calls to
-        # this method with new samples.
-        samples = np.concatenate((self._unprocessed_samples, samples))
+        if self._owns_analysis_graph:
+            self._analysis_graph.process(samples)
+        
+        if self._debugging_listener is not None:
+            self._notify_debugging_listener()
+        
+        # Concatenate unprocessed in-band powers from previous calls to
+        # this method with new powers.
+        powers = np.concatenate(
+            (self._unprocessed_powers, self._band_power_node.output))
         
-        # Run signal processors on samples.
-        ratios = self._signal_processor.process(samples)
+        # Run signal processors on powers.
+        ratios = self._power_processor.process(powers)
            
         # self._ratio_file_writer.write(samples, ratios)
           
@@ -370,8 +418,19 @@ class Detector:
         num_samples_processed = \
             num_samples_generated * self._signal_processor.hop_size
         self._num_samples_processed += num_samples_processed
-        self._unprocessed_samples = samples[num_samples_processed:]
+        self._unprocessed_powers = powers[num_samples_generated:]
         self._num_samples_generated += num_samples_generated
+    
+    
+    def _notify_debugging_listener(self):
+        
+        fs = self._input_sample_rate / self._spectrogram_node.hop_size
+        
+        self._debugging_listener.handle_samples(
+            'Spectrograph', self._spectrogram_node.output, fs)
+        
+        self._debugging_listener.handle_samples(
+            'Frequency Integrator', self._band_power_node.output, fs)
             
             
     def _get_threshold_crossings(self, ratios, threshold):
@@ -398,7 +457,7 @@ class Detector:
     
     
     def _notify_listener(self, clips, threshold):
-        for start_index, length in clips:
+        for start_index, length in clips.tolist():
             self._listener.process_clip(start_index, length, threshold)
             
             
@@ -511,39 +570,24 @@ class _SignalProcessor:
         
 class _Spectrograph(_SignalProcessor):
     
+    """
+    Spectrograph description.
+    
+    The spectrogram computations themselves are performed by a
+    `SpectrogramNode` of the detector's analysis graph.
+    """
+    
     
     def __init__(
-            self, name, window_type, window_size, hop_size, dft_size,
-            input_sample_rate):
+            self, name, window_size, hop_size, dft_size, input_sample_rate):
         
         super().__init__(name, window_size, hop_size, input_sample_rate)
-        
-        self.window = signal.get_window(window_type, window_size)
-        # self.window = HannWindow(window_size).samples
         self.dft_size = dft_size
         
         
     @property
     def bin_size(self):
         return self.input_sample_rate / self.dft_size
-    
-    
-    def process(self, x):
-        return tfa_utils.compute_spectrogram(
-            x, self.window, self.hop_size, self.dft_size)
-
-
-class _FrequencyIntegrator(_SignalProcessor):
-    
-    
-    def __init__(self, name, start_bin_num, end_bin_num, input_sample_rate):
-        super().__init__(name, 1, 1, input_sample_rate)
-        self.start_bin_num = start_bin_num
-        self.end_bin_num = end_bin_num
-        
-        
-    def process(self, x):
-        return x[:, self.start_bin_num:self.end_bin_num].sum(axis=1)
 
         
 class _FirFilter(_SignalProcessor):
@@ -663,18 +707,7 @@ class _SignalProcessorChain(_SignalProcessor):
         return x
     
     
-class _SeriesProcessor:
-    
-    
-    def process(self, items):
-        raise NotImplementedError()
-    
-    
-    def complete_processing(self, items):
-        return self.process(items)
-    
-    
-class _Clipper(_SeriesProcessor):
+class _Clipper(SeriesProcessor):
      
     """Finds transients in a series of threshold crossings."""
      
@@ -687,36 +720,15 @@ class _Clipper(_SeriesProcessor):
                   
          
     def process(self, crossings):
-            
-        clips = []
-            
-        for time in crossings:
         
-            start_time = max(time - self._initial_padding, 0)
-            start_index = _seconds_to_samples(
-                start_time, self._sample_rate)
-            clips.append((start_index, self._length))
-                  
-        return clips
-
-
-class _SeriesProcessorChain(_SeriesProcessor):
-    
-    
-    def __init__(self, processors):
-        self._processors = processors
+        # Crossings are times in seconds.
+        times = np.asarray(crossings, dtype='float64')
         
+        start_times = np.maximum(times - self._initial_padding, 0)
+        start_indices = np.rint(start_times * self._sample_rate)
+        lengths = np.full(len(start_indices), self._length)
         
-    def process(self, items):
-        for processor in self._processors:
-            items = processor.process(items)
-        return items
-    
-    
-    def complete_processing(self, items):
-        for processor in self._processors:
-            items = processor.complete_processing(items)
-        return items
+        return np.column_stack((start_indices, lengths)).astype('int64')
 
 
 class TseepDetector(Detector):
@@ -725,8 +737,10 @@ class TseepDetector(Detector):
     extension_name = 'PNF Tseep Energy Detector 1.0'
     
     
-    def __init__(self, sample_rate, listener):
-        super().__init__(_TSEEP_SETTINGS, sample_rate, listener)
+    def __init__(self, sample_rate, listener, analysis_graph=None):
+        super().__init__(
+            _TSEEP_SETTINGS, sample_rate, listener,
+            analysis_graph=analysis_graph)
 
     
 class ThrushDetector(Detector):
@@ -735,5 +749,7 @@ class ThrushDetector(Detector):
     extension_name = 'PNF Thrush Energy Detector 1.0'
     
     
-    def __init__(self, sample_rate, listener):
-        super().__init__(_THRUSH_SETTINGS, sample_rate, listener)
+    def __init__(self, sample_rate, listener, analysis_graph=None):
+        super().__init__(
+            _THRUSH_SETTINGS, sample_rate, listener,
+            analysis_graph=analysis_graph)
@@ -0,0 +1,264 @@
+"""Module containing class `MappedWaveFile`."""
+
+
+import struct
+
+import numpy as np
+
+from vesper.signal.unsupported_audio_file_error import UnsupportedAudioFileError
+
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+_INTEGER_DTYPES = {
+    8: np.dtype(np.uint8),              # unsigned as per WAVE file spec
+    16: np.dtype('<i2'),
+    24: None,                           # NumPy has no 24-bit type
+    32: np.dtype('<i4')
+}
+
+_FLOAT_DTYPES = {
+    32: np.dtype('<f4'),
+    64: np.dtype('<f8')
+}
+
+_SAMPLE_DTYPE = np.dtype('<i2')
+
+_FLOAT_SAMPLE_SCALE_FACTOR = 32767
+
+
+class MappedWaveFile:
+    
+    """
+    WAVE audio file whose sample data are memory-mapped.
+    
+    A `MappedWaveFile` parses the header of a WAVE file once, and then
+    memory-maps the file's data chunk. Reads of integer files other
+    than 24-bit ones return NumPy views of the mapped data rather than
+    copies. The views are read-only.
+    
+    A `MappedWaveFile` supports uncompressed 8-, 16-, 24-, and 32-bit
+    integer files, and 32- and 64-bit floating point files, including
+    files with `WAVE_FORMAT_EXTENSIBLE` format chunks. Since the rest
+    of Vesper assumes 16-bit samples, reads of files with samples that
+    are not 8- or 16-bit integers return 16-bit samples, in the `dtype`
+    of this object. 24- and 32-bit integer samples are shifted right
+    to 16 bits, and floating point samples in [-1, 1] are scaled by
+    32767 and clipped. The `sample_size` and `sample_format` attributes
+    of this object describe the samples of the file itself.
+    
+    A `MappedWaveFile` can also be created from a file-like object. In
+    that case the object's contents are read into memory rather than
+    memory-mapped.
+    """
+    
+    
+    def __init__(self, file, name='WAV file'):
+        
+        """
+        Initializes this object for the specified file.
+        
+        `file` may be either a file path or a file-like object. `name`
+        is used in error messages.
+        
+        Raises `UnsupportedAudioFileError` if the file has a format
+        that is not supported, or `OSError` if the file could not be
+        opened or its header is malformed.
+        """
+        
+        self._name = name
+        
+        if hasattr(file, 'read'):
+            # `file` is a file-like object
+            
+            data = np.frombuffer(file.read(), dtype=np.uint8)
+        
+        else:
+            # `file` is a file path
+            
+            try:
+                data = np.memmap(file, dtype=np.uint8, mode='r')
+            except ValueError:
+                # file is empty (NumPy can't memory-map an empty file)
+                data = np.zeros(0, dtype=np.uint8)
+            
+            # Use an `ndarray` view of the memory map, so that samples
+            # we return are `ndarray` views rather than `memmap` views.
+            data = data.view(np.ndarray)
+        
+        self._parse_header(data)
+        
+        # Get frame-first sample array, or raw bytes for 24-bit samples.
+        end_offset = self._data_offset + \
+            self.available_frame_count * self._frame_size
+        data = data[self._data_offset:end_offset]
+        
+        if self._file_dtype is None:
+            self._samples = data.reshape(
+                (self.available_frame_count, self.channel_count, 3))
+        else:
+            self._samples = data.view(self._file_dtype).reshape(
+                (self.available_frame_count, self.channel_count))
+    
+    
+    def _parse_header(self, data):
+        
+        size = len(data)
+        
+        if size < 12 or data[:4].tobytes() != b'RIFF' or \
+                data[8:12].tobytes() != b'WAVE':
+            raise OSError(f'Could not read metadata from {self._name}.')
+        
+        fmt = None
+        offset = 12
+        
+        # Find format and data chunks.
+        while offset + 8 <= size:
+            
+            chunk_id = data[offset:offset + 4].tobytes()
+            chunk_size, = struct.unpack_from('<I', data, offset + 4)
+            chunk_offset = offset + 8
+            
+            if chunk_id == b'fmt ':
+                fmt = data[chunk_offset:chunk_offset + chunk_size].tobytes()
+            
+            elif chunk_id == b'data':
+                
+                if fmt is None:
+                    break
+                
+                self._parse_format_chunk(fmt)
+                
+                self._data_offset = chunk_offset
+                self.frame_count = chunk_size // self._frame_size
+                
+                # The file may have been truncated, for example if the
+                # process writing it ended abnormally.
+                available_size = min(chunk_size, size - chunk_offset)
+                self.available_frame_count = \
+                    available_size // self._frame_size
+                
+                return
+            
+            # Chunks are padded to even sizes.
+            offset = chunk_offset + chunk_size + (chunk_size & 1)
+        
+        raise OSError(f'Could not read metadata from {self._name}.')
+    
+    
+    def _parse_format_chunk(self, fmt):
+        
+        if len(fmt) < 16:
+            raise OSError(f'Could not read metadata from {self._name}.')
+        
+        (format_tag, self.channel_count, self.frame_rate, _, block_align,
+         self.sample_size) = struct.unpack_from('<HHIIHH', fmt)
+        
+        if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            # format tag is first two bytes of subformat GUID
+            format_tag, = struct.unpack_from('<H', fmt, 24)
+        
+        if format_tag == _WAVE_FORMAT_PCM:
+            self.sample_format = 'integer'
+            dtypes = _INTEGER_DTYPES
+        
+        elif format_tag == _WAVE_FORMAT_IEEE_FLOAT:
+            self.sample_format = 'floating point'
+            dtypes = _FLOAT_DTYPES
+        
+        else:
+            raise UnsupportedAudioFileError(
+                f'{self._name} has unsupported format tag '
+                f'0x{format_tag:04X}.')
+        
+        if self.sample_size not in dtypes:
+            raise UnsupportedAudioFileError(
+                f'{self._name} contains {self.sample_size}-bit '
+                f'{self.sample_format} samples, which are not supported.')
+        
+        if self.channel_count == 0:
+            raise OSError(f'{self._name} has no channels.')
+        
+        self._file_dtype = dtypes[self.sample_size]
+        
+        if self.sample_size == 8:
+            self.dtype = self._file_dtype
+        else:
+            self.dtype = _SAMPLE_DTYPE
+        
+        self._frame_size = self.channel_count * self.sample_size // 8
+        
+        if block_align != self._frame_size:
+            raise UnsupportedAudioFileError(
+                f'{self._name} has unsupported block alignment of '
+                f'{block_align} bytes.')
+    
+    
+    def read(self, start_index, end_index):
+        
+        """
+        Reads the specified frames of this file.
+        
+        Returns a frame-first, two-dimensional NumPy array of samples
+        of type `self.dtype`. The array's transpose is a channel-first
+        view of the same samples.
+        
+        Raises `OSError` if the file has been closed or the frames are
+        not all present in the file.
+        """
+        
+        if self._samples is None:
+            raise OSError(f'Cannot read from closed {self._name}.')
+        
+        if end_index > self.available_frame_count:
+            raise OSError(
+                f'Got fewer samples than expected from read of '
+                f'{self._name}.')
+        
+        samples = self._samples[start_index:end_index]
+        
+        if self.sample_format == 'floating point':
+            return _convert_float_samples(samples)
+        
+        elif self.sample_size == 24:
+            return _convert_24_bit_samples(samples)
+        
+        elif self.sample_size == 32:
+            return _convert_32_bit_samples(samples)
+        
+        else:
+            return samples
+    
+    
+    def close(self):
+        
+        # We don't close the memory map explicitly, since samples we have
+        # returned may still refer to it. It is closed when the last
+        # reference to it is released.
+        self._samples = None
+
+
+def _convert_24_bit_samples(samples):
+    
+    # `samples` is an array of shape (frame count, channel count, 3)
+    # of bytes. The high two bytes of each little-endian sample are
+    # the sample shifted right by eight bits.
+    frame_count, channel_count, _ = samples.shape
+    data = np.ascontiguousarray(samples[:, :, 1:])
+    return data.view(_SAMPLE_DTYPE).reshape((frame_count, channel_count))
+
+
+def _convert_32_bit_samples(samples):
+    
+    # The high halves of the little-endian samples are the samples
+    # shifted right by 16 bits. We return a view of them rather than
+    # a copy.
+    return samples.view(_SAMPLE_DTYPE)[:, 1::2]
+
+
+def _convert_float_samples(samples):
+    samples = np.round(samples * _FLOAT_SAMPLE_SCALE_FACTOR)
+    samples = np.clip(samples, -32768, 32767)
+    return samples.astype(_SAMPLE_DTYPE)
@@ -0,0 +1,122 @@
+"""Module containing class `MultiFileSignal`."""
+
+
+from bisect import bisect_right
+import itertools
+
+import numpy as np
+
+from vesper.signal.sample_provider import SampleProvider
+from vesper.signal.signal import Signal
+from vesper.signal.time_axis import TimeAxis
+
+
+class MultiFileSignal(Signal):
+    
+    """
+    Signal whose samples are those of a sequence of audio files, one
+    after the other.
+    
+    A multi-file signal presents a recording that comprises several
+    consecutive audio files as a single signal, so that its users
+    needn't concern themselves with file boundaries. The files must
+    all have the same frame rate, channel count, and sample type.
+    
+    The signal gets the samples of its files from a *file reader*,
+    a function `read(file_num, start_index, end_index)` that returns a
+    frame-first, two-dimensional NumPy array of frames `start_index`
+    through `end_index - 1` of the specified file. A request for
+    samples that span several files reads each of them just once, and
+    concatenates the results. A request for samples within a single
+    file returns (a view of) the array that the file reader returns.
+    """
+    
+    
+    def __init__(
+            self, file_lengths, frame_rate, channel_count, dtype,
+            file_reader, name=None):
+        
+        file_start_indices = list(itertools.accumulate(file_lengths))
+        length = file_start_indices[-1] if len(file_start_indices) else 0
+        file_start_indices = [0] + file_start_indices[:-1]
+        
+        time_axis = TimeAxis(length, frame_rate)
+        
+        sample_provider = _SampleProvider(
+            file_start_indices, list(file_lengths), channel_count, dtype,
+            file_reader)
+        
+        super().__init__(
+            time_axis, channel_count, (), dtype, sample_provider, name)
+        
+        self._file_start_indices = tuple(file_start_indices)
+    
+    
+    @property
+    def file_start_indices(self):
+        return self._file_start_indices
+
+
+class _SampleProvider(SampleProvider):
+    
+    
+    def __init__(
+            self, file_start_indices, file_lengths, channel_count, dtype,
+            file_reader):
+        
+        super().__init__(True)
+        self._file_start_indices = file_start_indices
+        self._file_lengths = file_lengths
+        self._channel_count = channel_count
+        self._dtype = dtype
+        self._read = file_reader
+    
+    
+    def get_samples(self, frame_key, channel_key):
+        
+        if isinstance(frame_key, int):
+            file_num, index = self._get_file_index(frame_key)
+            samples = self._read(file_num, index, index + 1)
+            return samples[0, channel_key]
+        
+        start_index = frame_key.start
+        remaining = frame_key.stop - start_index
+        
+        if remaining == 0:
+            samples = np.zeros((0, self._channel_count), self._dtype)
+            return samples[:, channel_key]
+        
+        file_num, index = self._get_file_index(start_index)
+        
+        # Read samples from each file that contains some of them.
+        arrays = []
+        
+        while True:
+            
+            length = min(self._file_lengths[file_num] - index, remaining)
+            samples = self._read(file_num, index, index + length)
+            arrays.append(samples[:, channel_key])
+            
+            remaining -= length
+            
+            if remaining == 0:
+                break
+            
+            file_num += 1
+            index = 0
+        
+        if len(arrays) == 1:
+            return arrays[0]
+        else:
+            return np.concatenate(arrays)
+    
+    
+    def _get_file_index(self, index):
+        
+        """
+        Gets the number of the file containing the specified signal
+        index, and the corresponding index in that file.
+        """
+        
+        file_num = bisect_right(self._file_start_indices, index) - 1
+        return file_num, index - self._file_start_indices[file_num]
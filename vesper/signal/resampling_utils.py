@@ -3,14 +3,11 @@
 
 import numbers
 
+import numpy as np
 import resampy
 import scipy.signal as signal
  
 
-# TODO: Create `Resampler` class whose instances can resample a signal
-# in chunks, producing the same samples that would be produced if the
-# signal was processed all at once.
-
 # TODO: Try using combined fractional delay/lowpass filters designed
 # as such rather than multirate polyphase filters derived from a single
 # lowpass filter for resampling.
@@ -21,17 +18,22 @@ def resample_to_24000_hz(samples, input_rate):
     """
     Resamples audio samples to 24000 Hz.
     
-    For input sample rates of 22000 (not 22050), 32000, 44000 (not 44100),
-    and 48000 Hz, this function performs fast, high-quality resampling
+    For input sample rates of 22000, 22050, 32000, 44000, 44100, and
+    48000 Hz, this function performs fast, high-quality resampling
     (using multirate, polyphase FIR filtering) to 24000 Hz. For all other
-    rates (including 22050 Hz and 44100 Hz), it falls back on
-    `resampy.resample` with the default `kaiser_best` filter.
+    rates, it falls back on `resampy.resample` with the default
+    `kaiser_best` filter.
     
     This function was developed for use with NFC detectors that
     require 24000 Hz input (or close to that) and ignore the portion of
     the input above 10000 Hz. For the input sample rates for which the
     function does not fall back on `resampy`, the output is highly
     faithful to the input up to 10000 Hz, but is attenuated above that.
+    
+    To resample a long signal in chunks, use a `Resampler` rather than
+    calling this function once per chunk: the `Resampler` produces the
+    same output as this function would for the whole signal, while
+    this function produces filter transients at the chunk boundaries.
 
     Parameters
     ----------
@@ -61,19 +63,230 @@ def resample_to_24000_hz(samples, input_rate):
         result = signal.resample_poly(samples, up, down, window=filter_)
         
         # Always return an array that has the same dtype as the input.
-        if result.dtype != samples.dtype:
-            
-            # If result will be integral, round and clip samples.
-            if issubclass(samples.dtype.type, numbers.Integral):
-                result.round(out=result)
-                _clip_samples(result, samples.dtype)
-                
-            return result.astype(samples.dtype)
+        return _convert_samples(result, samples.dtype)
         
     else:
         return resampy.resample(samples, input_rate, 24000)
        
         
+class Resampler:
+    
+    """
+    Resamples audio to 24000 Hz in chunks.
+    
+    A resampler resamples a signal that is presented to it as a sequence
+    of consecutive chunks, one per call to its `process` method. The
+    resampler retains the input samples that it will need to compute
+    output samples for later chunks, so that the concatenation of its
+    outputs is exactly the output of `resample_to_24000_hz` for the
+    whole signal, with no filter transients at chunk boundaries. Output
+    sample `i` is for time `i / 24000` seconds from the start of the
+    input.
+    
+    A resampler supports the input sample rates for which
+    `resample_to_24000_hz` performs polyphase resampling, i.e. 22000,
+    22050, 32000, 44000, 44100, and 48000 Hz.
+    """
+    
+    
+    def __init__(self, input_rate):
+        
+        case = _24000_HZ_SPECIAL_CASES.get(float(input_rate))
+        
+        if case is None:
+            raise ValueError(
+                f'Unsupported resampler input sample rate {input_rate} Hz.')
+        
+        up, down, filter_ = case
+        
+        self._input_rate = input_rate
+        self._up = up
+        self._down = down
+        
+        # We scale the filter and compensate for its delay as
+        # `scipy.signal.resample_poly` does.
+        self._filter = up * np.array(filter_, dtype='float64')
+        self._half_len = (len(self._filter) - 1) // 2
+        
+        # Multiplicative inverse of `up` modulo `down`.
+        self._up_inverse = pow(up, -1, down)
+        
+        # Retained input samples and the index in the input of the first
+        # of them.
+        self._samples = np.zeros(0)
+        self._samples_start_index = 0
+        
+        self._input_length = 0
+        self._output_length = 0
+        
+        self._dtype = None
+    
+    
+    @property
+    def input_rate(self):
+        return self._input_rate
+    
+    
+    @property
+    def output_rate(self):
+        return 24000
+    
+    
+    @property
+    def input_length(self):
+        
+        """The number of input samples processed so far."""
+        
+        return self._input_length
+    
+    
+    @property
+    def output_length(self):
+        
+        """The number of output samples produced so far."""
+        
+        return self._output_length
+    
+    
+    def process(self, samples, final=False):
+        
+        """
+        Resamples the next chunk of input samples.
+        
+        Parameters
+        ----------
+        samples : NumPy array
+            the next chunk of input samples. The chunk can be empty.
+        
+        final : bool
+            `True` if and only if the chunk is the last one. If so, the
+            resampler outputs all of its remaining output samples,
+            taking input samples past the end of the chunk to be zero.
+        
+        Returns
+        -------
+        NumPy array
+            the output samples that can be computed from the input so
+            far. Output samples that depend on input samples that have
+            not yet been processed are withheld until those samples are
+            processed, or until a final chunk is processed. The output
+            samples have the same dtype as the first input chunk.
+        """
+        
+        if self._dtype is None:
+            self._dtype = samples.dtype
+        
+        self._samples = np.concatenate((self._samples, samples))
+        self._input_length += len(samples)
+        
+        up = self._up
+        down = self._down
+        half_len = self._half_len
+        filter_length = len(self._filter)
+        input_length = self._input_length
+        
+        # Output sample `i` is sample `i * down + half_len` of the
+        # result of upsampling the input by `up` and then filtering,
+        # and so depends on input samples through index
+        # `(i * down + half_len) // up`.
+        start = self._output_length
+        if final:
+            end = -(-input_length * up // down)
+        else:
+            end = (input_length * up - 1 - half_len) // down + 1
+        end = max(end, start)
+        
+        if end == start:
+            result = np.zeros(0)
+        
+        else:
+            
+            first = start * down + half_len
+            last = (end - 1) * down + half_len
+            
+            # Get the index of the first input sample needed for the
+            # first output sample, and then back up to an input sample
+            # whose upsampled index differs from that of the first
+            # output sample by a multiple of `down`, so that
+            # `scipy.signal.upfirdn` computes the output samples we want.
+            index = _ceil_div(first - filter_length + 1, up)
+            index -= ((index * up - first) * self._up_inverse) % down
+            end_index = min(last // up + 1, input_length)
+            
+            x = self._get_samples(index, end_index)
+            
+            if len(x) == 0:
+                result = np.zeros(0)
+            else:
+                result = signal.upfirdn(self._filter, x, up, down)
+                
+            offset = (first - index * up) // down
+            result = result[offset:offset + end - start]
+            
+            if len(result) < end - start:
+                # final output samples depend only on zero samples
+                # following input
+                
+                result = np.concatenate(
+                    (result, np.zeros(end - start - len(result))))
+            
+        self._output_length = end
+        
+        self._discard_unneeded_samples()
+        
+        return _convert_samples(result, self._dtype)
+    
+    
+    def _get_samples(self, start_index, end_index):
+        
+        # Gets input samples, taking samples preceding the input to be
+        # zero.
+        
+        offset = self._samples_start_index
+        start = max(start_index, 0) - offset
+        samples = self._samples[start:end_index - offset]
+        
+        if start_index < 0:
+            samples = np.concatenate((np.zeros(-start_index), samples))
+        
+        return samples
+    
+    
+    def _discard_unneeded_samples(self):
+        
+        # Get the index of the first input sample that `process` might
+        # need for the next output sample.
+        first = self._output_length * self._down + self._half_len
+        index = _ceil_div(first - len(self._filter) + 1, self._up)
+        index -= self._down - 1
+        
+        num_samples = index - self._samples_start_index
+        
+        if num_samples > 0:
+            self._samples = self._samples[num_samples:]
+            self._samples_start_index = index
+
+
+def _ceil_div(a, b):
+    return -(-a // b)
+
+
+def _convert_samples(samples, dtype):
+    
+    """Converts resampled samples to the specified dtype."""
+    
+    if samples.dtype != dtype:
+        
+        # If result will be integral, round and clip samples.
+        if issubclass(dtype.type, numbers.Integral):
+            samples = samples.round()
+            _clip_samples(samples, dtype)
+            
+        samples = samples.astype(dtype)
+        
+    return samples
+
+
 def _clip_samples(samples, dtype):
     
     """
@@ -1193,10 +1406,46 @@ _FILTER_11 = [
 ]
 
 
+def _design_filter_147():
+    
+    """
+    Designs an FIR filter for resampling between 22050 or 44100 Hz and
+    24000 Hz.
+    
+    The filter operates at 3528000 Hz, the least common multiple of
+    22050, 44100, and 24000 Hz, and has the same pass band and stop
+    band as the filters above. It has about 15000 coefficients, too
+    many to list here, so we design it with the Kaiser window method
+    when this module is loaded, which takes only a few milliseconds.
+    
+    sampling frequency: 3528000 Hz
+    
+    * 0 Hz - 10000 Hz
+      gain = 1
+      actual ripple < .00001 dB
+    
+    * 12000 Hz - 1764000 Hz
+      gain = 0
+      actual attenuation < -130 dB
+    """
+    
+    sample_rate = 3528000
+    nyquist_rate = sample_rate / 2
+    length, beta = signal.kaiserord(132, 2000 / nyquist_rate)
+    length |= 1
+    return signal.firwin(
+        length, 11000, window=('kaiser', beta), fs=sample_rate)
+
+
+_FILTER_147 = _design_filter_147()
+
+
 _24000_HZ_SPECIAL_CASES = {
     22000.: (12, 11, _FILTER_11),
+    22050.: (160, 147, _FILTER_147),
     32000.: (3, 4, _FILTER_4),
     44000.: (6, 11, _FILTER_11),
+    44100.: (80, 147, _FILTER_147),
     48000.: (1, 2, _FILTER_2)
 }
 """
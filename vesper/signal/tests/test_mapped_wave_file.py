@@ -0,0 +1,126 @@
+import io
+import struct
+
+import numpy as np
+
+from vesper.signal.mapped_wave_file import MappedWaveFile
+from vesper.signal.unsupported_audio_file_error import UnsupportedAudioFileError
+from vesper.tests.test_case import TestCase
+
+
+# frame-first samples of a two-channel file
+_SAMPLES = np.array([
+    [0, 1000],
+    [1, -1000],
+    [-1, 8388607],
+    [100, -8388608],
+    [-100, 12345]], dtype='<i4')
+
+
+class MappedWaveFileTests(TestCase):
+    
+    
+    def test_integer_files(self):
+        
+        for sample_size in (16, 24, 32):
+            
+            # Samples of the file.
+            if sample_size == 16:
+                file_samples = _SAMPLES >> 8
+            else:
+                file_samples = _SAMPLES << (sample_size - 24)
+            
+            # Samples read from the file, which are 16-bit.
+            samples = (_SAMPLES >> 8).astype('<i2')
+            
+            for extensible in (False, True):
+                data = _create_file(
+                    1, sample_size, _get_bytes(file_samples, sample_size),
+                    extensible)
+                wave_file = MappedWaveFile(io.BytesIO(data))
+                self._assert_file(wave_file, samples, sample_size)
+    
+    
+    def test_float_files(self):
+        
+        # Samples read from the file, which are 16-bit.
+        samples = np.array([
+            [0, 16384],
+            [1, -16384],
+            [-1, 32767],
+            [100, -32768],
+            [-100, 32767]], dtype='<i2')
+        
+        # Samples of the file, including some outside of [-1, 1] that
+        # are clipped.
+        file_samples = samples / 32767
+        file_samples[2:, 1] = [1.5, -1.5, 1]
+        file_samples[0:2, 1] = [.5, -.5]
+        
+        for sample_size, dtype in ((32, '<f4'), (64, '<f8')):
+            data = _create_file(
+                3, sample_size, file_samples.astype(dtype).tobytes())
+            wave_file = MappedWaveFile(io.BytesIO(data))
+            self._assert_file(wave_file, samples, sample_size)
+    
+    
+    def _assert_file(self, wave_file, samples, sample_size):
+        
+        self.assertEqual(wave_file.channel_count, 2)
+        self.assertEqual(wave_file.frame_rate, 24000)
+        self.assertEqual(wave_file.sample_size, sample_size)
+        self.assertEqual(wave_file.frame_count, 5)
+        self.assertEqual(wave_file.dtype, np.dtype('<i2'))
+        
+        s = wave_file.read(1, 4)
+        self.assertEqual(s.dtype, np.dtype('<i2'))
+        self.assertTrue(np.array_equal(s, samples[1:4]))
+        
+        self.assertRaises(OSError, wave_file.read, 0, 6)
+    
+    
+    def test_unsupported_file(self):
+        data = _create_file(3, 16, bytes(20))
+        self.assertRaises(
+            UnsupportedAudioFileError, MappedWaveFile, io.BytesIO(data))
+    
+    
+    def test_truncated_file(self):
+        data = _create_file(1, 16, bytes(20))[:-3]
+        wave_file = MappedWaveFile(io.BytesIO(data))
+        self.assertEqual(wave_file.frame_count, 5)
+        self.assertEqual(wave_file.available_frame_count, 4)
+        self.assertRaises(OSError, wave_file.read, 0, 5)
+
+
+def _get_bytes(samples, sample_size):
+    
+    if sample_size == 24:
+        # Keep low three bytes of each little-endian 32-bit sample.
+        data = samples.astype('<i4').view(np.uint8).reshape((-1, 4))
+        return data[:, :3].tobytes()
+    
+    else:
+        return samples.astype(f'<i{sample_size // 8}').tobytes()
+
+
+def _create_file(format_tag, sample_size, data, extensible=False):
+    
+    channel_count = 2
+    frame_rate = 24000
+    block_align = channel_count * sample_size // 8
+    
+    fmt = struct.pack(
+        '<HHIIHH', 0xFFFE if extensible else format_tag, channel_count,
+        frame_rate, frame_rate * block_align, block_align, sample_size)
+    
+    if extensible:
+        fmt += struct.pack('<HHI', 22, sample_size, 0) + \
+            struct.pack('<H', format_tag) + bytes(14)
+    
+    chunks = \
+        b'WAVE' + \
+        b'fmt ' + struct.pack('<I', len(fmt)) + fmt + \
+        b'data' + struct.pack('<I', len(data)) + data
+    
+    return b'RIFF' + struct.pack('<I', len(chunks)) + chunks
@@ -0,0 +1,48 @@
+import numpy as np
+
+from vesper.signal.multi_file_signal import MultiFileSignal
+from vesper.tests.test_case import TestCase
+
+
+class MultiFileSignalTests(TestCase):
+    
+    
+    def test_get_samples(self):
+        
+        # three two-channel files, the second one empty
+        file_lengths = (5, 0, 7)
+        samples = np.arange(24).reshape((12, 2))
+        files = [samples[:5], samples[5:5], samples[5:]]
+        
+        reads = []
+        
+        def read(file_num, start_index, end_index):
+            reads.append(file_num)
+            return files[file_num][start_index:end_index]
+        
+        signal = MultiFileSignal(file_lengths, 24000, 2, samples.dtype, read)
+        
+        self.assertEqual(signal.time_axis.length, 12)
+        self.assertEqual(signal.file_start_indices, (0, 5, 5))
+        
+        cases = [
+            (slice(None), slice(None)),
+            (slice(1, 4), 1),
+            (slice(3, 9), slice(None)),
+            (slice(5, 12), 0),
+            (slice(4, 4), slice(None)),
+            (4, slice(None)),
+            (5, 1),
+            (11, 0),
+        ]
+        
+        for frame_key, channel_key in cases:
+            expected = samples[frame_key, channel_key]
+            actual = signal.as_frames[frame_key, channel_key]
+            self.assertTrue(np.array_equal(actual, expected))
+        
+        # Check that reading across file boundaries reads each file
+        # just once.
+        reads.clear()
+        signal.as_channels[0, 2:10]
+        self.assertEqual(reads, [0, 1, 2])
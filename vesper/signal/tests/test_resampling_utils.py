@@ -0,0 +1,43 @@
+import numpy as np
+
+from vesper.signal.resampling_utils import Resampler
+from vesper.tests.test_case import TestCase
+import vesper.signal.resampling_utils as resampling_utils
+
+
+class ResamplingUtilsTests(TestCase):
+    
+    
+    def test_resampler(self):
+        
+        rng = np.random.default_rng(0)
+        
+        for input_rate in (22000, 22050, 32000, 44000, 44100, 48000):
+            
+            samples = rng.integers(-10000, 10000, input_rate // 2)
+            samples = samples.astype('int16')
+            expected = resampling_utils.resample_to_24000_hz(
+                samples, input_rate)
+            
+            # Include an empty chunk and chunks shorter than the
+            # resampling filter.
+            chunk_ends = [0, 10, 1000, 1000, 1001, 5000, len(samples)]
+            
+            resampler = Resampler(input_rate)
+            outputs = []
+            start_index = 0
+            for end_index in chunk_ends:
+                chunk = samples[start_index:end_index]
+                outputs.append(resampler.process(chunk))
+                start_index = end_index
+            outputs.append(resampler.process(samples[:0], final=True))
+            output = np.concatenate(outputs)
+            
+            self.assertEqual(output.dtype, samples.dtype)
+            self.assertEqual(len(output), 12000)
+            self.assertEqual(resampler.output_length, 12000)
+            self.assertTrue(np.array_equal(output, expected))
+    
+    
+    def test_resampler_errors(self):
+        self._assert_raises(ValueError, Resampler, 16000)
@@ -2,11 +2,9 @@
 
 
 import os.path
-import wave
-
-import numpy as np
 
 from vesper.signal.audio_file_reader import AudioFileReader
+from vesper.signal.mapped_wave_file import MappedWaveFile
 from vesper.signal.unsupported_audio_file_error import UnsupportedAudioFileError
 
 
@@ -95,36 +93,12 @@ class WaveAudioFileReader(AudioFileReader):
             file_path = None
             self._name = 'WAV file'
             
-        try:
-            self._reader = wave.open(file_, 'rb')
-        except:
-            raise OSError('Could not open {}.'.format(self._name))
-        
-        try:
-            (num_channels, sample_width, sample_rate, length, compression_type,
-             compression_name) = self._reader.getparams()
-        except:
-            self._reader.close()
-            raise OSError('Could not read metadata from {}.'.format(self._name))
-        
-        sample_size = 8 * sample_width
+        self._file = MappedWaveFile(file_, self._name)
         
-        if compression_type != 'NONE':
-            raise UnsupportedAudioFileError((
-                '{} appears to contain compressed data (with '
-                'compression name "{}"), which is not '
-                'supported.').format(self._name, compression_name))
-            
-        # TODO: support additional sample sizes, especially 24 bits.
-        if sample_size != 8 and sample_size != 16:
-            raise UnsupportedAudioFileError((
-                '{} contains {}-bit samples, which are '
-                'not supported.').format(self._name, sample_size))
-            
-        if sample_size == 8:
-            dtype = np.uint8            # unsigned as per WAVE file spec
-        else:
-            dtype = np.dtype('<i2')
+        num_channels = self._file.channel_count
+        sample_rate = self._file.frame_rate
+        length = self._file.frame_count
+        dtype = self._file.dtype
             
         super().__init__(
             file_path, WaveAudioFileType, num_channels, length, sample_rate,
@@ -133,7 +107,7 @@ class WaveAudioFileReader(AudioFileReader):
         
     def read(self, start_index=0, length=None):
         
-        if self._reader is None:
+        if self._file is None:
             raise OSError('Cannot read from closed {}.'.format(self._name))
         
         if start_index < 0 or start_index > self.length:
@@ -160,41 +134,23 @@ class WaveAudioFileReader(AudioFileReader):
                         stop_index, start_index, length, self.length,
                         self._name))
                         
-        try:
-            self._reader.setpos(start_index)
-        except:
-            self._reader.close()
-            raise OSError(
-                'Set of read position failed for {}.'.format(self._name))
-
-        try:
-            buffer = self._reader.readframes(length)
-        except:
-            self._reader.close()
-            raise OSError('Samples read failed for {}.'.format(self._name))
-            
-        samples = np.frombuffer(buffer, dtype=self.dtype)
-        
-        if len(samples) != length * self.num_channels:
-            raise OSError(
-                'Got fewer samples than expected from read of {}.'.format(
-                    self._name))
+        # This is a view of the memory-mapped file rather than a copy,
+        # except for 24-bit and floating point samples, which are
+        # converted to 16 bits.
+        samples = self._file.read(start_index, start_index + length)
         
         if self.num_channels == 1 and self.mono_1d:
-            samples = samples.reshape((length,))
+            samples = samples[:, 0]
         else:
-            samples = samples.reshape((length, self.num_channels)).transpose()
-        
-        # TODO: Deinterleave samples?
-        # TODO: Byte swap samples on big endian platforms?
+            samples = samples.transpose()
         
         return samples
 
 
     def close(self):
-        if self._reader is not None:
-            self._reader.close()
-            self._reader = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
 
 class WaveAudioFileType:
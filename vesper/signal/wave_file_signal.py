@@ -2,13 +2,12 @@
 
 
 from pathlib import Path
-import wave
-
-import numpy as np
 
 from vesper.signal.audio_file_signal import AudioFileSignal
+from vesper.signal.mapped_wave_file import MappedWaveFile
 from vesper.signal.sample_provider import SampleProvider
 from vesper.signal.signal_error import SignalError
+from vesper.signal.unsupported_audio_file_error import UnsupportedAudioFileError
 
 
 class WaveFileSignal(AudioFileSignal):
@@ -19,37 +18,30 @@ class WaveFileSignal(AudioFileSignal):
         # Get `file` as `Path` if possible.
         file_path = _get_file_path(file)
             
-        # `file` can be a `Path`, a `str`, or a file-like object. If it
-        # is a `Path`, convert it to a `str` so we can call `wave.open`
-        # with it (as of Python 3.8, `wave.open` accepts either a `str`
-        # or a file-like argument, but not a `Path`).
-        if isinstance(file, Path):
-            file = str(file)
+        if file_path is None:
+            file_name = 'WAVE audio file'
         else:
-            file = file
-            
-        with wave.open(file, mode='rb') as reader:
+            file_name = f'WAVE audio file "{file_path}"'
             
-            frame_count = reader.getnframes()
-            frame_rate = reader.getframerate()
-            channel_count = reader.getnchannels()
+        # Parse the file's header and memory-map its sample data. The
+        # sample provider reads all samples from the memory map, so
+        # reading from the signal does not reopen or seek in the file.
+        try:
+            wave_file = MappedWaveFile(file, file_name)
+        except UnsupportedAudioFileError as e:
+            raise SignalError(str(e))
             
-            sample_size = 8 * reader.getsampwidth()
-            if sample_size != 16:
-                _raise_signal_error(
-                    f'Unsupported sample size of {sample_size} bits',
-                    file_path)
-            else:
-                dtype = np.dtype('<i2')
- 
-            if reader.getcomptype() != 'NONE':
-                _raise_signal_error((
-                    f'Unsupported compression type of '
-                    f'"{reader.getcompname()}"'), file_path)
+        frame_count = wave_file.frame_count
+        frame_rate = wave_file.frame_rate
+        channel_count = wave_file.channel_count
+        sample_size = wave_file.sample_size
+        sample_format = wave_file.sample_format
+        dtype = wave_file.dtype
                 
-        file_format = _get_file_format(channel_count, sample_size, frame_rate)
+        file_format = _get_file_format(
+            channel_count, sample_size, sample_format, frame_rate)
         
-        sample_provider = _SampleProvider(file, channel_count, dtype)
+        sample_provider = _SampleProvider(wave_file, file_path)
         
         super().__init__(
             frame_count, frame_rate, channel_count, dtype, sample_provider,
@@ -78,7 +70,7 @@ def _raise_signal_error(prefix, file_path):
     raise SignalError(message)
     
         
-def _get_file_format(channel_count, sample_size, frame_rate):
+def _get_file_format(channel_count, sample_size, sample_format, frame_rate):
     
     if channel_count == 1:
         channel_string = 'Mono'
@@ -87,73 +79,41 @@ def _get_file_format(channel_count, sample_size, frame_rate):
     else:
         channel_string = f'{channel_count}-channel'
         
-    return f'{channel_string}, {sample_size}-bit, {frame_rate} Hz WAVE'
+    if sample_format == 'floating point':
+        sample_string = f'{sample_size}-bit floating point'
+    else:
+        sample_string = f'{sample_size}-bit'
+        
+    return f'{channel_string}, {sample_string}, {frame_rate} Hz WAVE'
        
        
 class _SampleProvider(SampleProvider):
     
     
-    def __init__(self, file, channel_count, dtype):
-        
+    def __init__(self, wave_file, file_path):
         super().__init__(True)
-        
-        self._file = file
-        self._channel_count = channel_count
-        self._dtype = dtype
-        
-        self._file_path = _get_file_path(file)
-
-        with wave.open(self._file, mode='rb') as reader:
-            self._frame_count = reader.getnframes()
-            self._channel_count = reader.getnchannels()
+        self._wave_file = wave_file
+        self._file_path = file_path
         
         
     def get_samples(self, frame_key, channel_key):
         
         start_frame, end_frame = _get_bounds(frame_key)
-        frame_count = end_frame - start_frame
-        
-        start_channel, end_channel = _get_bounds(channel_key)
-        channel_count = end_channel - start_channel
         
-        with wave.open(self._file, mode='rb') as reader:
-            
-            # Set read position.
-            try:
-                reader.setpos(start_frame)
-            except Exception:
-                _raise_signal_error(
-                    'Set of read position failed', self._file_path)
-    
-            # Read sample data.
-            try:
-                buffer = reader.readframes(frame_count)
-            except Exception:
-                _raise_signal_error('Samples read failed', self._file_path)
-                
-        # Check actual read size.
-        byte_count = frame_count * self._channel_count * self._dtype.itemsize
-        if len(buffer) != byte_count:
+        # Get frame-first view of memory-mapped samples.
+        try:
+            samples = self._wave_file.read(start_frame, end_frame)
+        except OSError:
+            frame_count = end_frame - start_frame
+            available_count = max(
+                self._wave_file.available_frame_count - start_frame, 0)
             _raise_signal_error(
-                f'Read {len(buffer)} bytes rather than expected {byte_count}',
-                self._file_path)
-            
-        # Convert sample data to one-dimensional NumPy array.
-        samples = np.frombuffer(buffer, dtype=self._dtype)
-        
-        # Reshape sample array to two dimensions.
-        samples.shape = (frame_count, self._channel_count)
-        
-        # Select channels if needed.
-        if start_channel != 0 or end_channel != self._channel_count:
-            samples = samples[:, channel_key]
+                f'Read {available_count} frames rather than expected '
+                f'{frame_count}', self._file_path)
             
-        # Discard shape dimensions for integer keys.
-        frame_dim = _get_dim(frame_key, frame_count)
-        channel_dim = _get_dim(channel_key, channel_count)
-        samples.shape = frame_dim + channel_dim
-                    
-        return samples
+        # Select channels and discard shape dimensions for integer keys.
+        frame_key = 0 if isinstance(frame_key, int) else slice(None)
+        return samples[frame_key, channel_key]
         
         
 def _get_bounds(key):
@@ -162,7 +122,3 @@ def _get_bounds(key):
         return key, key + 1
     else:
         return key.start, key.stop
-    
-    
-def _get_dim(key, count):
-    return (count,) if isinstance(key, slice) else ()
@@ -241,6 +241,43 @@ def _create_recording_manager():
 recording_manager = Singleton(_create_recording_manager)
 
 
+# The index caches only a few hundred bytes per recording file, so it
+# can hold the files of many recordings.
+_MAX_NUM_INDEXED_RECORDINGS = 10000
+
+
+def _create_recording_file_index():
+    from vesper.django.app.recording_file_index import RecordingFileIndex
+    return RecordingFileIndex(_MAX_NUM_INDEXED_RECORDINGS)
+
+
+recording_file_index = Singleton(_create_recording_file_index)
+
+
+# Clip album spectrograms are typically a few kilobytes each, so this
+# holds the spectrograms of a few hundred thousand clips.
+_MAX_SPECTROGRAM_CACHE_SIZE = 1000000000
+
+
+def _create_clip_spectrogram_cache():
+    from vesper.django.app.clip_spectrogram_cache import \
+        ClipSpectrogramCache
+    return ClipSpectrogramCache(
+        clip_manager.instance, archive_paths.spectrogram_cache_dir_path,
+        _MAX_SPECTROGRAM_CACHE_SIZE)
+
+
+clip_spectrogram_cache = Singleton(_create_clip_spectrogram_cache)
+
+
+def _create_ephemeris_table_cache():
+    from vesper.ephem.ephemeris_table import EphemerisTableCache
+    return EphemerisTableCache(archive_paths.ephemeris_dir_path)
+
+
+ephemeris_table_cache = Singleton(_create_ephemeris_table_cache)
+
+
 def _create_archive():
     return Archive()
 
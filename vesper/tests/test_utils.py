@@ -1,7 +1,61 @@
 import os.path
+import struct
+
+import numpy as np
+
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
 
 
 def get_test_data_dir_path(module_file_path):
     tests_dir_path, file_name = os.path.split(module_file_path)
     module_name = file_name[:-len('.py')]
     return os.path.join(tests_dir_path, 'data', module_name)
+
+
+def create_wave_file_contents(
+        samples, sample_rate, sample_size=16, sample_format='integer'):
+    
+    """
+    Creates the contents of a WAVE file.
+    
+    `samples` is a channel-first NumPy array of samples at the scale
+    of the file's sample format, i.e. integers for integer formats and
+    values in [-1, 1] for floating point formats.
+    """
+    
+    samples = np.asarray(samples)
+    
+    if samples.ndim == 1:
+        samples = samples.reshape((1, -1))
+    
+    channel_count = samples.shape[0]
+    frames = np.ascontiguousarray(samples.transpose())
+    
+    if sample_format == 'floating point':
+        format_tag = _WAVE_FORMAT_IEEE_FLOAT
+        data = frames.astype(f'<f{sample_size // 8}').tobytes()
+    
+    elif sample_size == 24:
+        # Keep low three bytes of each little-endian 32-bit sample.
+        format_tag = _WAVE_FORMAT_PCM
+        data = frames.astype('<i4').view(np.uint8).reshape((-1, 4))
+        data = data[:, :3].tobytes()
+    
+    else:
+        format_tag = _WAVE_FORMAT_PCM
+        data = frames.astype(f'<i{sample_size // 8}').tobytes()
+    
+    block_align = channel_count * sample_size // 8
+    
+    fmt = struct.pack(
+        '<HHIIHH', format_tag, channel_count, sample_rate,
+        sample_rate * block_align, block_align, sample_size)
+    
+    chunks = \
+        b'WAVE' + \
+        b'fmt ' + struct.pack('<I', len(fmt)) + fmt + \
+        b'data' + struct.pack('<I', len(data)) + data
+    
+    return b'RIFF' + struct.pack('<I', len(chunks)) + chunks
@@ -0,0 +1,350 @@
+"""
+Module containing class `AnalysisGraph` and related classes.
+
+An analysis graph computes signal analysis products, such as spectrograms,
+that are needed by more than one of the detectors that are running on an
+audio channel. Each product is computed just once per input chunk, no
+matter how many detectors use it.
+"""
+
+
+import math
+
+import numpy as np
+import scipy.signal as signal
+
+from vesper.signal.resampling_utils import Resampler
+from vesper.util.sample_buffer import SampleBuffer
+import vesper.signal.resampling_utils as resampling_utils
+import vesper.util.time_frequency_analysis_utils as tfa_utils
+
+
+class AnalysisGraph:
+    
+    """
+    Signal analysis products shared by the detectors of an audio channel.
+    
+    An analysis graph comprises a set of *nodes*, each of which computes
+    one analysis product from consecutive chunks of the channel's samples.
+    A node can use the input samples, the outputs of nodes that were added
+    to the graph before it, or both. Nodes are identified by their keys:
+    when a detector adds a node to a graph that already contains a node
+    with the same key (typically because another detector added it), the
+    graph returns the existing node rather than adding the new one, so
+    that the two detectors share the node's output.
+    
+    The owner of a graph (for example, the command that is running
+    detectors) invokes the graph's `process` method on each input chunk
+    before invoking the `detect` methods of the graph's detectors on the
+    same chunk. The `process` method invokes the `process` methods of all
+    of the graph's nodes, after which the detectors can read the node
+    outputs.
+    
+    A graph can also cache *products* that are computed on demand rather
+    than for every chunk. A product is identified by a key, and is
+    computed by the first call to the `get_product` method with that key
+    following a call to `process`. Later calls with the same key return
+    the cached product until the next call to `process`.
+    """
+    
+    
+    def __init__(self):
+        self._nodes = {}
+        self._products = {}
+    
+    
+    @property
+    def nodes(self):
+        return tuple(self._nodes.values())
+    
+    
+    def add_node(self, node):
+        
+        """
+        Adds a node to this graph.
+        
+        If this graph already contains a node with the same key as the
+        specified node, the graph is not modified.
+        
+        Parameters
+        ----------
+        node : AnalysisNode
+            the node to add.
+        
+        Returns
+        -------
+        AnalysisNode
+            the node of this graph with the key of the specified node.
+            The caller should use this node rather than the specified one.
+        """
+        
+        return self._nodes.setdefault(node.key, node)
+    
+    
+    def process(self, samples):
+        
+        """
+        Processes the next chunk of input samples.
+        
+        This method invokes the `process` method of each node of this
+        graph, in the order in which the nodes were added, and clears
+        the graph's product cache.
+        """
+        
+        self._products.clear()
+        
+        for node in self._nodes.values():
+            node.process(samples)
+    
+    
+    def get_product(self, key, compute):
+        
+        """
+        Gets an analysis product for the current input chunk.
+        
+        Parameters
+        ----------
+        key : hashable
+            the key of the product.
+        
+        compute : callable
+            function of no arguments that computes the product. The
+            function is invoked only if the product is not already
+            cached.
+        
+        Returns
+        -------
+        object
+            the product.
+        """
+        
+        try:
+            return self._products[key]
+        
+        except KeyError:
+            product = compute()
+            self._products[key] = product
+            return product
+
+
+class AnalysisNode:
+    
+    """
+    Abstract analysis graph node.
+    
+    A node's `process` method is invoked once for each input chunk, and
+    sets the node's `output` attribute. Nodes that compute the same
+    output from the same input should have equal keys.
+    """
+    
+    
+    def __init__(self, key):
+        self._key = key
+        self.output = None
+    
+    
+    @property
+    def key(self):
+        return self._key
+    
+    
+    def process(self, samples):
+        raise NotImplementedError()
+
+
+class SpectrogramNode(AnalysisNode):
+    
+    """
+    Analysis graph node that computes a spectrogram.
+    
+    The node retains input samples that it has not yet been able to
+    include in a spectrum, so that the spectra computed for successive
+    chunks are exactly those that would be computed for all of the input
+    at once. Spectrum `i` is computed from the input samples starting at
+    index `i * hop_size`.
+    """
+    
+    
+    def __init__(self, window_type, window_size, hop_size, dft_size):
+        
+        key = ('Spectrogram', window_type, window_size, hop_size, dft_size)
+        super().__init__(key)
+        
+        self.window = signal.get_window(window_type, window_size)
+        self.hop_size = hop_size
+        self.dft_size = dft_size
+        
+        self.output = np.zeros((0, dft_size // 2 + 1))
+        
+        self._unprocessed_samples = np.array([], dtype='float')
+    
+    
+    def process(self, samples):
+        
+        samples = np.concatenate((self._unprocessed_samples, samples))
+        
+        self.output = tfa_utils.compute_spectrogram(
+            samples, self.window, self.hop_size, self.dft_size)
+        
+        num_samples_processed = len(self.output) * self.hop_size
+        self._unprocessed_samples = samples[num_samples_processed:]
+
+
+class BandPowerNode(AnalysisNode):
+    
+    """
+    Analysis graph node that sums the bins of a frequency band of the
+    spectra output by a `SpectrogramNode`.
+    
+    The band comprises the bins numbered `start_bin_num` through
+    `end_bin_num - 1`.
+    """
+    
+    
+    def __init__(self, spectrogram_node, start_bin_num, end_bin_num):
+        
+        key = ('Band Power', spectrogram_node.key, start_bin_num, end_bin_num)
+        super().__init__(key)
+        
+        self.spectrogram_node = spectrogram_node
+        self.start_bin_num = start_bin_num
+        self.end_bin_num = end_bin_num
+        
+        self.output = np.array([], dtype='float')
+    
+    
+    def process(self, samples):
+        spectra = self.spectrogram_node.output
+        self.output = \
+            spectra[:, self.start_bin_num:self.end_bin_num].sum(axis=1)
+
+
+class ResamplingNode(AnalysisNode):
+    
+    """
+    Analysis graph node that resamples its input to 24000 Hz.
+    
+    For the input sample rates supported by the
+    `vesper.signal.resampling_utils.Resampler` class, the node resamples
+    with a `Resampler`, so that the outputs for successive chunks are
+    exactly the resampling of all of the input at once. The node
+    withholds the last few output samples until the input samples they
+    depend on arrive, and the `complete` method gets the output samples
+    that remain after the last chunk.
+    
+    For other input sample rates, the node buffers its input and
+    resamples it with `resampy` in chunks of about an hour, so that
+    resampling artifacts occur only at the boundaries of those chunks.
+    For integer input sample rates, each such chunk comprises a whole
+    number of resampling periods (e.g. 147 input samples, for 320
+    output samples, at 11025 Hz), so its output length is exact and
+    output indices do not drift over a long input. The output for
+    most input chunks is empty, and the `complete` method gets the
+    resampling of the remaining buffered input.
+    """
+    
+    
+    def __init__(self, input_sample_rate):
+        
+        key = ('Resampled To 24000 Hz', input_sample_rate)
+        super().__init__(key)
+        
+        self.input_sample_rate = input_sample_rate
+        
+        try:
+            self._resampler = Resampler(input_sample_rate)
+        except ValueError:
+            self._resampler = None
+            self._buffer = None
+            self._buffer_chunk_size = \
+                _get_resampling_chunk_size(input_sample_rate)
+        
+        self.output = np.array([], dtype='float')
+        
+        self._final_output = None
+    
+    
+    def process(self, samples):
+        
+        if self._resampler is not None:
+            self.output = self._resampler.process(samples)
+            
+        else:
+            
+            if self._buffer is None:
+                self._buffer = SampleBuffer(samples.dtype)
+                
+            self._buffer.write(samples)
+            
+            outputs = [samples[:0]]
+            
+            while len(self._buffer) >= self._buffer_chunk_size:
+                chunk = self._buffer.read(self._buffer_chunk_size)
+                outputs.append(self._resample(chunk))
+                
+            self.output = np.concatenate(outputs)
+    
+    
+    def _resample(self, samples):
+        
+        # `resampy.resample` raises an exception if the output would
+        # be empty.
+        if len(samples) * 24000 < self.input_sample_rate:
+            return samples[:0]
+        
+        return resampling_utils.resample_to_24000_hz(
+            samples, self.input_sample_rate)
+    
+    
+    def complete(self):
+        
+        """
+        Gets the output samples that remain after the last input chunk.
+        
+        Detectors that share this node can all call this method: the
+        remaining samples are computed by the first call and returned
+        by every call.
+        """
+        
+        if self._final_output is None:
+            
+            if self._resampler is not None:
+                self._final_output = self._resampler.process(
+                    self.output[:0], final=True)
+                
+            elif self._buffer is not None and len(self._buffer) != 0:
+                self._final_output = self._resample(self._buffer.read())
+                
+            else:
+                self._final_output = self.output[:0]
+        
+        return self._final_output
+
+
+_RESAMPLING_CHUNK_DURATION = 3600
+"""
+Approximate duration in seconds of the chunks in which a `ResamplingNode`
+resamples input with `resampy`.
+"""
+
+
+def _get_resampling_chunk_size(input_sample_rate):
+    
+    """
+    Gets the size in input samples of the chunks in which a
+    `ResamplingNode` resamples input with `resampy`.
+    """
+    
+    size = int(round(input_sample_rate * _RESAMPLING_CHUNK_DURATION))
+    
+    if float(input_sample_rate).is_integer():
+        # input sample rate is an integer
+        
+        # Make chunk size a multiple of the resampling period, i.e.
+        # of the smallest number of input samples that resample to a
+        # whole number of output samples.
+        rate = int(input_sample_rate)
+        period = rate // math.gcd(rate, 24000)
+        size = max(size // period, 1) * period
+        
+    return size
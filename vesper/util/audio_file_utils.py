@@ -1,8 +1,8 @@
 """
 Functions pertaining to audio files.
 
-For the time being, this module supports only one-channel and two-channel
-16-bit WAVE files. It includes support for incremental writes that open a
+Except for `get_wave_file_info`, this module supports only one-channel
+and two-channel 16-bit WAVE files for the time being. It includes support for incremental writes that open a
 file, append samples to it, and close it. Python's `wave` module does not
 seem to support incremental writes, which is desirable for recording.
 
@@ -19,6 +19,7 @@ import io
 import numpy as np
 import wave
 
+from vesper.signal.mapped_wave_file import MappedWaveFile
 from vesper.util.bunch import Bunch
 from vesper.util.byte_buffer import ByteBuffer
 
@@ -57,8 +58,29 @@ def is_wave_file_path(path):
 
 
 def get_wave_file_info(path):
-    with wave.open(path, 'rb') as reader:
-        return _read_header(reader, check_format=False)
+    
+    """
+    Gets information about a WAVE file.
+    
+    This function supports all of the sample formats supported by
+    `vesper.signal.mapped_wave_file.MappedWaveFile`, which reads the
+    samples of recording files, including 24-bit integer and floating
+    point formats.
+    """
+    
+    wave_file = MappedWaveFile(str(path), f'WAVE file "{path}"')
+    
+    try:
+        return Bunch(
+            num_channels=wave_file.channel_count,
+            length=wave_file.frame_count,
+            sample_size=wave_file.sample_size,
+            sample_rate=float(wave_file.frame_rate),
+            compression_type='NONE',
+            compression_name='not compressed')
+    
+    finally:
+        wave_file.close()
 
 
 def _read_header(reader, check_format=True):
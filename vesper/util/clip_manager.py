@@ -3,16 +3,42 @@
 
 from io import BytesIO
 from threading import Lock
+import hashlib
 import os.path
 
 from vesper.archive_paths import archive_paths
+from vesper.django.app.recording_signal import RecordingSignal
+from vesper.signal.mapped_wave_file import MappedWaveFile
 from vesper.signal.wave_audio_file import WaveAudioFileReader
-from vesper.singletons import recording_manager
+from vesper.singletons import recording_file_index, recording_manager
 from vesper.util.bunch import Bunch
+from vesper.util.lru_cache import LruCache
 import vesper.util.audio_file_utils as audio_file_utils
 import vesper.util.os_utils as os_utils
 
 
+_MAX_NUM_FILE_READERS = 20
+"""
+Maximum number of recording file readers a clip manager keeps open.
+
+Clip album pages and clip exports often interleave clips from several
+recording files (for example, from different stations), so a clip
+manager keeps readers for several files open at once rather than
+reopening files and reparsing their headers each time it switches
+among them.
+"""
+
+
+_AUDIO_ETAG_VERSION = 2
+"""
+Version of clip audio entity tags.
+
+Increment this whenever the format of the audio file contents returned
+by `ClipManager.get_audio_file_contents` changes, so that clients will
+not use audio that they cached before the change.
+"""
+
+
 class ClipManagerError(Exception):
     pass
 
@@ -24,8 +50,21 @@ class ClipManager:
     
     def __init__(self):
         self._rm = recording_manager.instance
-        self._file_reader_cache = {}
-        self._read_lock = Lock()
+        self._file_index = recording_file_index.instance
+        self._file_reader_pool = _FileReaderPool(_MAX_NUM_FILE_READERS)
+        
+        
+    @property
+    def file_reader_stats(self):
+        
+        """
+        Recording file reader pool statistics.
+        
+        The statistics are a `Bunch` with attributes `num_hits`,
+        `num_misses`, and `num_opens`.
+        """
+        
+        return self._file_reader_pool.stats
         
         
     def get_audio_file_path(self, clip):
@@ -107,9 +146,9 @@ class ClipManager:
        
     def _get_samples_from_audio_file(self, clip, start_index, length):
         path = self.get_audio_file_path(clip)
-        samples, _ = audio_file_utils.read_wave_file(path)
+        wave_file = MappedWaveFile(path)
         end_index = start_index + length
-        return samples[0, start_index:end_index]
+        return wave_file.read(start_index, end_index)[:, 0]
 
 
     def _get_samples_from_recording(
@@ -123,41 +162,42 @@ class ClipManager:
             
             self._handle_get_samples_error(clip, 'clip has no start index')
         
-        # TODO: Make search for a file's clip more efficient.
-        # The following code is O(n), where n is the number of
-        # recording files, but we could make it O(log(n)) by
-        # using a more efficient search algorithm. This will
-        # require cacheing lists of recording files for recordings,
-        # which is fine.
-        
         # Get start and end indices of samples in recording.
         start_index = clip.start_index + start_offset
         end_index = start_index + length
         
-        for file_ in clip.recording.files.all():
+        recording_id, channel_num = \
+            self._file_index.get_channel_info(clip.recording_channel_id)
+        
+        try:
+            return self._read_recording(
+                clip, recording_id, channel_num, start_index, end_index)
+        
+        except (ClipManagerError, OSError, ValueError):
             
-            if start_index >= file_.start_index and \
-                    start_index < file_.end_index:
-                # samples start in this file.
-                
-                if end_index < file_.end_index:
-                    # samples end in this file.
-                
-                    # Get start index of samples in file.
-                    start_index -= file_.start_index
-                    
-                    return self._get_samples_from_recording_file(
-                        file_, clip.channel_num, start_index, length)
-                        
-                else:
-                    # clip extends past end of file
-                    
-                    # TODO: Handle clips that cross file boundaries.
-                    self._handle_get_samples_error(
-                        clip, 'clip crosses a file boundary')
-                
-        # If we get here, the clip was not found in a recording file.
-        self._handle_get_samples_error(clip, 'clip is outside of recording')
+            # The recording's files may have been changed in another
+            # process since we indexed them. Reindex the files and try
+            # again.
+            self._file_index.invalidate(recording_id)
+            return self._read_recording(
+                clip, recording_id, channel_num, start_index, end_index)
+    
+    
+    def _read_recording(
+            self, clip, recording_id, channel_num, start_index, end_index):
+        
+        files = self._file_index.get_files(recording_id)
+        
+        if len(files) == 0 or start_index < 0 or \
+                end_index > files[-1].end_index:
+            self._handle_get_samples_error(
+                clip, 'clip is outside of recording')
+            
+        # The samples may span several recording files. The recording
+        # signal reads each of them just once, via our reader pool.
+        signal = RecordingSignal(files, self._read_recording_file)
+        
+        return signal.as_channels[channel_num, start_index:end_index]
     
     
     def _handle_get_samples_error(self, clip, reason):
@@ -166,8 +206,7 @@ class ClipManager:
             'since {}.').format(reason))
         
         
-    def _get_samples_from_recording_file(
-            self, file_, channel_num, start_index, length):
+    def _read_recording_file(self, file_, start_index, end_index):
         
         try:
             path = self._rm.get_absolute_recording_file_path(file_.path)
@@ -177,80 +216,78 @@ class ClipManager:
                 'Could not read clip samples from recording file. '
                 '{}').format(str(e)))
         
-        # Since the file reader cache may be shared among threads, we
-        # use a lock to make getting a file reader for a clip and reading
-        # samples from it atomic.
-        #
-        # Without the lock, we have observed that reads can return the
-        # wrong samples. For example, suppose that this method is called
-        # on separate threads for two different clips, clips 1 and 2,
-        # that are in the same file and hence will use the same file
-        # reader. We want the seek and read operations for the two clips
-        # to be ordered like this:
-        #
-        #     1. Seek clip 1.
-        #     2. Read clip 1.
-        #     3. Seek clip 2.
-        #     4. Read clip 2.
-        #
-        # (or perhaps with operations 3 and 4 preceding 1 and 2). If we
-        # don't make the seek/read combinations atomic, however, we can
-        # get this instead:
-        #
-        #     1. Seek clip 1.
-        #     2. Seek clip 2.
-        #     3. Read clip 1.
-        #     4. Read clip 2.
-        #
-        # which reads the wrong samples for both clips.
-        #
-        # If we don't make the combination of getting the file reader
-        # for a clip and reading from the reader atomic, the following
-        # can happen when we try to read two clips whose samples are in
-        # different files:
-        #
-        #     1. Get reader for clip 1.
-        #     2. Get reader for clip 2, closing reader for clip 1.
-        #     3. Attempt to read samples from reader for clip 1.
-        #
-        # Step 3 results in an exception since the reader for clip 1
-        # was closed in step 2.
-        
-        with self._read_lock:
-            reader = self._get_audio_file_reader(path)
-            samples = reader.read(start_index, length)
-        
-        return samples[channel_num]
-    
-    
-    def _get_audio_file_reader(self, path):
+        samples = self._file_reader_pool.read(
+            path, start_index, end_index - start_index)
         
-        try:
-            reader = self._file_reader_cache[path]
+        # Return frame-first view of channel-first samples.
+        return samples.transpose()
+    
+    
+    def get_audio_etag(self, clip):
+        
+        """
+        Gets an entity tag for the audio of the specified clip.
+        
+        The tag is a string that changes if the audio file contents
+        returned by `get_audio_file_contents` for the clip might change.
+        It depends on the clip's ID and extent, and on the identity of
+        the source of the contents, i.e. the clip's audio file if it
+        exists, or otherwise the recording files that the clip spans.
+        Creating, regenerating, or deleting a clip's audio file thus
+        changes the tag. The tag can be computed without reading any
+        audio data.
+        
+        Parameters
+        ----------
+        clip : Clip
+            the clip for which to get an entity tag.
+            
+        Returns
+        -------
+        str
+            the entity tag, without quotes.
+        """
         
-        except KeyError:
-            # cache miss
+        parts = [clip.id, clip.start_index, clip.length, clip.sample_rate]
+        
+        # Like `get_audio_file_contents`, look for a clip audio file
+        # first, and fall back on the clip's recording files.
+        path = self.get_audio_file_path(clip)
+        
+        try:
+            stat = os.stat(path)
             
-            # Clear cache. We cache just one reader at a time, which
-            # goes a long way since in typical use our accesses don't
-            # switch files very often.
-            self._clear_file_reader_cache()
+        except FileNotFoundError:
+            stat = None
             
-            # Create new reader.
-            reader = WaveAudioFileReader(str(path))
+        if stat is not None:
+            # contents come from clip audio file
             
-            # Cache new reader.
-            self._file_reader_cache[path] = reader
+            parts.append(('clip', stat.st_mtime_ns, stat.st_size))
             
-        return reader
-    
-    
-    def _clear_file_reader_cache(self):
-        
-        for reader in self._file_reader_cache.values():
-            reader.close()
+        elif clip.start_index is None:
+            # clip has neither audio file nor start index
+            
+            parts.append(None)
+                
+        else:
+            # contents come from recording files
+            
+            recording_id, channel_num = \
+                self._file_index.get_channel_info(clip.recording_channel_id)
+            
+            start_index = clip.start_index
+            end_index = start_index + clip.length
+            
+            parts.append(channel_num)
+            parts += [
+                (f.id, f.path, f.start_index, f.length)
+                for f in self._file_index.get_files(recording_id)
+                if f.start_index < end_index and f.end_index > start_index]
             
-        self._file_reader_cache = {}
+        digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+        
+        return f'{_AUDIO_ETAG_VERSION}-{digest}'
     
     
     def get_audio_file_contents(self, clip, media_type):
@@ -406,3 +443,142 @@ def _create_audio_file_contents(samples, sample_rate):
     audio_file_utils.write_wave_file(buffer, samples, sample_rate)
     
     return buffer.getvalue()
+
+
+class _FileReaderPool:
+    
+    """
+    Bounded pool of audio file readers.
+    
+    The pool keeps readers for up to a specified number of files open,
+    closing the least recently used reader when it needs room for a new
+    one.
+    
+    The pool may be shared among threads. Each reader has its own lock,
+    which makes a reader's seek/read combinations atomic. (Without the
+    lock, reads on separate threads for two clips in the same file could
+    interleave their seeks and reads and return the wrong samples.)
+    Reads from different files thus never wait for each other. The pool
+    lock is held only briefly, to look up, insert, and evict readers,
+    and not while a file is being opened or read.
+    
+    A reader that is evicted from the pool while another thread is
+    reading from it is closed when that read completes.
+    """
+    
+    
+    def __init__(self, max_size):
+        
+        self._max_size = max_size
+        
+        # Cache items are `_PooledFileReader` objects. We evict items
+        # ourselves rather than letting the cache do it, so that we
+        # can close their readers.
+        self._readers = LruCache()
+        
+        self._lock = Lock()
+        
+        self._num_hits = 0
+        self._num_misses = 0
+        self._num_opens = 0
+        
+        
+    @property
+    def stats(self):
+        with self._lock:
+            return Bunch(
+                num_hits=self._num_hits,
+                num_misses=self._num_misses,
+                num_opens=self._num_opens)
+            
+            
+    def read(self, path, start_index, length):
+        
+        reader = self._acquire_reader(path)
+        
+        try:
+            with reader.lock:
+                return reader.reader.read(start_index, length)
+            
+        finally:
+            self._release_reader(reader)
+            
+            
+    def _acquire_reader(self, path):
+        
+        with self._lock:
+            
+            try:
+                reader = self._readers[path]
+                
+            except KeyError:
+                # cache miss
+                
+                self._num_misses += 1
+                
+            else:
+                # cache hit
+                
+                self._num_hits += 1
+                reader.num_users += 1
+                return reader
+            
+        # Open file outside of pool lock so other threads can use the
+        # pool meanwhile.
+        new_reader = _PooledFileReader(WaveAudioFileReader(str(path)))
+        
+        with self._lock:
+            
+            self._num_opens += 1
+            
+            reader = self._readers.get(path)
+            
+            if reader is not None:
+                # another thread opened the file while we were doing so
+                
+                new_reader.reader.close()
+                
+                # Mark reader as most recently used.
+                reader = self._readers[path]
+                
+            else:
+                
+                if len(self._readers) == self._max_size:
+                    self._evict_reader()
+                    
+                reader = new_reader
+                self._readers[path] = reader
+                
+            reader.num_users += 1
+            return reader
+        
+        
+    def _evict_reader(self):
+        
+        # This method must be called with the pool lock held.
+        
+        _, reader = self._readers.popitem(last=False)
+        reader.evicted = True
+        
+        if reader.num_users == 0:
+            reader.reader.close()
+            
+            
+    def _release_reader(self, reader):
+        
+        with self._lock:
+            
+            reader.num_users -= 1
+            
+            if reader.evicted and reader.num_users == 0:
+                reader.reader.close()
+                
+                
+class _PooledFileReader:
+    
+    
+    def __init__(self, reader):
+        self.reader = reader
+        self.lock = Lock()
+        self.num_users = 0
+        self.evicted = False
@@ -0,0 +1,273 @@
+"""Module containing class `InferenceSession`."""
+
+
+from pathlib import Path
+from threading import Lock
+import logging
+import time
+
+import numpy as np
+import tensorflow as tf
+
+
+# We use the TensorFlow 1 API via `tf.compat.v1` so that this module
+# works with both TensorFlow 1 and TensorFlow 2.
+_tf = tf.compat.v1
+
+
+DEFAULT_BATCH_SIZE = 64
+"""Default number of examples per inference batch."""
+
+
+class InferenceSession:
+    
+    """
+    Long-lived TensorFlow inference session for a SavedModel.
+    
+    An inference session loads a TensorFlow SavedModel into its own graph
+    and session once, and then scores any number of NumPy arrays of
+    examples with it. This is much faster than scoring examples with the
+    `predict` method of a `tf.contrib.estimator.SavedModelEstimator`,
+    which rebuilds the model graph and restores the model weights every
+    time it is called.
+    
+    A session can also preprocess examples before scoring them. A
+    preprocessor is a function that takes a two-dimensional float32
+    tensor of examples (e.g. waveforms), whose first dimension is the
+    batch dimension, and returns a tensor of model input features
+    computed from them, or a dictionary with a single item whose value
+    is such a tensor. The session calls the function once, to add the
+    preprocessing operations to its graph.
+    
+    The model's default serving signature must have exactly one input
+    and one output.
+    
+    Use the `get_inference_session` function of this module to get an
+    inference session that is shared by all users of a model in a
+    process, so that the process loads the model only once.
+    
+    Parameters
+    ----------
+    model_dir_path : str or Path
+        the path of the SavedModel directory.
+    preprocessor : function or None
+        the example preprocessor, or `None` to feed examples to the
+        model as is.
+    batch_size : int
+        the maximum number of examples per inference batch.
+    intra_op_thread_count : int
+        the number of threads the session uses within an operation,
+        or zero to let TensorFlow choose.
+    inter_op_thread_count : int
+        the number of threads the session uses to run operations in
+        parallel, or zero to let TensorFlow choose.
+    """
+    
+    
+    def __init__(
+            self, model_dir_path, preprocessor=None,
+            batch_size=DEFAULT_BATCH_SIZE, intra_op_thread_count=0,
+            inter_op_thread_count=0):
+        
+        if batch_size <= 0:
+            raise ValueError(
+                f'Bad inference session batch size {batch_size}.')
+        
+        self._model_dir_path = Path(model_dir_path)
+        self._batch_size = batch_size
+        
+        self._num_batches = 0
+        self._total_batch_duration = 0
+        self._stats_lock = Lock()
+        
+        config = _tf.ConfigProto(
+            intra_op_parallelism_threads=intra_op_thread_count,
+            inter_op_parallelism_threads=inter_op_thread_count)
+        
+        self._graph = tf.Graph()
+        self._session = _tf.Session(graph=self._graph, config=config)
+        
+        logging.info(
+            f'Loading TensorFlow SavedModel from directory '
+            f'"{self._model_dir_path}"...')
+        
+        with self._graph.as_default():
+            
+            meta_graph = _tf.saved_model.loader.load(
+                self._session, [_tf.saved_model.tag_constants.SERVING],
+                str(self._model_dir_path))
+            
+            key = _tf.saved_model.signature_constants.\
+                DEFAULT_SERVING_SIGNATURE_DEF_KEY
+            signature = meta_graph.signature_def[key]
+            (input_info,) = signature.inputs.values()
+            (output_info,) = signature.outputs.values()
+            
+            self._model_input = \
+                self._graph.get_tensor_by_name(input_info.name)
+            self._model_output = \
+                self._graph.get_tensor_by_name(output_info.name)
+            
+            if preprocessor is None:
+                self._input = None
+                self._features = None
+            
+            else:
+                
+                with _tf.name_scope('preprocessing'):
+                    
+                    # The placeholder must have a known rank, since
+                    # preprocessors may need it to infer the shapes
+                    # of the tensors they compute.
+                    self._input = _tf.placeholder(
+                        tf.float32, shape=(None, None), name='input')
+                    
+                    features = preprocessor(self._input)
+                    if isinstance(features, dict):
+                        (features,) = features.values()
+                    self._features = features
+        
+        # Make sure that nothing adds operations to our graph once we
+        # start running it.
+        self._graph.finalize()
+    
+    
+    @property
+    def model_dir_path(self):
+        return self._model_dir_path
+    
+    
+    @property
+    def batch_size(self):
+        return self._batch_size
+    
+    
+    @property
+    def num_batches(self):
+        
+        """The number of batches this session has scored."""
+        
+        return self._num_batches
+    
+    
+    @property
+    def mean_batch_duration(self):
+        
+        """
+        The mean duration of the batches this session has scored, in
+        seconds, or `None` if it has scored none.
+        """
+        
+        with self._stats_lock:
+            if self._num_batches == 0:
+                return None
+            else:
+                return self._total_batch_duration / self._num_batches
+    
+    
+    def predict(self, examples):
+        
+        """
+        Scores examples.
+        
+        Parameters
+        ----------
+        examples : NumPy array
+            the examples to score, along the first axis of the array.
+        
+        Returns
+        -------
+        NumPy array
+            the model outputs for the examples, along the first axis
+            of the array.
+        """
+        
+        batch_size = self._batch_size
+        
+        outputs = [
+            self._predict_batch(examples[i:i + batch_size])
+            for i in range(0, len(examples), batch_size)]
+        
+        if len(outputs) == 0:
+            shape = [0] + self._model_output.shape.as_list()[1:]
+            dtype = self._model_output.dtype.as_numpy_dtype
+            return np.zeros(shape, dtype=dtype)
+        
+        else:
+            return np.concatenate(outputs)
+    
+    
+    def _predict_batch(self, examples):
+        
+        start_time = time.time()
+        
+        if self._input is None:
+            features = examples
+        else:
+            features = self._session.run(
+                self._features, {self._input: examples})
+        
+        outputs = self._session.run(
+            self._model_output, {self._model_input: features})
+        
+        duration = time.time() - start_time
+        
+        with self._stats_lock:
+            self._num_batches += 1
+            self._total_batch_duration += duration
+        
+        logging.debug(
+            f'Scored batch of {len(examples)} examples with model '
+            f'"{self._model_dir_path}" in {duration:.3f} seconds.')
+        
+        return outputs
+    
+    
+    def close(self):
+        self._session.close()
+
+
+_sessions = {}
+_sessions_lock = Lock()
+
+
+def get_inference_session(
+        model_dir_path, preprocessor=None, preprocessor_key=None,
+        batch_size=DEFAULT_BATCH_SIZE, intra_op_thread_count=0,
+        inter_op_thread_count=0):
+    
+    """
+    Gets the shared inference session for a SavedModel.
+    
+    This function creates at most one inference session per combination
+    of model directory, preprocessor, batch size, and thread counts per
+    process, and returns the same session for subsequent calls with the
+    same values of those arguments.
+    
+    The preprocessor of a session is identified by `preprocessor_key`,
+    a hashable value that callers that create equivalent preprocessors
+    should specify to share a session. If `preprocessor_key` is `None`,
+    the preprocessor is identified by the preprocessor function itself.
+    
+    See the `InferenceSession` class for a description of the other
+    arguments.
+    """
+    
+    if preprocessor_key is None:
+        preprocessor_key = preprocessor
+    
+    key = (
+        str(Path(model_dir_path).resolve()), preprocessor_key, batch_size,
+        intra_op_thread_count, inter_op_thread_count)
+    
+    with _sessions_lock:
+        
+        session = _sessions.get(key)
+        
+        if session is None:
+            session = InferenceSession(
+                model_dir_path, preprocessor, batch_size,
+                intra_op_thread_count, inter_op_thread_count)
+            _sessions[key] = session
+        
+        return session
@@ -12,17 +12,35 @@ class PreferenceManager:
     
     
     def __init__(self, preference_dir_path):
+        self._version = 0
         self._load_preferences(preference_dir_path)
         self._stack = []
         
         
     def _load_preferences(self, preference_dir_path):
+        
+        # Get file stat before loading file so that if the file is
+        # modified during the load, the next reload will see it.
+        self._file_stat = _get_file_stat(preference_dir_path)
+        
         self._preferences = _load_preferences(preference_dir_path)
         self._preference_dir_path = preference_dir_path
+        self._version += 1
         
         
     def reload_preferences(self):
-        self._load_preferences(self._preference_dir_path)
+        
+        """
+        Reloads preferences from the preference file.
+        
+        This method reloads the preference file only if it has been
+        modified, created, or deleted since the last load, as indicated
+        by its modification time and size. It increments the version
+        of this preference manager when it reloads.
+        """
+        
+        if _get_file_stat(self._preference_dir_path) != self._file_stat:
+            self._load_preferences(self._preference_dir_path)
         
         
     @property
@@ -30,6 +48,21 @@ class PreferenceManager:
         return self._preferences
     
     
+    @property
+    def version(self):
+        
+        """
+        the version of this preference manager's preferences.
+        
+        The version is a positive integer that increases each time the
+        preferences are reloaded. Users of the preferences can remember
+        it to avoid redundant work, for example to reuse data derived
+        from the preferences until the version changes.
+        """
+        
+        return self._version
+    
+    
     def _push_test_module_preferences(self, test_module_file_path):
         
         """
@@ -47,7 +80,8 @@ class PreferenceManager:
         preference_dir_path = test_module_dir_path / 'data' / test_module_name
             
         # Push current preferences onto stack.
-        self._stack.append((self._preference_dir_path, self._preferences))
+        self._stack.append(
+            (self._preference_dir_path, self._preferences, self._file_stat))
         
         # Load test preferences.
         self._load_preferences(preference_dir_path)
@@ -57,7 +91,10 @@ class PreferenceManager:
         
         """Pops test preferences."""
         
-        self._preference_dir_path, self._preferences = self._stack.pop()
+        self._preference_dir_path, self._preferences, self._file_stat = \
+            self._stack.pop()
+        
+        self._version += 1
     
     
 class _Preferences:
@@ -111,6 +148,15 @@ def _get_item(preferences, name):
         return _get_item(preferences[parts[0]], parts[1])
             
             
+def _get_file_stat(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    else:
+        return (stat.st_mtime_ns, stat.st_size)
+
+
 def _load_preferences(file_path):
     
     defaults_message = 'Will use default preference values.'
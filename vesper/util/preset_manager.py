@@ -40,13 +40,46 @@ class PresetManager:
         
         self._preset_dir_path = preset_dir_path
         
+        self._preset_files = {}
+        """
+        Mapping from the paths of the preset directories and files that
+        were present at the last load to `(file stat, preset)` pairs.
+        
+        The pair of a directory is `(None, None)`. The preset of a file
+        is `None` if the file could not be parsed.
+        """
+        
+        self._version = 0
+        
         self.reload_presets()
         
         
     def reload_presets(self):
         
-        self._preset_data = \
-            _load_presets(self._preset_dir_path, self._preset_types)
+        """
+        Reloads presets from the preset directory.
+        
+        This method reparses only preset files that have been added or
+        modified since the last load, as indicated by their modification
+        times and sizes. If any preset directories or files have been
+        added, modified, or removed, it increments the version of this
+        preset manager.
+        """
+        
+        preset_files = {}
+        
+        preset_data = _load_presets(
+            self._preset_dir_path, self._preset_types, self._preset_files,
+            preset_files)
+        
+        if self._version != 0 and \
+                _get_file_stats(preset_files) == \
+                _get_file_stats(self._preset_files):
+            # no presets changed since last load
+            
+            return
+        
+        self._preset_data = preset_data
         """Mapping from preset type names to collections of presets."""
         
         self._preset_dicts = dict(
@@ -57,6 +90,26 @@ class PresetManager:
         presets.
         """
         
+        self._preset_files = preset_files
+        
+        self._version += 1
+        
+        
+    @property
+    def version(self):
+        
+        """
+        the version of this preset manager's presets.
+        
+        The version is a positive integer that increases each time a
+        reload changes the presets. Users of the presets can remember
+        it to avoid redundant work, for example to reuse data derived
+        from the presets until the version changes.
+        """
+        
+        return self._version
+    
+    
 
     @property
     def preset_dir_path(self):
@@ -177,7 +230,11 @@ def _get_preset_types(preset_types):
     return tuple(types)
 
 
-def _load_presets(preset_dir_path, preset_types):
+def _get_file_stats(preset_files):
+    return dict((path, stat) for path, (stat, _) in preset_files.items())
+
+
+def _load_presets(preset_dir_path, preset_types, old_files, new_files):
     
     if not os.path.exists(preset_dir_path):
         message = 'Preset directory "{}" does not exist.'.format(
@@ -213,8 +270,8 @@ def _load_presets(preset_dir_path, preset_types):
                             dir_name, dir_path))
                 
                 else:
-                    preset_data[dir_name] = \
-                        _load_presets_aux(dir_path, preset_type)
+                    preset_data[dir_name] = _load_presets_aux(
+                        dir_path, preset_type, old_files, new_files)
                     
             # Stop walk from visiting subdirectories.
             del dir_names[:]
@@ -222,22 +279,25 @@ def _load_presets(preset_dir_path, preset_types):
         return preset_data
         
 
-def _load_presets_aux(dir_path, preset_type):
+def _load_presets_aux(dir_path, preset_type, old_files, new_files):
     
     presets = []
     preset_data = {}
     
+    new_files[dir_path] = (None, None)
+    
     for _, subdir_names, file_names in os.walk(dir_path):
         
         for file_name in file_names:
-            preset = _load_preset(dir_path, file_name, preset_type)
+            preset = _load_preset(
+                dir_path, file_name, preset_type, old_files, new_files)
             if preset is not None:
                 presets.append(preset)
                             
         for subdir_name in subdir_names:
             subdir_path = os.path.join(dir_path, subdir_name)
-            preset_data[subdir_name] = \
-                _load_presets_aux(subdir_path, preset_type)
+            preset_data[subdir_name] = _load_presets_aux(
+                subdir_path, preset_type, old_files, new_files)
                 
         # Stop walk from visiting subdirectories.
         del subdir_names[:]
@@ -247,13 +307,37 @@ def _load_presets_aux(dir_path, preset_type):
     return (tuple(presets), preset_data)
         
         
-def _load_preset(dir_path, file_name, preset_type):
-    file_path = os.path.join(dir_path, file_name)
+def _load_preset(dir_path, file_name, preset_type, old_files, new_files):
+    
     preset_name = _get_preset_name(file_name)
+    
     if preset_name is None:
         return None
-    else:
-        return _parse_preset(file_path, preset_name, preset_type)
+    
+    file_path = os.path.join(dir_path, file_name)
+    
+    try:
+        stat = _get_file_stat(file_path)
+    except OSError:
+        # file removed since directory listed
+        
+        return None
+    
+    old_stat, preset = old_files.get(file_path, (None, None))
+    
+    if stat != old_stat:
+        # file added or modified since last load
+        
+        preset = _parse_preset(file_path, preset_name, preset_type)
+        
+    new_files[file_path] = (stat, preset)
+    
+    return preset
+        
+
+def _get_file_stat(file_path):
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
             
 
 def _get_preset_name(file_name):
@@ -266,7 +350,7 @@ def _get_preset_name(file_name):
 def _parse_preset(file_path, preset_name, preset_type):
     
     try:
-        file_ = open(file_path, 'rU')
+        file_ = open(file_path, 'r')
     except:
         logging.error(
             'Preset manager could not open preset file "{}".'.format(file_path))
@@ -0,0 +1,385 @@
+"""
+Module containing series processors for threshold detectors.
+
+A threshold detector, like the Old Bird redux detectors and the PNF
+energy detectors, finds where a detection signal crosses one or more
+thresholds and then passes the resulting series of threshold crossings
+through a chain of *series processors* that turn it into a series of
+clips. The processors are stateful, so a detector can pass a long
+series through a chain in consecutive pieces.
+
+The processors of this module operate on NumPy arrays rather than on
+sequences of tuples, so that they can process series of millions of
+crossings or clips quickly. A series of threshold crossings is an
+integer array of shape (n, 2) whose rows are (index, rise) pairs,
+where `rise` is one for a crossing up through a threshold and zero
+for a crossing down through one. The rows are sorted by index, with
+falls preceding rises at the same index. (The `get_crossings` function
+creates such arrays.) A series of clips is an integer array of shape
+(n, 2) whose rows are (start index, length) pairs. For convenience,
+the processors also accept sequences of pairs.
+"""
+
+
+import numpy as np
+
+
+_DTYPE = np.dtype('int64')
+
+
+def get_crossings(rise_indices, fall_indices):
+    
+    """
+    Creates a series of threshold crossings.
+    
+    Parameters
+    ----------
+    rise_indices : one-dimensional NumPy array
+        indices of crossings up through a threshold.
+    fall_indices : one-dimensional NumPy array
+        indices of crossings down through a threshold.
+    
+    Returns
+    -------
+    NumPy array
+        the crossings, as described in the module docstring.
+    """
+    
+    indices = np.concatenate((rise_indices, fall_indices)).astype(_DTYPE)
+    
+    rises = np.zeros(len(indices), dtype=_DTYPE)
+    rises[:len(rise_indices)] = 1
+    
+    order = np.lexsort((rises, indices))
+    
+    return np.column_stack((indices[order], rises[order]))
+
+
+def _get_array(items):
+    return np.asarray(items, dtype=_DTYPE).reshape(-1, 2)
+
+
+def _get_empty_array():
+    return np.zeros((0, 2), dtype=_DTYPE)
+
+
+class SeriesProcessor:
+    
+    
+    def process(self, items):
+        raise NotImplementedError()
+    
+    
+    def complete_processing(self, items):
+        return self.process(items)
+
+
+class TransientFinder(SeriesProcessor):
+    
+    """
+    Finds transients in a series of threshold crossings.
+    
+    The transient finder reproduces the flip-flop of the original Old
+    Bird detectors, whose source code file was splimflipflop.c. A
+    transient starts with a rise. It ends with the first subsequent
+    fall at or after the end of a minimal transient (one of length
+    `min_length`), but is truncated at length `max_length`. A fall
+    before the end of a minimal transient puts the finder in a holding
+    state, which a subsequent rise ends: if the rise is within the
+    minimal transient the transient continues, and if not the finder
+    emits a minimal transient and the rise starts a new transient. A
+    rise at or after the end of a maximal transient ends the transient,
+    and if more than one sample after its end starts a new transient.
+    
+    Rather than stepping through crossings one at a time, the finder
+    computes with NumPy, for every rise, the transient that would
+    result if the rise started one and where the next transient would
+    then start. It then follows the resulting chain of transients from
+    the first rise, so that its Python code runs once per transient
+    instead of once per crossing.
+    
+    `min_length` must be positive and not exceed `max_length`.
+    """
+    
+    
+    def __init__(self, min_length, max_length):
+        
+        if min_length <= 0 or min_length > max_length:
+            raise ValueError(
+                f'Bad transient finder minimum and maximum lengths '
+                f'{min_length} and {max_length}.')
+        
+        self._min_length = min_length
+        self._max_length = max_length
+        
+        # Crossings we have not yet been able to finish processing,
+        # namely the rise that started the current transient and the
+        # crossings following it. We process them again with the
+        # crossings of the next call to `process`. When we are not in
+        # a transient, there are no such crossings.
+        self._pending_crossings = _get_empty_array()
+    
+    
+    def process(self, crossings):
+        
+        crossings = np.concatenate(
+            (self._pending_crossings, _get_array(crossings)))
+        
+        self._pending_crossings = _get_empty_array()
+        
+        if len(crossings) == 0:
+            return _get_empty_array()
+        
+        indices = crossings[:, 0]
+        rises = crossings[:, 1] != 0
+        count = len(crossings)
+        
+        next_rises = _get_next_positions(rises)
+        next_falls = _get_next_positions(~rises)
+        
+        # Positions and indices of rises, each of which we consider as
+        # the start of a transient.
+        starts = np.flatnonzero(rises)
+        start_indices = indices[starts]
+        min_end_indices = start_indices + self._min_length
+        max_end_indices = start_indices + self._max_length
+        
+        # Position of first crossing at or after end of minimal
+        # transient.
+        min_ends = np.maximum(
+            np.searchsorted(indices, min_end_indices), starts + 1)
+        
+        # Position of first crossing at or after end of maximal
+        # transient.
+        max_ends = np.searchsorted(indices, max_end_indices)
+        
+        # Crossings before the end of a minimal transient never end it.
+        # They just toggle the finder between the up and holding states,
+        # so the finder is holding at the end of a minimal transient if
+        # and only if the last crossing before it (if any) is a fall.
+        previous = np.maximum(min_ends - 1, 0)
+        holding = (previous > starts) & ~rises[previous]
+        
+        # Get first crossing at or after end of minimal transient.
+        min_end_valid = min_ends < count
+        valid_min_ends = np.minimum(min_ends, count - 1)
+        min_end_rises = rises[valid_min_ends]
+        
+        # A rise exactly at the end of a minimal transient returns a
+        # holding finder to the up state.
+        resumed = \
+            holding & min_end_valid & min_end_rises & \
+            (indices[valid_min_ends] == min_end_indices)
+        holding &= ~resumed
+        
+        # For the up state, get the first fall at or after the end of
+        # a minimal transient and the first rise at or after the end
+        # of a maximal transient.
+        up_starts = min_ends + resumed
+        falls = next_falls[up_starts]
+        up_rises = next_rises[np.maximum(max_ends, up_starts)]
+        
+        fall_first = falls < up_rises
+        fall_indices = indices[np.minimum(falls, count - 1)]
+        rise_indices = indices[np.minimum(up_rises, count - 1)]
+        
+        # Get transient lengths.
+        lengths = np.where(
+            holding, self._min_length,
+            np.where(
+                fall_first,
+                np.minimum(fall_indices - start_indices, self._max_length),
+                self._max_length))
+        
+        # Get positions at which we look for the next transient. A
+        # holding finder starts a new transient at a rise after the end
+        # of a minimal transient, but looks after a fall. An up finder
+        # starts a new transient at a rise more than one sample after
+        # the end of a maximal transient, but looks after a fall or a
+        # rise exactly at the end of a maximal transient.
+        next_starts = np.where(
+            holding, min_ends + ~min_end_rises,
+            np.where(
+                fall_first | (rise_indices == max_end_indices),
+                np.minimum(falls, up_rises) + 1,
+                up_rises))
+        next_starts = next_rises[np.minimum(next_starts, count)]
+        
+        # Transients we cannot finish without more crossings.
+        unfinished = np.where(
+            holding, ~min_end_valid, (falls == count) & (up_rises == count))
+        
+        # Map positions of next rises to numbers of next transients.
+        next_starts = np.searchsorted(starts, next_starts)
+        
+        # Follow the chain of transients from the first rise.
+        transients = []
+        start_indices = start_indices.tolist()
+        lengths = lengths.tolist()
+        next_starts = next_starts.tolist()
+        unfinished = unfinished.tolist()
+        
+        i = 0
+        num_starts = len(starts)
+        
+        while i < num_starts:
+            
+            if unfinished[i]:
+                self._pending_crossings = crossings[starts[i]:]
+                break
+            
+            transients.append((start_indices[i], lengths[i]))
+            i = next_starts[i]
+        
+        return _get_array(transients)
+
+
+def _get_next_positions(mask):
+    
+    """
+    Gets, for each position of a boolean array and the position just
+    past its end, the position of the first `True` element at or after
+    that position, or the length of the array if there is none.
+    """
+    
+    count = len(mask)
+    positions = np.arange(count + 1)
+    positions[:count][~mask] = count
+    return np.minimum.accumulate(positions[::-1])[::-1]
+
+
+class ClipMerger(SeriesProcessor):
+    
+    """
+    Merges clips that overlap or abut.
+    
+    A clip is merged into the previous clip if it starts at or before
+    the end of the previous clip. The merged clip extends from the start
+    of the first clip to the end of the last clip of a merged run.
+    """
+    
+    
+    def __init__(self):
+        
+        # Start and end indices of the last merged clip, which later
+        # clips may yet be merged into.
+        self._prev_start_index = None
+        self._prev_end_index = None
+    
+    
+    def process(self, clips):
+        
+        clips = _get_array(clips)
+        
+        start_indices = clips[:, 0]
+        end_indices = start_indices + clips[:, 1]
+        
+        if self._prev_start_index is not None:
+            start_indices = np.insert(
+                start_indices, 0, self._prev_start_index)
+            end_indices = np.insert(end_indices, 0, self._prev_end_index)
+        
+        if len(start_indices) == 0:
+            return _get_empty_array()
+        
+        # Each merged clip starts with a clip that starts after the end
+        # of the previous clip.
+        firsts = np.flatnonzero(
+            np.concatenate(([True], start_indices[1:] > end_indices[:-1])))
+        lasts = np.append(firsts[1:], len(start_indices)) - 1
+        
+        merged_start_indices = start_indices[firsts]
+        merged_end_indices = end_indices[lasts]
+        
+        # Hold on to the last merged clip, since later clips may be
+        # merged into it.
+        self._prev_start_index = merged_start_indices[-1]
+        self._prev_end_index = merged_end_indices[-1]
+        
+        return np.column_stack((
+            merged_start_indices[:-1],
+            merged_end_indices[:-1] - merged_start_indices[:-1]))
+    
+    
+    def complete_processing(self, clips):
+        
+        merged_clips = self.process(clips)
+        
+        if self._prev_start_index is not None:
+            # one more clip to emit
+            
+            length = self._prev_end_index - self._prev_start_index
+            merged_clips = np.append(
+                merged_clips, [(self._prev_start_index, length)], axis=0)
+            
+            self._prev_start_index = None
+            self._prev_end_index = None
+        
+        return merged_clips
+
+
+class ClipSuppressor(SeriesProcessor):
+    
+    """
+    Suppresses clips that occur at too high a rate.
+    
+    A clip is suppressed if it and the `count_threshold - 1` clips
+    (suppressed or not) that preceded it all started within `period`
+    samples.
+    """
+    
+    
+    def __init__(self, count_threshold, period):
+        
+        if count_threshold < 1:
+            raise ValueError(
+                f'Bad clip suppressor count threshold {count_threshold}.')
+        
+        self._count_threshold = count_threshold
+        self._period = period
+        
+        # Start indices of the last `count_threshold - 1` clips.
+        self._recent_start_indices = np.zeros(0, dtype=_DTYPE)
+    
+    
+    def process(self, clips):
+        
+        clips = _get_array(clips)
+        
+        start_indices = np.concatenate(
+            (self._recent_start_indices, clips[:, 0]))
+        
+        lag = self._count_threshold - 1
+        positions = np.arange(
+            len(self._recent_start_indices), len(start_indices))
+        earlier_positions = positions - lag
+        
+        deltas = \
+            start_indices[positions] - \
+            start_indices[np.maximum(earlier_positions, 0)]
+        
+        suppressed = (earlier_positions >= 0) & (deltas < self._period)
+        
+        self._recent_start_indices = \
+            start_indices[max(len(start_indices) - lag, 0):]
+        
+        return clips[~suppressed]
+
+
+class SeriesProcessorChain(SeriesProcessor):
+    
+    
+    def __init__(self, processors):
+        self._processors = processors
+    
+    
+    def process(self, items):
+        for processor in self._processors:
+            items = processor.process(items)
+        return items
+    
+    
+    def complete_processing(self, items):
+        for processor in self._processors:
+            items = processor.complete_processing(items)
+        return items
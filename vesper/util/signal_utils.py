@@ -192,6 +192,66 @@ def find_peaks(x, min_value=None):
         return indices
         
         
+_MOVING_AVERAGE_BLOCK_SIZE = 65536
+"""
+Number of moving averages computed from each cumulative sum by
+`moving_average`.
+"""
+
+
+def moving_average(x, length):
+    
+    """
+    Computes moving averages of the specified array.
+    
+    The result is the same as that of
+    `np.convolve(x, np.ones(length) / length, mode='valid')`, up to
+    rounding error, but is computed in time proportional to the length
+    of `x` regardless of the averaging length.
+    
+    The function computes each average as the difference of two
+    cumulative sums of `x`, divided by `length`. A single cumulative
+    sum over a long array would grow ever larger while the elements of
+    `x` did not, eventually losing precision in the averages. The
+    function avoids this by restarting the cumulative sum for every
+    `_MOVING_AVERAGE_BLOCK_SIZE` averages, so that the rounding error
+    of an average does not grow with the length of `x`.
+    
+    Parameters
+    ----------
+    x : one-dimensional NumPy array
+        the array to average.
+    length : int
+        the number of elements of `x` in each average.
+        
+    Returns
+    -------
+    NumPy array
+        the `len(x) - length + 1` averages of consecutive runs of
+        `length` elements of `x`, or an empty array if `x` has fewer
+        than `length` elements. The array has dtype float64.
+    """
+    
+    num_averages = max(len(x) - length + 1, 0)
+    averages = np.empty(num_averages)
+    
+    for start_index in range(0, num_averages, _MOVING_AVERAGE_BLOCK_SIZE):
+        
+        end_index = min(
+            start_index + _MOVING_AVERAGE_BLOCK_SIZE, num_averages)
+        
+        sums = np.cumsum(
+            x[start_index:end_index + length - 1], dtype='float64')
+        
+        block = averages[start_index:end_index]
+        block[0] = sums[length - 1]
+        np.subtract(sums[length:], sums[:-length], out=block[1:])
+        
+    averages /= length
+    
+    return averages
+        
+        
 def resample(audio, target_sample_rate):
     
     """
@@ -0,0 +1,125 @@
+import weakref
+
+import numpy as np
+
+from vesper.tests.test_case import TestCase
+from vesper.util.analysis_graph import (
+    AnalysisGraph, BandPowerNode, ResamplingNode, SpectrogramNode)
+import vesper.signal.resampling_utils as resampling_utils
+import vesper.util.analysis_graph as analysis_graph
+import vesper.util.time_frequency_analysis_utils as tfa_utils
+
+
+class AnalysisGraphTests(TestCase):
+
+
+    def test_add_node(self):
+        
+        graph = AnalysisGraph()
+        
+        a = graph.add_node(SpectrogramNode('hann', 8, 4, 8))
+        b = graph.add_node(SpectrogramNode('hann', 8, 4, 8))
+        c = graph.add_node(SpectrogramNode('hann', 8, 2, 8))
+        
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+        self.assertEqual(graph.nodes, (a, c))
+        
+        
+    def test_chunked_processing(self):
+        
+        graph = AnalysisGraph()
+        spectrogram_node = graph.add_node(SpectrogramNode('hann', 8, 3, 8))
+        band_power_node = graph.add_node(
+            BandPowerNode(spectrogram_node, 1, 3))
+        
+        samples = np.random.default_rng(0).normal(size=100)
+        
+        spectra = []
+        powers = []
+        for start_index in range(0, len(samples), 17):
+            graph.process(samples[start_index:start_index + 17])
+            spectra.append(spectrogram_node.output)
+            powers.append(band_power_node.output)
+        spectra = np.concatenate(spectra)
+        powers = np.concatenate(powers)
+        
+        window = spectrogram_node.window
+        expected = tfa_utils.compute_spectrogram(samples, window, 3, 8)
+        self.assertTrue(np.allclose(spectra, expected))
+        self.assertTrue(np.allclose(powers, expected[:, 1:3].sum(axis=1)))
+        
+        
+    def test_get_product(self):
+        
+        graph = AnalysisGraph()
+        graph.process(np.zeros(10))
+        
+        computations = []
+        
+        def compute():
+            computations.append(None)
+            return len(computations)
+        
+        self.assertEqual(graph.get_product('a', compute), 1)
+        self.assertEqual(graph.get_product('a', compute), 1)
+        
+        # Product cache is cleared when the next chunk is processed.
+        graph.process(np.zeros(10))
+        self.assertEqual(graph.get_product('a', compute), 2)
+
+        
+        
+    def test_products_do_not_accumulate(self):
+        
+        # A graph with no nodes still caches products, so processing it
+        # must release the products of earlier chunks.
+        graph = AnalysisGraph()
+        
+        refs = []
+        for i in range(5):
+            graph.process(np.zeros(10))
+            product = graph.get_product(('a', i), lambda: np.zeros(1000))
+            refs.append(weakref.ref(product))
+            del product
+        
+        self.assertEqual([ref() is None for ref in refs], [True] * 4 + [False])
+
+        
+        
+    def test_resampy_resampling_node(self):
+        
+        # 11025 Hz input has no polyphase resampler, so the node
+        # resamples it with `resampy` in chunks, here of one second.
+        chunk_duration = analysis_graph._RESAMPLING_CHUNK_DURATION
+        analysis_graph._RESAMPLING_CHUNK_DURATION = 1
+        
+        try:
+            
+            node = ResamplingNode(11025)
+            samples = np.random.default_rng(0).normal(size=38000)
+            
+            outputs = []
+            output_lengths = []
+            for start_index in range(0, len(samples), 1000):
+                node.process(samples[start_index:start_index + 1000])
+                outputs.append(node.output)
+                output_lengths.append(len(node.output))
+            outputs.append(node.complete())
+            
+        finally:
+            analysis_graph._RESAMPLING_CHUNK_DURATION = chunk_duration
+            
+        # Output appears only when a whole chunk has been buffered, and
+        # each chunk resamples to exactly one second of output.
+        self.assertEqual(
+            [i for i, n in enumerate(output_lengths) if n != 0],
+            [11, 22, 33])
+        self.assertEqual(
+            [n for n in output_lengths if n != 0], [24000] * 3)
+        
+        resample = resampling_utils.resample_to_24000_hz
+        expected = np.concatenate([
+            resample(samples[i:i + 11025], 11025)
+            for i in range(0, len(samples), 11025)])
+        self.assertTrue(np.allclose(np.concatenate(outputs), expected))
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os.path
+import tempfile
 
 import numpy as np
 
@@ -75,6 +76,37 @@ class AudioFileUtilsTests(TestCase):
             self.assertEqual(info.compression_name, _EXPECTED_COMPRESSION_NAME)
 
 
+    def test_get_wave_file_info_sample_formats(self):
+        
+        samples = np.zeros((2, 10))
+        
+        cases = [
+            (24, 'integer'),
+            (32, 'integer'),
+            (32, 'floating point'),
+            (64, 'floating point')
+        ]
+        
+        with tempfile.TemporaryDirectory() as dir_path:
+            
+            path = os.path.join(dir_path, _TEST_FILE_NAME)
+            
+            for sample_size, sample_format in cases:
+                
+                contents = test_utils.create_wave_file_contents(
+                    samples, 24000, sample_size, sample_format)
+                
+                with open(path, 'wb') as file_:
+                    file_.write(contents)
+                
+                info = audio_file_utils.get_wave_file_info(path)
+                
+                self.assertEqual(info.num_channels, 2)
+                self.assertEqual(info.length, 10)
+                self.assertEqual(info.sample_size, sample_size)
+                self.assertEqual(info.sample_rate, 24000)
+        
+        
     def test_read_wave_file(self):
         for case in _TEST_CASES:
             self._assert_wave_file(*case)
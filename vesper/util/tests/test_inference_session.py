@@ -0,0 +1,118 @@
+import os.path
+import tempfile
+
+import numpy as np
+import tensorflow as tf
+
+from vesper.tests.test_case import TestCase
+from vesper.util.inference_session import (
+    InferenceSession, get_inference_session)
+
+
+_tf = tf.compat.v1
+
+_WEIGHTS = np.array([1, 2, 3, 4], dtype='float32')
+
+
+def _create_model(dir_path):
+    
+    """
+    Saves a SavedModel that computes the dot product of a four-element
+    input vector with `_WEIGHTS`.
+    """
+    
+    model_dir_path = os.path.join(dir_path, 'Model')
+    
+    graph = tf.Graph()
+    
+    with graph.as_default():
+        
+        features = _tf.placeholder(tf.float32, shape=(None, 4))
+        weights = _tf.Variable(_WEIGHTS.reshape((4, 1)))
+        output = tf.matmul(features, weights)
+        
+        with _tf.Session(graph=graph) as session:
+            session.run(_tf.global_variables_initializer())
+            _tf.saved_model.simple_save(
+                session, model_dir_path, {'features': features},
+                {'output': output})
+    
+    return model_dir_path
+
+
+def _preprocess(waveforms):
+    
+    """
+    Preprocesses a batch of waveforms like the coarse classifier
+    dataset preprocessors do, slicing each waveform and then computing
+    features for the batch.
+    """
+    
+    waveforms = tf.map_fn(lambda w: w[2:6], waveforms, dtype=tf.float32)
+    
+    # Like `_Preprocessor.compute_spectrograms`, require a known rank.
+    dims = list(waveforms.shape.dims)
+    dims[1] = 4
+    waveforms.set_shape(dims)
+    
+    return {'features': 2 * waveforms}
+
+
+class InferenceSessionTests(TestCase):
+    
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.dir_path = tempfile.mkdtemp()
+        cls.model_dir_path = _create_model(cls.dir_path)
+    
+    
+    def test_predict(self):
+        
+        examples = np.random.default_rng(0).normal(size=(10, 4))
+        expected = np.dot(examples, _WEIGHTS).reshape((10, 1))
+        
+        session = InferenceSession(self.model_dir_path, batch_size=4)
+        outputs = session.predict(examples.astype('float32'))
+        
+        self._assert_arrays_close(outputs, expected)
+        self.assertEqual(session.num_batches, 3)
+        self.assertIsNotNone(session.mean_batch_duration)
+        
+        outputs = session.predict(np.zeros((0, 4), dtype='float32'))
+        self.assertEqual(outputs.shape, (0, 1))
+    
+    
+    def test_predict_with_preprocessor(self):
+        
+        waveforms = np.random.default_rng(0).normal(size=(5, 10))
+        expected = 2 * np.dot(waveforms[:, 2:6], _WEIGHTS).reshape((5, 1))
+        
+        session = InferenceSession(
+            self.model_dir_path, _preprocess, batch_size=2,
+            intra_op_thread_count=1, inter_op_thread_count=1)
+        outputs = session.predict(waveforms)
+        
+        self._assert_arrays_close(outputs, expected)
+        self.assertEqual(session.num_batches, 3)
+    
+    
+    def test_get_inference_session(self):
+        
+        get = get_inference_session
+        path = self.model_dir_path
+        
+        a = get(path, _preprocess, 'Double')
+        self.assertIs(get(path, lambda w: w, 'Double'), a)
+        self.assertIsNot(get(path, _preprocess, 'Triple'), a)
+        self.assertIsNot(get(path, _preprocess, 'Double', batch_size=32), a)
+        
+        # Without a preprocessor key, a preprocessor identifies itself.
+        b = get(path, _preprocess)
+        self.assertIs(get(path, _preprocess), b)
+        self.assertIsNot(get(path), b)
+    
+    
+    def test_errors(self):
+        self._assert_raises(
+            ValueError, InferenceSession, self.model_dir_path, None, 0)
@@ -1,4 +1,6 @@
 from pathlib import Path
+import os
+import tempfile
 
 from vesper.tests.test_case import TestCase
 from vesper.util.preference_manager import PreferenceManager
@@ -73,3 +75,33 @@ class PreferenceManagerTests(TestCase):
     def test_non_mapping_preference_file(self):
         p = PreferenceManager(_NON_MAPPING_PREFERENCE_FILE_PATH).preferences
         self.assertEqual(len(p), 0)
+        
+        
+    def test_reload_preferences(self):
+        
+        file_path = Path(tempfile.mkdtemp()) / 'Preferences.yaml'
+        file_path.write_text('one: 1')
+        
+        manager = PreferenceManager(file_path)
+        self.assertEqual(manager.version, 1)
+        preferences = manager.preferences
+        
+        # Reload without changes should keep version and preferences.
+        manager.reload_preferences()
+        self.assertEqual(manager.version, 1)
+        self.assertIs(manager.preferences, preferences)
+        
+        # Modify preference file. We set its modification time explicitly
+        # in case the file system's time resolution is coarse.
+        file_path.write_text('one: 2')
+        stat = file_path.stat()
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        manager.reload_preferences()
+        self.assertEqual(manager.version, 2)
+        self.assertEqual(manager.preferences['one'], 2)
+        
+        # Delete preference file.
+        file_path.unlink()
+        manager.reload_preferences()
+        self.assertEqual(manager.version, 3)
+        self.assertEqual(len(manager.preferences), 0)
@@ -1,3 +1,8 @@
+from pathlib import Path
+import os
+import shutil
+import tempfile
+
 from vesper.tests.test_case import TestCase
 from vesper.util.preset import Preset
 from vesper.util.preset_manager import PresetManager
@@ -119,3 +124,44 @@ class PresetManagerTests(TestCase):
         for type_name, path, expected in cases:
             preset = self.manager.get_preset(type_name, path)
             self.assertEqual(preset, expected)
+            
+            
+    def test_reload_presets(self):
+        
+        dir_path = Path(tempfile.mkdtemp()) / 'Presets'
+        shutil.copytree(_DATA_DIR_PATH, dir_path)
+        
+        manager = PresetManager((A, B), str(dir_path))
+        self.assertEqual(manager.version, 1)
+        preset = manager.get_preset('A', '1')
+        preset_2 = manager.get_preset('A', '2')
+        
+        # Reload without changes should keep version and presets.
+        manager.reload_presets()
+        self.assertEqual(manager.version, 1)
+        self.assertIs(manager.get_preset('A', '1'), preset)
+        
+        # Modify a preset file. We set its modification time explicitly
+        # in case the file system's time resolution is coarse.
+        file_path = dir_path / 'A' / '1.yaml'
+        file_path.write_text('uno')
+        stat = file_path.stat()
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        manager.reload_presets()
+        self.assertEqual(manager.version, 2)
+        self.assertEqual(manager.get_preset('A', '1'), A('1', 'uno'))
+        
+        # Unmodified preset files should not have been reparsed.
+        self.assertIs(manager.get_preset('A', '2'), preset_2)
+        
+        # Add a preset file.
+        (dir_path / 'B' / '3.yaml').write_text('3')
+        manager.reload_presets()
+        self.assertEqual(manager.version, 3)
+        self.assertEqual(manager.get_preset('B', '3'), B('3', '3'))
+        
+        # Remove a preset directory.
+        shutil.rmtree(dir_path / 'A' / 'x')
+        manager.reload_presets()
+        self.assertEqual(manager.version, 4)
+        self.assertIsNone(manager.get_preset('A', ('x', 'y', '3')))
@@ -0,0 +1,172 @@
+import numpy as np
+
+from vesper.tests.test_case import TestCase
+from vesper.util.series_processors import (
+    ClipMerger, ClipSuppressor, TransientFinder, get_crossings)
+
+
+_MIN_LENGTH = 100
+_MAX_LENGTH = 400
+_FINAL_FALL = (1000000, False)
+
+
+class SeriesProcessorsTests(TestCase):
+    
+    
+    def test_get_crossings(self):
+        
+        crossings = get_crossings(np.array([5, 1, 3]), np.array([3, 0]))
+        
+        # Falls precede rises at the same index.
+        expected = np.array([[0, 0], [1, 1], [3, 0], [3, 1], [5, 1]])
+        
+        self._assert_arrays_equal(crossings, expected)
+    
+    
+    def test_transient_finder(self):
+        
+        cases = [
+            
+            # no transitions, no transients
+            ([], []),
+            
+            # falls only, no transients
+            ([(1000, False)], []),
+            ([(1000, False), (1100, False)], []),
+            
+            # one transient, length less than minimum
+            ([(1000, True), (1001, False)], [(1000, 100)]),
+            ([(1000, True), (1050, False)], [(1000, 100)]),
+            ([(1000, True), (1099, False)], [(1000, 100)]),
+            
+            # one transient, minimum length
+            ([(1000, True), (1100, False)], [(1000, 100)]),
+            
+            # one transient, length between minimum and maximum
+            ([(1000, True), (1200, False)], [(1000, 200)]),
+            
+            # one transient, maximum length
+            ([(1000, True), (1400, False)], [(1000, 400)]),
+            
+            # one transient, length greater than maximum
+            ([(1000, True), (1401, False)], [(1000, 400)]),
+            ([(1000, True), (1500, False)], [(1000, 400)]),
+            
+            # two transients
+            ([(1000, True), (1200, False), (1400, True), (1600, False)],
+             [(1000, 200), (1400, 200)]),
+            
+            # two closely spaced transients
+            ([(1000, True), (1200, False), (1201, True), (1401, False)],
+             [(1000, 200), (1201, 200)]),
+            
+            # one transient preceded by fall
+            ([(500, False), (1000, True), (1200, False)], [(1000, 200)]),
+            
+            # two consecutive rises separated by less than maximum length
+            ([(1000, True), (1100, True), (1200, False)], [(1000, 200)]),
+            ([(1000, True), (1399, True)], [(1000, 400)]),
+            
+            # two consecutive rises separated by exactly maximum length
+            # (the second rise is ignored)
+            ([(1000, True), (1400, True)], [(1000, 400)]),
+            
+            # two consecutive rises separated by more than maximum length
+            ([(1000, True), (1401, True)], [(1000, 400), (1401, 400)]),
+            ([(1000, True), (2000, True), (3000, False)],
+             [(1000, 400), (2000, 400)]),
+            
+            # rise after transient of less than minimum length, not more
+            # than one sample past end of minimum length transient
+            ([(1000, True), (1010, False), (1020, True)], [(1000, 400)]),
+            ([(1000, True), (1010, False), (1099, True)], [(1000, 400)]),
+            ([(1000, True), (1010, False), (1100, True)], [(1000, 400)]),
+            
+            # rise after transient of less than minimum length, more than
+            # one sample past end of minimum length transient
+            ([(1000, True), (1010, False), (1101, True)],
+             [(1000, 100), (1101, 400)]),
+            
+            # fall after transient of less than minimum length, before
+            # end of minimum length transient
+            ([(1000, True), (1010, False), (1020, False)], [(1000, 100)]),
+        
+        ]
+        
+        for crossings, expected in cases:
+            
+            # Pass crossings all at once.
+            finder = TransientFinder(_MIN_LENGTH, _MAX_LENGTH)
+            result = [
+                finder.process(crossings),
+                finder.complete_processing([_FINAL_FALL])]
+            self._assert_clips(np.concatenate(result), expected)
+            
+            # Pass crossings one at a time.
+            finder = TransientFinder(_MIN_LENGTH, _MAX_LENGTH)
+            result = [finder.process([crossing]) for crossing in crossings]
+            result.append(finder.complete_processing([_FINAL_FALL]))
+            self._assert_clips(np.concatenate(result), expected)
+    
+    
+    def test_transient_finder_errors(self):
+        self._assert_raises(ValueError, TransientFinder, 0, 10)
+        self._assert_raises(ValueError, TransientFinder, 10, 5)
+    
+    
+    def test_clip_merger(self):
+        
+        cases = [
+            ([], []),
+            ([(0, 10)], [(0, 10)]),
+            ([(0, 10), (11, 5)], [(0, 10), (11, 5)]),
+            ([(0, 10), (10, 5)], [(0, 15)]),
+            
+            # A merged clip ends where its last clip ends, as in the
+            # original Old Bird detectors.
+            ([(0, 10), (5, 2)], [(0, 7)]),
+            
+            ([(0, 10), (5, 10), (15, 1), (20, 5)], [(0, 16), (20, 5)]),
+        ]
+        
+        for clips, expected in cases:
+            
+            # Pass clips all at once.
+            merger = ClipMerger()
+            result = merger.complete_processing(clips)
+            self._assert_clips(result, expected)
+            
+            # Pass clips one at a time.
+            merger = ClipMerger()
+            result = [merger.process([clip]) for clip in clips]
+            result.append(merger.complete_processing([]))
+            self._assert_clips(np.concatenate(result), expected)
+    
+    
+    def _assert_clips(self, clips, expected):
+        self.assertEqual([tuple(clip) for clip in clips.tolist()], expected)
+    
+    
+    def test_clip_suppressor(self):
+        
+        clips = [(0, 1), (5, 1), (9, 1), (10, 1), (30, 1), (31, 1)]
+        
+        cases = [
+            (1, 10, []),
+            (2, 1, clips),
+            (2, 5, [(0, 1), (5, 1), (30, 1)]),
+            (3, 10, [(0, 1), (5, 1), (30, 1), (31, 1)]),
+        ]
+        
+        for count_threshold, period, expected in cases:
+            
+            # Pass clips all at once.
+            suppressor = ClipSuppressor(count_threshold, period)
+            self._assert_clips(suppressor.process(clips), expected)
+            
+            # Pass clips one at a time.
+            suppressor = ClipSuppressor(count_threshold, period)
+            result = [suppressor.process([clip]) for clip in clips]
+            self._assert_clips(np.concatenate(result), expected)
+        
+        self._assert_raises(ValueError, ClipSuppressor, 0, 10)
@@ -112,3 +112,33 @@ class SignalUtilsTests(TestCase):
             expected = np.array(expected)
             actual = signal_utils.find_peaks(x, min_value)
             self._assert_arrays_equal(actual, expected)
+            
+            
+    def test_moving_average(self):
+        
+        cases = [
+            ([], 1, []),
+            ([1, 2], 3, []),
+            ([1, 2, 3], 3, [2]),
+            ([1, 2, 3, 4], 1, [1, 2, 3, 4]),
+            ([1, 2, 3, 4], 2, [1.5, 2.5, 3.5]),
+        ]
+        
+        for x, length, expected in cases:
+            x = np.array(x, dtype='float')
+            expected = np.array(expected, dtype='float')
+            actual = signal_utils.moving_average(x, length)
+            self._assert_arrays_equal(actual, expected)
+            
+        # Averages spanning several cumulative sum blocks, with large
+        # values early in the input and small ones later. The error of
+        # the averages of the small values should not depend on the
+        # large ones once a new block has started.
+        x = np.random.default_rng(0).uniform(size=400000)
+        x[:100000] *= 1e6
+        length = 2000
+        actual = signal_utils.moving_average(x, length)
+        expected = np.convolve(x, np.ones(length) / length, mode='valid')
+        self.assertTrue(np.allclose(actual, expected, rtol=1e-6, atol=0))
+        self.assertTrue(np.allclose(
+            actual[-100000:], expected[-100000:], rtol=1e-11, atol=0))